@@ -0,0 +1,101 @@
+"""Throughput benchmark for the whole serial pipeline, driven by a replayed capture.
+
+Replays a capture (a synthetic plotter-style one by default) through a
+virtual serial port into the IDE's SerialMonitor with the Plotter attached,
+and reports how fast bytes and lines get through the reader thread, line
+decoding, output batching and plot parsing. The same capture gives the same
+input on every run, so results can be compared between changes.
+
+Usage (POSIX only):
+    QT_QPA_PLATFORM=offscreen python scripts/bench_serial_pipeline.py [--mb 20] [--channels 4]
+    python scripts/bench_serial_pipeline.py --capture ~/.asic/captures/<capture> [--speed 10]
+"""
+
+import argparse
+import math
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PyQt6.QtWidgets import QApplication
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+from vb2arduino.serial_capture import CaptureReader, CaptureWriter  # noqa: E402
+from vb2arduino.serial_replay import SPEED_MAX, Replayer, VirtualSerialPort, capture_chunks  # noqa: E402
+from vb2arduino.ide.plotter_panel import PlotterPanel  # noqa: E402
+from vb2arduino.ide.serial_monitor import SerialMonitor  # noqa: E402
+
+
+def make_capture(directory: Path, mb: float, channels: int, chunk: int = 4096) -> None:
+    """Write a capture of comma-separated samples, timed as if read at 2 Mbaud."""
+    writer = CaptureWriter(directory, port="synthetic", baudrate=2000000)
+    target = int(mb * 1024 * 1024)
+    ts, pending, k = 1.0e9, [], 0
+    while writer.bytes_written < target:
+        pending.append(",".join(f"{math.sin((k + c * 13) / 40) * 100:.3f}" for c in range(channels)) + "\n")
+        k += 1
+        if sum(map(len, pending)) >= chunk:
+            data = "".join(pending).encode()
+            writer.write(data, ts)
+            ts += len(data) * 10 / 2000000
+            pending = []
+    writer.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--capture", help="Replay this capture instead of a synthetic one")
+    parser.add_argument("--mb", type=float, default=20, help="Size of the synthetic capture (default: 20)")
+    parser.add_argument("--channels", type=int, default=4, help="Values per synthetic line (default: 4)")
+    parser.add_argument("--speed", type=float, default=SPEED_MAX,
+                        help="Replay speed, 0 = as fast as the pipeline takes it (default)")
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(args.capture) if args.capture else Path(tmp) / "capture"
+        if not args.capture:
+            make_capture(directory, args.mb, args.channels)
+        reader = CaptureReader(directory)
+        expected_lines, size = len(reader), reader.size
+        reader.close()
+
+        monitor = SerialMonitor()
+        plotter = PlotterPanel()
+        received = {"lines": 0, "last": 0.0}
+
+        def count(lines):
+            received["lines"] += len(lines)
+            received["last"] = time.monotonic()
+        monitor.lines_received.connect(count)
+        monitor.lines_received.connect(plotter.add_lines)
+
+        port = VirtualSerialPort()
+        replayer = Replayer(capture_chunks(directory), port, args.speed)
+        monitor.set_port(port.port)
+        monitor.connect_serial()
+        replayer.start()
+        deadline = time.monotonic() + args.timeout
+        while time.monotonic() < deadline:
+            app.processEvents()
+            if replayer.finished.is_set() and received["lines"] >= expected_lines - 1:
+                break
+            time.sleep(0.001)
+        app.processEvents()
+        monitor.disconnect_serial()
+        replayer.stop()
+        port.close()
+
+    elapsed = max(received["last"], replayer.finished_at) - replayer.started_at
+    print(f"capture:   {size / 1048576:.1f} MB, {expected_lines:,} lines")
+    print(f"delivered: {replayer.bytes_sent / 1048576:.1f} MB, {received['lines']:,} lines, "
+          f"{plotter.data.total_samples:,} plot samples")
+    print(f"elapsed:   {elapsed:.2f} s (sender busy {replayer.elapsed:.2f} s)")
+    print(f"rate:      {replayer.bytes_sent / elapsed / 1048576:.2f} MB/s, {received['lines'] / elapsed:,.0f} lines/s")
+    return 0 if received["lines"] >= expected_lines - 1 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
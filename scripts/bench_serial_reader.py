@@ -0,0 +1,153 @@
+"""Benchmark the serial monitor's reader thread against a pty pair standing in for a device.
+
+Measures, for the current SerialReader and the previous 50 ms in_waiting
+poller:
+  - latency: time from writing one line on the device side to data_received
+  - throughput: time to deliver a burst of data at full pty speed
+  - idle cost: CPU time the reader uses while nothing arrives
+
+Usage (POSIX only):
+    python scripts/bench_serial_reader.py [--samples 200] [--burst-kb 4096]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+import tty
+from pathlib import Path
+
+import serial
+from PyQt6.QtCore import QCoreApplication, QThread, Qt, pyqtSignal
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+from vb2arduino.ide.serial_monitor import SerialReader  # noqa: E402
+
+
+class PollingReader(QThread):
+    """The reader as it was before: poll in_waiting every 50 ms."""
+
+    data_received = pyqtSignal(str)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, serial_port):
+        super().__init__()
+        self.serial_port = serial_port
+        self.running = True
+
+    def run(self):
+        while self.running:
+            try:
+                if self.serial_port.in_waiting > 0:
+                    data = self.serial_port.read(self.serial_port.in_waiting).decode("utf-8", errors="ignore")
+                    if data:
+                        self.data_received.emit(data)
+            except Exception as e:
+                if self.running:
+                    self.error_occurred.emit(str(e))
+                break
+            self.msleep(50)
+
+    def stop(self):
+        self.running = False
+        self.wait(1000)
+
+
+class Sink:
+    """Collects data_received on the reader thread (direct connection, no event loop needed)."""
+
+    def __init__(self):
+        self.received = 0
+        self.event = threading.Event()
+        self.target = 0
+
+    def on_data(self, text: str):
+        self.received += len(text)
+        if self.received >= self.target:
+            self.event.set()
+
+    def expect(self, count: int):
+        self.target = self.received + count
+        self.event.clear()
+
+
+def open_pair():
+    master, slave = os.openpty()
+    tty.setraw(master)
+    port = serial.Serial(os.ttyname(slave), baudrate=115200, timeout=SerialReader.READ_TIMEOUT_S)
+    return master, slave, port
+
+
+def write_all(fd: int, data: bytes):
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def bench(reader_cls, samples: int, burst: int) -> dict:
+    master, slave, port = open_pair()
+    sink = Sink()
+    reader = reader_cls(port)
+    reader.data_received.connect(sink.on_data, Qt.ConnectionType.DirectConnection)
+    reader.start()
+    time.sleep(0.2)
+    try:
+        latencies = []
+        for _ in range(samples):
+            sink.expect(6)
+            start = time.perf_counter()
+            os.write(master, b"hello\n")
+            if not sink.event.wait(2):
+                raise RuntimeError("line not delivered")
+            latencies.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.003)
+
+        payload = (b"0123456789abcdef" * 64)[:1023] + b"\n"
+        data = payload * (burst // len(payload))
+        sink.expect(len(data))
+        start = time.perf_counter()
+        writer = threading.Thread(target=write_all, args=(master, data))
+        writer.start()
+        if not sink.event.wait(60):
+            raise RuntimeError(f"burst incomplete: {sink.received} bytes")
+        elapsed = time.perf_counter() - start
+        writer.join()
+
+        # The main thread sleeps, so process CPU time here is the reader's idle cost
+        before = time.process_time()
+        time.sleep(2)
+        idle_cpu = (time.process_time() - before) * 1000 / 2
+    finally:
+        reader.stop()
+        port.close()
+        os.close(master)
+        os.close(slave)
+    latencies.sort()
+    return {
+        "latency_median_ms": statistics.median(latencies),
+        "latency_p99_ms": latencies[int(len(latencies) * 0.99) - 1],
+        "throughput_mb_s": len(data) / elapsed / 1e6,
+        "idle_cpu_ms_per_s": idle_cpu,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=200, help="Latency samples (default: 200)")
+    parser.add_argument("--burst-kb", type=int, default=4096, help="Throughput burst size in KB (default: 4096)")
+    args = parser.parse_args()
+    if os.name != "posix":
+        print("This benchmark needs a POSIX pty", file=sys.stderr)
+        return 1
+    app = QCoreApplication(sys.argv)  # noqa: F841 - QThread wants an application object
+    for name, cls in (("polling (50 ms)", PollingReader), ("SerialReader", SerialReader)):
+        r = bench(cls, args.samples, args.burst_kb * 1024)
+        print(f"{name:<16} latency median {r['latency_median_ms']:7.3f} ms  p99 {r['latency_p99_ms']:7.3f} ms  "
+              f"throughput {r['throughput_mb_s']:7.2f} MB/s  idle CPU {r['idle_cpu_ms_per_s']:.2f} ms/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
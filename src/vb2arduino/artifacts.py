@@ -0,0 +1,183 @@
+"""Generated-artifact writes and build manifests.
+
+PlatformIO rebuilds whatever looks newer than its last build, and any change
+to platformio.ini invalidates the whole environment. Writers here therefore
+leave files alone when their content is unchanged, replace them atomically
+when it isn't, and record what went into the last successful build so an
+unchanged project can reuse its firmware without running PlatformIO at all.
+The firmware last flashed to each serial port is recorded too, so uploading
+the same image again can be skipped.
+"""
+
+import hashlib
+import json
+import os
+import pathlib
+import re
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+
+MANIFEST_NAME = "build_manifest.json"
+# Which firmware each serial port was last flashed with; shared by the CLI and the IDE
+FLASH_RECORD_PATH = pathlib.Path.home() / ".asic" / "flashed.json"
+FIRMWARE_NAMES = ("firmware.bin", "firmware.hex", "firmware.uf2", "firmware.elf")
+SOURCE_SUFFIXES = {".c", ".cc", ".cpp", ".cxx", ".h", ".hh", ".hpp", ".ino", ".s", ".S"}
+_LOCAL_INCLUDE = re.compile(r'^\s*#\s*include\s*"([^"]+)"', re.MULTILINE)
+
+
+def content_hash(data: str | bytes) -> str:
+    """SHA-256 of text (UTF-8) or bytes."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_hash(path: pathlib.Path) -> str | None:
+    """SHA-256 of a file's bytes, or None if it can't be read."""
+    try:
+        return content_hash(path.read_bytes())
+    except OSError:
+        return None
+
+
+def write_atomic(path: pathlib.Path, data: str | bytes) -> None:
+    """Write via a temp file in the same directory and rename it into place."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def write_if_changed(path: pathlib.Path, content: str | bytes) -> bool:
+    """Atomically write `content` unless the file already holds it. Returns True if written."""
+    if file_hash(path) == content_hash(content):
+        return False
+    write_atomic(path, content)
+    return True
+
+
+def find_firmware(project_dir: pathlib.Path, env: str) -> pathlib.Path | None:
+    """The firmware image PlatformIO produced for `env`, if any."""
+    build_dir = project_dir / ".pio" / "build" / env
+    for name in FIRMWARE_NAMES:
+        candidate = build_dir / name
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+@dataclass
+class BuildManifest:
+    """Inputs and output of the last successful build of one environment."""
+
+    env: str
+    inputs: dict[str, str] = field(default_factory=dict)  # Relative path -> sha256
+    firmware: str | None = None  # Relative path of the firmware image
+    firmware_hash: str | None = None
+    flash: int | None = None  # Flash bytes PlatformIO reported for the firmware
+    built_at: float = 0.0
+
+
+def input_hashes(project_dir: pathlib.Path, paths: list[str]) -> dict[str, str]:
+    """Hash the given project-relative inputs as they are on disk now."""
+    return {rel: file_hash(project_dir / rel) or "" for rel in paths}
+
+
+def build_inputs(project_dir: pathlib.Path, src_dir: str = "src") -> list[str]:
+    """Project-relative paths of everything that goes into a build.
+
+    platformio.ini, every source and header under `src_dir`, include/ and
+    lib/, and any header those pull in with #include "..." from elsewhere.
+    """
+    project_dir = project_dir.resolve()
+    found: set[pathlib.Path] = set()
+    for top in dict.fromkeys((src_dir, "include", "lib")):
+        root = project_dir / top
+        if not root.is_dir():
+            continue
+        for path in root.rglob("*"):
+            hidden = any(part.startswith(".") for part in path.relative_to(root).parts[:-1])  # .pio, .git
+            if path.suffix in SOURCE_SUFFIXES and not hidden and path.is_file():
+                found.add(path)
+    search = [project_dir / src_dir, project_dir / "include"]
+    queue = list(found)
+    while queue:
+        source = queue.pop()
+        try:
+            text = source.read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            continue
+        for name in _LOCAL_INCLUDE.findall(text):
+            header = next((d / name for d in (source.parent, *search) if (d / name).is_file()), None)
+            if header is not None:
+                header = header.resolve()
+                if header not in found:
+                    found.add(header)
+                    queue.append(header)
+    return ["platformio.ini", *sorted(os.path.relpath(path, project_dir) for path in found)]
+
+
+def load_manifest(project_dir: pathlib.Path) -> BuildManifest | None:
+    try:
+        data = json.loads((project_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+        return BuildManifest(**data)
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def save_manifest(project_dir: pathlib.Path, env: str, inputs: dict[str, str],
+                  flash: int | None = None) -> BuildManifest:
+    """Record a successful build of `env` from `inputs`."""
+    firmware = find_firmware(project_dir, env)
+    manifest = BuildManifest(
+        env=env,
+        inputs=inputs,
+        firmware=str(firmware.relative_to(project_dir)) if firmware else None,
+        firmware_hash=file_hash(firmware) if firmware else None,
+        flash=flash,
+        built_at=time.time(),
+    )
+    write_atomic(project_dir / MANIFEST_NAME, json.dumps(asdict(manifest), indent=2) + "\n")
+    return manifest
+
+
+def is_up_to_date(project_dir: pathlib.Path, env: str, inputs: dict[str, str]) -> bool:
+    """True if the last successful build used exactly `inputs` and its firmware is untouched."""
+    manifest = load_manifest(project_dir)
+    if not manifest or manifest.env != env or manifest.inputs != inputs or not manifest.firmware:
+        return False
+    return file_hash(project_dir / manifest.firmware) == manifest.firmware_hash
+
+
+def load_flash_records(path: pathlib.Path = FLASH_RECORD_PATH) -> dict[str, dict]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def record_flash(port: str, env: str, firmware_hash: str, path: pathlib.Path = FLASH_RECORD_PATH) -> None:
+    """Remember that the device on `port` now runs `firmware_hash`."""
+    records = load_flash_records(path)
+    records[port] = {"env": env, "firmware_hash": firmware_hash, "flashed_at": time.time()}
+    write_atomic(path, json.dumps(records, indent=2) + "\n")
+
+
+def is_flashed(port: str, env: str, firmware_hash: str | None, path: pathlib.Path = FLASH_RECORD_PATH) -> bool:
+    """True if the device on `port` was last flashed with exactly this firmware."""
+    if not firmware_hash:
+        return False
+    record = load_flash_records(path).get(port)
+    return bool(record) and record.get("env") == env and record.get("firmware_hash") == firmware_hash
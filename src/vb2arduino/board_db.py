@@ -0,0 +1,268 @@
+"""Local database of PlatformIO boards, imported from `pio boards --json-output`.
+
+Listing boards through PlatformIO takes seconds (it loads every installed
+platform manifest), so the result is imported once into a small SQLite file
+indexed by MCU, platform and vendor. Reading it back takes milliseconds;
+refreshing it is left to a background thread in the IDE or to
+``vb2arduino --refresh-boards``. Each thread that touches a BoardDB gets its
+own SQLite connection and should close() it when done.
+"""
+
+import contextlib
+import json
+import pathlib
+import sqlite3
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+
+DEFAULT_DB_PATH = pathlib.Path.home() / ".asic" / "boards.sqlite"
+MAX_AGE_S = 7 * 24 * 3600  # Re-import weekly; new boards only arrive with platform updates
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS boards (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    mcu TEXT NOT NULL DEFAULT '',
+    vendor TEXT NOT NULL DEFAULT '',
+    fcpu INTEGER NOT NULL DEFAULT 0,
+    ram INTEGER NOT NULL DEFAULT 0,
+    flash INTEGER NOT NULL DEFAULT 0,
+    frameworks TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS boards_mcu ON boards (mcu);
+CREATE INDEX IF NOT EXISTS boards_platform ON boards (platform);
+CREATE INDEX IF NOT EXISTS boards_vendor ON boards (vendor);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+COLUMNS = "id, name, platform, mcu, vendor, fcpu, ram, flash, frameworks"
+
+
+class BoardDBError(RuntimeError):
+    """PlatformIO's board list could not be fetched or parsed."""
+
+
+@dataclass(frozen=True)
+class BoardInfo:
+    """One board as listed by PlatformIO."""
+
+    board_id: str
+    name: str
+    platform: str
+    mcu: str = ""
+    vendor: str = ""
+    fcpu: int = 0
+    ram: int = 0  # bytes
+    flash: int = 0  # bytes available to the application
+    frameworks: tuple[str, ...] = ()
+
+    @property
+    def supports_arduino(self) -> bool:
+        return "arduino" in self.frameworks
+
+    @classmethod
+    def from_pio(cls, entry: dict) -> "BoardInfo":
+        """Build from one element of `pio boards --json-output`."""
+        return cls(
+            board_id=entry["id"],
+            name=entry.get("name") or entry["id"],
+            platform=entry.get("platform") or "",
+            mcu=(entry.get("mcu") or "").lower(),
+            vendor=entry.get("vendor") or "",
+            fcpu=int(entry.get("fcpu") or 0),
+            ram=int(entry.get("ram") or 0),
+            flash=int(entry.get("rom") or 0),
+            frameworks=tuple(entry.get("frameworks") or ()),
+        )
+
+    @classmethod
+    def _from_row(cls, row: tuple) -> "BoardInfo":
+        *fields, frameworks = row
+        return cls(*fields, frameworks=tuple(f for f in frameworks.split(",") if f))
+
+
+def fetch_pio_boards(pio_cmd: Sequence[str] = ("pio",), timeout: int = 300) -> list[BoardInfo]:
+    """Run `pio boards --json-output` (slow: seconds) and parse it."""
+    try:
+        proc = subprocess.run([*pio_cmd, "boards", "--json-output"], capture_output=True, text=True,
+                              errors="replace", timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        raise BoardDBError(f"pio boards failed: {e}") from e
+    if proc.returncode != 0:
+        raise BoardDBError(f"pio boards failed: {proc.stderr.strip()[:300]}")
+    try:
+        return [BoardInfo.from_pio(entry) for entry in json.loads(proc.stdout) if entry.get("id")]
+    except (ValueError, TypeError, KeyError) as e:
+        raise BoardDBError(f"Unrecognised output from pio boards: {e}") from e
+
+
+def fuzzy_score(query: str, text: str) -> int | None:
+    """Score `text` against a lower-case search query; None if some word doesn't match.
+
+    Each query word must appear in `text` either as a substring (strong
+    match, stronger at a word start) or as an in-order subsequence of
+    characters, so "s3dk" finds "esp32-s3-devkitc-1".
+    """
+    score = 0
+    for word in query.split():
+        pos = text.find(word)
+        if pos != -1:
+            score += 10 * len(word) + (5 if pos == 0 or not text[pos - 1].isalnum() else 0)
+            continue
+        start = 0
+        for ch in word:
+            start = text.find(ch, start) + 1
+            if not start:
+                return None
+        score += len(word)
+    return score
+
+
+class BoardDB:
+    """The board cache file, plus an in-memory copy for searching."""
+
+    def __init__(self, path: pathlib.Path | None = None):
+        self.path = pathlib.Path(path) if path else DEFAULT_DB_PATH
+        self._boards: dict[str, BoardInfo] | None = None
+        self._haystacks: list[tuple[str, BoardInfo]] = []
+        self._lock = threading.Lock()  # Guards the in-memory copy
+        self._local = threading.local()  # This thread's connection
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """The calling thread's connection, inside a transaction."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            try:
+                conn.executescript(SCHEMA)
+            except sqlite3.Error:
+                conn.close()
+                raise
+            self._local.conn = conn
+        with conn:
+            yield conn
+
+    def close(self) -> None:
+        """Close the calling thread's connection; the next query opens a new one."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            conn.close()
+
+    def _load(self) -> dict[str, BoardInfo]:
+        with self._lock:
+            if self._boards is None:
+                boards: dict[str, BoardInfo] = {}
+                if self.path.exists():
+                    try:
+                        with self._connect() as conn:
+                            for row in conn.execute(f"SELECT {COLUMNS} FROM boards ORDER BY name"):
+                                info = BoardInfo._from_row(row)
+                                boards[info.board_id] = info
+                    except sqlite3.Error:
+                        boards = {}
+                self._haystacks = [
+                    (f"{b.board_id} {b.name} {b.mcu} {b.vendor} {b.platform}".lower(), b) for b in boards.values()
+                ]
+                self._boards = boards
+            return self._boards
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def get(self, board_id: str | None) -> BoardInfo | None:
+        return self._load().get(board_id) if board_id else None
+
+    def all(self) -> list[BoardInfo]:
+        return list(self._load().values())
+
+    def _where(self, column: str, value: str) -> list[BoardInfo]:
+        if not self.path.exists():
+            return []
+        with self._connect() as conn:
+            rows = conn.execute(f"SELECT {COLUMNS} FROM boards WHERE {column} = ? COLLATE NOCASE ORDER BY name",
+                                (value,)).fetchall()
+        return [BoardInfo._from_row(row) for row in rows]
+
+    def by_mcu(self, mcu: str) -> list[BoardInfo]:
+        return self._where("mcu", mcu)
+
+    def by_platform(self, platform: str) -> list[BoardInfo]:
+        return self._where("platform", platform)
+
+    def by_vendor(self, vendor: str) -> list[BoardInfo]:
+        return self._where("vendor", vendor)
+
+    def search(self, query: str, limit: int = 50, arduino_only: bool = True) -> list[BoardInfo]:
+        """Best fuzzy matches for `query` over id, name, MCU, vendor and platform."""
+        self._load()
+        haystacks = self._haystacks
+        query = query.lower().strip()
+        scored = []
+        for haystack, board in haystacks:
+            if arduino_only and board.frameworks and not board.supports_arduino:
+                continue
+            if not query:
+                scored.append((0, board))
+                continue
+            score = fuzzy_score(query, haystack)
+            if score is not None:
+                if board.board_id == query:
+                    score += 1000
+                elif board.board_id.startswith(query):
+                    score += 100
+                scored.append((score, board))
+        scored.sort(key=lambda sb: (-sb[0], sb[1].name.lower()))
+        return [board for _, board in scored[:limit]]
+
+    def imported_at(self) -> float | None:
+        if not self.path.exists():
+            return None
+        try:
+            with self._connect() as conn:
+                row = conn.execute("SELECT value FROM meta WHERE key = 'imported_at'").fetchone()
+        except sqlite3.Error:
+            return None
+        return float(row[0]) if row else None
+
+    def is_stale(self, max_age: float = MAX_AGE_S) -> bool:
+        imported = self.imported_at()
+        return imported is None or time.time() - imported > max_age
+
+    def replace_all(self, boards: Iterable[BoardInfo]) -> int:
+        """Swap the stored board list for `boards` in one transaction."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        rows = [
+            (b.board_id, b.name, b.platform, b.mcu, b.vendor, b.fcpu, b.ram, b.flash, ",".join(b.frameworks))
+            for b in boards
+        ]
+        with self._connect() as conn:
+            conn.execute("DELETE FROM boards")
+            conn.executemany(f"INSERT OR REPLACE INTO boards ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('imported_at', ?)", (str(time.time()),))
+        self.reload()
+        return len(rows)
+
+    def refresh(self, pio_cmd: Sequence[str] = ("pio",)) -> int:
+        """Re-import from PlatformIO. Returns the number of boards stored."""
+        return self.replace_all(fetch_pio_boards(pio_cmd))
+
+    def reload(self) -> None:
+        """Forget the in-memory copy (after another process or thread refreshed the file)."""
+        with self._lock:
+            self._boards = None
+
+
+_default_db: BoardDB | None = None
+
+
+def default_db() -> BoardDB:
+    """The shared database at DEFAULT_DB_PATH."""
+    global _default_db
+    if _default_db is None:
+        _default_db = BoardDB()
+    return _default_db
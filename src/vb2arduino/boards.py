@@ -0,0 +1,118 @@
+"""Board profiles: memory limits and data-model sizes per PlatformIO board."""
+
+from dataclasses import dataclass
+
+from vb2arduino.board_db import BoardInfo, default_db
+
+
+@dataclass(frozen=True)
+class BoardProfile:
+    """Static facts about a board used for code generation and memory estimates."""
+
+    board_id: str
+    name: str
+    platform: str
+    mcu: str
+    ram: int  # bytes of data RAM
+    flash: int  # bytes available to the application
+    int_size: int = 4
+    pointer_size: int = 4
+    string_size: int = 12  # sizeof(String)
+    call_overhead: int = 16  # return address + saved registers per call
+    stack_limit: int | None = None  # fixed task stack (ESP32 loopTask); None = shares RAM
+    core_ram: int = 0  # typical static RAM of an empty sketch
+    literals_in_ram: bool = False  # AVR copies string literals into RAM
+
+    @property
+    def is_avr(self) -> bool:
+        return self.platform == "atmelavr"
+
+
+def _avr(board_id: str, name: str, mcu: str, ram: int, flash: int, core_ram: int = 190) -> BoardProfile:
+    return BoardProfile(board_id, name, "atmelavr", mcu, ram, flash, int_size=2, pointer_size=2,
+                        string_size=6, call_overhead=4, core_ram=core_ram, literals_in_ram=True)
+
+
+def _esp32(board_id: str, name: str, mcu: str) -> BoardProfile:
+    return BoardProfile(board_id, name, "espressif32", mcu, 327680, 1310720, string_size=16,
+                        call_overhead=32, stack_limit=8192, core_ram=21000)
+
+
+def _samd(board_id: str, name: str) -> BoardProfile:
+    return BoardProfile(board_id, name, "atmelsam", "samd21g18a", 32768, 262144, core_ram=2900)
+
+
+BOARD_PROFILES: dict[str, BoardProfile] = {
+    p.board_id: p
+    for p in (
+        # ESP32 boards
+        _esp32("esp32-s3-devkitm-1", "ESP32-S3 DevKitM-1", "esp32s3"),
+        _esp32("esp32-s3-devkitc-1", "ESP32-S3 DevKitC-1", "esp32s3"),
+        _esp32("esp32dev", "ESP32 Dev Module", "esp32"),
+        _esp32("esp32-c3-devkitm-1", "ESP32-C3 DevKitM-1", "esp32c3"),
+        _esp32("esp32-s2-saola-1", "ESP32-S2 Saola-1", "esp32s2"),
+        _esp32("lolin_d32", "WEMOS LOLIN D32", "esp32"),
+        # Arduino AVR boards
+        _avr("uno", "Arduino Uno", "atmega328p", 2048, 32256),
+        _avr("nanoatmega328", "Arduino Nano", "atmega328p", 2048, 30720),
+        _avr("nano", "Arduino Nano", "atmega328p", 2048, 30720),
+        _avr("pro16MHzatmega328", "Arduino Pro Mini 5V 16MHz", "atmega328p", 2048, 30720),
+        _avr("megaatmega2560", "Arduino Mega 2560", "atmega2560", 8192, 253952),
+        _avr("mega2560", "Arduino Mega 2560", "atmega2560", 8192, 253952),
+        _avr("leonardo", "Arduino Leonardo", "atmega32u4", 2560, 28672, core_ram=350),
+        _avr("micro", "Arduino Micro", "atmega32u4", 2560, 28672, core_ram=350),
+        # Arduino ARM boards
+        _samd("nano_33_iot", "Arduino Nano 33 IoT"),
+        _samd("mkr1000", "Arduino MKR1000"),
+        _samd("mkrwifi1010", "Arduino MKR WiFi 1010"),
+        _samd("zero", "Arduino Zero"),
+        BoardProfile("due", "Arduino Due", "atmelsam", "at91sam3x8e", 98304, 524288, core_ram=1500),
+        # RP2040 boards
+        BoardProfile("pico", "Raspberry Pi Pico", "raspberrypi", "rp2040", 270336, 2097152, core_ram=9000),
+        BoardProfile("nanorp2040connect", "Arduino Nano RP2040 Connect", "raspberrypi", "rp2040",
+                     270336, 16777216, core_ram=9000),
+    )
+}
+
+
+# Data model and runtime overhead per platform, for boards known only from the board database
+PLATFORM_DEFAULTS: dict[str, dict] = {
+    "atmelavr": dict(int_size=2, pointer_size=2, string_size=6, call_overhead=4, core_ram=190, literals_in_ram=True),
+    "atmelmegaavr": dict(int_size=2, pointer_size=2, string_size=6, call_overhead=4, core_ram=190,
+                         literals_in_ram=True),
+    "espressif32": dict(string_size=16, call_overhead=32, stack_limit=8192, core_ram=21000),
+    "espressif8266": dict(string_size=16, call_overhead=32, stack_limit=4096, core_ram=26000),
+    "atmelsam": dict(core_ram=2900),
+    "raspberrypi": dict(core_ram=9000),
+}
+
+
+def profile_from_info(info: BoardInfo) -> BoardProfile | None:
+    """Derive a profile from a PlatformIO board listing (RAM/flash from the board manifest)."""
+    if not info.ram or not info.flash:
+        return None
+    return BoardProfile(info.board_id, info.name, info.platform, info.mcu, info.ram, info.flash,
+                        **PLATFORM_DEFAULTS.get(info.platform, {}))
+
+
+def get_board_profile(board_id: str | None) -> BoardProfile | None:
+    """Return the profile for a PlatformIO board id, or None if unknown.
+
+    Hand-tuned profiles come first; other boards are derived from the board database.
+    """
+    if not board_id:
+        return None
+    profile = BOARD_PROFILES.get(board_id)
+    if profile is None:
+        info = default_db().get(board_id)
+        profile = profile_from_info(info) if info else None
+    return profile
+
+
+def board_platform(board_id: str | None, default: str = "atmelavr") -> str:
+    """PlatformIO platform for a board id."""
+    profile = get_board_profile(board_id)
+    if profile:
+        return profile.platform
+    info = default_db().get(board_id)
+    return info.platform if info and info.platform else default
@@ -0,0 +1,214 @@
+"""Static RAM / stack budget estimation from transpiler state, before PlatformIO runs."""
+
+import re
+from dataclasses import dataclass, field
+from typing import List
+
+from vb2arduino.boards import BoardProfile
+from vb2arduino.profiler import ram_bytes
+from vb2arduino.transpiler import Declaration, VBTranspiler
+
+
+@dataclass
+class Consumer:
+    """One memory consumer in the budget report."""
+
+    name: str
+    kind: str  # "global", "array", "static", "string literal", "table", "core"
+    size: int
+    detail: str = ""
+    region: str = "ram"  # "ram" or "flash"
+
+
+@dataclass
+class BudgetReport:
+    """Estimated memory use of a transpiled program on one board."""
+
+    profile: BoardProfile
+    consumers: List[Consumer] = field(default_factory=list)
+    stack_depth: int = 0
+    stack_path: List[str] = field(default_factory=list)
+    recursive: List[str] = field(default_factory=list)
+    unknown: List[str] = field(default_factory=list)  # Declarations whose size we can't compute
+
+    @property
+    def static_ram(self) -> int:
+        return sum(c.size for c in self.consumers if c.region == "ram")
+
+    @property
+    def flash_data(self) -> int:
+        return sum(c.size for c in self.consumers if c.region == "flash")
+
+    @property
+    def stack_available(self) -> int:
+        if self.profile.stack_limit:
+            return self.profile.stack_limit
+        return self.profile.ram - self.static_ram
+
+    @property
+    def errors(self) -> List[str]:
+        """Hard failures: the build cannot fit."""
+        errors = []
+        if self.static_ram > self.profile.ram:
+            errors.append(f"Static RAM {self.static_ram} B exceeds {self.profile.ram} B")
+        if self.flash_data > self.profile.flash:
+            errors.append(f"Constant data {self.flash_data} B exceeds flash {self.profile.flash} B")
+        return errors
+
+    @property
+    def warnings(self) -> List[str]:
+        """Likely problems that depend on the accuracy of the estimate."""
+        warnings = []
+        if self.stack_depth > self.stack_available:
+            warnings.append(f"Estimated stack {self.stack_depth} B exceeds the {self.stack_available} B available")
+        if self.recursive:
+            warnings.append("Recursion makes stack depth unbounded: " + ", ".join(self.recursive))
+        if self.unknown:
+            warnings.append("Size unknown (not counted): " + ", ".join(self.unknown))
+        return warnings
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def ranked(self, limit: int | None = None) -> List[Consumer]:
+        """Consumers sorted biggest first."""
+        ranked = sorted(self.consumers, key=lambda c: c.size, reverse=True)
+        return ranked[:limit] if limit else ranked
+
+    def format(self, limit: int = 10) -> str:
+        """Human-readable report with the biggest consumers first."""
+        p = self.profile
+        pct = 100.0 * self.static_ram / p.ram if p.ram else 0.0
+        lines = [
+            f"Memory budget for {p.name} ({p.board_id}, {p.mcu})",
+            f"  Static RAM:    {self.static_ram} / {p.ram} bytes ({pct:.1f}%)",
+            f"  Stack (est.):  {self.stack_depth} / {self.stack_available} bytes"
+            + (f" via {' -> '.join(self.stack_path)}" if self.stack_path else ""),
+        ]
+        if self.flash_data:
+            lines.append(f"  Const data:    {self.flash_data} bytes in flash")
+        lines.append("Biggest consumers:")
+        for i, c in enumerate(self.ranked(limit), start=1):
+            where = "" if c.region == "ram" else " [flash]"
+            detail = f"  ({c.detail})" if c.detail else ""
+            lines.append(f"  {i:2d}. {c.size:7d} B  {c.kind:<14} {c.name}{where}{detail}")
+        for msg in self.errors:
+            lines.append(f"[error] {msg}")
+        for msg in self.warnings:
+            lines.append(f"[warn] {msg}")
+        return "\n".join(lines)
+
+
+def type_size(c_type: str, profile: BoardProfile, type_fields: dict[str, List[str]]) -> int | None:
+    """Size in bytes of a generated C type on the given board, or None if unknown."""
+    c_type = c_type.strip()
+    if c_type.endswith("*") or c_type.endswith("&"):
+        return profile.pointer_size
+    sizes = {
+        "bool": 1, "char": 1, "byte": 1, "uint8_t": 1, "int8_t": 1,
+        "int16_t": 2, "uint16_t": 2, "int32_t": 4, "uint32_t": 4,
+        "int": profile.int_size, "unsigned": profile.int_size,
+        "long": 4, "float": 4, "double": 4 if profile.is_avr else 8,
+        "String": profile.string_size,
+    }
+    if c_type in sizes:
+        return sizes[c_type]
+    if c_type in type_fields:
+        total = 0
+        for field_type in type_fields[c_type]:
+            size = type_size(field_type, profile, type_fields)
+            if size is None:
+                return None
+            total += size
+        return total
+    return None
+
+
+def _element_count(decl: Declaration, consts: dict[str, int | float]) -> int | None:
+    """Number of elements in an array declaration (VB bounds are inclusive)."""
+    count = 1
+    for dim in decl.dims:
+        bound = dim if isinstance(dim, int) else consts.get(str(dim).strip())
+        if not isinstance(bound, int):
+            return None
+        count *= bound + 1
+    return count
+
+
+def _declaration_size(decl: Declaration, transpiler: VBTranspiler, profile: BoardProfile) -> int | None:
+    size = type_size(decl.c_type, profile, transpiler.type_fields)
+    if size is None:
+        return None
+    count = _element_count(decl, transpiler.const_values)
+    return None if count is None else size * count
+
+
+def _string_literals(transpiler: VBTranspiler) -> dict[str, int]:
+    """Unique string literals in the generated program -> bytes incl. terminator."""
+    text = "\n".join(transpiler.global_lines + transpiler.setup_lines + transpiler.loop_lines + transpiler.function_lines)
+    literals: dict[str, int] = {}
+    for lit in re.findall(r'"((?:[^"\\]|\\.)*)"', text):
+        # Escapes count as one byte each
+        literals[lit] = len(re.sub(r"\\.", "x", lit)) + 1
+    return literals
+
+
+def estimate_budget(transpiler: VBTranspiler, profile: BoardProfile,
+                    call_graph: dict[str, set[str]] | None = None) -> BudgetReport:
+    """Estimate static RAM and stack depth for the program last transpiled by `transpiler`."""
+    report = BudgetReport(profile=profile)
+    if profile.core_ram:
+        report.consumers.append(Consumer("Arduino core", "core", profile.core_ram, "typical empty sketch"))
+
+    frames: dict[str, int] = {}
+    for decl in transpiler.declarations:
+        size = _declaration_size(decl, transpiler, profile)
+        if size is None:
+            report.unknown.append(decl.name)
+            continue
+        if decl.scope == "global" or decl.is_static:
+            kind = "array" if decl.dims else ("static" if decl.is_static else "global")
+            label = decl.name if decl.scope == "global" else f"{decl.scope}.{decl.name}"
+            dims = "".join(f"[{d}]" for d in decl.dims)
+            report.consumers.append(Consumer(label, kind, size, f"{decl.c_type}{dims}"))
+        else:
+            frames[decl.scope] = frames.get(decl.scope, 0) + size
+
+    for lit, size in _string_literals(transpiler).items():
+        shown = lit if len(lit) <= 24 else lit[:21] + "..."
+        report.consumers.append(Consumer(f'"{shown}"', "string literal", size,
+                                         region="ram" if profile.literals_in_ram else "flash"))
+
+    for line in transpiler.lut_lines:
+        m = re.match(r"static const (.+?) (\w+)\[(\d+)\]", line)
+        if m:
+            c_type, name, count = m.groups()
+            in_flash = "PROGMEM" in line or not profile.is_avr
+            size = (type_size(c_type, profile, {}) or profile.pointer_size) * int(count)
+            report.consumers.append(Consumer(name, "table", size, f"{c_type}[{count}]",
+                                             region="flash" if in_flash else "ram"))
+
+    if transpiler.profile_slots:
+        slots = len(transpiler.profile_slots)
+        report.consumers.append(Consumer("__vb_prof", "table", ram_bytes(slots), f"{slots} profiling counters"))
+
+    graph = call_graph if call_graph is not None else transpiler.build_call_graph()
+    report.recursive = sorted(name for name in transpiler.procedures if transpiler.is_recursive(name, graph))
+
+    def depth(name: str, path: tuple[str, ...]) -> tuple[int, List[str]]:
+        own = frames.get(name, 0) + profile.call_overhead
+        best, best_path = 0, []
+        for callee in sorted(graph.get(name, ())):
+            if callee in path:  # recursive edge; reported separately
+                continue
+            d, p = depth(callee, path + (callee,))
+            if d > best:
+                best, best_path = d, p
+        return own + best, [name] + best_path
+
+    for root in ("setup", "loop"):
+        d, path = depth(root, (root,))
+        if d > report.stack_depth:
+            report.stack_depth, report.stack_path = d, path
+    return report
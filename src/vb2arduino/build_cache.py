@@ -0,0 +1,150 @@
+"""Shared compiler object cache for PlatformIO builds.
+
+PlatformIO (through SCons) can keep compiled objects in a ``build_cache_dir``
+keyed by each object's build signature, i.e. the source content and the exact
+compiler command line. Pointing every project, the matrix project and the
+CLI output directories at one cache means the Arduino core and common
+libraries are compiled once per board and flag set instead of once per
+project and again after every clean.
+
+The cache is enabled per process through ``PLATFORMIO_BUILD_CACHE_DIR``, so
+generated ``platformio.ini`` files (and the build manifests hashing them)
+stay unchanged. PlatformIO never shrinks the cache; ``BuildCache.evict``
+keeps it under a size limit by removing the least recently used objects.
+"""
+
+import json
+import os
+import pathlib
+import re
+import shutil
+import time
+from dataclasses import asdict, dataclass
+from typing import Iterable
+
+from vb2arduino.artifacts import write_atomic
+
+DEFAULT_CACHE_DIR = pathlib.Path.home() / ".asic" / "build_cache"
+DEFAULT_MAX_MB = 1024
+STATS_NAME = "asic_cache_stats.json"
+CACHE_ENV = "PLATFORMIO_BUILD_CACHE_DIR"
+
+# SCons prints one of these per object: a cache hit, or PlatformIO's compile line for a miss
+RETRIEVED_RE = re.compile(r"^Retrieved `(.+?)' from cache")
+COMPILING_RE = re.compile(r"^Compiling \S+\.o\s*$")
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.total if self.total else 0.0
+
+    def add(self, other: "CacheStats") -> None:
+        self.hits += other.hits
+        self.misses += other.misses
+
+
+def count_hits(lines: Iterable[str]) -> CacheStats:
+    """Count cache hits and compiled (missed) objects in PlatformIO output."""
+    stats = CacheStats()
+    for line in lines:
+        if RETRIEVED_RE.match(line):
+            stats.hits += 1
+        elif COMPILING_RE.match(line):
+            stats.misses += 1
+    return stats
+
+
+class BuildCache:
+    """A size-limited PlatformIO build cache directory."""
+
+    def __init__(self, directory: pathlib.Path | None = None, max_mb: int = DEFAULT_MAX_MB):
+        self.directory = pathlib.Path(directory) if directory else DEFAULT_CACHE_DIR
+        self.max_bytes = max_mb * 1024 * 1024
+
+    def env(self) -> dict[str, str]:
+        """Environment variables that make a PlatformIO run use this cache."""
+        return {CACHE_ENV: str(self.directory)}
+
+    def _objects(self) -> list[tuple[pathlib.Path, os.stat_result]]:
+        # SCons stores entries as <dir>/<2-char prefix>/<signature>; leave config and stats alone
+        entries = []
+        if not self.directory.is_dir():
+            return entries
+        for sub in self.directory.iterdir():
+            if not sub.is_dir():
+                continue
+            for path in sub.iterdir():
+                try:
+                    entries.append((path, path.stat()))
+                except OSError:
+                    pass
+        return entries
+
+    def usage(self) -> tuple[int, int]:
+        """(bytes, objects) currently in the cache."""
+        objects = self._objects()
+        return sum(st.st_size for _, st in objects), len(objects)
+
+    def evict(self) -> tuple[int, int]:
+        """Drop least recently used objects until the cache is under 90% of its limit.
+
+        Returns (objects removed, bytes freed).
+        """
+        objects = self._objects()
+        total = sum(st.st_size for _, st in objects)
+        if total <= self.max_bytes:
+            return 0, 0
+        target = int(self.max_bytes * 0.9)
+        removed = freed = 0
+        # A cache hit reads the object, so access time (where the filesystem keeps it) tracks use
+        for path, st in sorted(objects, key=lambda e: max(e[1].st_atime, e[1].st_mtime)):
+            if total - freed <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            removed += 1
+            freed += st.st_size
+        return removed, freed
+
+    def load_stats(self) -> CacheStats:
+        try:
+            data = json.loads((self.directory / STATS_NAME).read_text(encoding="utf-8"))
+            return CacheStats(hits=data["hits"], misses=data["misses"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return CacheStats()
+
+    def record(self, stats: CacheStats) -> CacheStats:
+        """Add one build's hits/misses to the cumulative totals and return them."""
+        totals = self.load_stats()
+        if stats.total:
+            totals.add(stats)
+            write_atomic(self.directory / STATS_NAME,
+                         json.dumps({**asdict(totals), "updated_at": time.time()}, indent=2) + "\n")
+        return totals
+
+    def clear(self) -> None:
+        """Delete every cached object and the statistics."""
+        if self.directory.exists():
+            shutil.rmtree(self.directory)
+
+    def summary(self, stats: CacheStats) -> str:
+        """One-line report for a build's output."""
+        used, count = self.usage()
+        totals = self.load_stats()
+        line = f"Compiler cache: {stats.hits} hit{'s' if stats.hits != 1 else ''}, {stats.misses} compiled"
+        if stats.total:
+            line += f" ({stats.hit_rate:.0%} hit rate)"
+        line += (f"; {used / 1048576:.1f} of {self.max_bytes / 1048576:.0f} MB in {count} objects"
+                 f", {totals.hit_rate:.0%} overall")
+        return line
@@ -0,0 +1,149 @@
+"""Build one program for several boards at once, one PlatformIO environment per board.
+
+Each board builds in its own PlatformIO build directory (.pio/matrix/<board>).
+PlatformIO wipes the whole build directory when platformio.ini changes, so
+environments sharing .pio/build would delete each other's objects, or fail
+recreating the directory, whenever the matrix adds a board.
+"""
+
+import os
+import pathlib
+import re
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Sequence
+
+# PlatformIO's size summary, e.g. "RAM:   [=    ]   9.2% (used 188 bytes from 2048 bytes)"
+SIZE_RE = re.compile(r"^(RAM|Flash):.*?used (\d+) bytes from (\d+) bytes", re.MULTILINE)
+MATRIX_BUILD_DIR = pathlib.Path(".pio") / "matrix"
+
+
+@dataclass
+class BoardResult:
+    """Outcome of building one board in the matrix."""
+
+    board: str
+    returncode: int | None = None  # None while queued/running
+    duration: float = 0.0
+    ram_used: int | None = None
+    ram_total: int | None = None
+    flash_used: int | None = None
+    flash_total: int | None = None
+    output: str = ""
+    note: str = ""  # Why the board was skipped, if it was
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+    @property
+    def status(self) -> str:
+        if self.note:
+            return self.note
+        if self.returncode is None:
+            return "pending"
+        return "ok" if self.ok else f"failed ({self.returncode})"
+
+
+def parse_size_report(output: str) -> dict[str, tuple[int, int]]:
+    """Map "RAM"/"Flash" to (used, total) bytes from PlatformIO's size summary."""
+    return {m.group(1): (int(m.group(2)), int(m.group(3))) for m in SIZE_RE.finditer(output)}
+
+
+def env_section(board: str, platform: str, extra: Sequence[str] = ()) -> str:
+    """One [env:...] block for platformio.ini."""
+    lines = [
+        f"[env:{board}]",
+        f"platform = {platform}",
+        f"board = {board}",
+        "framework = arduino",
+        *extra,
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def default_parallelism(count: int) -> int:
+    """How many environments to build at once: bounded by boards and CPUs."""
+    return max(1, min(count, os.cpu_count() or 1))
+
+
+def board_build_dir(project_dir: pathlib.Path, board: str) -> pathlib.Path:
+    """PlatformIO build directory of one matrix board (its outputs are in <dir>/<board>)."""
+    return project_dir / MATRIX_BUILD_DIR / board
+
+
+def _build_one(project_dir: pathlib.Path, board: str, pio_cmd: Sequence[str], cpu_jobs: int,
+               cancel: threading.Event, env: dict[str, str] | None) -> BoardResult:
+    result = BoardResult(board=board)
+    cmd = [*pio_cmd, "run", "--project-dir", str(project_dir), "--environment", board, "--jobs", str(cpu_jobs)]
+    start = time.monotonic()
+    run_env = {**os.environ, **(env or {}), "PLATFORMIO_BUILD_DIR": str(board_build_dir(project_dir, board))}
+    try:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+                                errors="replace", env=run_env)
+    except OSError as e:
+        result.returncode = -1
+        result.output = str(e)
+        return result
+    while True:
+        try:
+            output, _ = proc.communicate(timeout=0.5)
+            break
+        except subprocess.TimeoutExpired:
+            if cancel.is_set():
+                proc.terminate()
+                output, _ = proc.communicate()
+                result.note = "cancelled"
+                break
+    result.duration = time.monotonic() - start
+    result.returncode = proc.returncode
+    result.output = output or ""
+    sizes = parse_size_report(result.output)
+    if "RAM" in sizes:
+        result.ram_used, result.ram_total = sizes["RAM"]
+    if "Flash" in sizes:
+        result.flash_used, result.flash_total = sizes["Flash"]
+    return result
+
+
+def run_matrix(project_dir: pathlib.Path, boards: Sequence[str], pio_cmd: Sequence[str] = ("pio",),
+               parallel: int | None = None, on_result: Callable[[BoardResult], None] | None = None,
+               cancel: threading.Event | None = None, env: dict[str, str] | None = None) -> list[BoardResult]:
+    """Build every board's environment of an already-written project, `parallel` at a time.
+
+    Each PlatformIO run gets an equal share of the CPUs for its own compiler
+    jobs so the matrix doesn't oversubscribe the machine.
+    """
+    parallel = parallel or default_parallelism(len(boards))
+    cpu_jobs = max(1, (os.cpu_count() or 1) // parallel)
+    cancel = cancel or threading.Event()
+
+    def build(board: str) -> BoardResult:
+        if cancel.is_set():
+            result = BoardResult(board=board, note="cancelled")
+        else:
+            result = _build_one(project_dir, board, pio_cmd, cpu_jobs, cancel, env)
+        if on_result:
+            on_result(result)
+        return result
+
+    with ThreadPoolExecutor(max_workers=parallel) as pool:
+        return list(pool.map(build, boards))
+
+
+def _kb(value: int | None) -> str:
+    return "-" if value is None else f"{value / 1024:.1f}K"
+
+
+def format_matrix(results: Sequence[BoardResult]) -> str:
+    """Plain-text table of matrix results."""
+    rows = [("Board", "Status", "Flash", "RAM", "Time")]
+    for r in results:
+        flash = f"{_kb(r.flash_used)}/{_kb(r.flash_total)}" if r.flash_used is not None else "-"
+        ram = f"{_kb(r.ram_used)}/{_kb(r.ram_total)}" if r.ram_used is not None else "-"
+        rows.append((r.board, r.status, flash, ram, f"{r.duration:.1f}s" if r.duration else "-"))
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    return "\n".join("  ".join(cell.ljust(w) for cell, w in zip(row, widths)).rstrip() for row in rows)
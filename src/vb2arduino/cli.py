@@ -1,14 +1,36 @@
 import argparse
+import os
 import pathlib
+import re
 import subprocess
 import sys
+import tempfile
+import time
 
-from vb2arduino import transpile_string
+from vb2arduino import VBTranspiler
+from vb2arduino.artifacts import (
+    build_inputs, file_hash, find_firmware, input_hashes, is_flashed, is_up_to_date, load_manifest, record_flash,
+    save_manifest, write_if_changed,
+)
+from vb2arduino.board_db import BoardDBError, default_db
+from vb2arduino.boards import board_platform, get_board_profile
+from vb2arduino.build_cache import CACHE_ENV, DEFAULT_MAX_MB, BuildCache, CacheStats, count_hits
+from vb2arduino.build_matrix import BoardResult, env_section, format_matrix, run_matrix
+from vb2arduino.budget import estimate_budget
+from vb2arduino.native import build_native, run_native
+from vb2arduino.profiler import (
+    DEFAULT_INTERVAL_MS, MAP_FILE, PROFILE_LINES, PROFILE_OFF, PROFILE_PROCS, ProfileError, save_map,
+)
+from vb2arduino.serial_capture import CaptureReader
+from vb2arduino.serial_replay import Replayer, VirtualSerialPort, capture_chunks
+from vb2arduino.size_report import (
+    HISTORY_NAME, SizeToolError, analyze, append_history, find_elf, format_report, previous_record,
+)
 
 
-def write_file(path: pathlib.Path, content: str) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(content, encoding="utf-8")
+def write_file(path: pathlib.Path, content: str) -> bool:
+    """Write generated output, leaving the file untouched if the content is the same."""
+    return write_if_changed(path, content)
 
 
 def run_cmd(cmd: list[str]) -> int:
@@ -16,23 +38,315 @@ def run_cmd(cmd: list[str]) -> int:
     return subprocess.call(cmd)
 
 
+def run_build(cmd: list[str]) -> tuple[int, list[str]]:
+    """Run a build, echoing its output while keeping the lines for the cache report."""
+    print("[cmd]", " ".join(cmd))
+    lines = []
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors="replace") as proc:
+        for line in proc.stdout:
+            print(line, end="")
+            lines.append(line.rstrip("\n"))
+    return proc.returncode, lines
+
+
+def report_cache(cache: BuildCache | None, stats: CacheStats) -> None:
+    """Print the build's cache hit rate and trim the cache to its size limit."""
+    if not cache:
+        return
+    cache.record(stats)
+    removed, freed = cache.evict()
+    if stats.total:
+        print(f"[cache] {cache.summary(stats)}")
+    if removed:
+        print(f"[cache] Evicted {removed} old objects ({freed / 1048576:.1f} MB)")
+
+
+def flash_used(output: str) -> int | None:
+    """The flash bytes a PlatformIO build reports in its output, if any."""
+    m = re.search(r"Flash:.*?used (\d+) bytes", output or "")
+    return int(m.group(1)) if m else None
+
+
+def measure_flash(cmd: list[str]) -> int | None:
+    """Run a PlatformIO build and return the flash bytes it reports, if any."""
+    print("[cmd]", " ".join(cmd))
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    return flash_used(result.stdout) if result.returncode == 0 else None
+
+
+def without_inlining(cpp: str, inlined: list[tuple[str, int]]) -> str:
+    """The same C++ with the inlined procedures emitted out of line again."""
+    names = "|".join(re.escape(name) for name, _ in inlined)
+    return re.sub(rf"^static inline (?=.*?\b(?:{names})\s*\()", "", cpp, flags=re.MULTILINE)
+
+
+def report_inline_delta(cpp: str, inlined: list[tuple[str, int]], pio_ini: str, board: str,
+                        inlined_size: int | None) -> None:
+    """Build the sketch once without inlining, in a scratch project, and print the flash difference."""
+    if inlined_size is None:
+        print("[inline] Flash delta unavailable (the build did not report its size)")
+        return
+    with tempfile.TemporaryDirectory(prefix="vb2arduino-inline-") as tmp:
+        project = pathlib.Path(tmp)
+        write_file(project / "main.cpp", without_inlining(cpp, inlined))
+        write_file(project / "platformio.ini", pio_ini)
+        baseline = measure_flash(["pio", "run", "--project-dir", str(project), "--environment", board])
+    if baseline is None:
+        print("[inline] Flash delta unavailable (baseline build failed or size not reported)")
+    else:
+        print(f"[inline] Flash: {baseline} -> {inlined_size} bytes ({inlined_size - baseline:+d})")
+
+
+def run_native_sketch(out_cpp: pathlib.Path, out_dir: pathlib.Path, iterations: int,
+                      inputs: pathlib.Path | None, trace: pathlib.Path) -> int:
+    """Compile main.cpp against the Arduino stub with the host compiler and run it."""
+    exe = out_dir / "native" / ("sketch.exe" if os.name == "nt" else "sketch")
+    build = build_native(out_cpp, exe)
+    if build.returncode != 0:
+        print(build.stderr, file=sys.stderr)
+        print("[error] Native build failed", file=sys.stderr)
+        return build.returncode
+    run = run_native(exe, iterations, inputs, trace)
+    if run.returncode != 0:
+        print(run.stderr, file=sys.stderr)
+        print(f"[error] Native run exited with {run.returncode}", file=sys.stderr)
+        return run.returncode
+    print(f"[native] {run.iterations} loop() iterations in {run.elapsed * 1000:.3g} ms "
+          f"({run.iterations_per_sec:,.0f} iterations/sec, {run.virtual_ms} ms sketch time)")
+    print(f"[native] Trace written to {trace}")
+    return 0
+
+
+def report_size(out_dir: pathlib.Path, board: str, cpp: str, source: str, max_growth: int | None) -> int:
+    """Attribute the built firmware's size to the VB source, record it, and enforce --max-growth."""
+    elf = find_elf(out_dir, board)
+    if not elf:
+        print(f"[size] No firmware.elf in {out_dir / '.pio' / 'build' / board}", file=sys.stderr)
+        return 1
+    try:
+        record = analyze(elf, board, cpp, source)
+    except SizeToolError as e:
+        print(f"[size] {e}", file=sys.stderr)
+        return 1
+    history = append_history(out_dir / HISTORY_NAME, record)
+    previous = previous_record(history, record)
+    print(format_report(record, previous))
+    if max_growth is not None and previous and record.flash - previous.flash > max_growth:
+        print(f"[error] Flash grew by {record.flash - previous.flash} bytes (limit {max_growth})", file=sys.stderr)
+        return 1
+    return 0
+
+
+def build_matrix(out_dir: pathlib.Path, boards: list[str], transpiler: VBTranspiler, result,
+                 parallel: int | None, cache: BuildCache | None = None) -> int:
+    """Build the already-transpiled main.cpp for several boards concurrently."""
+    results: dict[str, BoardResult] = {}
+    buildable = []
+    for board in boards:
+        profile = get_board_profile(board)
+        if profile and not estimate_budget(transpiler, profile, result.call_graph).ok:
+            results[board] = BoardResult(board=board, note="over budget")
+            print(f"[matrix] {board}: skipped, memory budget exceeded (see --budget)")
+        else:
+            buildable.append(board)
+
+    # One environment per board; keep any existing envs and user edits
+    pio_ini = out_dir / "platformio.ini"
+    ini = pio_ini.read_text(encoding="utf-8") if pio_ini.exists() else ""
+    for board in buildable:
+        if f"[env:{board}]" not in ini:
+            ini += ("\n" if ini else "") + env_section(board, board_platform(board, "espressif32"),
+                                                        ["build_src_dir = ."])
+    if write_file(pio_ini, ini):
+        print(f"[init] Wrote {pio_ini}")
+
+    def report(r: BoardResult) -> None:
+        print(f"[matrix] {r.board}: {r.status} in {r.duration:.1f}s")
+
+    for r in run_matrix(out_dir, buildable, parallel=parallel, on_result=report):
+        results[r.board] = r
+    ordered = [results[b] for b in boards]
+    print(format_matrix(ordered))
+    report_cache(cache, count_hits(line for r in ordered for line in r.output.splitlines()))
+    return 0 if all(r.ok for r in ordered) else 1
+
+
+def board_tools(search: str | None, refresh: bool) -> int:
+    """--refresh-boards / --search-boards: maintain and query the local board database."""
+    db = default_db()
+    try:
+        if refresh:
+            try:
+                count = db.refresh()
+            except BoardDBError as e:
+                print(f"[error] {e}", file=sys.stderr)
+                return 1
+            print(f"[boards] Imported {count} boards into {db.path}")
+        if search is not None:
+            if not len(db):
+                print("[boards] Board database is empty; run with --refresh-boards first", file=sys.stderr)
+                return 1
+            for board in db.search(search, limit=25):
+                print(f"{board.board_id:<32} {board.name}  [{board.platform}, {board.mcu}]")
+        return 0
+    finally:
+        db.close()
+
+
+def replay_capture(directory: str, speed: float, loop: bool) -> int:
+    """--replay: serve a serial capture on a virtual port until it ends (or Ctrl+C)."""
+    path = pathlib.Path(directory)
+    reader = CaptureReader(path)
+    empty = not len(reader)
+    reader.close()
+    if empty:
+        print(f"[error] No capture data in {path}", file=sys.stderr)
+        return 1
+    try:
+        port = VirtualSerialPort()
+    except OSError as e:
+        print(f"[error] {e}", file=sys.stderr)
+        return 1
+    replayer = Replayer(capture_chunks(path), port, speed, loop)
+    pace = "full speed" if speed <= 0 else f"{speed:g}x"
+    print(f"[replay] {path} on {port.port} at {pace}; open that port to start (Ctrl+C to stop)")
+    replayer.start()
+    try:
+        while not replayer.wait(0.5):
+            pass
+        if replayer.error:
+            print(f"[error] Replay failed: {replayer.error}", file=sys.stderr)
+            return 1
+        rate = replayer.bytes_sent / replayer.elapsed / 1e6 if replayer.elapsed else 0.0
+        print(f"[replay] Sent {replayer.bytes_sent} bytes in {replayer.chunks_sent} reads, "
+              f"{replayer.elapsed:.2f} s ({rate:.2f} MB/s)")
+        # Like a device gone quiet: keep the port until the reader has taken everything and closed it
+        while port.is_open():
+            time.sleep(0.2)
+    except KeyboardInterrupt:
+        replayer.stop()
+    finally:
+        port.close()
+    return 0
+
+
 def main(argv: list[str] | None = None) -> int:
     parser = argparse.ArgumentParser(description="VB6-like to Arduino transpiler")
-    parser.add_argument("input", help="VB-like source file")
+    parser.add_argument("input", nargs="?", help="VB-like source file")
     parser.add_argument("--out", default="generated", help="Output directory")
     parser.add_argument("--board", help="PlatformIO board id (e.g., esp32-s3-devkitm-1)")
     parser.add_argument("--build", action="store_true", help="Run 'pio run' after transpiling")
     parser.add_argument("--upload", action="store_true", help="Run 'pio run --target upload'")
     parser.add_argument("--port", help="Upload port for PlatformIO")
+    parser.add_argument("--force-upload", action="store_true",
+                        help="Flash even if --port was last flashed with the same firmware")
+    parser.add_argument("--boards", help="Comma-separated board ids to build in parallel (build matrix)")
+    parser.add_argument("--jobs", type=int, help="Boards to build at once with --boards (default: CPU count)")
+    parser.add_argument("--cache-dir", help="Shared compiler cache directory (default: ~/.asic/build_cache)")
+    parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_MAX_MB,
+                        help=f"Size limit of the compiler cache in MB (default: {DEFAULT_MAX_MB})")
+    parser.add_argument("--no-cache", action="store_true", help="Don't use the shared compiler cache")
+    parser.add_argument("--inline", action="store_true",
+                        help="Emit small non-recursive procedures as static inline (same as Option Inline On)")
+    parser.add_argument("--inline-report", action="store_true",
+                        help="List procedures marked static inline (with --build, also measure the flash delta)")
+    parser.add_argument("--budget", action="store_true",
+                        help="Print the estimated RAM/stack budget for --board (checked before every build)")
+    parser.add_argument("--size-report", action="store_true",
+                        help="After building, attribute flash/RAM to VB procedures and lines and record the size history")
+    parser.add_argument("--max-growth", type=int, metavar="BYTES",
+                        help="With --size-report, fail if flash grew by more than BYTES since the last recorded build")
+    parser.add_argument("--profile", choices=[PROFILE_PROCS, PROFILE_LINES], default=PROFILE_OFF,
+                        help="Time every Sub/Function (procs) or also every VB line (lines) on the device; "
+                             "counters are sent over Serial for the IDE's Profiler tab")
+    parser.add_argument("--profile-interval", type=int, default=DEFAULT_INTERVAL_MS, metavar="MS",
+                        help=f"How often --profile sends its counters (default: {DEFAULT_INTERVAL_MS})")
+    parser.add_argument("--native", action="store_true",
+                        help="Compile with the host C++ compiler against an Arduino stub and run loop() locally")
+    parser.add_argument("--iterations", type=int, default=1000, help="loop() iterations for --native (default: 1000)")
+    parser.add_argument("--inputs", help="Scripted pin/serial inputs for --native")
+    parser.add_argument("--trace", help="Trace file for --native (default: OUT/trace.txt)")
+    parser.add_argument("--refresh-boards", action="store_true",
+                        help="Import the board list from 'pio boards' into the local board database")
+    parser.add_argument("--search-boards", metavar="QUERY",
+                        help="Fuzzy-search the board database by id, name, MCU or vendor")
+    parser.add_argument("--replay", metavar="CAPTURE_DIR",
+                        help="Replay a serial capture on a virtual serial port (POSIX)")
+    parser.add_argument("--replay-speed", type=float, default=1.0,
+                        help="Replay speed: 1 = original timing, 10 = ten times faster, 0 = as fast as possible")
+    parser.add_argument("--replay-loop", action="store_true", help="Start the replay over when it ends")
     args = parser.parse_args(argv)
 
+    if args.replay:
+        return replay_capture(args.replay, args.replay_speed, args.replay_loop)
+
+    if args.refresh_boards or args.search_boards is not None:
+        status = board_tools(args.search_boards, args.refresh_boards)
+        if status or not args.input:
+            return status
+    if not args.input:
+        parser.error("the input file is required")
+
     src_path = pathlib.Path(args.input)
     out_dir = pathlib.Path(args.out)
     out_cpp = out_dir / "main.cpp"
 
-    cpp = transpile_string(src_path.read_text(encoding="utf-8"))
-    write_file(out_cpp, cpp)
-    print(f"[ok] Transpiled to {out_cpp}")
+    source = src_path.read_text(encoding="utf-8")
+    transpiler = VBTranspiler(inline=args.inline, profile=args.profile, profile_interval_ms=args.profile_interval)
+    try:
+        result = transpiler.transpile(source)
+    except ProfileError as e:
+        print(f"[error] {e}", file=sys.stderr)
+        return 1
+    if write_file(out_cpp, result.cpp):
+        print(f"[ok] Transpiled to {out_cpp}")
+    else:
+        print(f"[ok] Transpiled to {out_cpp} (unchanged)")
+    profile_map = out_dir / MAP_FILE
+    if result.profile:
+        save_map(profile_map, result.profile, args.profile_interval)
+        print(f"[profile] {len(result.profile)} counters, sent every {args.profile_interval} ms; map in {profile_map}")
+    elif profile_map.exists():
+        profile_map.unlink()  # Left by an earlier profiling build; no longer matches the firmware
+
+    if args.inline_report:
+        if result.inlined:
+            for name, statements in result.inlined:
+                print(f"[inline] {name} ({statements} statement{'s' if statements != 1 else ''})")
+        else:
+            print("[inline] No procedures inlined")
+
+    if args.native:
+        trace = pathlib.Path(args.trace) if args.trace else out_dir / "trace.txt"
+        inputs = pathlib.Path(args.inputs) if args.inputs else None
+        status = run_native_sketch(out_cpp, out_dir, args.iterations, inputs, trace)
+        if status or not (args.build or args.upload):
+            return status
+
+    profile = get_board_profile(args.board)
+    if args.budget and not profile:
+        print(f"[budget] No board profile for {args.board or '(no --board)'}; skipping estimate")
+    if profile and (args.budget or args.build or args.upload):
+        report = estimate_budget(transpiler, profile, result.call_graph)
+        if args.budget or not report.ok:
+            print(report.format())
+        if not report.ok:
+            print("[error] Memory budget exceeded; not building", file=sys.stderr)
+            return 1
+
+    cache = None
+    if not args.no_cache:
+        cache = BuildCache(args.cache_dir or os.environ.get(CACHE_ENV), args.cache_max_mb)
+        os.environ.update(cache.env())  # Inherited by every PlatformIO run below
+
+    if args.boards:
+        if args.upload:
+            print("[error] --upload cannot be combined with --boards", file=sys.stderr)
+            return 1
+        if not args.build:
+            return 0
+        boards = [b.strip() for b in args.boards.split(",") if b.strip()]
+        return build_matrix(out_dir, boards, transpiler, result, args.jobs, cache)
 
     if not args.build and not args.upload:
         return 0
@@ -48,23 +362,47 @@ def main(argv: list[str] | None = None) -> int:
     # Create minimal platformio.ini if missing
     pio_ini = out_dir / "platformio.ini"
     if not pio_ini.exists():
-        pio_ini.write_text(
+        write_file(
+            pio_ini,
             f"""[env:{args.board}]
-platform = espressif32
+platform = {board_platform(args.board, "espressif32")}
 board = {args.board}
 framework = arduino
 build_src_dir = .
 """,
-            encoding="utf-8",
         )
         print(f"[init] Wrote {pio_ini}")
 
     cmd = ["pio", "run", "--project-dir", str(out_dir), "--environment", args.board]
-    if args.upload:
-        cmd.extend(["--target", "upload"])
-    cmd.extend(env_args)
 
-    return run_cmd(cmd)
+    inputs = input_hashes(out_dir, build_inputs(out_dir, "."))  # build_src_dir = .
+    if is_up_to_date(out_dir, args.board, inputs):
+        print("[ok] Up to date; reusing firmware from the last build")
+        status = 0
+    else:
+        status, output = run_build(cmd)
+        report_cache(cache, count_hits(output))
+        if status == 0:
+            save_manifest(out_dir, args.board, inputs, flash=flash_used("\n".join(output)))
+    if status == 0 and args.inline_report and result.inlined:
+        # The flash size of this build, against one build of the same code without inlining
+        manifest = load_manifest(out_dir)
+        report_inline_delta(result.cpp, result.inlined, pio_ini.read_text(encoding="utf-8"), args.board,
+                            manifest.flash if manifest else None)
+    if status == 0 and args.size_report:
+        status = report_size(out_dir, args.board, result.cpp, source, args.max_growth)
+    if status != 0 or not args.upload:
+        return status
+
+    firmware = find_firmware(out_dir, args.board)
+    firmware_hash = file_hash(firmware) if firmware else None
+    if args.port and not args.force_upload and is_flashed(args.port, args.board, firmware_hash):
+        print(f"[ok] {args.port} already runs this firmware; skipping upload (use --force-upload to flash anyway)")
+        return 0
+    status = run_cmd(cmd + ["--target", "nobuild", "--target", "upload"] + env_args)
+    if status == 0 and args.port and firmware_hash:
+        record_flash(args.port, args.board, firmware_hash)
+    return status
 
 
 if __name__ == "__main__":
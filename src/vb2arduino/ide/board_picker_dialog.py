@@ -0,0 +1,144 @@
+"""Board picker: fuzzy search over every PlatformIO board in the local board database."""
+
+import sys
+import time
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QCheckBox,
+    QTableWidget, QTableWidgetItem, QHeaderView
+)
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal
+
+from vb2arduino.board_db import BoardDB, BoardDBError, BoardInfo
+
+
+class BoardDBRefreshThread(QThread):
+    """Re-imports `pio boards --json-output` into the board database off the GUI thread."""
+
+    refreshed = pyqtSignal(int)  # boards stored
+    failed = pyqtSignal(str)
+
+    def __init__(self, db: BoardDB, parent=None):
+        super().__init__(parent)
+        self.db = db
+
+    def run(self):
+        try:
+            count = self.db.refresh([sys.executable, "-m", "platformio"])
+        except BoardDBError as e:
+            self.failed.emit(str(e))
+            return
+        finally:
+            self.db.close()  # This thread's connection
+        self.refreshed.emit(count)
+
+
+def _size(n: int) -> str:
+    if n >= 1048576:
+        return f"{n / 1048576:.0f} MB" if n % 1048576 == 0 else f"{n / 1048576:.1f} MB"
+    return f"{n // 1024} KB" if n >= 1024 else f"{n} B"
+
+
+class BoardPickerDialog(QDialog):
+    """Search boards by id, name, MCU or vendor and pick one.
+
+    Refreshing is requested from the owner, which runs the refresh thread so
+    it can outlive the dialog.
+    """
+
+    refresh_requested = pyqtSignal()
+    COLUMNS = ["Board", "ID", "MCU", "Platform", "RAM", "Flash"]
+
+    def __init__(self, db: BoardDB, current: str | None = None, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.setWindowTitle("Find Board")
+        self.resize(760, 480)
+        layout = QVBoxLayout(self)
+
+        search_row = QHBoxLayout()
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Search boards, e.g. 's3 devkit', 'atmega328', 'adafruit feather'")
+        self.search_edit.setClearButtonEnabled(True)
+        search_row.addWidget(self.search_edit)
+        self.arduino_only = QCheckBox("Arduino framework only")
+        self.arduino_only.setChecked(True)
+        search_row.addWidget(self.arduino_only)
+        layout.addLayout(search_row)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
+        self.table.cellDoubleClicked.connect(lambda *_: self.accept())
+        layout.addWidget(self.table)
+
+        bottom = QHBoxLayout()
+        self.status_label = QLabel()
+        bottom.addWidget(self.status_label)
+        bottom.addStretch()
+        self.refresh_btn = QPushButton("Refresh from PlatformIO")
+        self.refresh_btn.clicked.connect(self.refresh_requested)
+        bottom.addWidget(self.refresh_btn)
+        select_btn = QPushButton("Select")
+        select_btn.setDefault(True)
+        select_btn.clicked.connect(self.accept)
+        bottom.addWidget(select_btn)
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.clicked.connect(self.reject)
+        bottom.addWidget(cancel_btn)
+        layout.addLayout(bottom)
+
+        # Re-filter shortly after typing stops rather than on every keystroke
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(80)
+        self._search_timer.timeout.connect(self.update_results)
+        self.search_edit.textChanged.connect(self._search_timer.start)
+        self.arduino_only.toggled.connect(self.update_results)
+
+        if current:
+            self.search_edit.setText(current)
+            self.search_edit.selectAll()
+        self.update_results()
+
+    def update_results(self):
+        results = self.db.search(self.search_edit.text(), limit=200, arduino_only=self.arduino_only.isChecked())
+        self.table.setRowCount(len(results))
+        for row, board in enumerate(results):
+            values = [board.name, board.board_id, board.mcu, board.platform, _size(board.ram), _size(board.flash)]
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                item.setData(Qt.ItemDataRole.UserRole, board)
+                self.table.setItem(row, col, item)
+        if results:
+            self.table.selectRow(0)
+        self._update_status(len(results))
+
+    def _update_status(self, shown: int):
+        total = len(self.db)
+        if not total:
+            self.status_label.setText("Board database is empty - refresh it from PlatformIO.")
+            return
+        imported = self.db.imported_at()
+        age = f", updated {time.strftime('%Y-%m-%d', time.localtime(imported))}" if imported else ""
+        self.status_label.setText(f"{shown} of {total} boards{age}")
+
+    def selected_board(self) -> BoardInfo | None:
+        item = self.table.item(self.table.currentRow(), 0) if self.table.currentRow() >= 0 else None
+        return item.data(Qt.ItemDataRole.UserRole) if item else None
+
+    def show_refreshing(self):
+        self.refresh_btn.setEnabled(False)
+        self.status_label.setText("Reading boards from PlatformIO...")
+
+    def on_refreshed(self, _count: int):
+        self.refresh_btn.setEnabled(True)
+        self.update_results()
+
+    def on_refresh_failed(self, message: str):
+        self.refresh_btn.setEnabled(True)
+        self.status_label.setText(f"Refresh failed: {message}")
@@ -0,0 +1,73 @@
+"""Memory budget panel showing the estimated RAM/stack use of the current sketch."""
+
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QProgressBar,
+    QTableWidget, QTableWidgetItem, QHeaderView
+)
+from PyQt6.QtCore import Qt
+
+
+class BudgetPanel(QWidget):
+    """Ranked list of memory consumers plus RAM and stack gauges."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.title_label = QLabel("Compile or use Tools > Estimate Memory Usage to see the budget.")
+        layout.addWidget(self.title_label)
+
+        gauges = QHBoxLayout()
+        gauges.addWidget(QLabel("RAM:"))
+        self.ram_bar = QProgressBar()
+        self.ram_bar.setFormat("%v / %m bytes")
+        gauges.addWidget(self.ram_bar)
+        gauges.addWidget(QLabel("Stack (est.):"))
+        self.stack_bar = QProgressBar()
+        self.stack_bar.setFormat("%v / %m bytes")
+        gauges.addWidget(self.stack_bar)
+        layout.addLayout(gauges)
+
+        self.table = QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(["Bytes", "Kind", "Name", "Detail"])
+        self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        self.messages_label = QLabel()
+        self.messages_label.setWordWrap(True)
+        layout.addWidget(self.messages_label)
+
+    def show_report(self, report):
+        """Display a BudgetReport."""
+        p = report.profile
+        self.title_label.setText(f"Memory budget for {p.name} ({p.board_id}, {p.mcu})")
+        self.ram_bar.setRange(0, p.ram)
+        self.ram_bar.setValue(min(report.static_ram, p.ram))
+        self.stack_bar.setRange(0, max(report.stack_available, 1))
+        self.stack_bar.setValue(max(0, min(report.stack_depth, report.stack_available)))
+        self.stack_bar.setToolTip(" -> ".join(report.stack_path))
+
+        consumers = report.ranked()
+        self.table.setRowCount(len(consumers))
+        for row, c in enumerate(consumers):
+            size_item = QTableWidgetItem(str(c.size))
+            size_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            self.table.setItem(row, 0, size_item)
+            self.table.setItem(row, 1, QTableWidgetItem(c.kind if c.region == "ram" else f"{c.kind} (flash)"))
+            self.table.setItem(row, 2, QTableWidgetItem(c.name))
+            self.table.setItem(row, 3, QTableWidgetItem(c.detail))
+
+        messages = [f"<b style='color:#C5221F'>{m}</b>" for m in report.errors]
+        messages += [f"<span style='color:#B06000'>{m}</span>" for m in report.warnings]
+        self.messages_label.setText("<br>".join(messages))
+
+    def show_unavailable(self, board):
+        """Explain that no profile exists for the selected board."""
+        self.title_label.setText(f"No memory profile for board '{board}'.")
+        self.table.setRowCount(0)
+        self.ram_bar.reset()
+        self.stack_bar.reset()
+        self.messages_label.clear()
@@ -0,0 +1,161 @@
+"""Build matrix: pick several boards, build them in parallel, and compare the results."""
+
+import pathlib
+import threading
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QListWidget, QListWidgetItem,
+    QPushButton, QSpinBox, QWidget, QTableWidget, QTableWidgetItem, QHeaderView
+)
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from PyQt6.QtGui import QColor
+
+from vb2arduino.build_matrix import BoardResult, default_parallelism, run_matrix
+
+
+class BuildMatrixDialog(QDialog):
+    """Choose which boards to build and how many at once."""
+
+    def __init__(self, boards: list[tuple[str, str]], selected: list[str], parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Build Matrix")
+        self.resize(400, 500)
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("Build the current sketch for these boards:"))
+
+        self.board_list = QListWidget()
+        for name, board_id in boards:
+            item = QListWidgetItem(f"{name} ({board_id})")
+            item.setData(Qt.ItemDataRole.UserRole, board_id)
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(Qt.CheckState.Checked if board_id in selected else Qt.CheckState.Unchecked)
+            self.board_list.addItem(item)
+        layout.addWidget(self.board_list)
+
+        parallel_row = QHBoxLayout()
+        parallel_row.addWidget(QLabel("Parallel builds:"))
+        self.parallel_spin = QSpinBox()
+        self.parallel_spin.setRange(1, 32)
+        self.parallel_spin.setValue(default_parallelism(32))
+        parallel_row.addWidget(self.parallel_spin)
+        parallel_row.addStretch()
+        layout.addLayout(parallel_row)
+
+        buttons = QHBoxLayout()
+        buttons.addStretch()
+        build_btn = QPushButton("Build")
+        build_btn.setDefault(True)
+        build_btn.clicked.connect(self.accept)
+        buttons.addWidget(build_btn)
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.clicked.connect(self.reject)
+        buttons.addWidget(cancel_btn)
+        layout.addLayout(buttons)
+
+    def selected_boards(self) -> list[str]:
+        return [
+            self.board_list.item(i).data(Qt.ItemDataRole.UserRole)
+            for i in range(self.board_list.count())
+            if self.board_list.item(i).checkState() == Qt.CheckState.Checked
+        ]
+
+
+class MatrixThread(QThread):
+    """Runs build_matrix.run_matrix off the GUI thread."""
+
+    board_finished = pyqtSignal(object)  # BoardResult
+
+    def __init__(self, project_dir: pathlib.Path, boards: list[str], pio_cmd: list[str], parallel: int,
+                 env: dict[str, str] | None = None):
+        super().__init__()
+        self.project_dir = project_dir
+        self.boards = boards
+        self.pio_cmd = pio_cmd
+        self.parallel = parallel
+        self.env = env
+        self.cancel_event = threading.Event()
+
+    def run(self):
+        run_matrix(self.project_dir, self.boards, self.pio_cmd, self.parallel,
+                   on_result=self.board_finished.emit, cancel=self.cancel_event, env=self.env)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+
+class BuildMatrixPanel(QWidget):
+    """Per-board table of build status, flash/RAM use and duration."""
+
+    cancel_requested = pyqtSignal()
+    result_activated = pyqtSignal(object)  # BoardResult
+
+    COLUMNS = ["Board", "Status", "Flash", "RAM", "Time"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        toolbar = QHBoxLayout()
+        self.status_label = QLabel("Use Sketch > Build Matrix... to build for several boards.")
+        toolbar.addWidget(self.status_label)
+        toolbar.addStretch()
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel_requested.emit)
+        toolbar.addWidget(self.cancel_btn)
+        layout.addLayout(toolbar)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.cellDoubleClicked.connect(self._on_double_click)
+        layout.addWidget(self.table)
+
+        self.rows: dict[str, int] = {}
+        self.results: dict[str, BoardResult] = {}
+
+    def start(self, boards: list[str]):
+        self.rows = {board: row for row, board in enumerate(boards)}
+        self.results = {}
+        self.table.setRowCount(len(boards))
+        for board in boards:
+            self.show_result(BoardResult(board=board, note="building..."))
+        self.status_label.setText(f"Building {len(boards)} boards...")
+        self.cancel_btn.setEnabled(True)
+
+    def show_result(self, result: BoardResult):
+        row = self.rows[result.board]
+        self.results[result.board] = result
+        flash = self._usage(result.flash_used, result.flash_total)
+        ram = self._usage(result.ram_used, result.ram_total)
+        cells = [result.board, result.status, flash, ram, f"{result.duration:.1f} s" if result.duration else ""]
+        for col, text in enumerate(cells):
+            item = QTableWidgetItem(text)
+            if col == 1 and result.returncode is not None:
+                item.setForeground(QColor("#188038" if result.ok else "#C5221F"))
+            self.table.setItem(row, col, item)
+
+        pending = [r for r in self.results.values() if r.returncode is None and r.note == "building..."]
+        if not pending and len(self.results) == len(self.rows):
+            failed = sum(1 for r in self.results.values() if not r.ok)
+            self.status_label.setText(
+                f"✓ All {len(self.rows)} boards built" if not failed else f"✗ {failed} of {len(self.rows)} boards failed"
+            )
+            self.cancel_btn.setEnabled(False)
+
+    @staticmethod
+    def _usage(used: int | None, total: int | None) -> str:
+        if used is None:
+            return ""
+        if not total:
+            return f"{used} B"
+        return f"{used} / {total} B ({100.0 * used / total:.1f}%)"
+
+    def _on_double_click(self, row: int, _col: int):
+        for board, r in self.rows.items():
+            if r == row and board in self.results and self.results[board].output:
+                self.result_activated.emit(self.results[board])
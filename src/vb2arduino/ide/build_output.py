@@ -0,0 +1,81 @@
+"""Build output pane: live PlatformIO output, parsed errors, and a cancel button."""
+
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QPlainTextEdit,
+    QListWidget, QListWidgetItem, QSplitter
+)
+from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtGui import QFont, QColor
+
+
+class BuildOutputPane(QWidget):
+    """Shows the output of the running build as it streams in."""
+
+    cancel_requested = pyqtSignal()
+    error_activated = pyqtSignal(int, str, str)  # VB line, level, message
+
+    MAX_LINES = 5000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        toolbar = QHBoxLayout()
+        self.status_label = QLabel("No build yet")
+        toolbar.addWidget(self.status_label)
+        toolbar.addStretch()
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel_requested.emit)
+        toolbar.addWidget(self.cancel_btn)
+        clear_btn = QPushButton("Clear")
+        clear_btn.clicked.connect(self.clear)
+        toolbar.addWidget(clear_btn)
+        layout.addLayout(toolbar)
+
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        self.output = QPlainTextEdit()
+        self.output.setReadOnly(True)
+        self.output.setMaximumBlockCount(self.MAX_LINES)
+        self.output.setFont(QFont("Courier New", 9))
+        splitter.addWidget(self.output)
+
+        self.error_list = QListWidget()
+        self.error_list.itemActivated.connect(self._on_error_item)
+        self.error_list.itemDoubleClicked.connect(self._on_error_item)
+        splitter.addWidget(self.error_list)
+        splitter.setSizes([700, 300])
+        layout.addWidget(splitter)
+
+    def clear(self):
+        self.output.clear()
+        self.error_list.clear()
+
+    def build_started(self, title: str, command: str, queued: int = 0):
+        self.clear()
+        self.output.appendPlainText(f"> {command}")
+        self.set_status(f"{title} running..." + (f" ({queued} queued)" if queued else ""))
+        self.cancel_btn.setEnabled(True)
+
+    def build_finished(self, message: str):
+        self.set_status(message)
+        self.cancel_btn.setEnabled(False)
+
+    def set_status(self, text: str):
+        self.status_label.setText(text)
+
+    def append_line(self, line: str, is_stderr: bool = False):
+        self.output.appendPlainText(line)
+
+    def add_error(self, vb_line: int, level: str, msg: str):
+        item = QListWidgetItem(f"VB line {vb_line}: {level} - {msg}")
+        item.setData(Qt.ItemDataRole.UserRole, (vb_line, level, msg))
+        if level != "warning":
+            item.setForeground(QColor("#C5221F"))
+        self.error_list.addItem(item)
+
+    def _on_error_item(self, item: QListWidgetItem):
+        data = item.data(Qt.ItemDataRole.UserRole)
+        if isinstance(data, tuple) and len(data) == 3:
+            self.error_activated.emit(*data)
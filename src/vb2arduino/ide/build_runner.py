@@ -0,0 +1,271 @@
+"""Asynchronous build runner: runs PlatformIO jobs in a QProcess and streams their output."""
+
+import codecs
+import pathlib
+import re
+from dataclasses import dataclass, field
+from typing import Callable
+
+from PyQt6.QtCore import QObject, QProcess, QProcessEnvironment, QTimer, pyqtSignal
+
+from vb2arduino.ide.pio_client import PioWorkerClient
+
+# gcc/clang style: <file>:<line>:<col>: <level>: <message>
+DIAGNOSTIC_RE = re.compile(r"(.+?):(\d+):\d+:\s+(fatal error|error|warning):\s+(.*)")
+
+
+def parse_diagnostic(line: str, cpp_name: str) -> tuple[int, str, str] | None:
+    """Return (cpp_line, level, message) if `line` is a compiler diagnostic for `cpp_name`."""
+    m = DIAGNOSTIC_RE.match(line)
+    if not m:
+        return None
+    file_path, line_no, level, msg = m.groups()
+    if not file_path.endswith(cpp_name):
+        return None
+    return int(line_no), level, msg
+
+
+@dataclass
+class BuildJob:
+    """One queued PlatformIO invocation."""
+
+    title: str  # "Compile", "Upload", "Clean"
+    cmd: list[str]
+    log_name: str  # Prefix for <log_name>_stdout.txt / _stderr.txt and settings keys
+    cwd: pathlib.Path | None = None
+    cpp_file: pathlib.Path | None = None  # Source whose diagnostics are collected
+    prepare: Callable[["BuildJob"], bool] | None = None  # Runs right before start; False drops the job
+    timeout_ms: int = 0
+    env: dict[str, str] = field(default_factory=dict)  # Extra environment, e.g. the compiler cache
+    editor: object = None  # CodeEditor the source came from; receives live diagnostics
+    skipped: bool = False  # Set by prepare when the output is already up to date
+    skip_message: str = ""  # Shown instead of the generic "up to date" message
+    quiet: bool = False  # First step of a pipeline: no success popup
+    inputs: dict[str, str] = field(default_factory=dict)  # Hashes of what this build compiles
+    # Filled in while running
+    stdout: list[str] = field(default_factory=list)
+    stderr: list[str] = field(default_factory=list)
+    diagnostics: list[tuple[int, str, str]] = field(default_factory=list)
+    cancelled: bool = False
+    exit_code: int | None = None  # Set when finished, so later jobs can depend on it
+    worker_id: int = 0  # Non-zero while running in the PlatformIO worker
+
+    @property
+    def pio_args(self) -> list[str] | None:
+        """Arguments after `python -m platformio`, or None for any other command."""
+        if len(self.cmd) >= 3 and self.cmd[1:3] == ["-m", "platformio"]:
+            return self.cmd[3:]
+        return None
+
+
+class BuildRunner(QObject):
+    """Runs BuildJobs one at a time without blocking the GUI thread.
+
+    PlatformIO jobs go to a persistent worker process when one is enabled
+    (see use_worker); everything else, and every job after the worker dies,
+    runs as a fresh QProcess.
+    """
+
+    job_started = pyqtSignal(object)  # BuildJob
+    output_line = pyqtSignal(object, str, bool)  # job, line, is_stderr
+    diagnostic = pyqtSignal(object, int, str, str)  # job, cpp_line, level, message
+    job_finished = pyqtSignal(object, int)  # job, exit code (-1 if cancelled or failed to start)
+    queue_changed = pyqtSignal(int)  # Number of jobs waiting (excluding the running one)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.queue: list[BuildJob] = []
+        self.current: BuildJob | None = None
+        self.process: QProcess | None = None
+        self._decoders = {}
+        self._partial = {}
+        self._kill_timer = QTimer(self)
+        self._kill_timer.setSingleShot(True)
+        self._kill_timer.timeout.connect(self._kill)
+        self._timeout_timer = QTimer(self)
+        self._timeout_timer.setSingleShot(True)
+        self._timeout_timer.timeout.connect(self.cancel)
+        self.worker: PioWorkerClient | None = None
+        self._next_worker_id = 0
+
+    def use_worker(self) -> None:
+        """Start the persistent PlatformIO worker (no-op where unsupported)."""
+        if self.worker or not PioWorkerClient.supported():
+            return
+        self.worker = PioWorkerClient(self)
+        self.worker.line.connect(self._on_worker_line)
+        self.worker.job_done.connect(self._on_worker_done)
+        self.worker.died.connect(self._on_worker_died)
+        self.worker.start()
+
+    def shutdown(self) -> None:
+        """Stop all builds and the worker (used when the IDE closes)."""
+        self.cancel_all()
+        self.wait()
+        if self.worker:
+            self.worker.stop()
+
+    def is_busy(self) -> bool:
+        return self.current is not None
+
+    def enqueue(self, job: BuildJob) -> None:
+        """Queue a job; it starts immediately if nothing is running."""
+        self.queue.append(job)
+        self.queue_changed.emit(len(self.queue))
+        if not self.current:
+            self._start_next()
+
+    def cancel(self) -> None:
+        """Stop the running job (queued jobs still run)."""
+        if not self.current or not (self.process or self.current.worker_id):
+            return
+        self.current.cancelled = True
+        if self.current.worker_id:
+            self.worker.cancel(self.current.worker_id)
+        else:
+            self.process.terminate()
+        # Give PlatformIO a moment to stop its toolchain children, then force it
+        self._kill_timer.start(3000)
+
+    def cancel_all(self) -> None:
+        """Drop queued jobs and stop the running one."""
+        self.queue.clear()
+        self.queue_changed.emit(0)
+        self.cancel()
+
+    def wait(self, msecs: int = 3000) -> None:
+        """Block until the running process exits (used on shutdown)."""
+        if self.process:
+            self.process.waitForFinished(msecs)
+
+    def _start_next(self) -> None:
+        while self.queue:
+            job = self.queue.pop(0)
+            self.queue_changed.emit(len(self.queue))
+            if job.prepare and not job.prepare(job):
+                continue
+            if job.skipped:
+                # Nothing to run; report success without starting a process
+                job.exit_code = 0
+                self.job_started.emit(job)
+                self.job_finished.emit(job, 0)
+                continue
+            self._start(job)
+            return
+
+    def _start(self, job: BuildJob) -> None:
+        self.current = job
+        self._decoders = {
+            False: codecs.getincrementaldecoder("utf-8")(errors="replace"),
+            True: codecs.getincrementaldecoder("utf-8")(errors="replace"),
+        }
+        self._partial = {False: "", True: ""}
+        self.job_started.emit(job)
+        if job.timeout_ms:
+            self._timeout_timer.start(job.timeout_ms)
+
+        if self.worker and not self.worker.dead and job.pio_args is not None:
+            self._next_worker_id += 1
+            job.worker_id = self._next_worker_id
+            self.worker.run(job.worker_id, job.pio_args, str(job.cwd) if job.cwd else None, job.env)
+        else:
+            self._start_process(job)
+
+    def _start_process(self, job: BuildJob) -> None:
+        process = QProcess(self)
+        env = QProcessEnvironment.systemEnvironment()
+        env.insert("PYTHONUNBUFFERED", "1")  # Line-by-line output from PlatformIO
+        for key, value in job.env.items():
+            env.insert(key, value)
+        process.setProcessEnvironment(env)
+        if job.cwd:
+            process.setWorkingDirectory(str(job.cwd))
+        process.readyReadStandardOutput.connect(lambda: self._read(False))
+        process.readyReadStandardError.connect(lambda: self._read(True))
+        process.finished.connect(self._on_finished)
+        process.errorOccurred.connect(self._on_error)
+        self.process = process
+        process.start(job.cmd[0], job.cmd[1:])
+
+    def _read(self, is_stderr: bool) -> None:
+        if not self.process or not self.current:
+            return
+        raw = self.process.readAllStandardError() if is_stderr else self.process.readAllStandardOutput()
+        text = self._partial[is_stderr] + self._decoders[is_stderr].decode(bytes(raw))
+        lines = text.split("\n")
+        self._partial[is_stderr] = lines.pop()
+        for line in lines:
+            self._emit_line(line.rstrip("\r"), is_stderr)
+
+    def _emit_line(self, line: str, is_stderr: bool) -> None:
+        job = self.current
+        (job.stderr if is_stderr else job.stdout).append(line)
+        self.output_line.emit(job, line, is_stderr)
+        if job.cpp_file:
+            diag = parse_diagnostic(line, job.cpp_file.name)
+            if diag:
+                job.diagnostics.append(diag)
+                self.diagnostic.emit(job, *diag)
+
+    def _flush(self) -> None:
+        for is_stderr in (False, True):
+            self._read(is_stderr)
+            tail = self._partial[is_stderr] + self._decoders[is_stderr].decode(b"", final=True)
+            self._partial[is_stderr] = ""
+            if tail:
+                self._emit_line(tail.rstrip("\r"), is_stderr)
+
+    def _on_finished(self, exit_code: int, exit_status) -> None:
+        self._finish(-1 if exit_status == QProcess.ExitStatus.CrashExit else exit_code)
+
+    def _on_error(self, error) -> None:
+        # Finished is not emitted when the program could not be started at all
+        if error == QProcess.ProcessError.FailedToStart and self.current:
+            self.current.stderr.append(f"Failed to start: {self.current.cmd[0]}")
+            self._finish(-1)
+
+    def _finish(self, exit_code: int) -> None:
+        job = self.current
+        if not job:
+            return
+        self._flush()
+        self._kill_timer.stop()
+        self._timeout_timer.stop()
+        self.current = None
+        if self.process:
+            self.process.deleteLater()
+            self.process = None
+        job.exit_code = -1 if job.cancelled else exit_code
+        self.job_finished.emit(job, job.exit_code)
+        self._start_next()
+
+    def _on_worker_line(self, job_id: int, line: str, is_stderr: bool) -> None:
+        if self.current and self.current.worker_id == job_id:
+            self._emit_line(line, is_stderr)
+
+    def _on_worker_done(self, job_id: int, exit_code: int) -> None:
+        if self.current and self.current.worker_id == job_id:
+            self._finish(exit_code)
+
+    def _on_worker_died(self) -> None:
+        """Fall back to one process per job; rerun the interrupted job if there was one."""
+        self.worker = None
+        job = self.current
+        if not job or not job.worker_id:
+            return
+        job.worker_id = 0
+        if job.cancelled:
+            self._finish(-1)
+            return
+        job.stdout.clear()
+        job.stderr.clear()
+        job.diagnostics.clear()
+        self.output_line.emit(job, "[PlatformIO worker stopped; continuing in a separate process]", True)
+        self._start_process(job)
+
+    def _kill(self) -> None:
+        if self.current and self.current.worker_id and self.worker:
+            self.worker.cancel(self.current.worker_id, force=True)
+            return
+        if self.process and self.process.state() != QProcess.ProcessState.NotRunning:
+            self.process.kill()
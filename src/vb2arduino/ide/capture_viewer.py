@@ -0,0 +1,228 @@
+"""Viewer for on-disk serial captures: paged through mmap, with line/time jumps and regex search."""
+
+import pathlib
+import threading
+import time
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QCheckBox, QSpinBox,
+    QDateTimeEdit, QListView, QListWidget, QListWidgetItem, QSplitter, QMessageBox
+)
+from PyQt6.QtCore import Qt, QThread, QAbstractListModel, QModelIndex, QDateTime, QTimer, pyqtSignal
+from PyQt6.QtGui import QFont
+
+from vb2arduino.serial_capture import CaptureReader
+
+
+def _clock(ts: float) -> str:
+    return time.strftime("%H:%M:%S", time.localtime(ts)) + f".{int(ts * 1000) % 1000:03d}"
+
+
+class CaptureLineModel(QAbstractListModel):
+    """Lines of a capture, read from the mapped file only when the view asks for them."""
+
+    def __init__(self, reader: CaptureReader, parent=None):
+        super().__init__(parent)
+        self.reader = reader
+        self._count = len(reader)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._count
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        ts, text = self.reader.line(index.row())
+        return f"{index.row() + 1:>9}  {_clock(ts)}  {text}"
+
+    def reload(self):
+        """Pick up lines appended since the capture was opened."""
+        self.beginResetModel()
+        self.reader.refresh()
+        self._count = len(self.reader)
+        self.endResetModel()
+
+
+class CaptureSearchThread(QThread):
+    """Runs a regex over the capture and streams matching line numbers back in batches."""
+
+    found = pyqtSignal(object)  # list[int]
+    failed = pyqtSignal(str)
+
+    BATCH_S = 0.1
+    MAX_MATCHES = 100000
+
+    def __init__(self, directory: pathlib.Path, pattern: str, ignore_case: bool):
+        super().__init__()
+        self.directory = directory
+        self.pattern = pattern
+        self.ignore_case = ignore_case
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        # A reader of its own: mmaps are cheap and the GUI keeps using its copy meanwhile
+        reader = CaptureReader(self.directory)
+        try:
+            batch, total, last = [], 0, time.monotonic()
+            for line in reader.search(self.pattern, self.ignore_case, cancel=self.cancel_event):
+                batch.append(line)
+                total += 1
+                now = time.monotonic()
+                if now - last >= self.BATCH_S:
+                    self.found.emit(batch)
+                    batch, last = [], now
+                if total >= self.MAX_MATCHES:
+                    break
+            if batch:
+                self.found.emit(batch)
+        except Exception as e:  # re.error for a bad pattern, OSError for a vanished segment
+            self.failed.emit(str(e))
+        finally:
+            reader.close()
+
+
+class CaptureViewerDialog(QDialog):
+    """Browse a capture of any size; double-click a search result to jump to it."""
+
+    def __init__(self, directory: pathlib.Path, parent=None):
+        super().__init__(parent)
+        self.directory = directory
+        self.reader = CaptureReader(directory)
+        self.search_thread: CaptureSearchThread | None = None
+        self.match_count = 0
+        self.setWindowTitle(f"Serial Capture - {directory.name}")
+        self.resize(1000, 600)
+        layout = QVBoxLayout(self)
+
+        nav = QHBoxLayout()
+        self.info_label = QLabel()
+        nav.addWidget(self.info_label)
+        nav.addStretch()
+        nav.addWidget(QLabel("Line:"))
+        self.line_spin = QSpinBox()
+        self.line_spin.setMinimum(1)
+        self.line_spin.editingFinished.connect(lambda: self.goto_line(self.line_spin.value() - 1))
+        nav.addWidget(self.line_spin)
+        nav.addWidget(QLabel("Time:"))
+        self.time_edit = QDateTimeEdit()
+        self.time_edit.setDisplayFormat("yyyy-MM-dd HH:mm:ss")
+        nav.addWidget(self.time_edit)
+        time_btn = QPushButton("Go")
+        time_btn.clicked.connect(self.goto_time)
+        nav.addWidget(time_btn)
+        reload_btn = QPushButton("Reload")
+        reload_btn.setToolTip("Show lines captured since the viewer was opened")
+        reload_btn.clicked.connect(self.reload)
+        nav.addWidget(reload_btn)
+        layout.addLayout(nav)
+
+        search = QHBoxLayout()
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Regular expression, e.g. ERROR|panic|temp=\\d{3}")
+        self.search_edit.returnPressed.connect(self.start_search)
+        search.addWidget(self.search_edit)
+        self.case_cb = QCheckBox("Ignore case")
+        search.addWidget(self.case_cb)
+        self.search_btn = QPushButton("Search")
+        self.search_btn.clicked.connect(self.toggle_search)
+        search.addWidget(self.search_btn)
+        self.match_label = QLabel()
+        search.addWidget(self.match_label)
+        layout.addLayout(search)
+
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        self.model = CaptureLineModel(self.reader, self)
+        self.view = QListView()
+        self.view.setUniformItemSizes(True)  # Lets the view skip measuring millions of rows
+        self.view.setFont(QFont("Courier New", 10))
+        self.view.setModel(self.model)
+        splitter.addWidget(self.view)
+        self.match_list = QListWidget()
+        self.match_list.setUniformItemSizes(True)
+        self.match_list.setFont(QFont("Courier New", 10))
+        self.match_list.itemActivated.connect(
+            lambda item: self.goto_line(item.data(Qt.ItemDataRole.UserRole)))
+        splitter.addWidget(self.match_list)
+        splitter.setSizes([700, 300])
+        layout.addWidget(splitter)
+
+        self._update_info()
+        QTimer.singleShot(0, lambda: self.view.scrollToBottom())
+
+    def _update_info(self):
+        count = len(self.reader)
+        self.line_spin.setMaximum(max(1, count))
+        if count:
+            first, last = self.reader.timestamp(0), self.reader.timestamp(count - 1)
+            self.time_edit.setDateTimeRange(QDateTime.fromSecsSinceEpoch(int(first)),
+                                            QDateTime.fromSecsSinceEpoch(int(last) + 1))
+            self.time_edit.setDateTime(QDateTime.fromSecsSinceEpoch(int(first)))
+            span = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(first)) + " - " + _clock(last)
+        else:
+            span = "empty"
+        port = self.reader.meta.get("port", "")
+        self.info_label.setText(
+            f"{port + ': ' if port else ''}{count:,} lines, {self.reader.size / 1048576:.1f} MB, {span}")
+
+    def goto_line(self, line: int):
+        if 0 <= line < self.model.rowCount():
+            index = self.model.index(line)
+            self.view.setCurrentIndex(index)
+            self.view.scrollTo(index, QListView.ScrollHint.PositionAtCenter)
+
+    def goto_time(self):
+        line = self.reader.line_at_time(self.time_edit.dateTime().toSecsSinceEpoch())
+        self.goto_line(min(line, self.model.rowCount() - 1))
+
+    def reload(self):
+        self.model.reload()
+        self._update_info()
+
+    def toggle_search(self):
+        if self.search_thread and self.search_thread.isRunning():
+            self.search_thread.cancel()
+        else:
+            self.start_search()
+
+    def start_search(self):
+        pattern = self.search_edit.text()
+        if not pattern:
+            return
+        if self.search_thread and self.search_thread.isRunning():
+            self.search_thread.cancel()
+            self.search_thread.wait()
+        self.match_list.clear()
+        self.match_count = 0
+        self.match_label.setText("Searching...")
+        self.search_btn.setText("Stop")
+        self.search_thread = CaptureSearchThread(self.directory, pattern, self.case_cb.isChecked())
+        self.search_thread.found.connect(self._on_found)
+        self.search_thread.failed.connect(lambda msg: QMessageBox.warning(self, "Search", msg))
+        self.search_thread.finished.connect(self._on_search_finished)
+        self.search_thread.start()
+
+    def _on_found(self, lines: list[int]):
+        for line in lines:
+            if line >= self.model.rowCount():
+                continue  # Captured after the view was loaded
+            _ts, text = self.reader.line(line)
+            item = QListWidgetItem(f"{line + 1:>9}  {text[:200]}")
+            item.setData(Qt.ItemDataRole.UserRole, line)
+            self.match_list.addItem(item)
+        self.match_count += len(lines)
+        self.match_label.setText(f"{self.match_count:,} matches...")
+
+    def _on_search_finished(self):
+        self.search_btn.setText("Search")
+        capped = self.match_count >= CaptureSearchThread.MAX_MATCHES
+        self.match_label.setText(f"{self.match_count:,}{'+' if capped else ''} matches")
+
+    def done(self, result):
+        if self.search_thread and self.search_thread.isRunning():
+            self.search_thread.cancel()
+            self.search_thread.wait()
+        self.reader.close()
+        super().done(result)
@@ -0,0 +1,135 @@
+"""Background serial device watcher: keeps a live port table and reports plug/unplug."""
+
+import os
+import pathlib
+import threading
+from dataclasses import dataclass, replace
+
+import serial.tools.list_ports
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from vb2arduino.ide.utils import check_platformio_installed, get_pio_devices, guess_board
+
+SYS_TTY = pathlib.Path("/sys/class/tty")
+
+
+@dataclass(frozen=True)
+class DeviceInfo:
+    """One serial port as last seen by the watcher."""
+
+    port: str
+    description: str = ""
+    hwid: str = ""
+    board: str | None = None  # Best-guess PlatformIO board id from the USB vendor
+
+    @property
+    def label(self) -> str:
+        if self.description and self.description not in ("n/a", self.port):
+            return f"{self.port} - {self.description}"
+        return self.port
+
+
+def scan_ports() -> list[DeviceInfo]:
+    """Enumerate serial ports with pyserial (no subprocess)."""
+    devices = []
+    for p in serial.tools.list_ports.comports():
+        hwid = p.hwid or ""
+        devices.append(DeviceInfo(p.device, p.description or "", hwid, guess_board(p.device, hwid)))
+    return sorted(devices, key=lambda d: d.port)
+
+
+def tty_signature() -> tuple | None:
+    """Cheap change detector for Linux: the set of ttys backed by a real device.
+
+    Returns None where /sys/class/tty is unavailable.
+    """
+    try:
+        return tuple(sorted(e.name for e in os.scandir(SYS_TTY) if os.path.exists(os.path.join(e.path, "device"))))
+    except OSError:
+        return None
+
+
+class DeviceWatcher(QThread):
+    """Polls for serial device changes off the GUI thread.
+
+    On Linux only /sys/class/tty is polled each interval; the full pyserial
+    enumeration runs when it changes. Elsewhere pyserial is polled at a slower
+    rate. After each change, `pio device list` is consulted once in the
+    background to enrich descriptions, if PlatformIO is installed.
+    """
+
+    devices_changed = pyqtSignal(object)  # list[DeviceInfo]
+    device_added = pyqtSignal(object)  # DeviceInfo
+    device_removed = pyqtSignal(object)  # DeviceInfo
+
+    POLL_MS = 1000  # /sys/class/tty listing
+    FALLBACK_POLL_MS = 2500  # Full enumeration where sysfs is unavailable
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._devices: list[DeviceInfo] = []
+        self._wake = threading.Event()
+        self._running = True
+        self._force = True
+        self.scanned = threading.Event()  # Set after the first enumeration
+
+    def snapshot(self) -> list[DeviceInfo]:
+        """The current device table (never blocks on enumeration)."""
+        with self._lock:
+            return list(self._devices)
+
+    def refresh(self):
+        """Re-enumerate as soon as possible."""
+        self._force = True
+        self._wake.set()
+
+    def stop(self):
+        self._running = False
+        self._wake.set()
+        self.wait(3000)
+
+    def run(self):
+        signature = None
+        while self._running:
+            current = tty_signature()
+            if self._force or current is None or current != signature:
+                self._force = False
+                signature = current
+                if self._update(scan_ports()):
+                    self._update(self._enrich(self.snapshot()))
+                self.scanned.set()
+            self._wake.wait((self.POLL_MS if current is not None else self.FALLBACK_POLL_MS) / 1000)
+            self._wake.clear()
+
+    def _update(self, devices: list[DeviceInfo]) -> bool:
+        """Store a new table and emit what changed. Returns True if ports were added."""
+        with self._lock:
+            old = {d.port: d for d in self._devices}
+            self._devices = devices
+        new = {d.port: d for d in devices}
+        if new == old:
+            return False
+        for port in sorted(set(old) - set(new)):
+            self.device_removed.emit(old[port])
+        added = sorted(set(new) - set(old))
+        for port in added:
+            self.device_added.emit(new[port])
+        self.devices_changed.emit(devices)
+        return bool(added)
+
+    def _enrich(self, devices: list[DeviceInfo]) -> list[DeviceInfo]:
+        """Fill gaps from `pio device list` (slow; only runs when new ports appear)."""
+        if not self._running or not check_platformio_installed():
+            return devices
+        extra = {d.get("port"): d for d in get_pio_devices()}
+        enriched = []
+        for dev in devices:
+            info = extra.get(dev.port)
+            if info:
+                hwid = dev.hwid or info.get("hwid") or ""
+                description = dev.description if dev.description not in ("", "n/a") else info.get("description", "")
+                dev = replace(dev, hwid=hwid, description=description,
+                              board=dev.board or guess_board(dev.port, hwid))
+            enriched.append(dev)
+        return enriched
@@ -1,6 +1,6 @@
 """Code editor with VB syntax highlighting."""
 
-from PyQt6.QtWidgets import QPlainTextEdit, QWidget, QTextEdit, QComboBox, QVBoxLayout, QCompleter, QTreeView, QHeaderView, QMenu
+from PyQt6.QtWidgets import QPlainTextEdit, QWidget, QTextEdit, QComboBox, QVBoxLayout, QCompleter, QTreeView, QHeaderView, QMenu, QToolTip
 from PyQt6.QtGui import (
     QSyntaxHighlighter, QTextCharFormat, QColor, QFont, 
     QPainter, QTextFormat, QTextCursor, QPalette, QAction
@@ -160,11 +160,26 @@ class LineNumberArea(QWidget):
     def paintEvent(self, event):
         self.code_editor.line_number_area_paint_event(event)
 
+    def event(self, event):
+        # Hovering a gutter marker shows that line's compiler messages
+        if event.type() == event.Type.ToolTip:
+            block = self.code_editor.cursorForPosition(event.pos()).block()
+            messages = self.code_editor.diagnostics_at(block.blockNumber() + 1)
+            if messages:
+                QToolTip.showText(event.globalPos(), "\n".join(f"{level}: {msg}" for level, msg in messages), self)
+            else:
+                QToolTip.hideText()
+            return True
+        return super().event(event)
+
 
 class CodeEditor(QPlainTextEdit):
     """Code editor with line numbers and syntax highlighting."""
     
     modified_changed = pyqtSignal(bool)  # Signal for dirty state
+
+    DIAGNOSTIC_COLORS = {"error": "#E53935", "fatal error": "#E53935", "warning": "#F9A825"}
+    GUTTER_MARKER_WIDTH = 8
     
     def __init__(self, settings=None):
         super().__init__()
@@ -216,6 +231,11 @@ class CodeEditor(QPlainTextEdit):
         # Apply colors after line_number_area is created
         self.apply_colors()
 
+        # Compiler diagnostics shown as squiggles and gutter markers. Each entry keeps a
+        # cursor in its line so it follows edits above it; editing the line drops it.
+        self._diagnostics: list[tuple[QTextCursor, str, str]] = []
+        self.document().contentsChange.connect(self._on_contents_change)
+
         # Temporary jump highlight support (init before any highlighting)
         self._temp_highlight = None
         self._temp_highlight_timer = QTimer(self)
@@ -391,6 +411,12 @@ class CodeEditor(QPlainTextEdit):
     def _show_hover_tooltip(self):
         """Show hover tooltip if mouse is over a word."""
         if self.hover_pos:
+            line = self.cursorForPosition(self.hover_pos).blockNumber() + 1
+            messages = self.diagnostics_at(line)
+            if messages:
+                QToolTip.showText(self.viewport().mapToGlobal(self.hover_pos),
+                                  "\n".join(f"{level}: {msg}" for level, msg in messages), self)
+                return
             show_hover_tooltip(self, type('Event', (), {'pos': lambda: self.hover_pos})())
     
     def contextMenuEvent(self, event):
@@ -695,7 +721,7 @@ class CodeEditor(QPlainTextEdit):
         while max_num >= 10:
             max_num //= 10
             digits += 1
-        space = 3 + self.fontMetrics().horizontalAdvance('9') * digits
+        space = 3 + self.fontMetrics().horizontalAdvance('9') * digits + self.GUTTER_MARKER_WIDTH
         return space
         
     def update_line_number_area_width(self, _):
@@ -733,6 +759,12 @@ class CodeEditor(QPlainTextEdit):
         
         while block.isValid() and top <= event.rect().bottom():
             if block.isVisible() and bottom >= event.rect().top():
+                marker = self._marker_color(block_number + 1)
+                if marker:
+                    size = min(self.GUTTER_MARKER_WIDTH - 2, self.fontMetrics().height() - 2)
+                    painter.setBrush(QColor(marker))
+                    painter.setPen(Qt.PenStyle.NoPen)
+                    painter.drawEllipse(1, int(top) + (self.fontMetrics().height() - size) // 2, size, size)
                 number = str(block_number + 1)
                 fg_color = self.settings.get("editor", "line_number_fg", "#808080")
                 painter.setPen(QColor(fg_color))
@@ -763,6 +795,7 @@ class CodeEditor(QPlainTextEdit):
             # Include temporary jump highlight if present
             if self._temp_highlight is not None:
                 extra_selections.append(self._temp_highlight)
+            extra_selections.extend(self._diagnostic_selections())
             
         self.setExtraSelections(extra_selections)
 
@@ -791,6 +824,60 @@ class CodeEditor(QPlainTextEdit):
         self._temp_highlight = None
         self.highlight_current_line()
 
+    def add_diagnostic(self, line_number: int, level: str, message: str):
+        """Underline a line with a compiler error/warning and mark it in the gutter."""
+        block = self.document().findBlockByNumber(line_number - 1)
+        if not block.isValid():
+            return
+        self._diagnostics.append((QTextCursor(block), level, message))
+        self.highlight_current_line()
+        self.line_number_area.update()
+
+    def clear_diagnostics(self):
+        if self._diagnostics:
+            self._diagnostics = []
+            self.highlight_current_line()
+            self.line_number_area.update()
+
+    def diagnostics_at(self, line_number: int) -> list[tuple[str, str]]:
+        """(level, message) pairs currently shown on a line."""
+        return [(level, msg) for cursor, level, msg in self._diagnostics if cursor.blockNumber() + 1 == line_number]
+
+    def _marker_color(self, line_number: int) -> str | None:
+        levels = [level for level, _ in self.diagnostics_at(line_number)]
+        if not levels:
+            return None
+        return self.DIAGNOSTIC_COLORS["warning" if all(level == "warning" for level in levels) else "error"]
+
+    def _diagnostic_selections(self) -> list:
+        selections = []
+        for cursor, level, _ in self._diagnostics:
+            block = cursor.block()
+            text = block.text()
+            if not text.strip():
+                continue  # Nothing to underline; the gutter marker still shows
+            indent = len(text) - len(text.lstrip())
+            sel = QTextEdit.ExtraSelection()
+            sel.format.setUnderlineStyle(QTextCharFormat.UnderlineStyle.WaveUnderline)
+            sel.format.setUnderlineColor(QColor(self.DIAGNOSTIC_COLORS.get(level, "#E53935")))
+            sel.cursor = QTextCursor(block)
+            sel.cursor.setPosition(block.position() + indent)
+            sel.cursor.setPosition(block.position() + len(text.rstrip()), QTextCursor.MoveMode.KeepAnchor)
+            selections.append(sel)
+        return selections
+
+    def _on_contents_change(self, position: int, removed: int, added: int):
+        """Drop diagnostics on lines the user has just edited; they are stale now."""
+        if not self._diagnostics:
+            return
+        first = self.document().findBlock(position).blockNumber()
+        last = self.document().findBlock(position + added).blockNumber()
+        kept = [d for d in self._diagnostics if not first <= d[0].blockNumber() <= last]
+        if len(kept) != len(self._diagnostics):
+            self._diagnostics = kept
+            self.highlight_current_line()
+            self.line_number_area.update()
+
 
 class CodeEditorWidget(QWidget):
     """Widget combining procedure dropdown and code editor."""
@@ -6,10 +6,10 @@ This IDE supports Asic (Arduino Basic) language, macro commands (e.g., {{KEY:...
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QSplitter,
     QToolBar, QPushButton, QComboBox, QLabel, QMessageBox, QFileDialog,
-    QStatusBar, QDialog, QProgressDialog, QListWidget, QListWidgetItem, QMenu, QTextEdit
+    QStatusBar, QDialog, QListWidget, QListWidgetItem, QMenu, QTextEdit, QInputDialog
 )
 from PyQt6.QtCore import Qt, QTimer
-from PyQt6.QtGui import QIcon, QAction, QClipboard
+from PyQt6.QtGui import QIcon, QAction, QActionGroup, QClipboard
 import sys
 import pathlib
 import subprocess
@@ -18,12 +18,12 @@ import re
 
 from vb2arduino.ide.editor import CodeEditorWidget
 from vb2arduino.ide.serial_monitor import SerialMonitor
+from vb2arduino.ide.plotter_panel import PlotterPanel
+from vb2arduino.ide.profiler_panel import ProfilerPanel
+from vb2arduino.ide.serial_hub_panel import SerialHubPanel
 from vb2arduino.ide.project_tree import ProjectTreeView
-from vb2arduino.ide.utils import (
-    get_available_ports,
-    get_platformio_boards,
-    auto_detect_board_and_port,
-)
+from vb2arduino.ide.utils import check_platformio_installed
+from vb2arduino.ide.device_watcher import DeviceWatcher, scan_ports
 
 from vb2arduino.ide.settings import Settings
 from vb2arduino.ide.settings_dialog import SettingsDialog
@@ -33,7 +33,28 @@ from vb2arduino.ide.pin_configuration_dialog import PinConfigurationDialog
 from vb2arduino.ide.pin_templates import get_template_for_board
 from vb2arduino.ide.project_config import ProjectConfig
 from vb2arduino.ide.programmers_reference_dialog import ProgrammersReferenceDialog
-from vb2arduino import transpile_string
+from vb2arduino.ide.budget_panel import BudgetPanel
+from vb2arduino.ide.build_output import BuildOutputPane
+from vb2arduino.ide.build_runner import BuildJob, BuildRunner, parse_diagnostic
+from vb2arduino.ide.build_matrix_panel import BuildMatrixDialog, BuildMatrixPanel, MatrixThread
+from vb2arduino.ide.size_panel import SizePanel, SizeThread
+from vb2arduino.ide.board_picker_dialog import BoardDBRefreshThread, BoardPickerDialog
+from vb2arduino import VBTranspiler
+from vb2arduino.board_db import default_db
+from vb2arduino.boards import board_platform, get_board_profile
+from vb2arduino.budget import estimate_budget
+from vb2arduino.build_cache import BuildCache, count_hits
+from vb2arduino.build_matrix import BoardResult
+from vb2arduino.profiler import (
+    DEFAULT_INTERVAL_MS, MAP_FILE, PROFILE_LINES, PROFILE_OFF, PROFILE_PROCS, ProfileError, save_map,
+)
+from vb2arduino.size_report import find_elf, sketch_history_path
+from vb2arduino.serial_replay import SPEED_MAX, Replayer, VirtualSerialPort, capture_chunks
+from vb2arduino.source_map import vb_line_map
+from vb2arduino.artifacts import (
+    MANIFEST_NAME, build_inputs, file_hash, find_firmware, input_hashes, is_flashed, is_up_to_date, record_flash,
+    save_manifest, write_if_changed,
+)
 
 
 class MainWindow(QMainWindow):
@@ -53,29 +74,14 @@ class MainWindow(QMainWindow):
         self.is_modified = False
         self.build_output_dir = pathlib.Path(tempfile.gettempdir()) / "asic_build"
         self.selected_libraries = []  # Track selected libraries
-        self.board_platforms = {
-            # ESP32 boards
-            "esp32-s3-devkitm-1": "espressif32",
-            "esp32-s3-devkitc-1": "espressif32",
-            "esp32dev": "espressif32",
-            "esp32-c3-devkitm-1": "espressif32",
-            "esp32-s2-saola-1": "espressif32",
-            "lolin_d32": "espressif32",
-            # Arduino AVR boards
-            "uno": "atmelavr",
-            "mega2560": "atmelavr",
-            "megaatmega2560": "atmelavr",
-            "nano": "atmelavr",
-            # Arduino ARM boards
-            "nano_33_iot": "atmelsam",
-            "mkr1000": "atmelsam",
-            "mkrwifi1010": "atmelsam",
-            "zero": "atmelsam",
-            "due": "atmelsam",
-            # RP2040 boards
-            "pico": "raspberrypi",
-            "nanorp2040connect": "raspberrypi",
-        }
+        # Serial ports are enumerated in the background; the port combo follows its signals
+        self.device_watcher = DeviceWatcher(self)
+        self._devices = []
+        self._replay = None  # (VirtualSerialPort, Replayer) of the capture being replayed
+        self._replay_timer = None
+        # Every PlatformIO board, cached locally; the combo lists the common ones
+        self.board_db = default_db()
+        self.board_db_thread = None
         self.init_ui()
 
     def init_ui(self):
@@ -115,9 +121,62 @@ class MainWindow(QMainWindow):
         # Add horizontal splitter (explorer/editor) to vertical splitter
         self.v_splitter.addWidget(self.h_splitter)
 
-        # Serial monitor at the bottom
+        # Bottom panels: serial monitor and memory budget
+        self.bottom_tabs = QTabWidget()
         self.serial_monitor = SerialMonitor()
-        self.v_splitter.addWidget(self.serial_monitor)
+        self.serial_monitor.apply_settings(self.settings)
+        self.bottom_tabs.addTab(self.serial_monitor, "Serial Monitor")
+        self.plotter_panel = PlotterPanel()
+        self.bottom_tabs.addTab(self.plotter_panel, "Plotter")
+        self.serial_monitor.lines_received.connect(self.plotter_panel.add_lines)
+        self.profiler_panel = ProfilerPanel()
+        self.bottom_tabs.addTab(self.profiler_panel, "Profiler")
+        self.serial_monitor.profile_frames.connect(self.profiler_panel.add_frames)
+        self.profiler_panel.line_activated.connect(self.goto_line)
+        self.serial_hub_panel = SerialHubPanel()
+        self.serial_hub_panel.apply_settings(self.settings)
+        self.serial_hub_panel.port_busy = (
+            lambda port: self.serial_monitor.is_connected() and self.serial_monitor.port_name == port)
+        self.bottom_tabs.addTab(self.serial_hub_panel, "Serial Hub")
+        self.budget_panel = BudgetPanel()
+        self.bottom_tabs.addTab(self.budget_panel, "Memory")
+        self.build_output = BuildOutputPane()
+        self.bottom_tabs.addTab(self.build_output, "Build Output")
+        self.matrix_panel = BuildMatrixPanel()
+        self.bottom_tabs.addTab(self.matrix_panel, "Build Matrix")
+        self.matrix_panel.cancel_requested.connect(self.cancel_build_matrix)
+        self.matrix_panel.result_activated.connect(self._show_matrix_output)
+        self.matrix_thread = None
+        self.size_panel = SizePanel()
+        self.bottom_tabs.addTab(self.size_panel, "Size")
+        self.size_panel.line_activated.connect(self.goto_line)
+        self.size_thread = None
+        self._size_sources = ("", "", None)  # (VB source, generated C++, sketch path) of the build being run
+        self._monitor_released = False  # Serial monitor was closed for the running upload
+        self._hub_released_port = None  # Port the serial hub gave up for the running upload
+        self.v_splitter.addWidget(self.bottom_tabs)
+
+        # Builds run in the background and stream into the Build Output tab
+        self._build_vb_map: dict[int, int] = {}
+        self.build_runner = BuildRunner(self)
+        self.build_runner.job_started.connect(self._on_build_started)
+        self.build_runner.output_line.connect(lambda job, line, err: self.build_output.append_line(line, err))
+        self.build_runner.diagnostic.connect(self._on_build_diagnostic)
+        self.build_runner.job_finished.connect(self._on_build_finished)
+        self.build_output.cancel_requested.connect(self.cancel_build)
+        self.build_output.error_activated.connect(self._on_build_error_activated)
+        if check_platformio_installed():
+            # Import PlatformIO once in the background so builds skip its startup
+            self.build_runner.use_worker()
+
+        self.device_watcher.devices_changed.connect(self._on_devices_changed)
+        self.device_watcher.device_added.connect(
+            lambda dev: self.status.showMessage(f"Device connected: {dev.label}", 5000))
+        self.device_watcher.device_removed.connect(
+            lambda dev: self.status.showMessage(f"Device disconnected: {dev.port}", 5000))
+        self.device_watcher.start()
+        if check_platformio_installed() and self.board_db.is_stale():
+            self.refresh_board_db()
 
         # Add main splitter to layout
         layout.addWidget(self.v_splitter)
@@ -204,17 +263,13 @@ class MainWindow(QMainWindow):
                 
                 # Restore board selection
                 if saved_board:
-                    for i in range(self.board_combo.count()):
-                        if self.board_combo.itemData(i) == saved_board:
-                            self.board_combo.setCurrentIndex(i)
-                            break
+                    self._select_board(saved_board)
                 
                 # Restore port selection
                 if saved_port:
-                    for i in range(self.port_combo.count()):
-                        if self.port_combo.itemText(i) == saved_port:
-                            self.port_combo.setCurrentIndex(i)
-                            break
+                    idx = self.port_combo.findData(saved_port)
+                    if idx != -1:
+                        self.port_combo.setCurrentIndex(idx)
             else:
                 print(f"Warning: File not found: {file_path}")
         except Exception as e:
@@ -334,17 +389,13 @@ class MainWindow(QMainWindow):
                 
                 # Restore board selection
                 if saved_board:
-                    for i in range(self.board_combo.count()):
-                        if self.board_combo.itemData(i) == saved_board:
-                            self.board_combo.setCurrentIndex(i)
-                            break
+                    self._select_board(saved_board)
                 
                 # Restore port selection
                 if saved_port:
-                    for i in range(self.port_combo.count()):
-                        if self.port_combo.itemText(i) == saved_port:
-                            self.port_combo.setCurrentIndex(i)
-                            break
+                    idx = self.port_combo.findData(saved_port)
+                    if idx != -1:
+                        self.port_combo.setCurrentIndex(idx)
             else:
                 self.current_file = None
         self.update_title()
@@ -386,7 +437,7 @@ class MainWindow(QMainWindow):
         # Upload button  
         upload_btn = QPushButton("→ Upload")
         upload_btn.setToolTip("Compile and Upload (Ctrl+U)")
-        upload_btn.clicked.connect(self.upload_code)
+        upload_btn.clicked.connect(lambda: self.upload_code())
         toolbar.addWidget(upload_btn)
         
         toolbar.addSeparator()
@@ -434,6 +485,11 @@ class MainWindow(QMainWindow):
         
         self.board_combo.setMinimumWidth(250)
         toolbar.addWidget(self.board_combo)
+        find_board_btn = QPushButton("...")
+        find_board_btn.setToolTip("Find any PlatformIO board (Ctrl+Shift+B)")
+        find_board_btn.setMaximumWidth(30)
+        find_board_btn.clicked.connect(self.find_board)
+        toolbar.addWidget(find_board_btn)
         # Clear [Auto] badge when user changes selection
         self.board_combo.currentIndexChanged.connect(self._clear_board_auto_mark)
         # Load pin template when board changes
@@ -552,8 +608,31 @@ class MainWindow(QMainWindow):
         sketch_menu.addAction(verify_action)
         upload_action = QAction("&Upload", self)
         upload_action.setShortcut("Ctrl+U")
-        upload_action.triggered.connect(self.upload_code)
+        upload_action.triggered.connect(lambda: self.upload_code())
         sketch_menu.addAction(upload_action)
+
+        force_upload_action = QAction("Upload (&Always Flash)", self)
+        force_upload_action.setShortcut("Ctrl+Shift+U")
+        force_upload_action.setToolTip("Upload even if the board already runs this firmware")
+        force_upload_action.triggered.connect(self.force_upload_code)
+        sketch_menu.addAction(force_upload_action)
+        cancel_build_action = QAction("Cancel &Build", self)
+        cancel_build_action.setShortcut("Ctrl+.")
+        cancel_build_action.triggered.connect(self.cancel_build)
+        sketch_menu.addAction(cancel_build_action)
+        matrix_action = QAction("Build &Matrix...", self)
+        matrix_action.triggered.connect(self.build_matrix)
+        sketch_menu.addAction(matrix_action)
+        profile_menu = sketch_menu.addMenu("&Profile on Device")
+        profile_group = QActionGroup(self)
+        current_profile = self.settings.get("build", "profile", PROFILE_OFF)
+        for label, mode in (("&Off", PROFILE_OFF), ("&Subs and Functions", PROFILE_PROCS),
+                            ("Subs, Functions and &Lines", PROFILE_LINES)):
+            action = QAction(label, self, checkable=True)
+            action.setChecked(mode == current_profile)
+            action.triggered.connect(lambda _checked, m=mode: self.set_profile_mode(m))
+            profile_group.addAction(action)
+            profile_menu.addAction(action)
         sketch_menu.addSeparator()
         libraries_action = QAction("Include &Library...", self)
         libraries_action.triggered.connect(self.show_libraries)
@@ -563,8 +642,26 @@ class MainWindow(QMainWindow):
         tools_menu = menubar.addMenu("&Tools")
         serial_action = QAction("Serial &Monitor", self)
         serial_action.setShortcut("Ctrl+Shift+M")
-        serial_action.triggered.connect(lambda: self.serial_monitor.setVisible(not self.serial_monitor.isVisible()))
+        serial_action.triggered.connect(lambda: self.toggle_serial_monitor(not self.bottom_tabs.isVisible()))
         tools_menu.addAction(serial_action)
+        hub_action = QAction("Serial &Hub", self)
+        hub_action.setToolTip("Monitor several ports at once")
+        hub_action.triggered.connect(self.show_serial_hub)
+        tools_menu.addAction(hub_action)
+        capture_action = QAction("Open Serial &Capture...", self)
+        capture_action.triggered.connect(lambda: self.serial_monitor.open_capture())
+        tools_menu.addAction(capture_action)
+        replay_action = QAction("&Replay Serial Capture...", self)
+        replay_action.setToolTip("Play a capture back through a virtual serial port")
+        replay_action.triggered.connect(self.replay_serial_capture)
+        tools_menu.addAction(replay_action)
+        find_board_action = QAction("Find &Board...", self)
+        find_board_action.setShortcut("Ctrl+Shift+B")
+        find_board_action.triggered.connect(self.find_board)
+        tools_menu.addAction(find_board_action)
+        memory_action = QAction("Estimate &Memory Usage", self)
+        memory_action.triggered.connect(self.estimate_memory)
+        tools_menu.addAction(memory_action)
         libraries_action = QAction("Manage &Libraries... (Advanced Online Manager Available)", self)
         libraries_action.setShortcut("Ctrl+Shift+L")
         libraries_action.triggered.connect(self.show_libraries_manager)
@@ -696,7 +793,7 @@ End Sub
             # Save board and port selection for this file
             self.project_config.set_board_and_port(
                 self.board_combo.currentData(),
-                self.port_combo.currentText() if self.port_combo.count() > 0 else None
+                self._selected_port()
             )
             
             self.status.showMessage(f"Saved: {path}")
@@ -706,251 +803,466 @@ End Sub
             return False
             
     def check_platformio(self):
-        """Check if PlatformIO is installed."""
-        try:
-            # Try using Python module first (works in venv)
-            result = subprocess.run(
-                [sys.executable, "-m", "platformio", "--version"],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            if result.returncode == 0:
-                return True
-            
-            # Fallback to 'pio' command in PATH
-            result = subprocess.run(
-                ["pio", "--version"],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            return result.returncode == 0
-        except (subprocess.SubprocessError, FileNotFoundError):
+        """Check if PlatformIO is installed (cached for the session once found)."""
+        return check_platformio_installed()
+
+    def _platformio_missing(self) -> bool:
+        """Warn and return True when PlatformIO is not installed."""
+        if self.check_platformio():
             return False
-            
-    def verify_code(self):
-        """Compile/verify code."""
-        # Check if PlatformIO is installed
-        if not self.check_platformio():
-            QMessageBox.critical(
-                self,
-                "PlatformIO Not Found",
-                "PlatformIO CLI is not installed or not in PATH.\n\n"
-                "Please install it using:\n"
-                "  pip install platformio\n\n"
-                "Or visit: https://platformio.org/install/cli"
-            )
-            self.status.showMessage("✗ PlatformIO not found")
-            return
-            
-        self.status.showMessage("Compiling...")
-        progress = QProgressDialog("Compiling...", None, 0, 0, self)
-        progress.setWindowModality(Qt.WindowModality.ApplicationModal)
-        progress.setCancelButton(None)
-        progress.setWindowTitle("Compile")
-        progress.show()
-        QApplication.processEvents()
-        
-        try:
-            # Transpile VB to C++
-            editor = self.get_current_editor()
-            if not editor:
-                QMessageBox.warning(self, "No Editor", "No active editor found.")
-                progress.close()
-                return
-            vb_code = editor.toPlainText()
-            cpp_code = transpile_string(vb_code)
-            
-            # Create PlatformIO project structure
-            self.build_output_dir.mkdir(parents=True, exist_ok=True)
-            src_dir = self.build_output_dir / "src"
-            src_dir.mkdir(exist_ok=True)
-            
-            # Write main.cpp to src directory
-            cpp_file = src_dir / "main.cpp"
-            cpp_file.write_text(cpp_code, encoding='utf-8')
-            
-            # Get board ID and platform (try auto-detect if none selected)
+        QMessageBox.critical(
+            self,
+            "PlatformIO Not Found",
+            "PlatformIO CLI is not installed or not in PATH.\n\n"
+            "Please install it using:\n"
+            "  pip install platformio\n\n"
+            "Or visit: https://platformio.org/install/cli"
+        )
+        self.status.showMessage("✗ PlatformIO not found")
+        return True
+
+    def _resolve_board(self):
+        """Return the selected board id, auto-detecting if nothing is selected."""
+        board = self.board_combo.currentData()
+        if not board:
+            self.auto_select_defaults()
             board = self.board_combo.currentData()
-            if not board:
-                self.auto_select_defaults()
-                board = self.board_combo.currentData()
-            if not board:  # Still not selected (likely category header)
-                QMessageBox.warning(self, "No Board", "Please select a board, not a category header.")
-                self.status.showMessage("✗ No board selected")
-                return
-            
-            platform = self.board_platforms.get(board, "atmelavr")
-            
-            # Create platformio.ini
-            ini_file = self.build_output_dir / "platformio.ini"
-            ini_file.write_text(self._platformio_ini_content(board, platform), encoding='utf-8')
-            
-            # Run PlatformIO compile
-            result = subprocess.run(
-                [sys.executable, "-m", "platformio", "run", "--project-dir", str(self.build_output_dir), "--environment", board],
-                capture_output=True,
-                text=True
-            )
+        if not board:  # Still not selected (likely category header)
+            QMessageBox.warning(self, "No Board", "Please select a board, not a category header.")
+            self.status.showMessage("✗ No board selected")
+        return board
+
+    def _transpiler(self) -> VBTranspiler:
+        """A transpiler with the Sketch > Profile on Device setting."""
+        return VBTranspiler(profile=self.settings.get("build", "profile", PROFILE_OFF),
+                            profile_interval_ms=self.settings.get("build", "profile_interval_ms", DEFAULT_INTERVAL_MS))
+
+    def set_profile_mode(self, mode: str):
+        """Instrument the next builds for the Profiler tab (PROFILE_OFF builds unchanged code)."""
+        self.settings.set("build", "profile", mode)
+        self.settings.save()
+        if mode == PROFILE_OFF:
+            self.status.showMessage("Profiling off: the next upload runs uninstrumented code")
+        else:
+            self.status.showMessage("Profiling on: compile and upload, then connect the serial monitor "
+                                    "and open the Profiler tab")
 
-            # Persist logs for troubleshooting
-            try:
-                (self.build_output_dir / "compile_stdout.txt").write_text(result.stdout or "", encoding='utf-8')
-                (self.build_output_dir / "compile_stderr.txt").write_text(result.stderr or "", encoding='utf-8')
-            except Exception:
-                pass
-            
-            if result.returncode == 0:
-                self.status.showMessage("✓ Compilation successful")
-                if self.settings.get("editor", "show_compile_success_popup", True):
-                    QMessageBox.information(self, "Success", "Code compiled successfully!")
+    def _prepare_build(self, job: BuildJob, vb_code: str, board: str) -> bool:
+        """Transpile and write the PlatformIO project; runs when the queued job starts."""
+        try:
+            transpiler = self._transpiler()
+            transpile_result = transpiler.transpile(vb_code)
+
+            # Fail fast when the sketch cannot fit, before a long PlatformIO run
+            if not self._check_memory_budget(transpiler, transpile_result, board):
+                self.status.showMessage("✗ Memory budget exceeded")
+                return False
+
+            # Create PlatformIO project structure; unchanged files keep their
+            # timestamps so PlatformIO can build incrementally
+            project = self.build_output_dir
+            platform = board_platform(board)
+            write_if_changed(project / "src" / "main.cpp", transpile_result.cpp)
+            write_if_changed(project / "platformio.ini", self._platformio_ini_content(board, platform))
+            self._size_sources = (vb_code, transpile_result.cpp, self.current_file)
+            if transpile_result.profile:
+                save_map(project / MAP_FILE, transpile_result.profile, transpiler.profile_interval_ms)
+                self.profiler_panel.set_slots(transpile_result.profile)
+                self.serial_monitor.set_profiling(True)
             else:
-                self.status.showMessage("✗ Compilation failed")
-                # Parse errors, map to VB lines, and show clickable list
-                vb_map = self._build_vb_line_map(cpp_file)
-                errors = self._parse_compile_errors(result.stderr, cpp_file.name)
-                if errors:
-                    if self.settings.get("editor", "show_compile_failure_popup", True):
-                        self._show_compile_errors(errors, vb_map)
-                    else:
-                        # Show concise status only; no popup
-                        self.status.showMessage("✗ Compilation failed - see status output", 5000)
-                else:
-                    if self.settings.get("editor", "show_compile_failure_popup", True):
-                        QMessageBox.warning(self, "Compilation Error", 
-                            f"Compilation failed:\n\n{result.stderr[:500]}")
-                    else:
-                        self.status.showMessage("✗ Compilation failed", 5000)
-                    
+                # A map left by an earlier profiling build no longer matches the firmware
+                (project / MAP_FILE).unlink(missing_ok=True)
+                self.serial_monitor.set_profiling(False)
+
+            job.inputs = input_hashes(project, build_inputs(project))
+            job.skipped = is_up_to_date(project, board, job.inputs)
+            return True
         except Exception as e:
             self.status.showMessage("✗ Error")
-            QMessageBox.critical(self, "Error", f"Compilation error:\n{e}")
-        finally:
-            progress.close()
-            
-    def upload_code(self):
-        """Compile and upload code."""
-        # Check if PlatformIO is installed
-        if not self.check_platformio():
-            QMessageBox.critical(
-                self,
-                "PlatformIO Not Found",
-                "PlatformIO CLI is not installed or not in PATH.\n\n"
-                "Please install it using:\n"
-                "  pip install platformio\n\n"
-                "Or visit: https://platformio.org/install/cli"
-            )
-            self.status.showMessage("✗ PlatformIO not found")
+            QMessageBox.critical(self, "Error", f"Transpile error:\n{e}")
+            return False
+
+    def _prepare_upload(self, job: BuildJob, compile_job: BuildJob, board: str, port: str, force: bool) -> bool:
+        """Flash the firmware compile_job produced, unless the device already runs it."""
+        if compile_job.exit_code != 0:
+            return False  # Compile failed or was cancelled; it has already been reported
+        firmware = find_firmware(self.build_output_dir, board)
+        job.inputs = {"firmware": file_hash(firmware) if firmware else ""}
+        if not force and is_flashed(port, board, job.inputs["firmware"]):
+            job.skipped = True
+            job.skip_message = f"{port} already runs this firmware - upload skipped"
+            return True
+        # Only now take the port from the serial monitor; it kept reading during the compile
+        self._monitor_released = self.serial_monitor.release_port()
+        self._hub_released_port = port if self.serial_hub_panel.release_port(port) else None
+        return True
+
+    def _queue_pio_job(self, title: str, log_name: str, board: str, extra_args: list[str],
+                       quiet: bool = False) -> BuildJob | None:
+        """Snapshot the current editor and queue a PlatformIO run for it."""
+        editor = self.get_current_editor()
+        if not editor:
+            QMessageBox.warning(self, "No Editor", "No active editor found.")
+            return None
+        vb_code = editor.toPlainText()
+        job = BuildJob(
+            title=title,
+            cmd=[sys.executable, "-m", "platformio", "run", "--project-dir", str(self.build_output_dir),
+                 "--environment", board] + extra_args,
+            log_name=log_name,
+            cpp_file=self.build_output_dir / "src" / "main.cpp",
+            prepare=lambda job: self._prepare_build(job, vb_code, board),
+            quiet=quiet,
+            env=self._cache_env(),
+            editor=editor,
+        )
+        if self.build_runner.is_busy():
+            self.status.showMessage(f"{title} queued", 3000)
+        self.build_runner.enqueue(job)
+        return job
+
+    def verify_code(self):
+        """Compile/verify code."""
+        if self._platformio_missing():
             return
-            
-        port = self.port_combo.currentText()
+        board = self._resolve_board()
+        if board:
+            self._queue_pio_job("Compile", "compile", board, [])
+
+    def force_upload_code(self):
+        """Compile and upload even if the device already runs the same firmware."""
+        self.upload_code(force=True)
+
+    def upload_code(self, force: bool = False):
+        """Compile and upload code.
+
+        Runs as two queued jobs: a compile (the serial monitor stays connected
+        meanwhile) and a flash of the resulting firmware, which is skipped when
+        the port was last flashed with the same image.
+        """
+        if self._platformio_missing():
+            return
+
+        port = self._selected_port()
         if not port:
             # Try to auto-detect
             self.refresh_ports()
             self.auto_select_defaults()
-            port = self.port_combo.currentText()
+            port = self._selected_port()
         if not port:
             QMessageBox.warning(self, "No Port", "Please select a serial port first.")
             return
-            
-        self.status.showMessage("Uploading...")
-        progress = QProgressDialog("Compiling & Uploading...", None, 0, 0, self)
-        progress.setWindowModality(Qt.WindowModality.ApplicationModal)
-        progress.setCancelButton(None)
-        progress.setWindowTitle("Upload")
-        progress.show()
-        QApplication.processEvents()
-        
+
+        board = self._resolve_board()
+        if not board:
+            return
+        compile_job = self._queue_pio_job("Compile", "compile", board, [], quiet=True)
+        if not compile_job:
+            return
+        self.build_runner.enqueue(BuildJob(
+            title="Upload",
+            cmd=[sys.executable, "-m", "platformio", "run", "--project-dir", str(self.build_output_dir),
+                 "--environment", board, "--target", "nobuild", "--target", "upload", "--upload-port", port],
+            log_name="upload",
+            prepare=lambda job: self._prepare_upload(job, compile_job, board, port, force),
+        ))
+
+    def build_matrix(self):
+        """Build the current sketch for several boards in parallel."""
+        if self.matrix_thread and self.matrix_thread.isRunning():
+            QMessageBox.information(self, "Build Matrix", "A build matrix is already running.")
+            return
+        if self._platformio_missing():
+            return
+        editor = self.get_current_editor()
+        if not editor:
+            QMessageBox.warning(self, "No Editor", "No active editor found.")
+            return
+
+        boards = []
+        for i in range(self.board_combo.count()):
+            board_id = self.board_combo.itemData(i)
+            if board_id:
+                boards.append((self.board_combo.itemText(i).replace(" (auto)", ""), board_id))
+        selected = self.settings.get("build", "matrix_boards", [self.board_combo.currentData()])
+        dialog = BuildMatrixDialog(boards, selected, self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        chosen = dialog.selected_boards()
+        if not chosen:
+            return
+        self.settings.set("build", "matrix_boards", chosen)
+        self.settings.save()
+
+        # Transpile once; every board compiles the same main.cpp
         try:
-            # Transpile VB to C++
-            editor = self.get_current_editor()
-            if not editor:
-                QMessageBox.warning(self, "No Editor", "No active editor found.")
-                progress.close()
-                return
-            vb_code = editor.toPlainText()
-            cpp_code = transpile_string(vb_code)
-            
-            # Create PlatformIO project structure
-            self.build_output_dir.mkdir(parents=True, exist_ok=True)
-            src_dir = self.build_output_dir / "src"
-            src_dir.mkdir(exist_ok=True)
-            
-            # Write main.cpp to src directory
-            cpp_file = src_dir / "main.cpp"
-            cpp_file.write_text(cpp_code, encoding='utf-8')
-            
-            # Get board ID and platform (try auto-detect if none selected)
-            board = self.board_combo.currentData()
-            if not board:
-                self.auto_select_defaults()
-                board = self.board_combo.currentData()
-            if not board:  # Still not selected (likely category header)
-                QMessageBox.warning(self, "No Board", "Please select a board, not a category header.")
-                self.status.showMessage("✗ No board selected")
-                return
-            
-            platform = self.board_platforms.get(board, "atmelavr")
-            
-            # Create platformio.ini
-            ini_file = self.build_output_dir / "platformio.ini"
-            ini_file.write_text(self._platformio_ini_content(board, platform), encoding='utf-8')
-            
-            # Run PlatformIO upload
-            result = subprocess.run(
-                [sys.executable, "-m", "platformio", "run", "--project-dir", str(self.build_output_dir), 
-                 "--environment", board, "--target", "upload", "--upload-port", port],
-                capture_output=True,
-                text=True
+            transpiler = self._transpiler()
+            transpile_result = transpiler.transpile(editor.toPlainText())
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Transpile error:\n{e}")
+            return
+        skipped = []
+        buildable = []
+        for board in chosen:
+            profile = get_board_profile(board)
+            if profile and not estimate_budget(transpiler, profile, transpile_result.call_graph).ok:
+                skipped.append(BoardResult(board=board, note="over budget"))
+            else:
+                buildable.append(board)
+
+        project = self.build_output_dir / "matrix"
+        write_if_changed(project / "src" / "main.cpp", transpile_result.cpp)
+        if buildable:
+            write_if_changed(project / "platformio.ini", self._platformio_ini_content(buildable))
+
+        self.matrix_panel.start(chosen)
+        for result in skipped:
+            self.matrix_panel.show_result(result)
+        self.bottom_tabs.setVisible(True)
+        self.bottom_tabs.setCurrentWidget(self.matrix_panel)
+        if not buildable:
+            return
+
+        self.matrix_thread = MatrixThread(project, buildable, [sys.executable, "-m", "platformio"],
+                                          dialog.parallel_spin.value(), self._cache_env())
+        self.matrix_thread.board_finished.connect(self._on_matrix_board_finished)
+        self.matrix_thread.start()
+        self.status.showMessage(f"Building {len(buildable)} boards...")
+
+    def cancel_build_matrix(self):
+        if self.matrix_thread and self.matrix_thread.isRunning():
+            self.matrix_thread.cancel()
+            self.status.showMessage("Cancelling build matrix...")
+
+    def _on_matrix_board_finished(self, result):
+        self.matrix_panel.show_result(result)
+        cache = self._build_cache()
+        if cache:
+            cache.record(count_hits(result.output.splitlines()))
+        try:
+            (self.build_output_dir / "matrix" / f"{result.board}_output.txt").write_text(result.output, encoding='utf-8')
+        except Exception:
+            pass
+        self.status.showMessage(f"{result.board}: {result.status}", 5000)
+
+    def _show_matrix_output(self, result):
+        """Show one board's matrix log in the Build Output tab with its errors."""
+        vb_map = self._build_vb_line_map(self.build_output_dir / "matrix" / "src" / "main.cpp")
+        self._build_vb_map = vb_map
+        self.build_output.build_started(f"{result.board} (matrix)", f"pio run -e {result.board}")
+        for line in result.output.splitlines():
+            self.build_output.append_line(line)
+            diag = parse_diagnostic(line, "main.cpp")
+            if diag:
+                self.build_output.add_error(vb_map.get(diag[0], 1), diag[1], diag[2])
+        self.build_output.build_finished(f"{result.board}: {result.status}")
+        self.bottom_tabs.setCurrentWidget(self.build_output)
+
+    def _build_cache(self) -> BuildCache | None:
+        """The shared compiler cache configured in Settings > Build, or None if disabled."""
+        if not self.settings.get("build", "cache_enabled", True):
+            return None
+        return BuildCache(self.settings.get("build", "cache_dir", "") or None,
+                          self.settings.get("build", "cache_max_mb", 1024))
+
+    def _cache_env(self) -> dict[str, str]:
+        cache = self._build_cache()
+        return cache.env() if cache else {}
+
+    def _report_cache(self, job):
+        """Add the build's cache hit rate to its output and keep the cache under its limit."""
+        cache = self._build_cache()
+        if not cache:
+            return
+        stats = count_hits(job.stdout + job.stderr)
+        try:
+            cache.record(stats)
+            removed, freed = cache.evict()
+        except OSError:
+            return
+        if stats.total:
+            self.build_output.append_line(cache.summary(stats))
+        if removed:
+            self.build_output.append_line(
+                f"Compiler cache: evicted {removed} old objects ({freed / 1048576:.1f} MB) to stay under the limit"
             )
 
-            # Persist logs for troubleshooting
-            try:
-                (self.build_output_dir / "upload_stdout.txt").write_text(result.stdout or "", encoding='utf-8')
-                (self.build_output_dir / "upload_stderr.txt").write_text(result.stderr or "", encoding='utf-8')
-            except Exception:
-                pass
-            
-            if result.returncode == 0:
-                self.status.showMessage("✓ Upload successful")
-                if self.settings.get("editor", "show_upload_success_popup", True):
-                    QMessageBox.information(self, "Success", "Code uploaded successfully!")
+    def cancel_build(self):
+        """Cancel the running build; queued builds are dropped too."""
+        if self.build_runner.is_busy():
+            self.build_runner.cancel_all()
+            self.status.showMessage("Cancelling build...")
+
+    def _on_build_started(self, job):
+        self.status.showMessage(f"{job.title}...")
+        self._build_vb_map = self._build_vb_line_map(job.cpp_file) if job.cpp_file else {}
+        if job.editor and job.cpp_file:
+            job.editor.clear_diagnostics()
+        self.build_output.build_started(job.title, " ".join(job.cmd), len(self.build_runner.queue))
+        self.bottom_tabs.setVisible(True)
+        self.bottom_tabs.setCurrentWidget(self.build_output)
+
+    def _on_build_diagnostic(self, job, cpp_line, level, msg):
+        """Show a compiler message as soon as its line arrives, while the build keeps running."""
+        vb_line = self._build_vb_map.get(cpp_line, 1)
+        self.build_output.add_error(vb_line, level, msg)
+        if job.editor:
+            job.editor.add_diagnostic(vb_line, level, msg)
+        if level != "warning" and sum(1 for d in job.diagnostics if d[1] != "warning") == 1:
+            self.status.showMessage(f"✗ {level.capitalize()} at VB line {vb_line}: {msg}")
+
+    def _on_build_error_activated(self, vb_line, level, msg):
+        self.goto_line(vb_line)
+        self.status.showMessage(f"{level.capitalize()} at VB line {vb_line}: {msg}", 5000)
+
+    def _on_build_finished(self, job, exit_code):
+        """Report the result of a finished build job."""
+        stdout = "\n".join(job.stdout)
+        stderr = "\n".join(job.stderr)
+
+        # Persist logs for troubleshooting
+        try:
+            log_dir = job.cwd or self.build_output_dir
+            (log_dir / f"{job.log_name}_stdout.txt").write_text(stdout, encoding='utf-8')
+            (log_dir / f"{job.log_name}_stderr.txt").write_text(stderr, encoding='utf-8')
+        except Exception:
+            pass
+
+        if job.log_name == "compile" and not job.skipped:
+            self._report_cache(job)
+
+        if job.log_name == "upload" and self._monitor_released:
+            self._monitor_released = False
+            self.serial_monitor.reconnect()
+        if job.log_name == "upload" and self._hub_released_port:
+            self.serial_hub_panel.reconnect(self._hub_released_port)
+            self._hub_released_port = None
+
+        if job.skipped:
+            message = job.skip_message or "Up to date - reusing firmware from the last build"
+            self.status.showMessage(f"✓ {message}", 5000)
+            self.build_output.build_finished(f"✓ {message}")
+            return
+
+        if exit_code == 0 and job.inputs:
+            env = job.cmd[job.cmd.index("--environment") + 1]
+            if job.log_name == "upload":
+                try:
+                    record_flash(job.cmd[job.cmd.index("--upload-port") + 1], env, job.inputs["firmware"])
+                except Exception as e:
+                    self.build_output.append_line(f"Could not record the flashed firmware: {e}", True)
             else:
-                self.status.showMessage("✗ Upload failed")
-                # On compile/upload error, parse and present clickable errors
-                vb_map = self._build_vb_line_map(cpp_file)
-                errors = self._parse_compile_errors(result.stderr, cpp_file.name)
-                if errors:
-                    if self.settings.get("editor", "show_upload_failure_popup", True):
-                        self._show_compile_errors(errors, vb_map)
-                    else:
-                        self.status.showMessage("✗ Upload failed - see status output", 5000)
-                else:
-                    if self.settings.get("editor", "show_upload_failure_popup", True):
-                        QMessageBox.warning(self, "Upload Error",
-                            f"Upload failed:\n\n{result.stderr[:500]}")
-                    else:
-                        self.status.showMessage("✗ Upload failed", 5000)
-                    
-        except Exception as e:
-            self.status.showMessage("✗ Error")
-            QMessageBox.critical(self, "Error", f"Upload error:\n{e}")
-        finally:
-            progress.close()
-            
+                try:
+                    save_manifest(self.build_output_dir, env, job.inputs)
+                except Exception as e:
+                    self.build_output.append_line(f"Could not save the build manifest: {e}", True)
+                try:
+                    self._analyze_size(env)
+                except Exception as e:
+                    self.build_output.append_line(f"Size report failed: {e}", True)
+
+        if job.cancelled:
+            self.status.showMessage(f"✗ {job.title} cancelled", 5000)
+            self.build_output.build_finished(f"{job.title} cancelled")
+            return
+
+        if exit_code == 0 and job.quiet:
+            self.status.showMessage(f"✓ {job.title} successful")
+            self.build_output.build_finished(f"✓ {job.title} successful")
+            return
+
+        show_success = self.settings.get("editor", f"show_{job.log_name}_success_popup", True)
+        show_failure = self.settings.get("editor", f"show_{job.log_name}_failure_popup", True)
+        if exit_code == 0:
+            self.status.showMessage(f"✓ {job.title} successful")
+            self.build_output.build_finished(f"✓ {job.title} successful")
+            if show_success:
+                message = {
+                    "Compile": "Code compiled successfully!",
+                    "Upload": "Code uploaded successfully!",
+                    "Clean": "Build artifacts cleaned successfully",
+                }.get(job.title, f"{job.title} finished successfully")
+                QMessageBox.information(self, "Success", message)
+            return
+
+        self.status.showMessage(f"✗ {job.title} failed")
+        self.build_output.build_finished(f"✗ {job.title} failed (exit code {exit_code})")
+        if job.diagnostics:
+            # Already underlined in the editor and listed in the build output as they arrived
+            errors = sum(1 for d in job.diagnostics if d[1] != "warning")
+            self.status.showMessage(f"✗ {job.title} failed - {errors} error{'s' if errors != 1 else ''}, "
+                                    f"marked in the editor")
+        elif show_failure:
+            QMessageBox.warning(self, f"{job.title} Error", f"{job.title} failed:\n\n{stderr[:500]}")
+
+    def _analyze_size(self, env: str):
+        """Attribute the new firmware's size to the sketch in the background and record it."""
+        elf = find_elf(self.build_output_dir, env)
+        if not elf or (self.size_thread and self.size_thread.isRunning()):
+            return
+        vb_source, cpp, sketch = self._size_sources
+        # Each saved sketch keeps its own history; an unsaved one gets none
+        history_path = sketch_history_path(sketch) if sketch else None
+        self.size_thread = SizeThread(elf, env, cpp, vb_source, history_path)
+        self.size_thread.analyzed.connect(self.size_panel.show_record)
+        self.size_thread.failed.connect(self.size_panel.show_error)
+        self.size_thread.start()
+
     def refresh_ports(self):
         """Refresh available serial ports."""
-        ports = get_available_ports()
-        self.port_combo.clear()
-        self.port_combo.addItems(ports)
+        # pyserial enumeration is quick; the watcher re-scans and enriches in the background
+        self._fill_ports(scan_ports())
+        self.device_watcher.refresh()
         # Auto-select port if nothing chosen yet
-        if not self.port_combo.currentText():
+        if not self._selected_port():
             self.auto_select_defaults()
-        
+
+    def _selected_port(self):
+        """Port name of the selected entry (item text may carry a description or badge)."""
+        return self.port_combo.currentData() or None
+
+    def _fill_ports(self, devices):
+        """Repopulate the port combo from a device list, keeping the current selection."""
+        selected = self._selected_port()
+        auto_port = None
+        if self._auto_port_mark_idx is not None:
+            auto_port = self.port_combo.itemData(self._auto_port_mark_idx)
+        self._devices = list(devices)
+        entries = [(d.port, d.label) for d in devices]
+        if self._replay:
+            port = self._replay[0].port
+            entries.append((port, f"{port} - Replay of {self._replay[1].name}"))
+        if selected and selected not in {port for port, _ in entries}:
+            # Keep an unplugged port selected; boards drop off the bus while resetting
+            entries.append((selected, f"{selected} (disconnected)"))
+
+        self.port_combo.blockSignals(True)
+        self.port_combo.clear()
+        self._port_original_text = {}
+        self._auto_port_mark_idx = None
+        for port, label in entries:
+            self.port_combo.addItem(label, port)
+        idx = self.port_combo.findData(selected) if selected else -1
+        self.port_combo.setCurrentIndex(idx if idx != -1 else 0 if entries else -1)
+        if auto_port is not None and auto_port == self._selected_port():
+            idx = self.port_combo.currentIndex()
+            self._port_original_text[idx] = self.port_combo.itemText(idx)
+            self.port_combo.setItemText(idx, f"{self.port_combo.itemText(idx)} [Auto]")
+            self._auto_port_mark_idx = idx
+        self.port_combo.blockSignals(False)
+        if self._selected_port() != selected and hasattr(self, "serial_monitor"):
+            self._on_port_changed()
+
+    def _on_devices_changed(self, devices):
+        """DeviceWatcher reported a plug/unplug or new details."""
+        self._fill_ports(devices)
+        self.serial_hub_panel.set_ports(devices)
+        if not self._selected_port():
+            self.auto_select_defaults()
+
     def _on_port_changed(self):
         """Handle port selection change - update serial monitor."""
-        port = self.port_combo.currentText()
+        port = self._selected_port()
         if port:
             self.serial_monitor.set_port(port)
         else:
@@ -958,7 +1270,98 @@ End Sub
         
     def toggle_serial_monitor(self, checked):
         """Toggle serial monitor visibility."""
-        self.serial_monitor.setVisible(checked)
+        self.bottom_tabs.setVisible(checked)
+        if checked:
+            self.bottom_tabs.setCurrentWidget(self.serial_monitor)
+
+    def replay_serial_capture(self):
+        """Serve a capture on a virtual port, select it, and connect the serial monitor to it."""
+        directory = QFileDialog.getExistingDirectory(
+            self, "Replay Serial Capture", str(self.serial_monitor.capture_base))
+        if not directory:
+            return
+        speeds = {"Original timing": 1.0, "10x faster": 10.0, "100x faster": 100.0, "As fast as possible": SPEED_MAX}
+        choice, ok = QInputDialog.getItem(self, "Replay Serial Capture", "Speed:", list(speeds), 0, False)
+        if not ok:
+            return
+        self.stop_replay()
+        try:
+            port = VirtualSerialPort()
+        except OSError as e:
+            QMessageBox.warning(self, "Replay Serial Capture", str(e))
+            return
+        replayer = Replayer(capture_chunks(directory), port, speeds[choice], name=pathlib.Path(directory).name)
+        self._replay = (port, replayer)
+        replayer.start()
+        self._fill_ports(self._devices)
+        self.port_combo.setCurrentIndex(self.port_combo.findData(port.port))
+        self.serial_monitor.set_port(port.port)
+        self.serial_monitor.connect_serial()
+        self.toggle_serial_monitor(True)
+        self._replay_timer = QTimer(self)
+        self._replay_timer.timeout.connect(self._check_replay)
+        self._replay_timer.start(500)
+        self.status.showMessage(f"Replaying {replayer.name} on {port.port} ({choice.lower()})", 5000)
+
+    def _check_replay(self):
+        if not self._replay or not self._replay[1].finished.is_set():
+            return
+        self._replay_timer.stop()
+        replayer = self._replay[1]
+        if replayer.error:
+            self.status.showMessage(f"Replay failed: {replayer.error}", 10000)
+        else:
+            self.status.showMessage(
+                f"Replay finished: {replayer.bytes_sent:,} bytes in {replayer.elapsed:.1f} s", 10000)
+
+    def stop_replay(self):
+        """Stop the running replay and remove its virtual port."""
+        if not self._replay:
+            return
+        port, replayer = self._replay
+        if self._replay_timer:
+            self._replay_timer.stop()
+        replayer.stop()
+        if self.serial_monitor.is_connected() and self.serial_monitor.port_name == port.port:
+            self.serial_monitor.disconnect_serial()
+        port.close()
+        self._replay = None
+        self._fill_ports(self._devices)
+
+    def show_serial_hub(self):
+        self.bottom_tabs.setVisible(True)
+        self.bottom_tabs.setCurrentWidget(self.serial_hub_panel)
+
+    def estimate_memory(self):
+        """Transpile the current editor and show its memory budget for the selected board."""
+        editor = self.get_current_editor()
+        board = self.board_combo.currentData()
+        if not editor or not board:
+            QMessageBox.warning(self, "Memory Estimate", "Open a sketch and select a board first.")
+            return
+        transpiler = self._transpiler()
+        try:
+            result = transpiler.transpile(editor.toPlainText())
+        except ProfileError as e:
+            QMessageBox.warning(self, "Memory Estimate", str(e))
+            return
+        self._check_memory_budget(transpiler, result, board)
+        self.bottom_tabs.setVisible(True)
+        self.bottom_tabs.setCurrentWidget(self.budget_panel)
+
+    def _check_memory_budget(self, transpiler, result, board) -> bool:
+        """Estimate RAM/stack for the board, update the Memory panel, and return False if it can't fit."""
+        profile = get_board_profile(board)
+        if not profile:
+            self.budget_panel.show_unavailable(board)
+            return True
+        report = estimate_budget(transpiler, profile, result.call_graph)
+        self.budget_panel.show_report(report)
+        if report.ok:
+            return True
+        self.bottom_tabs.setCurrentWidget(self.budget_panel)
+        QMessageBox.warning(self, "Memory Budget Exceeded", report.format())
+        return False
         
     def on_text_changed(self):
         """Handle text change in editor."""
@@ -1001,16 +1404,14 @@ End Sub
         self.setWindowTitle(title)
 
     def auto_select_defaults(self):
-        """Auto-detect board and port via PlatformIO and set defaults."""
-        try:
-            board, port = auto_detect_board_and_port()
-        except Exception:
-            board, port = (None, None)
+        """Pick a board and port from the detected devices (USB vendor ids)."""
+        device = next((d for d in self._devices if d.board), self._devices[0] if self._devices else None)
+        board, port = (device.board, device.port) if device else (None, None)
 
         # Set port if detected and available
         if port:
-            idx = self.port_combo.findText(port)
-            if idx != -1 and not self.port_combo.currentText():
+            idx = self.port_combo.findData(port)
+            if idx != -1 and not self._selected_port():
                 self.port_combo.setCurrentIndex(idx)
                 # Set a helpful tooltip and extend message duration
                 self.port_combo.setToolTip(f"Auto-detected: {port}")
@@ -1074,8 +1475,20 @@ End Sub
         except Exception:
             pass
 
-    def _platformio_ini_content(self, board: str, platform: str) -> str:
-        """Generate platformio.ini content with libraries and build flags from project config."""
+    def _platformio_ini_content(self, boards: str | list[str], platform: str | None = None) -> str:
+        """Generate platformio.ini content with libraries and build flags from project config.
+
+        Accepts one board or a list (build matrix); each board gets its own [env:...].
+        """
+        if isinstance(boards, str):
+            boards = [boards]
+        return "\n".join(
+            self._platformio_env_content(b, platform or board_platform(b))
+            for b in boards
+        )
+
+    def _platformio_env_content(self, board: str, platform: str) -> str:
+        """One [env:board] section of platformio.ini."""
         lines = [
             f"[env:{board}]",
             f"platform = {platform}",
@@ -1111,25 +1524,16 @@ End Sub
         return "\n".join(lines) + "\n"
 
     def _build_vb_line_map(self, cpp_path: pathlib.Path) -> dict[int, int]:
-        """Build a map of C++ line -> VB line by scanning marker comments.
+        """Build a map of C++ line -> VB line from the // __VB_LINE__:N marker comments.
 
-        We emit lines like: // __VB_LINE__:N before each generated statement.
-        We map each subsequent C++ line to the most recent VB marker.
+        Lines without a VB origin (includes, runtime helpers) map to line 1.
         """
         try:
-            lines = cpp_path.read_text(encoding='utf-8').splitlines()
+            cpp = cpp_path.read_text(encoding='utf-8')
         except Exception:
             return {}
-        vb_map: dict[int, int] = {}
-        current_vb = None
-        for idx, l in enumerate(lines, start=1):
-            if l.strip().startswith("// __VB_LINE__:"):
-                try:
-                    current_vb = int(l.strip().split(":", 1)[1])
-                except Exception:
-                    current_vb = current_vb
-            vb_map[idx] = current_vb if current_vb is not None else 1
-        return vb_map
+        mapping = vb_line_map(cpp)
+        return {idx: mapping.get(idx, 1) for idx in range(1, cpp.count("\n") + 2)}
 
     def _parse_compile_errors(self, stderr: str, cpp_name: str) -> list[tuple[int, str, str]]:
         """Parse compiler stderr to extract (cpp_line, level, message) for main file.
@@ -1139,71 +1543,11 @@ End Sub
         """
         errors: list[tuple[int, str, str]] = []
         for line in stderr.splitlines():
-            # General gcc/clang style: <file>:<line>:<col>: <level>: <message>
-            m = re.match(r"(.+?):(\d+):\d+:\s+(fatal error|error|warning):\s+(.*)", line)
-            if m:
-                file_path, line_no, level, msg = m.groups()
-                if file_path.endswith(cpp_name):
-                    try:
-                        errors.append((int(line_no), level, msg))
-                    except ValueError:
-                        pass
+            diag = parse_diagnostic(line, cpp_name)
+            if diag:
+                errors.append(diag)
         return errors
 
-    def _show_compile_errors(self, errors: list[tuple[int, str, str]], vb_map: dict[int, int]):
-        """Show a clickable list of compile errors mapped to VB lines."""
-        dlg = QDialog(self)
-        dlg.setWindowTitle("Compilation Errors")
-        layout = QVBoxLayout(dlg)
-        lst = QListWidget(dlg)
-        layout.addWidget(lst)
-        # Populate list with VB line numbers and messages
-        for cpp_line, level, msg in errors:
-            vb_line = vb_map.get(cpp_line, 1)
-            item = QListWidgetItem(f"VB line {vb_line}: {level} - {msg}")
-            # store VB line and message in item data
-            item.setData(Qt.ItemDataRole.UserRole, (vb_line, level, msg))
-            lst.addItem(item)
-
-        def on_item_activated(item: QListWidgetItem):
-            data = item.data(Qt.ItemDataRole.UserRole)
-            if isinstance(data, tuple) and len(data) == 3:
-                vb_line, level, msg = data
-                if isinstance(vb_line, int):
-                    self.goto_line(vb_line)
-                    # Update status bar with concise hint
-                    self.status.showMessage(f"{level.capitalize()} at VB line {vb_line}: {msg}", 5000)
-        
-        # Context menu for copying error text
-        def on_context_menu(pos):
-            item = lst.itemAt(pos)
-            if item:
-                menu = QMenu(lst)
-                copy_action = menu.addAction("Copy Error")
-                copy_all_action = menu.addAction("Copy All Errors")
-                
-                def copy_error():
-                    clipboard = QApplication.clipboard()
-                    clipboard.setText(item.text())
-                    self.status.showMessage("Error copied to clipboard", 3000)
-                
-                def copy_all_errors():
-                    all_text = "\n".join([lst.item(i).text() for i in range(lst.count())])
-                    clipboard = QApplication.clipboard()
-                    clipboard.setText(all_text)
-                    self.status.showMessage(f"{lst.count()} errors copied to clipboard", 3000)
-                
-                copy_action.triggered.connect(copy_error)
-                copy_all_action.triggered.connect(copy_all_errors)
-                menu.exec(lst.mapToGlobal(pos))
-        
-        lst.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
-        lst.customContextMenuRequested.connect(on_context_menu)
-        lst.itemActivated.connect(on_item_activated)
-        lst.itemDoubleClicked.connect(on_item_activated)
-        dlg.resize(800, 400)
-        dlg.show()
-        
     def check_save_changes(self):
         """Check if unsaved changes exist and prompt user."""
         if not self.is_modified:
@@ -1245,6 +1589,8 @@ End Sub
             editor = self.get_current_editor()
             if editor:
                 editor.apply_settings(self.settings)
+            self.serial_monitor.apply_settings(self.settings)
+            self.serial_hub_panel.apply_settings(self.settings)
             self.status.showMessage("Settings applied", 2000)
     
     def show_libraries_manager(self):
@@ -1372,49 +1718,39 @@ End Sub
     
     def clean_build(self):
         """Clean build artifacts using PlatformIO."""
-        try:
-            # Save current file first
-            if self.is_modified:
-                self.save_file()
-            
-            board = self.board_combo.currentData()
-            if not board:
-                QMessageBox.warning(self, "Warning", "Please select a board first")
-                return
-            
-            self.status.showMessage("Cleaning build artifacts...")
-            
-            # Run clean in generated directory
-            gen_dir = pathlib.Path.cwd() / "generated"
-            cmd = [
-                sys.executable, "-m", "platformio",
-                "run", "--target", "clean",
-                "--environment", board
-            ]
-            
-            result = subprocess.run(
-                cmd,
-                cwd=str(gen_dir),
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            if result.returncode == 0:
-                self.status.showMessage("✓ Build cleaned successfully", 3000)
-                QMessageBox.information(self, "Success", "Build artifacts cleaned successfully")
-            else:
-                self.status.showMessage("✗ Clean failed", 3000)
-                QMessageBox.warning(self, "Error", f"Clean failed:\n{result.stderr}")
-        except Exception as e:
-            self.status.showMessage("✗ Clean error", 3000)
-            QMessageBox.critical(self, "Error", f"Failed to clean build:\n{e}")
-    
+        # Save current file first
+        if self.is_modified:
+            self.save_file()
+
+        board = self.board_combo.currentData()
+        if not board:
+            QMessageBox.warning(self, "Warning", "Please select a board first")
+            return
+
+        # Clean the project the IDE builds into, and forget what it last built
+        self.build_runner.enqueue(BuildJob(
+            title="Clean",
+            cmd=[sys.executable, "-m", "platformio", "run", "--project-dir", str(self.build_output_dir),
+                 "--target", "clean", "--environment", board],
+            log_name="clean",
+            cwd=self.build_output_dir,
+            prepare=self._prepare_clean,
+            timeout_ms=30000,
+        ))
+
+    def _prepare_clean(self, job: BuildJob) -> bool:
+        """Drop the build manifest so the next build can't be skipped as up to date."""
+        if not self.build_output_dir.is_dir():
+            self.status.showMessage("Nothing to clean", 3000)
+            return False
+        (self.build_output_dir / MANIFEST_NAME).unlink(missing_ok=True)
+        return True
+
     def open_device_monitor(self):
         """Open PlatformIO device monitor."""
         try:
-            port = self.port_combo.currentText()
-            if not port or port == "No port detected":
+            port = self._selected_port()
+            if not port:
                 QMessageBox.warning(self, "Warning", "Please select a serial port first")
                 return
             
@@ -1447,6 +1783,50 @@ End Sub
             self.status.showMessage("✗ Monitor error", 3000)
             QMessageBox.critical(self, "Error", f"Failed to open device monitor:\n{e}")
     
+    def _select_board(self, board_id: str, name: str | None = None) -> bool:
+        """Select a board in the combo, adding it under "Other Boards" if it isn't listed."""
+        idx = self.board_combo.findData(board_id)
+        if idx == -1:
+            if name is None:
+                info = self.board_db.get(board_id)
+                if info is None:
+                    return False
+                name = info.name
+            if self.board_combo.findText("--- Other Boards ---") == -1:
+                self.board_combo.addItem("--- Other Boards ---", None)
+            self.board_combo.addItem(name, board_id)
+            idx = self.board_combo.count() - 1
+        self.board_combo.setCurrentIndex(idx)
+        return True
+
+    def find_board(self):
+        """Search every PlatformIO board and select one."""
+        dialog = BoardPickerDialog(self.board_db, parent=self)
+        dialog.refresh_requested.connect(lambda: self.refresh_board_db(dialog))
+        if self.board_db_thread and self.board_db_thread.isRunning():
+            self._connect_board_db_dialog(dialog)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        board = dialog.selected_board()
+        if board:
+            self._select_board(board.board_id, board.name)
+            self.status.showMessage(f"Board: {board.name} ({board.board_id})", 5000)
+
+    def refresh_board_db(self, dialog: BoardPickerDialog | None = None):
+        """Re-import the board list from PlatformIO in the background."""
+        if not (self.board_db_thread and self.board_db_thread.isRunning()):
+            self.board_db_thread = BoardDBRefreshThread(self.board_db, self)
+            self.board_db_thread.refreshed.connect(
+                lambda count: self.status.showMessage(f"Board database updated: {count} boards", 5000))
+            self.board_db_thread.start()
+        if dialog is not None:
+            self._connect_board_db_dialog(dialog)
+
+    def _connect_board_db_dialog(self, dialog: BoardPickerDialog):
+        dialog.show_refreshing()
+        self.board_db_thread.refreshed.connect(dialog.on_refreshed)
+        self.board_db_thread.failed.connect(dialog.on_refresh_failed)
+
     def _on_board_changed(self):
         """Handle board selection change - auto-load pin template."""
         board = self.board_combo.currentData()
@@ -1526,6 +1906,19 @@ End Sub
     def closeEvent(self, event):
         """Handle window close event and ensure all resources are cleaned up."""
         if self.check_save_changes():
+            # Stop any running build so PlatformIO isn't left orphaned
+            self.build_runner.shutdown()
+            self.device_watcher.stop()
+            if self.board_db_thread and self.board_db_thread.isRunning():
+                self.board_db_thread.wait(5000)
+            self.board_db.close()
+            if self.matrix_thread and self.matrix_thread.isRunning():
+                self.matrix_thread.cancel()
+                self.matrix_thread.wait(5000)
+            if self.size_thread:
+                self.size_thread.wait(5000)
+            self.serial_hub_panel.shutdown()
+            self.stop_replay()
             # Ensure serial monitor is closed and cleaned up
             try:
                 if hasattr(self, 'serial_monitor') and self.serial_monitor is not None:
@@ -0,0 +1,101 @@
+"""Qt client for the long-lived PlatformIO worker (vb2arduino.pio_worker)."""
+
+import json
+import sys
+
+from PyQt6.QtCore import QObject, QProcess, QProcessEnvironment, QTimer, pyqtSignal
+
+from vb2arduino import pio_worker
+
+
+class PioWorkerClient(QObject):
+    """Owns one worker process and relays its job output as signals."""
+
+    line = pyqtSignal(int, str, bool)  # job id, line, is_stderr
+    job_done = pyqtSignal(int, int)  # job id, exit code
+    died = pyqtSignal()  # Worker exited or never became ready; client is unusable afterwards
+
+    START_TIMEOUT_MS = 20000
+
+    @staticmethod
+    def supported() -> bool:
+        return pio_worker.supported()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.ready = False
+        self.dead = False
+        self.version = ""
+        self._buffer = b""
+        self._outbox: list[dict] = []  # Messages sent before the worker is ready
+        self.process = QProcess(self)
+        env = QProcessEnvironment.systemEnvironment()
+        env.insert("PYTHONUNBUFFERED", "1")
+        self.process.setProcessEnvironment(env)
+        self.process.readyReadStandardOutput.connect(self._read)
+        self.process.finished.connect(lambda *_: self._die())
+        self.process.errorOccurred.connect(self._on_error)
+        self._start_timer = QTimer(self)
+        self._start_timer.setSingleShot(True)
+        self._start_timer.timeout.connect(self._die)
+
+    def start(self) -> None:
+        """Launch the worker; it imports PlatformIO in the background."""
+        if self.process.state() == QProcess.ProcessState.NotRunning and not self.dead:
+            self.process.start(sys.executable, ["-m", "vb2arduino.pio_worker"])
+            self._start_timer.start(self.START_TIMEOUT_MS)
+
+    def run(self, job_id: int, args: list[str], cwd: str | None, env: dict[str, str] | None = None) -> None:
+        self._send({"id": job_id, "args": args, "cwd": cwd, "env": env or {}})
+
+    def cancel(self, job_id: int, force: bool = False) -> None:
+        self._send({"cancel": job_id, "force": force})
+
+    def stop(self) -> None:
+        """Close the worker's stdin (it kills any running build and exits)."""
+        if self.process.state() != QProcess.ProcessState.NotRunning:
+            self.dead = True  # Expected exit; don't report it as a failure
+            self.process.closeWriteChannel()
+            if not self.process.waitForFinished(3000):
+                self.process.kill()
+
+    def _send(self, msg: dict) -> None:
+        if not self.ready:
+            self._outbox.append(msg)
+            self.start()
+            return
+        self.process.write((json.dumps(msg) + "\n").encode("utf-8"))
+
+    def _read(self) -> None:
+        self._buffer += bytes(self.process.readAllStandardOutput())
+        while b"\n" in self._buffer:
+            raw, self._buffer = self._buffer.split(b"\n", 1)
+            try:
+                msg = json.loads(raw)
+            except ValueError:
+                continue
+            if msg.get("ready"):
+                self.ready = True
+                self.version = msg.get("version", "")
+                self._start_timer.stop()
+                outbox, self._outbox = self._outbox, []
+                for queued in outbox:
+                    self._send(queued)
+            elif "exit" in msg:
+                self.job_done.emit(msg["id"], int(msg["exit"]))
+            elif "line" in msg:
+                self.line.emit(msg["id"], msg["line"], msg.get("stream") == "stderr")
+
+    def _on_error(self, error) -> None:
+        if error == QProcess.ProcessError.FailedToStart:
+            self._die()
+
+    def _die(self) -> None:
+        if self.dead:
+            return
+        self.dead = True
+        self.ready = False
+        self._start_timer.stop()
+        if self.process.state() != QProcess.ProcessState.NotRunning:
+            self.process.kill()
+        self.died.emit()
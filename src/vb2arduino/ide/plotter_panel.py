@@ -0,0 +1,206 @@
+"""Serial plotter: live chart of numeric fields from the serial line stream."""
+
+import pathlib
+import time
+
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QComboBox, QFileDialog, QMessageBox
+)
+from PyQt6.QtCore import Qt, QTimer, QLineF, QPointF
+from PyQt6.QtGui import QColor, QPainter, QPen
+
+from vb2arduino.serial_plot import PlotData
+
+CHANNEL_COLORS = [
+    "#1A73E8", "#D93025", "#188038", "#F9AB00", "#A142F4", "#12B5CB", "#E8710A", "#5F6368",
+    "#174EA6", "#A50E0E", "#0D652D", "#E37400", "#681DA8", "#007B83", "#B06000", "#3C4043",
+]
+
+
+class PlotCanvas(QWidget):
+    """Draws the last `window` samples of every channel, decimated to the widget width."""
+
+    MARGIN = 48  # Left margin for the Y axis labels
+
+    def __init__(self, data: PlotData, parent=None):
+        super().__init__(parent)
+        self.data = data
+        self.window = 2000
+        self.setMinimumHeight(120)
+        self.setAutoFillBackground(True)
+        self.wheel_zoomed = None  # Callback when the window changes from the mouse wheel
+        self.paint_ms = 0.0  # Duration of the last paint, used to pace redraws
+
+    def wheelEvent(self, event):
+        # Wheel zooms the time axis: fewer samples in view when scrolling up
+        factor = 0.8 if event.angleDelta().y() > 0 else 1.25
+        self.window = max(20, min(self.data.capacity, int(self.window * factor)))
+        if self.wheel_zoomed:
+            self.wheel_zoomed(self.window)
+        self.update()
+
+    def paintEvent(self, event):
+        started = time.perf_counter()
+        painter = QPainter(self)
+        try:
+            self._paint(painter)
+        finally:
+            painter.end()
+        self.paint_ms = (time.perf_counter() - started) * 1000
+
+    def _paint(self, painter: QPainter):
+        painter.fillRect(self.rect(), QColor("#FFFFFF"))
+        plot = self.rect().adjusted(self.MARGIN, 6, -6, -6)
+        n = min(self.window, len(self.data))
+        if n < 2 or not self.data.channels or plot.width() < 2:
+            painter.setPen(QColor("#5F6368"))
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter,
+                             "Print comma-separated numbers from the sketch (e.g. 12.5,40) to plot them")
+            return
+
+        width = plot.width()
+        series = [env.columns(n, width) for env in self.data.envelopes.values()]
+        low = min(min(lo for lo, _ in cols) for _, cols in series)
+        high = max(max(hi for _, hi in cols) for _, cols in series)
+        if high == low:
+            high, low = high + 1, low - 1
+        scale = plot.height() / (high - low)
+        left, bottom = plot.left(), plot.bottom()
+
+        painter.setPen(QColor("#DADCE0"))
+        painter.drawRect(plot)
+        painter.setPen(QColor("#5F6368"))
+        painter.drawText(2, plot.top() + 10, f"{high:.4g}")
+        painter.drawText(2, bottom, f"{low:.4g}")
+
+        for idx, (block, cols) in enumerate(series):
+            painter.setPen(QPen(QColor(CHANNEL_COLORS[idx % len(CHANNEL_COLORS)]), 1))
+            x_step = width / max(len(cols) - 1, 1)
+            if block == 1:
+                painter.drawPolyline([QPointF(left + i * x_step, bottom - (v - low) * scale)
+                                      for i, (v, _) in enumerate(cols)])
+                continue
+            # One vertical span per column, stretched to meet the previous column so the
+            # trace stays connected: a single QLineF per column keeps the Python work small
+            lines = []
+            add = lines.append
+            prev_lo, prev_hi = cols[0]
+            for i, (lo, hi) in enumerate(cols):
+                x = left + i * x_step
+                y0 = lo if lo < prev_hi else prev_hi
+                y1 = hi if hi > prev_lo else prev_lo
+                add(QLineF(x, bottom - (y0 - low) * scale, x, bottom - (y1 - low) * scale))
+                prev_lo, prev_hi = lo, hi
+            painter.drawLines(lines)
+
+
+class PlotterPanel(QWidget):
+    """Plot tab: parses numeric serial lines into ring buffers and redraws at a fixed rate."""
+
+    REDRAW_MS = 40
+    WINDOWS = [200, 1000, 2000, 10000, 50000, 100000]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.data = PlotData()
+        self.paused = False
+        self._dirty = False
+        self._rate_samples = 0
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        toolbar = QHBoxLayout()
+        self.pause_btn = QPushButton("Pause")
+        self.pause_btn.setCheckable(True)
+        self.pause_btn.toggled.connect(self.set_paused)
+        toolbar.addWidget(self.pause_btn)
+        toolbar.addWidget(QLabel("Window:"))
+        self.window_combo = QComboBox()
+        for size in self.WINDOWS:
+            self.window_combo.addItem(f"{size:,} samples", size)
+        self.window_combo.setCurrentIndex(self.WINDOWS.index(2000))
+        self.window_combo.currentIndexChanged.connect(self._on_window_changed)
+        toolbar.addWidget(self.window_combo)
+        self.zoom_label = QLabel()
+        self.zoom_label.setToolTip("Use the mouse wheel over the plot to zoom")
+        toolbar.addWidget(self.zoom_label)
+        clear_btn = QPushButton("Clear")
+        clear_btn.clicked.connect(self.clear)
+        toolbar.addWidget(clear_btn)
+        export_btn = QPushButton("Export CSV...")
+        export_btn.clicked.connect(self.export_csv)
+        toolbar.addWidget(export_btn)
+        self.legend = QLabel()
+        self.legend.setTextFormat(Qt.TextFormat.RichText)
+        toolbar.addWidget(self.legend)
+        toolbar.addStretch()
+        self.rate_label = QLabel()
+        toolbar.addWidget(self.rate_label)
+        layout.addLayout(toolbar)
+
+        self.canvas = PlotCanvas(self.data)
+        self.canvas.wheel_zoomed = lambda size: self.zoom_label.setText(f"Zoom: {size:,} samples")
+        layout.addWidget(self.canvas)
+
+        self._redraw_timer = QTimer(self)
+        self._redraw_timer.setInterval(self.REDRAW_MS)
+        self._redraw_timer.timeout.connect(self._redraw)
+        self._redraw_timer.start()
+        self._rate_timer = QTimer(self)
+        self._rate_timer.setInterval(1000)
+        self._rate_timer.timeout.connect(self._update_rate)
+        self._rate_timer.start()
+
+    def add_lines(self, lines):
+        """Slot for SerialMonitor.lines_received."""
+        if self.paused:
+            return
+        added = self.data.add_lines(lines)
+        if added:
+            self._rate_samples += added
+            self._dirty = True
+
+    def set_paused(self, paused: bool):
+        self.paused = paused
+        self.pause_btn.setText("Resume" if paused else "Pause")
+
+    def clear(self):
+        self.data.clear()
+        self.legend.clear()
+        self._dirty = True
+
+    def _on_window_changed(self):
+        self.canvas.window = self.window_combo.currentData()
+        self.zoom_label.clear()
+        self.canvas.update()
+
+    def _redraw(self):
+        if not self._dirty or not self.isVisible():
+            return
+        self._dirty = False
+        # Many channels on a wide plot can take longer than a frame to draw; never spend
+        # more than about half the GUI thread's time painting
+        self._redraw_timer.setInterval(max(self.REDRAW_MS, int(self.canvas.paint_ms * 2)))
+        self.legend.setText("  ".join(
+            f'<span style="color:{CHANNEL_COLORS[i % len(CHANNEL_COLORS)]}">&#9632; {name}</span>'
+            for i, name in enumerate(self.data.channels)))
+        self.canvas.update()
+
+    def _update_rate(self):
+        self.rate_label.setText(f"{self._rate_samples:,} samples/s" if self._rate_samples else "")
+        self._rate_samples = 0
+
+    def export_csv(self):
+        if not len(self.data):
+            QMessageBox.information(self, "Export CSV", "Nothing has been plotted yet.")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Export Plot Data", "plot.csv", "CSV Files (*.csv)")
+        if not path:
+            return
+        try:
+            with open(pathlib.Path(path), "w", newline="", encoding="utf-8") as f:
+                rows = self.data.write_csv(f)
+        except OSError as e:
+            QMessageBox.warning(self, "Export CSV", f"Failed to write {path}:\n{e}")
+            return
+        QMessageBox.information(self, "Export CSV", f"Wrote {rows:,} samples to {path}")
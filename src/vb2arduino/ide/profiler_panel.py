@@ -0,0 +1,158 @@
+"""Profiler panel: live hot Subs and VB lines from a sketch built with profiling on."""
+
+import pathlib
+
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QComboBox, QFileDialog,
+    QTableWidget, QTableWidgetItem, QHeaderView
+)
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+
+from vb2arduino.profiler import MAP_FILE, ProfileStats, ProfileSlot, load_map
+
+REFRESH_MS = 500
+MAX_ROWS = 200
+
+
+class ProfilerPanel(QWidget):
+    """Loop frequency and jitter, and the Subs/lines taking the most time, from decoded frames."""
+
+    line_activated = pyqtSignal(int)  # VB line
+
+    SHOW = [("Subs and lines", None), ("Subs", "proc"), ("Lines", "line")]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.stats: ProfileStats | None = None
+        self.mismatched = 0  # Frames whose slot count didn't match the map
+        self._dirty = False
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        header = QHBoxLayout()
+        self.loop_label = QLabel("Compile with Sketch > Profile on Device, upload, and connect the serial monitor.")
+        header.addWidget(self.loop_label)
+        header.addStretch()
+        header.addWidget(QLabel("Show:"))
+        self.show_combo = QComboBox()
+        self.show_combo.addItems([label for label, _ in self.SHOW])
+        self.show_combo.currentIndexChanged.connect(self.refresh)
+        header.addWidget(self.show_combo)
+        self.window_combo = QComboBox()
+        self.window_combo.addItems(["Since reset", "Last interval"])
+        self.window_combo.currentIndexChanged.connect(self.refresh)
+        header.addWidget(self.window_combo)
+        reset_btn = QPushButton("Reset")
+        reset_btn.clicked.connect(self.reset)
+        header.addWidget(reset_btn)
+        load_btn = QPushButton("Load Map...")
+        load_btn.setToolTip(f"Use the {MAP_FILE} written next to main.cpp by a --profile build")
+        load_btn.clicked.connect(lambda: self.load_map())
+        header.addWidget(load_btn)
+        layout.addLayout(header)
+
+        self.table = QTableWidget(0, 7)
+        self.table.setHorizontalHeaderLabels(["Time %", "ms/s", "Calls/s", "µs/call", "Kind", "Sub", "VB line"])
+        self.table.horizontalHeader().setSectionResizeMode(5, QHeaderView.ResizeMode.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.setToolTip("Subs: time including the Subs they call. Lines: time until the next line runs.\n"
+                              "Double-click a row to jump to its VB line.")
+        self.table.cellDoubleClicked.connect(self._on_double_click)
+        layout.addWidget(self.table)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self._refresh_if_dirty)
+        self.timer.start(REFRESH_MS)
+
+    def set_slots(self, slots: list[ProfileSlot]):
+        """Name the slots of the frames to come (the profiled build's slot table)."""
+        if self.stats and self.stats.slots == slots:
+            return
+        self.stats = ProfileStats(slots) if slots else None
+        self.mismatched = 0
+        self.refresh()
+
+    def load_map(self, path=None) -> bool:
+        if path is None:
+            path, _ = QFileDialog.getOpenFileName(self, "Load Profile Map", "", f"Profile map ({MAP_FILE});;All files (*)")
+            if not path:
+                return False
+        try:
+            self.set_slots(load_map(pathlib.Path(path)))
+        except (OSError, ValueError, KeyError) as e:
+            self.loop_label.setText(f"Can't load {path}: {e}")
+            return False
+        return True
+
+    def add_frames(self, frames):
+        if self.stats is None:
+            self.mismatched += len(frames)
+        else:
+            for frame in frames:
+                if not self.stats.add(frame):
+                    self.mismatched += 1
+        self._dirty = True
+
+    def reset(self):
+        if self.stats:
+            self.stats.reset()
+        self.mismatched = 0
+        self.refresh()
+
+    def _refresh_if_dirty(self):
+        if self._dirty and self.isVisible():
+            self.refresh()
+
+    def refresh(self):
+        self._dirty = False
+        stats = self.stats
+        if stats is None or not stats.frames:
+            self.table.setRowCount(0)
+            if self.mismatched:
+                self.loop_label.setText(f"{self.mismatched} profile frames don't match the loaded map: "
+                                        "upload the profiled build or load its map.")
+            elif stats is not None:
+                self.loop_label.setText(f"Waiting for profile data ({len(stats.slots)} counters)...")
+            return
+        text = (f"Loop: {stats.loop_hz:,.0f} Hz, period {stats.loop_mean_us:,.0f} µs "
+                f"({stats.loop_min_us:,}-{stats.loop_max_us:,}), jitter {stats.jitter_us:,} µs  |  "
+                f"{stats.frames} frames, {stats.elapsed_us / 1e6:,.1f} s")
+        if self.mismatched:
+            text += f"  |  {self.mismatched} frames didn't match the map"
+        self.loop_label.setText(text)
+
+        last = self.window_combo.currentIndex() == 1
+        elapsed = (stats.last.elapsed_us if last else stats.elapsed_us) or 1
+        kind = self.SHOW[self.show_combo.currentIndex()][1]
+        rows = [row for row in stats.rows if kind is None or row.slot.kind == kind]
+        if last:
+            rows.sort(key=lambda row: (-row.last_us, -row.last_hits, row.slot.vb_line))
+        else:
+            rows = stats.hot(kind)
+        rows = rows[:MAX_ROWS]
+        self.table.setUpdatesEnabled(False)
+        self.table.setRowCount(len(rows))
+        for i, row in enumerate(rows):
+            us, hits = (row.last_us, row.last_hits) if last else (row.us, row.hits)
+            values = [
+                f"{100 * us / elapsed:.1f}",
+                f"{us / elapsed * 1000:.2f}",
+                f"{hits * 1e6 / elapsed:,.0f}",
+                f"{us / hits:,.1f}" if hits else "",
+                "Sub" if row.slot.kind == "proc" else "Line",
+                row.slot.name,
+                str(row.slot.vb_line),
+            ]
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if col < 4 or col == 6:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(i, col, item)
+        self.table.setUpdatesEnabled(True)
+
+    def _on_double_click(self, row: int, _col: int):
+        item = self.table.item(row, 6)
+        if item is not None and int(item.text()) > 0:
+            self.line_activated.emit(int(item.text()))
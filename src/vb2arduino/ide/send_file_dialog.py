@@ -0,0 +1,117 @@
+"""Dialog choosing a file to send over serial and how to pace it."""
+
+import pathlib
+
+from PyQt6.QtWidgets import (
+    QDialog, QFormLayout, QHBoxLayout, QLineEdit, QPushButton, QComboBox,
+    QSpinBox, QDoubleSpinBox, QDialogButtonBox, QFileDialog, QMessageBox
+)
+
+from vb2arduino.serial_send import FLOW_ACK, FLOW_NONE, FLOW_XONXOFF, SendOptions
+
+FLOW_MODES = [
+    ("None", FLOW_NONE),
+    ("XON/XOFF (device pauses the sender)", FLOW_XONXOFF),
+    ("ACK (wait for a reply after each chunk/line)", FLOW_ACK),
+]
+
+
+class SendFileDialog(QDialog):
+    """Pick a file and the chunking, pacing and flow control to send it with."""
+
+    def __init__(self, options: SendOptions, directory: str = "", parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Send File")
+        self.setMinimumWidth(480)
+        self.directory = directory
+        self.init_ui(options)
+
+    def init_ui(self, options: SendOptions):
+        form = QFormLayout(self)
+
+        file_row = QHBoxLayout()
+        self.path_edit = QLineEdit()
+        file_row.addWidget(self.path_edit)
+        browse_btn = QPushButton("Browse...")
+        browse_btn.clicked.connect(self.browse)
+        file_row.addWidget(browse_btn)
+        form.addRow("File:", file_row)
+
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItems(["In chunks", "Line by line"])
+        self.mode_combo.setCurrentIndex(1 if options.by_line else 0)
+        self.mode_combo.currentIndexChanged.connect(self._update_enabled)
+        form.addRow("Send:", self.mode_combo)
+
+        self.chunk_spin = QSpinBox()
+        self.chunk_spin.setRange(1, 65536)
+        self.chunk_spin.setSuffix(" bytes")
+        self.chunk_spin.setValue(options.chunk_size)
+        form.addRow("Chunk size:", self.chunk_spin)
+
+        self.delay_spin = QDoubleSpinBox()
+        self.delay_spin.setRange(0, 10000)
+        self.delay_spin.setDecimals(1)
+        self.delay_spin.setSuffix(" ms")
+        self.delay_spin.setValue(options.delay_ms)
+        self.delay_spin.setToolTip("Pause after each chunk or line")
+        form.addRow("Delay:", self.delay_spin)
+
+        self.flow_combo = QComboBox()
+        for label, mode in FLOW_MODES:
+            self.flow_combo.addItem(label, mode)
+        self.flow_combo.setCurrentIndex(max(0, self.flow_combo.findData(options.flow)))
+        self.flow_combo.currentIndexChanged.connect(self._update_enabled)
+        form.addRow("Flow control:", self.flow_combo)
+
+        self.ack_edit = QLineEdit(options.ack)
+        self.ack_edit.setToolTip("A received line containing this text acknowledges the last chunk or line")
+        form.addRow("ACK text:", self.ack_edit)
+
+        self.ack_timeout_spin = QDoubleSpinBox()
+        self.ack_timeout_spin.setRange(0.1, 600)
+        self.ack_timeout_spin.setSuffix(" s")
+        self.ack_timeout_spin.setValue(options.ack_timeout_s)
+        form.addRow("ACK timeout:", self.ack_timeout_spin)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        buttons.button(QDialogButtonBox.StandardButton.Ok).setText("Send")
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        form.addRow(buttons)
+        self.stall_timeout_s = options.stall_timeout_s
+        self._update_enabled()
+
+    def _update_enabled(self):
+        self.chunk_spin.setEnabled(self.mode_combo.currentIndex() == 0)
+        ack = self.flow_combo.currentData() == FLOW_ACK
+        self.ack_edit.setEnabled(ack)
+        self.ack_timeout_spin.setEnabled(ack)
+
+    def browse(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Send File", self.path_edit.text() or self.directory)
+        if path:
+            self.path_edit.setText(path)
+
+    def path(self) -> pathlib.Path:
+        return pathlib.Path(self.path_edit.text().strip())
+
+    def options(self) -> SendOptions:
+        return SendOptions(
+            chunk_size=self.chunk_spin.value(),
+            by_line=self.mode_combo.currentIndex() == 1,
+            delay_ms=self.delay_spin.value(),
+            flow=self.flow_combo.currentData(),
+            ack=self.ack_edit.text(),
+            ack_timeout_s=self.ack_timeout_spin.value(),
+            stall_timeout_s=self.stall_timeout_s,
+        )
+
+    def accept(self):
+        if not self.path().is_file():
+            QMessageBox.warning(self, "Send File", "Choose a file to send.")
+            return
+        if self.flow_combo.currentData() == FLOW_ACK and not self.ack_edit.text():
+            QMessageBox.warning(self, "Send File", "Enter the text the device replies with.")
+            return
+        super().accept()
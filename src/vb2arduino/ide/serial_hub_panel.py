@@ -0,0 +1,397 @@
+"""Serial hub tab: several ports at once, one tab each plus a merged, time-ordered view."""
+
+import pathlib
+import time
+
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QComboBox,
+    QTabWidget, QTabBar, QFileDialog
+)
+from PyQt6.QtCore import Qt, QObject, QTimer, pyqtSignal
+from PyQt6.QtGui import QColor
+
+import serial
+import serial.tools.list_ports
+
+from vb2arduino.serial_capture import (
+    DEFAULT_CAPTURE_DIR, DEFAULT_MAX_MB, DEFAULT_SEGMENT_MB, CaptureWriter, capture_dir_for
+)
+from vb2arduino.serial_hub import HubSession, LineMerger, SerialHub
+from vb2arduino.ide.capture_viewer import CaptureViewerDialog
+from vb2arduino.ide.serial_monitor import BAUD_RATES
+from vb2arduino.ide.serial_output import SerialOutputView
+
+SESSION_COLORS = ["#1A73E8", "#D93025", "#188038", "#E37400", "#A142F4", "#007B83", "#B06000", "#681DA8"]
+
+
+def _clock(ts: float) -> str:
+    return time.strftime("%H:%M:%S", time.localtime(ts)) + f".{int(ts * 1000) % 1000:03d}"
+
+
+def _rate(per_s: float) -> str:
+    if per_s >= 1e6:
+        return f"{per_s / 1e6:.1f} MB/s"
+    if per_s >= 1e3:
+        return f"{per_s / 1e3:.1f} kB/s"
+    return f"{per_s:.0f} B/s"
+
+
+def _short(port: str) -> str:
+    return pathlib.PurePath(port).name or port
+
+
+class _HubBridge(QObject):
+    """Carries SerialHub callbacks from the hub thread to the GUI thread."""
+
+    data_received = pyqtSignal(object, str, object)  # HubSession, text, list[SerialLine]
+    error_occurred = pyqtSignal(object, str)
+    session_closed = pyqtSignal(object)
+
+
+class SessionTab(QWidget):
+    """Output, input and counters of one port. The tab outlives its session so the log stays readable."""
+
+    close_requested = pyqtSignal(object)  # SessionTab
+    capture_toggled = pyqtSignal(object, bool)
+
+    def __init__(self, port: str, color: str, parent=None):
+        super().__init__(parent)
+        self.port = port
+        self.color = color
+        self.session: HubSession | None = None
+        self.capture_writer: CaptureWriter | None = None
+        self._last = (0, 0, 0)  # bytes in, lines in, bytes out at the previous stats tick
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        toolbar = QHBoxLayout()
+        self.stats_label = QLabel()
+        toolbar.addWidget(self.stats_label)
+        toolbar.addStretch()
+        self.capture_btn = QPushButton("Capture")
+        self.capture_btn.setCheckable(True)
+        self.capture_btn.setToolTip("Record everything received on this port to a log on disk")
+        self.capture_btn.toggled.connect(lambda checked: self.capture_toggled.emit(self, checked))
+        toolbar.addWidget(self.capture_btn)
+        clear_btn = QPushButton("Clear")
+        clear_btn.clicked.connect(lambda: self.output.clear_output())
+        toolbar.addWidget(clear_btn)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(lambda: self.close_requested.emit(self))
+        toolbar.addWidget(close_btn)
+        layout.addLayout(toolbar)
+
+        self.output = SerialOutputView()
+        layout.addWidget(self.output)
+
+        input_layout = QHBoxLayout()
+        self.input_line = QLineEdit()
+        self.input_line.setPlaceholderText(f"Send to {_short(port)} and press Enter...")
+        self.input_line.returnPressed.connect(self.send_data)
+        input_layout.addWidget(self.input_line)
+        self.send_btn = QPushButton("Send")
+        self.send_btn.clicked.connect(self.send_data)
+        input_layout.addWidget(self.send_btn)
+        layout.addLayout(input_layout)
+
+    def attach(self, session: HubSession):
+        self.session = session
+        self._last = (0, 0, 0)
+        self.input_line.setEnabled(True)
+        self.send_btn.setEnabled(True)
+
+    def detach(self):
+        self.input_line.setEnabled(False)
+        self.send_btn.setEnabled(False)
+
+    def send_data(self):
+        text = self.input_line.text()
+        if not text or not self.session or not self.session.is_open:
+            return
+        try:
+            self.session.write((text + "\n").encode("utf-8"))
+            self.output.message(f"> {text}")
+            self.input_line.clear()
+        except Exception as e:
+            self.output.message(f"Error sending: {e}")
+
+    def update_stats(self, elapsed: float) -> tuple[float, float]:
+        """Refresh the counters label; returns (bytes in, lines in) per second since the last call."""
+        if not self.session:
+            return 0.0, 0.0
+        stats = self.session.stats
+        now = (stats.bytes_in, stats.lines_in, stats.bytes_out)
+        rx, lines, tx = ((a - b) / elapsed for a, b in zip(now, self._last))
+        self._last = now
+        state = "" if self.session.is_open else "closed - "
+        self.stats_label.setText(
+            f"{state}RX {_rate(rx)}, {lines:.0f} lines/s, TX {_rate(tx)}  |  "
+            f"total {stats.bytes_in:,} bytes, {stats.lines_in:,} lines in, {stats.bytes_out:,} bytes out")
+        return (rx, lines) if self.session.is_open else (0.0, 0.0)
+
+
+class SerialHubPanel(QWidget):
+    """Opens several ports on one SerialHub thread: a tab, color and capture per port, plus an "All" tab
+    with every port's lines merged in receive-time order."""
+
+    DEFAULT_SCROLLBACK = 10000
+    MERGE_INTERVAL_MS = 50
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.capture_base = DEFAULT_CAPTURE_DIR
+        self.capture_segment_mb = DEFAULT_SEGMENT_MB
+        self.capture_max_mb = DEFAULT_MAX_MB
+        self.scrollback = self.DEFAULT_SCROLLBACK
+        self.port_busy = None  # Callback: port -> True if another part of the IDE has it open
+        self._tabs: dict[str, SessionTab] = {}
+        self._colors_used = 0
+        self._stats_at = time.monotonic()
+
+        self._bridge = _HubBridge(self)
+        self._bridge.data_received.connect(self._on_data)
+        self._bridge.error_occurred.connect(self._on_error)
+        self._bridge.session_closed.connect(self._on_closed)
+        self.hub = SerialHub(on_data=self._bridge.data_received.emit,
+                             on_error=self._bridge.error_occurred.emit,
+                             on_closed=self._bridge.session_closed.emit)
+        self.merger = LineMerger()
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        toolbar = QHBoxLayout()
+        toolbar.addWidget(QLabel("Port:"))
+        self.port_combo = QComboBox()
+        self.port_combo.setEditable(True)
+        self.port_combo.setMinimumWidth(220)
+        toolbar.addWidget(self.port_combo)
+        toolbar.addWidget(QLabel("Baud rate:"))
+        self.baud_combo = QComboBox()
+        self.baud_combo.addItems(BAUD_RATES)
+        self.baud_combo.setCurrentText("115200")
+        toolbar.addWidget(self.baud_combo)
+        open_btn = QPushButton("Open")
+        open_btn.clicked.connect(lambda: self.open_session())
+        toolbar.addWidget(open_btn)
+        open_capture_btn = QPushButton("Open Capture...")
+        open_capture_btn.clicked.connect(self.open_capture)
+        toolbar.addWidget(open_capture_btn)
+        toolbar.addStretch()
+        self.summary_label = QLabel("No ports open")
+        self.summary_label.setTextFormat(Qt.TextFormat.RichText)
+        toolbar.addWidget(self.summary_label)
+        layout.addLayout(toolbar)
+
+        self.tabs = QTabWidget()
+        self.tabs.setTabsClosable(True)
+        self.tabs.tabCloseRequested.connect(lambda i: self._close_tab(self.tabs.widget(i)))
+        self.merged_output = SerialOutputView()
+        self.tabs.addTab(self.merged_output, "All")
+        self.tabs.tabBar().setTabButton(0, QTabBar.ButtonPosition.RightSide, None)
+        layout.addWidget(self.tabs)
+        self.set_scrollback(self.scrollback)
+
+        self._merge_timer = QTimer(self)
+        self._merge_timer.setInterval(self.MERGE_INTERVAL_MS)
+        self._merge_timer.timeout.connect(self._merge)
+        self._merge_timer.start()
+        self._stats_timer = QTimer(self)
+        self._stats_timer.setInterval(1000)
+        self._stats_timer.timeout.connect(self._update_stats)
+        self._stats_timer.start()
+
+    def apply_settings(self, settings):
+        """Apply the "serial" settings shared with the serial monitor."""
+        self.set_scrollback(settings.get("serial", "scrollback_lines", self.DEFAULT_SCROLLBACK))
+        capture_dir = settings.get("serial", "capture_dir", "")
+        self.capture_base = pathlib.Path(capture_dir) if capture_dir else DEFAULT_CAPTURE_DIR
+        self.capture_segment_mb = settings.get("serial", "capture_segment_mb", DEFAULT_SEGMENT_MB)
+        self.capture_max_mb = settings.get("serial", "capture_max_mb", DEFAULT_MAX_MB)
+
+    def set_scrollback(self, lines: int):
+        self.scrollback = lines
+        self.merged_output.set_scrollback(lines)
+        for tab in self._tabs.values():
+            tab.output.set_scrollback(lines)
+
+    def set_ports(self, devices):
+        """Offer DeviceWatcher's ports in the port box, keeping whatever is typed or selected."""
+        current = self.port_combo.currentText()
+        self.port_combo.blockSignals(True)
+        self.port_combo.clear()
+        for dev in devices:
+            self.port_combo.addItem(dev.label, dev.port)
+        self.port_combo.setEditText(current)
+        self.port_combo.blockSignals(False)
+
+    def _combo_port(self) -> str:
+        index = self.port_combo.findText(self.port_combo.currentText())
+        if index >= 0 and self.port_combo.itemData(index):
+            return self.port_combo.itemData(index)
+        return self.port_combo.currentText().strip()
+
+    def open_session(self, port: str | None = None, baudrate: int | None = None) -> HubSession | None:
+        """Open `port` (default: the port box) in its own tab, reusing the tab of a closed session."""
+        port = port or self._combo_port()
+        if not port:
+            return None
+        tab = self._tabs.get(port)
+        if tab and tab.session and tab.session.is_open:
+            self.tabs.setCurrentWidget(tab)
+            return tab.session
+        if self.port_busy and self.port_busy(port):
+            self._tab_for(port).output.message(f"{port} is open in the Serial Monitor; disconnect it there first")
+            return None
+        baudrate = baudrate or int(self.baud_combo.currentText())
+        tab = self._tab_for(port)
+        try:
+            session = self.hub.open(port, baudrate)
+        except (serial.SerialException, OSError, ValueError) as e:
+            tab.output.message(f"Error connecting: {e}")
+            return None
+        tab.attach(session)
+        if tab.capture_btn.isChecked():
+            self._start_capture(tab)
+        tab.output.message(f"Connected to {port} at {baudrate} baud")
+        self.tabs.setCurrentWidget(tab)
+        return session
+
+    def _tab_for(self, port: str) -> SessionTab:
+        tab = self._tabs.get(port)
+        if tab is None:
+            color = SESSION_COLORS[self._colors_used % len(SESSION_COLORS)]
+            self._colors_used += 1
+            tab = SessionTab(port, color)
+            tab.output.set_scrollback(self.scrollback)
+            tab.close_requested.connect(self._close_tab)
+            tab.capture_toggled.connect(self._on_capture_toggled)
+            self._tabs[port] = tab
+            index = self.tabs.addTab(tab, _short(port))
+            self.tabs.tabBar().setTabTextColor(index, QColor(color))
+            self.tabs.setTabToolTip(index, port)
+        return tab
+
+    def close_session(self, port: str):
+        tab = self._tabs.get(port)
+        if tab and tab.session and tab.session.is_open:
+            self._stop_capture(tab)
+            self.hub.close(tab.session)
+
+    def _close_tab(self, tab):
+        if not isinstance(tab, SessionTab):
+            return  # The merged view stays
+        self.close_session(tab.port)
+        self._tabs.pop(tab.port, None)
+        self.tabs.removeTab(self.tabs.indexOf(tab))
+        tab.deleteLater()
+
+    def open_ports(self) -> list[str]:
+        return [s.port for s in self.hub.sessions if s.is_open]
+
+    def release_port(self, port: str) -> bool:
+        """Close `port` so an uploader can use it. Returns True if it was open here."""
+        if port not in self.open_ports():
+            return False
+        self.close_session(port)
+        self._tabs[port].output.message("[Port released for upload]")
+        return True
+
+    def reconnect(self, port: str, delay_ms: int = 500, attempts: int = 6):
+        """Reopen a released port once it reappears after the board resets."""
+        tab = self._tabs.get(port)
+        if not tab or not tab.session:
+            return
+        baudrate = tab.session.baudrate
+
+        def attempt(remaining):
+            if port not in self._tabs or port in self.open_ports():
+                return
+            present = any(p.device == port for p in serial.tools.list_ports.comports())
+            if not present and remaining > 1:
+                QTimer.singleShot(delay_ms, lambda: attempt(remaining - 1))
+                return
+            self.open_session(port, baudrate)
+        QTimer.singleShot(delay_ms, lambda: attempt(attempts))
+
+    def _on_data(self, session: HubSession, text: str, lines):
+        tab = self._tabs.get(session.port)
+        if tab is None or tab.session is not session:
+            return
+        tab.output.append_text(text)
+        if lines:
+            self.merger.push(tab, lines)
+
+    def _merge(self):
+        ready = self.merger.pop_ready()
+        for tab, line in ready:
+            self.merged_output.append_text(f"{_clock(line.timestamp)}  {_short(tab.port):<10} {line.text}\n", tab.color)
+
+    def _on_error(self, session: HubSession, message: str):
+        tab = self._tabs.get(session.port)
+        if tab and tab.session is session:
+            tab.output.message(f"[Serial Error] {message}")
+
+    def _on_closed(self, session: HubSession):
+        tab = self._tabs.get(session.port)
+        if tab and tab.session is session:
+            self._stop_capture(tab)
+            tab.detach()
+            tab.output.message("Disconnected")
+
+    def _on_capture_toggled(self, tab: SessionTab, checked: bool):
+        if not checked:
+            self._stop_capture(tab)
+        elif tab.session and tab.session.is_open:
+            self._start_capture(tab)
+        else:
+            tab.output.message("[Capture will start when connected]")
+
+    def _start_capture(self, tab: SessionTab):
+        if tab.capture_writer:
+            return
+        try:
+            tab.capture_writer = CaptureWriter(
+                capture_dir_for(tab.port, self.capture_base), self.capture_segment_mb, self.capture_max_mb,
+                port=tab.port, baudrate=tab.session.baudrate)
+        except OSError as e:
+            tab.output.message(f"Error starting capture: {e}")
+            tab.capture_btn.setChecked(False)
+            return
+        tab.session.set_capture(tab.capture_writer)
+        tab.output.message(f"[Capturing to {tab.capture_writer.directory}]")
+
+    def _stop_capture(self, tab: SessionTab):
+        writer = tab.capture_writer
+        if writer is None:
+            return
+        if tab.session:
+            tab.session.set_capture(None)
+        writer.close()
+        tab.capture_writer = None
+        tab.output.message(f"[Capture saved: {writer.lines} lines, {writer.bytes_written} bytes in {writer.directory}]")
+
+    def open_capture(self):
+        directory = QFileDialog.getExistingDirectory(self, "Open Serial Capture", str(self.capture_base))
+        if directory:
+            viewer = CaptureViewerDialog(pathlib.Path(directory), self)
+            viewer.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+            viewer.show()
+
+    def _update_stats(self):
+        now = time.monotonic()
+        elapsed, self._stats_at = max(now - self._stats_at, 1e-3), now
+        parts = []
+        for tab in self._tabs.values():
+            rx, lines = tab.update_stats(elapsed)
+            if tab.session and tab.session.is_open:
+                parts.append(f'<span style="color:{tab.color}">&#9632; {_short(tab.port)}</span> '
+                             f'{_rate(rx)} ({lines:.0f} lines/s)')
+        self.summary_label.setText("&nbsp;&nbsp;".join(parts) if parts else "No ports open")
+
+    def shutdown(self):
+        """Stop captures and close every port (call when the IDE closes)."""
+        for tab in self._tabs.values():
+            self._stop_capture(tab)
+        self._merge_timer.stop()
+        self._stats_timer.stop()
+        self.hub.shutdown()
@@ -1,59 +1,194 @@
 """Serial monitor widget for communicating with microcontroller."""
 
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QTextEdit, 
-    QLineEdit, QPushButton, QComboBox, QLabel
+    QWidget, QVBoxLayout, QHBoxLayout,
+    QLineEdit, QPushButton, QComboBox, QLabel, QFileDialog, QProgressBar
 )
-from PyQt6.QtCore import QThread, pyqtSignal, Qt
-from PyQt6.QtGui import QFont
+from PyQt6.QtCore import QObject, QThread, QTimer, pyqtSignal, Qt
+import os
+import pathlib
+import re
+import select
+import threading
+import time
 import serial
 import serial.tools.list_ports
 
+from vb2arduino.serial_capture import (
+    DEFAULT_CAPTURE_DIR, DEFAULT_MAX_MB, DEFAULT_SEGMENT_MB, CaptureWriter, capture_dir_for
+)
+from vb2arduino.profiler import FrameParser
+from vb2arduino.serial_filter import MESSAGE, LineIndex, Rule, RuleSet
+from vb2arduino.serial_send import SendOptions, SendQueue
+from vb2arduino.serial_stream import LineAssembler
+from vb2arduino.ide.capture_viewer import CaptureViewerDialog
+from vb2arduino.ide.send_file_dialog import SendFileDialog
+from vb2arduino.ide.serial_output import SerialOutputView
+
+BAUD_RATES = [
+    "300", "1200", "2400", "4800", "9600",
+    "19200", "38400", "57600", "74880", "115200",
+    "230400", "250000", "500000", "1000000", "2000000"
+]
+
 
 class SerialReader(QThread):
-    """Thread for reading from serial port."""
-    
-    data_received = pyqtSignal(str)
+    """Thread for reading from serial port.
+
+    Sleeps until data arrives: on POSIX it selects on the port's file
+    descriptor together with a wake-up pipe used by stop(); elsewhere it
+    blocks in read() with a short timeout (set on the port by the caller).
+    Bytes are decoded incrementally, so characters and lines split across
+    reads arrive intact.
+    """
+
+    READ_TIMEOUT_S = 0.1  # Blocking-read fallback: how long stop() may wait for read() to return
+
+    data_received = pyqtSignal(str)  # Decoded text, partial lines included (for display)
+    lines_received = pyqtSignal(object)  # list[SerialLine] completed by one read
+    profile_frames = pyqtSignal(object)  # list[ProfileFrame] taken out of the stream by frame_parser
     error_occurred = pyqtSignal(str)
     
     def __init__(self, serial_port):
         super().__init__()
         self.serial_port = serial_port
+        self.assembler = LineAssembler()
+        self._capture = None
+        self._capture_lock = threading.Lock()
+        self.line_listener = None  # Called on this thread with each list of lines (send queue ACKs)
+        self.frame_parser = None  # FrameParser, set while the sketch may send profile frames
         self.running = True
         self.daemon = True
-        
+        self._wake_r = self._wake_w = None
+        if os.name == "posix":
+            self._wake_r, self._wake_w = os.pipe()
+
+    def set_capture(self, writer):
+        """Start (or with None, stop) writing raw bytes to a CaptureWriter. Returns the previous one."""
+        with self._capture_lock:
+            old, self._capture = self._capture, writer
+        return old
+
+    def _port_fd(self):
+        if self._wake_r is None:
+            return None
+        try:
+            return self.serial_port.fileno()
+        except (AttributeError, ValueError, OSError, serial.SerialException):
+            return None
+
     def run(self):
         """Read data from serial port."""
+        port = self.serial_port
+        fd = self._port_fd()
         try:
-            while self.running:
+            while self.running and port and port.is_open:
                 try:
-                    if self.serial_port and self.serial_port.is_open:
-                        if self.serial_port.in_waiting > 0:
-                            data = self.serial_port.read(self.serial_port.in_waiting).decode('utf-8', errors='ignore')
-                            if data:
-                                self.data_received.emit(data)
+                    if fd is not None:
+                        ready, _, _ = select.select([fd, self._wake_r], [], [])
+                        if not self.running or fd not in ready:
+                            break
+                        # An empty in_waiting here means the device went away; read() then raises
+                        data = port.read(port.in_waiting or 1)
+                    else:
+                        data = port.read(1)  # Returns on the first byte or after the port timeout
+                        if data and port.in_waiting:
+                            data += port.read(port.in_waiting)
+                    if data:
+                        now = time.time()
+                        if self._capture:
+                            with self._capture_lock:
+                                if self._capture:
+                                    self._capture.write(data, now)
+                                    self._capture.flush()
+                        parser = self.frame_parser
+                        if parser:
+                            data, frames = parser.feed(data)
+                            if frames:
+                                self.profile_frames.emit(frames)
+                        text, lines = self.assembler.feed(data, now)
+                        if text:
+                            self.data_received.emit(text)
+                        if lines:
+                            if self.line_listener:
+                                self.line_listener(lines)
+                            self.lines_received.emit(lines)
                 except Exception as e:
                     if self.running:
                         self.error_occurred.emit(f"Read error: {str(e)}")
                     break
-                self.msleep(50)
         except Exception as e:
             self.error_occurred.emit(f"Thread error: {str(e)}")
+        tail = self.assembler.flush()
+        if tail:
+            self.lines_received.emit([tail])
             
     def stop(self):
         """Stop the reader thread."""
         self.running = False
-        self.wait(1000)
+        if self._wake_w is not None:
+            try:
+                os.write(self._wake_w, b"\0")
+            except OSError:
+                pass
+        if not self.isRunning() or self.wait(1000):
+            for fd in (self._wake_r, self._wake_w):
+                if fd is not None:
+                    os.close(fd)
+            self._wake_r = self._wake_w = None
+
+
+class _SendBridge(QObject):
+    """Carries SendQueue callbacks from the writer thread to the GUI thread."""
+
+    progress = pyqtSignal(object)  # SendJob
+    finished = pyqtSignal(object)
 
 
 class SerialMonitor(QWidget):
-    """Serial monitor for communicating with microcontroller."""
-    
-    def __init__(self):
+    """Serial monitor for communicating with microcontroller.
+
+    Incoming text is written to the view in one insert per frame (see
+    SerialOutputView), and the view keeps only the last `scrollback_lines`
+    lines.
+
+    Every received line is tagged against the filter and highlight rules as
+    it arrives and kept in a LineIndex alongside the view. While a filter or
+    a highlight rule is active the view shows whole lines, filtered and
+    colored from their tags; changing the filter redraws from the index.
+    """
+
+    DEFAULT_SCROLLBACK = 10000
+    FILTER_HISTORY = 10  # Recent filters kept compiled and tagged, so switching back is instant
+
+    lines_received = pyqtSignal(object)  # list[SerialLine] from the device, for line-based consumers
+    profile_frames = pyqtSignal(object)  # list[ProfileFrame] from a sketch built with profiling
+
+    def __init__(self, scrollback_lines: int = DEFAULT_SCROLLBACK):
         super().__init__()
         self.serial_port = None
         self.reader_thread = None
+        self.capture_base = DEFAULT_CAPTURE_DIR
+        self.capture_segment_mb = DEFAULT_SEGMENT_MB
+        self.capture_max_mb = DEFAULT_MAX_MB
+        self.capture_writer = None
+        self.rules = RuleSet()
+        self.line_index = LineIndex(scrollback_lines)
+        self.filter_bit = None  # Rule bit of the active filter
+        self.filter_history: list[str] = []
+        self._highlight_specs: list[tuple[str, str, bool]] = []  # As last applied by set_highlight_rules
+        self._settings = None
+        self._shown = 0  # Lines that passed the filter since the view was last redrawn
+        self.profiling = False  # Take profile frames out of the stream instead of showing them
+        self.send_queue = None
+        self.send_options = SendOptions()  # Last used for Send File
+        self.send_dir = ""
+        self._file_jobs: set[int] = set()  # Ids of queued file jobs (typed lines are not reported)
+        self._send_bridge = _SendBridge()
+        self._send_bridge.progress.connect(self._on_send_progress)
+        self._send_bridge.finished.connect(self._on_send_finished)
         self.init_ui()
+        self.set_scrollback(scrollback_lines)
         
     def init_ui(self):
         """Initialize UI."""
@@ -66,11 +201,7 @@ class SerialMonitor(QWidget):
         # Baud rate selector
         toolbar.addWidget(QLabel("Baud rate:"))
         self.baud_combo = QComboBox()
-        self.baud_combo.addItems([
-            "300", "1200", "2400", "4800", "9600", 
-            "19200", "38400", "57600", "74880", "115200", 
-            "230400", "250000", "500000", "1000000", "2000000"
-        ])
+        self.baud_combo.addItems(BAUD_RATES)
         self.baud_combo.setCurrentText("115200")
         self.baud_combo.setMaximumWidth(100)
         toolbar.addWidget(self.baud_combo)
@@ -88,15 +219,36 @@ class SerialMonitor(QWidget):
         self.clear_btn.setMaximumWidth(80)
         self.clear_btn.clicked.connect(self.clear_output)
         toolbar.addWidget(self.clear_btn)
+
+        # Capture to disk
+        self.capture_btn = QPushButton("Capture")
+        self.capture_btn.setCheckable(True)
+        self.capture_btn.setToolTip("Record everything received to a log on disk")
+        self.capture_btn.toggled.connect(self.toggle_capture)
+        toolbar.addWidget(self.capture_btn)
+        self.open_capture_btn = QPushButton("Open Capture...")
+        self.open_capture_btn.clicked.connect(lambda: self.open_capture())
+        toolbar.addWidget(self.open_capture_btn)
         
+        toolbar.addSpacing(20)
+        toolbar.addWidget(QLabel("Filter:"))
+        self.filter_combo = QComboBox()
+        self.filter_combo.setEditable(True)
+        self.filter_combo.setInsertPolicy(QComboBox.InsertPolicy.NoInsert)
+        self.filter_combo.setMinimumWidth(200)
+        self.filter_combo.lineEdit().setPlaceholderText("Regex, e.g. ERR|WARN (Enter to apply)")
+        self.filter_combo.lineEdit().returnPressed.connect(lambda: self.set_filter(self.filter_combo.currentText()))
+        self.filter_combo.textActivated.connect(self.set_filter)
+        toolbar.addWidget(self.filter_combo)
+        self.filter_status = QLabel()
+        toolbar.addWidget(self.filter_status)
+
         toolbar.addStretch()
         
         layout.addLayout(toolbar)
         
         # Output text area
-        self.output_text = QTextEdit()
-        self.output_text.setReadOnly(True)
-        self.output_text.setFont(QFont("Courier New", 10))
+        self.output_text = SerialOutputView()
         layout.addWidget(self.output_text)
         
         # Input area
@@ -110,6 +262,20 @@ class SerialMonitor(QWidget):
         self.send_btn.clicked.connect(self.send_data)
         self.send_btn.setMaximumWidth(80)
         input_layout.addWidget(self.send_btn)
+
+        self.send_file_btn = QPushButton("Send File...")
+        self.send_file_btn.setToolTip("Stream a file to the device with chunking, pacing and flow control")
+        self.send_file_btn.clicked.connect(lambda: self.send_file())
+        input_layout.addWidget(self.send_file_btn)
+        self.send_progress = QProgressBar()
+        self.send_progress.setMaximumWidth(260)
+        self.send_progress.setVisible(False)
+        input_layout.addWidget(self.send_progress)
+        self.send_cancel_btn = QPushButton("Cancel")
+        self.send_cancel_btn.setToolTip("Stop sending and drop everything queued")
+        self.send_cancel_btn.clicked.connect(self.cancel_send)
+        self.send_cancel_btn.setVisible(False)
+        input_layout.addWidget(self.send_cancel_btn)
         
         layout.addLayout(input_layout)
         
@@ -137,12 +303,12 @@ class SerialMonitor(QWidget):
     def connect_serial(self):
         """Connect to serial port."""
         if not hasattr(self, 'port_name') or not self.port_name:
-            self.output_text.append("Error: No port selected\n")
+            self._message("Error: No port selected")
             return
         
         # Prevent multiple connections
         if self.reader_thread and self.reader_thread.isRunning():
-            self.output_text.append("Already connected\n")
+            self._message("Already connected")
             return
             
         try:
@@ -155,30 +321,45 @@ class SerialMonitor(QWidget):
             self.serial_port = serial.Serial(
                 port=self.port_name,
                 baudrate=baud_rate,
-                timeout=1,
+                timeout=SerialReader.READ_TIMEOUT_S,
                 write_timeout=1
             )
             
             # Start reader thread
             self.reader_thread = SerialReader(self.serial_port)
-            self.reader_thread.data_received.connect(self.append_output)
+            self.reader_thread.data_received.connect(self._on_text)
+            self.reader_thread.lines_received.connect(self._on_lines)
+            self.reader_thread.lines_received.connect(self.lines_received)
+            self.reader_thread.profile_frames.connect(self.profile_frames)
+            self.reader_thread.frame_parser = FrameParser() if self.profiling else None
             self.reader_thread.error_occurred.connect(self.on_reader_error)
+            self.send_queue = SendQueue(self.serial_port, self._send_bridge.progress.emit,
+                                        self._send_bridge.finished.emit)
+            self.reader_thread.line_listener = self.send_queue.ack_lines
             self.reader_thread.start()
+            if self.capture_btn.isChecked():
+                self._start_capture()
             
             self.connect_btn.setText("Disconnect")
-            self.output_text.append(f"Connected to {self.port_name} at {baud_rate} baud\n")
+            self._message(f"Connected to {self.port_name} at {baud_rate} baud")
             
         except serial.SerialException as e:
-            self.output_text.append(f"Error connecting: {str(e)}\n")
+            self._message(f"Error connecting: {str(e)}")
             self.serial_port = None
         except Exception as e:
-            self.output_text.append(f"Unexpected error: {str(e)}\n")
+            self._message(f"Unexpected error: {str(e)}")
             self.serial_port = None
             
     def disconnect_serial(self):
         """Disconnect from serial port."""
         try:
-            # Stop reader thread first
+            # Stop the writer and reader threads first
+            if self.send_queue:
+                self.send_queue.close()
+                self.send_queue = None
+                self._file_jobs.clear()
+                self._update_send_progress()
+            self._stop_capture()
             if self.reader_thread:
                 self.reader_thread.stop()
                 # Wait for thread to finish (with timeout)
@@ -197,44 +378,322 @@ class SerialMonitor(QWidget):
                 self.serial_port = None
             
             self.connect_btn.setText("Connect")
-            self.output_text.append("Disconnected\n")
+            self._message("Disconnected")
             
         except Exception as e:
-            self.output_text.append(f"Error disconnecting: {str(e)}\n")
+            self._message(f"Error disconnecting: {str(e)}")
             
+    def is_connected(self) -> bool:
+        return bool(self.serial_port and self.serial_port.is_open)
+
+    def release_port(self) -> bool:
+        """Close the port so an uploader can use it. Returns True if it was open."""
+        if not self.is_connected():
+            return False
+        self.disconnect_serial()
+        self._message("[Port released for upload]")
+        return True
+
+    def reconnect(self, delay_ms: int = 500, attempts: int = 6):
+        """Reopen the port after an upload, retrying while the board resets and re-enumerates."""
+        def attempt(remaining):
+            if self.is_connected() or not getattr(self, 'port_name', None):
+                return
+            # Wait for the port to reappear rather than opening it, which would reset some boards
+            present = any(p.device == self.port_name for p in serial.tools.list_ports.comports())
+            if not present and remaining > 1:
+                QTimer.singleShot(delay_ms, lambda: attempt(remaining - 1))
+                return
+            self.connect_serial()
+        QTimer.singleShot(delay_ms, lambda: attempt(attempts))
+
+    def set_profiling(self, enabled: bool):
+        """Decode profile frames (and hide them from the output) from now on."""
+        self.profiling = enabled
+        if self.reader_thread and bool(self.reader_thread.frame_parser) != enabled:
+            self.reader_thread.frame_parser = FrameParser() if enabled else None
+
     def send_data(self):
-        """Send data to serial port."""
-        if not self.serial_port or not self.serial_port.is_open:
-            self.output_text.append("Error: Not connected\n")
+        """Queue the input line for sending (after any file still being sent)."""
+        if not self.send_queue:
+            self._message("Error: Not connected")
             return
             
         text = self.input_line.text()
         if text:
-            try:
-                self.serial_port.write((text + "\n").encode('utf-8'))
-                self.output_text.append(f"> {text}\n")
-                self.input_line.clear()
-            except Exception as e:
-                self.output_text.append(f"Error sending: {str(e)}\n")
-                
-    def append_output(self, text):
-        """Append text to output."""
+            self.send_queue.submit(text, (text + "\n").encode('utf-8'))
+            self._message(f"> {text}")
+            self.input_line.clear()
+
+    def send_file(self, path=None, options: SendOptions | None = None):
+        """Queue a file for sending; without a path, ask for it and for the pacing options."""
+        if not self.send_queue:
+            self._message("Error: Not connected")
+            return
+        if path is None:
+            dialog = SendFileDialog(self.send_options, self.send_dir, self)
+            if not dialog.exec():
+                return
+            path, options = dialog.path(), dialog.options()
+            self.send_options, self.send_dir = options, str(path.parent)
+            if self._settings:
+                self._settings.set("serial", "send_options", options.to_dict())
+                self._settings.save()
+        path = pathlib.Path(path)
         try:
-            self.output_text.moveCursor(self.output_text.textCursor().End)
-            self.output_text.insertPlainText(text)
-            self.output_text.moveCursor(self.output_text.textCursor().End)
-        except Exception:
-            pass  # Ignore errors in GUI updates
-    
+            data = path.read_bytes()
+        except OSError as e:
+            self._message(f"Error reading {path}: {e}")
+            return
+        job = self.send_queue.submit(path.name, data, options or self.send_options)
+        self._file_jobs.add(job.id)
+        self._message(f"[Sending {path.name}: {job.total:,} bytes]")
+        self._update_send_progress()
+        return job
+
+    def cancel_send(self):
+        if self.send_queue:
+            self.send_queue.cancel()
+
+    def _on_send_progress(self, job):
+        self._update_send_progress(job)
+
+    def _on_send_finished(self, job):
+        if job.state == "failed":
+            self._message(f"[Send failed: {job.name}: {job.error}]")
+        elif job.state == "cancelled":
+            self._message(f"[Send cancelled: {job.name} after {job.sent:,} of {job.total:,} bytes]")
+        elif job.id in self._file_jobs:
+            self._message(f"[Sent {job.name}: {job.total:,} bytes in {job.finished - job.started:.1f} s]")
+        self._file_jobs.discard(job.id)
+        self._update_send_progress()
+
+    def _update_send_progress(self, job=None):
+        """Show the running job's progress while anything is queued or sending."""
+        queue = self.send_queue
+        job = job or (queue.current if queue else None)
+        pending = queue.pending() if queue else []
+        current = queue.current if queue else None
+        busy = bool(pending or (current and current.state == "sending"))
+        self.send_progress.setVisible(busy)
+        self.send_cancel_btn.setVisible(busy)
+        if busy and job and job.state == "sending":
+            self.send_progress.setMaximum(max(1, job.total))
+            self.send_progress.setValue(job.sent)
+            more = f" (+{len(pending)} queued)" if pending else ""
+            self.send_progress.setFormat(f"{job.name}: %p% at {job.rate / 1024:.1f} KB/s{more}")
+
+    def apply_settings(self, settings):
+        """Apply the "serial" settings (scrollback, capture location/limits, highlight rules, filters)."""
+        self._settings = settings
+        self.set_scrollback(settings.get("serial", "scrollback_lines", self.DEFAULT_SCROLLBACK))
+        self.filter_history = list(settings.get("serial", "filter_history", []))[:self.FILTER_HISTORY]
+        self.filter_combo.blockSignals(True)
+        text = self.filter_combo.currentText()
+        self.filter_combo.clear()
+        self.filter_combo.addItems(["", *self.filter_history])
+        self.filter_combo.setEditText(text)
+        self.filter_combo.blockSignals(False)
+        self.set_highlight_rules(settings.get("serial", "highlight_rules", []))
+        self.send_options = SendOptions.from_dict(settings.get("serial", "send_options", {}))
+        capture_dir = settings.get("serial", "capture_dir", "")
+        self.capture_base = pathlib.Path(capture_dir) if capture_dir else DEFAULT_CAPTURE_DIR
+        self.capture_segment_mb = settings.get("serial", "capture_segment_mb", DEFAULT_SEGMENT_MB)
+        self.capture_max_mb = settings.get("serial", "capture_max_mb", DEFAULT_MAX_MB)
+
+    def toggle_capture(self, checked: bool):
+        """Start or stop capturing (a capture armed while disconnected starts on connect)."""
+        if checked:
+            if self.reader_thread and self.reader_thread.isRunning():
+                self._start_capture()
+            else:
+                self._message("[Capture will start when connected]")
+        else:
+            self._stop_capture()
+
+    def _start_capture(self):
+        if self.capture_writer:
+            return
+        try:
+            self.capture_writer = CaptureWriter(
+                capture_dir_for(self.port_name, self.capture_base), self.capture_segment_mb,
+                self.capture_max_mb, port=self.port_name, baudrate=int(self.baud_combo.currentText()))
+        except OSError as e:
+            self._message(f"Error starting capture: {e}")
+            self.capture_btn.setChecked(False)
+            return
+        self.reader_thread.set_capture(self.capture_writer)
+        self.capture_btn.setToolTip(f"Capturing to {self.capture_writer.directory}")
+        self._message(f"[Capturing to {self.capture_writer.directory}]")
+
+    def _stop_capture(self):
+        writer = self.capture_writer
+        if writer is None:
+            return
+        if self.reader_thread:
+            self.reader_thread.set_capture(None)
+        writer.close()
+        self.capture_writer = None
+        self.capture_btn.setToolTip("Record everything received to a log on disk")
+        self._message(f"[Capture saved: {writer.lines} lines, {writer.bytes_written} bytes in {writer.directory}]")
+
+    def open_capture(self, directory=None):
+        """Open a capture in the viewer (asks for the directory if none is given)."""
+        if not directory:
+            start = self.capture_writer.directory if self.capture_writer else self.capture_base
+            directory = QFileDialog.getExistingDirectory(self, "Open Serial Capture", str(start))
+            if not directory:
+                return
+        viewer = CaptureViewerDialog(pathlib.Path(directory), self)
+        viewer.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        viewer.show()
+
+    def set_scrollback(self, lines: int):
+        """Keep at most `lines` lines in the view (0 = unlimited); older lines are dropped."""
+        self.output_text.set_scrollback(lines)
+        self.line_index.set_max_lines(max(0, int(lines)))
+
+    def _line_mode(self) -> bool:
+        """True while the view shows filtered/highlighted whole lines rather than the raw stream."""
+        return self.filter_bit is not None or bool(self.rules.highlight_mask)
+
+    def _filter_mask(self) -> int:
+        return 0 if self.filter_bit is None else 1 << self.filter_bit
+
+    def _on_text(self, text):
+        if not self._line_mode():
+            self.output_text.append_text(text)
+
+    def _on_lines(self, lines):
+        """Tag each arriving line, index it, and show it if line mode is on and it passes the filter."""
+        rules, index = self.rules, self.line_index
+        line_mode = self._line_mode()
+        mask = self._filter_mask()
+        runs = []  # [text parts, color]
+        for line in lines:
+            tags = rules.tag(line.text)
+            index.append(line.text, tags)
+            if line_mode and (not mask or tags & mask):
+                color = rules.color_for(tags)
+                if runs and runs[-1][1] == color:
+                    runs[-1][0].append(line.text)
+                else:
+                    runs.append(([line.text], color))
+                self._shown += 1
+        for parts, color in runs:
+            self.output_text.append_text("\n".join(parts) + "\n", color)
+        if mask:
+            self._update_filter_status()
+
+    def _update_filter_status(self):
+        if self.filter_bit is None:
+            self.filter_status.clear()
+        else:
+            self.filter_status.setText(f"{self._shown:,} matching lines")
+
+    def refresh_view(self):
+        """Redraw the view from the line index (no rules are re-run)."""
+        self.output_text.clear_output()
+        self._shown = 0
+        mask = self._filter_mask()
+        runs = []
+        for text, tags in self.line_index.lines(mask):
+            color = None if tags & MESSAGE else self.rules.color_for(tags)
+            if runs and runs[-1][1] == color:
+                runs[-1][0].append(text)
+            else:
+                runs.append(([text], color))
+            self._shown += not tags & MESSAGE
+        for parts, color in runs:
+            self.output_text.append_text("\n".join(parts) + "\n", color)
+        self.output_text.flush()
+        self._update_filter_status()
+
+    def _add_rule(self, pattern: str, color: str | None = None, ignore_case: bool = False) -> int | None:
+        """Add a rule, tagging the stored lines once if it is new. Returns its bit (None if invalid)."""
+        try:
+            bit, new = self.rules.add(Rule(pattern, color, ignore_case))
+        except (re.error, ValueError) as e:
+            self.filter_status.setText(f"Invalid pattern: {e}")
+            return None
+        if new:
+            self.line_index.retag(self.rules, bit)
+        return bit
+
+    def set_filter(self, pattern: str):
+        """Show only lines matching `pattern` (all lines if empty)."""
+        pattern = pattern.strip()
+        if not pattern:
+            self.filter_bit = None
+        else:
+            bit = self._add_rule(pattern)
+            if bit is None:
+                return
+            self.filter_bit = bit
+            self._remember_filter(pattern)
+        self.refresh_view()
+
+    def _remember_filter(self, pattern: str):
+        if pattern in self.filter_history:
+            self.filter_history.remove(pattern)
+        self.filter_history.insert(0, pattern)
+        for old in self.filter_history[self.FILTER_HISTORY:]:
+            bit = self.rules.find(old)
+            if bit is not None and not self.rules.rule(bit).color:
+                self.rules.remove(bit)
+        del self.filter_history[self.FILTER_HISTORY:]
+        self.filter_combo.blockSignals(True)
+        self.filter_combo.clear()
+        self.filter_combo.addItems(["", *self.filter_history])
+        self.filter_combo.setCurrentText(pattern)
+        self.filter_combo.blockSignals(False)
+        if self._settings:
+            self._settings.set("serial", "filter_history", list(self.filter_history))
+            self._settings.save()
+
+    def set_highlight_rules(self, rules: list[dict]):
+        """Replace the highlight rules: dicts with "pattern", "color" and optional "ignore_case"."""
+        specs = [(spec["pattern"], spec.get("color") or "#D93025", bool(spec.get("ignore_case")))
+                 for spec in rules if spec.get("pattern")]
+        if specs == self._highlight_specs:
+            return  # Unchanged (e.g. settings saved for another reason): keep the view as it is
+        self._highlight_specs = specs
+        keep = {self.rules.rule(self.filter_bit).pattern} if self.filter_bit is not None else set()
+        keep.update(self.filter_history)
+        for bit, rule in list(self.rules):
+            if rule.color:
+                rule.color = None
+                if rule.pattern not in keep or rule.ignore_case:
+                    self.rules.remove(bit)
+        for pattern, color, ignore_case in specs:
+            self._add_rule(pattern, color, ignore_case)
+        self.refresh_view()
+
+    def append_output(self, text):
+        """Queue text for the next frame."""
+        self.output_text.append_text(text)
+
+    def _message(self, text):
+        """Show a monitor message on a line of its own."""
+        self.line_index.append(text, MESSAGE)
+        self.output_text.message(text)
+
+    def flush_output(self):
+        """Write everything queued since the last frame."""
+        self.output_text.flush()
+
     def on_reader_error(self, error_msg):
         """Handle errors from reader thread."""
-        self.append_output(f"[Serial Error] {error_msg}\n")
+        self._message(f"[Serial Error] {error_msg}")
         # Auto-disconnect on error
         self.disconnect_serial()
         
     def clear_output(self):
         """Clear output text."""
-        self.output_text.clear()
+        self.output_text.clear_output()
+        self.line_index.clear()
+        self._shown = 0
+        self._update_filter_status()
         
     def closeEvent(self, event):
         """Handle close event."""
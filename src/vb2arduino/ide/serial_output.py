@@ -0,0 +1,98 @@
+"""Read-only text view for serial output, written in batches once per frame."""
+
+from collections import deque
+
+from PyQt6.QtWidgets import QPlainTextEdit
+from PyQt6.QtCore import QTimer
+from PyQt6.QtGui import QFont, QTextCursor, QTextCharFormat, QColor
+
+
+class SerialOutputView(QPlainTextEdit):
+    """Queues appended text and inserts it in one edit per frame.
+
+    Text can carry a color; consecutive runs of the same color are merged
+    before insertion. Only the last `scrollback` lines are kept.
+    """
+
+    FLUSH_INTERVAL_MS = 33  # ~30 redraws per second however fast data arrives
+    PENDING_LIMIT = 4 * 1024 * 1024  # Characters queued between flushes before the oldest are dropped
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.setUndoRedoEnabled(False)
+        self.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        self.setFont(QFont("Courier New", 10))
+        self._pending = deque()  # (text, color or None)
+        self._pending_size = 0
+        self._dropped = 0
+        self.at_line_start = True
+        self._formats: dict[str | None, QTextCharFormat] = {None: QTextCharFormat()}
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self.flush)
+
+    def set_scrollback(self, lines: int):
+        """Keep at most `lines` lines (0 = unlimited); older lines are dropped."""
+        self.setMaximumBlockCount(max(0, int(lines)))
+
+    def append_text(self, text: str, color: str | None = None):
+        """Queue text for the next frame."""
+        if not text:
+            return
+        self._pending.append((text, color))
+        self._pending_size += len(text)
+        self.at_line_start = text.endswith("\n")
+        while self._pending_size > self.PENDING_LIMIT and len(self._pending) > 1:
+            dropped, _ = self._pending.popleft()
+            self._pending_size -= len(dropped)
+            self._dropped += len(dropped)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def message(self, text: str, color: str | None = None):
+        """Show a message on a line of its own."""
+        self.append_text(("" if self.at_line_start else "\n") + text + "\n", color)
+
+    def _format(self, color: str | None) -> QTextCharFormat:
+        fmt = self._formats.get(color)
+        if fmt is None:
+            fmt = self._formats[color] = QTextCharFormat()
+            fmt.setForeground(QColor(color))
+        return fmt
+
+    def flush(self):
+        """Write everything queued since the last frame."""
+        if not self._pending:
+            return
+        runs: list[tuple[list[str], str | None]] = []
+        for text, color in self._pending:
+            if runs and runs[-1][1] == color:
+                runs[-1][0].append(text)
+            else:
+                runs.append(([text], color))
+        self._pending.clear()
+        self._pending_size = 0
+        if self._dropped:
+            runs.insert(0, ([f"[... {self._dropped} characters dropped ...]\n"], None))
+            self._dropped = 0
+        try:
+            scrollbar = self.verticalScrollBar()
+            follow = scrollbar.value() >= scrollbar.maximum()
+            cursor = QTextCursor(self.document())
+            cursor.movePosition(QTextCursor.MoveOperation.End)
+            for parts, color in runs:
+                cursor.insertText("".join(parts), self._format(color))
+            if follow:
+                scrollbar.setValue(scrollbar.maximum())
+        except Exception:
+            pass  # Ignore errors in GUI updates
+
+    def clear_output(self):
+        """Drop queued and shown text."""
+        self._pending.clear()
+        self._pending_size = 0
+        self._dropped = 0
+        self.at_line_start = True
+        self.clear()
@@ -37,6 +37,22 @@ class Settings:
             "string_bold": False,
             "comment_color": "#008000",
             "comment_italic": True,
+        },
+        "build": {
+            "cache_enabled": True,  # Shared compiler cache (see vb2arduino.build_cache)
+            "cache_dir": "",  # Empty: ~/.asic/build_cache
+            "cache_max_mb": 1024,
+            "profile": "off",  # Sketch > Profile on Device: off, procs or lines (vb2arduino.profiler)
+            "profile_interval_ms": 1000,  # How often a profiled sketch sends its counters
+        },
+        "serial": {
+            "scrollback_lines": 10000,  # Serial monitor keeps this many lines (0 = unlimited)
+            "capture_dir": "",  # Empty: ~/.asic/captures
+            "capture_segment_mb": 64,
+            "capture_max_mb": 2048,  # Oldest segments of a capture are deleted beyond this
+            "highlight_rules": [],  # {"pattern": regex, "color": "#rrggbb", "ignore_case": bool}
+            "filter_history": [],  # Recent serial monitor filters, most recent first
+            "send_options": {},  # Last Send File chunking/pacing/flow control (SendOptions fields)
         }
     }
     
@@ -3,10 +3,15 @@
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QTabWidget, QWidget,
     QLabel, QLineEdit, QSpinBox, QPushButton, QColorDialog,
-    QFormLayout, QCheckBox, QFontComboBox, QGroupBox
+    QFormLayout, QCheckBox, QFontComboBox, QGroupBox, QTableWidget, QTableWidgetItem,
+    QHeaderView, QMessageBox
 )
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QColor, QFont
+import re
+
+from vb2arduino.build_cache import DEFAULT_CACHE_DIR, BuildCache
+from vb2arduino.serial_capture import DEFAULT_CAPTURE_DIR
 
 
 class SettingsDialog(QDialog):
@@ -30,6 +35,8 @@ class SettingsDialog(QDialog):
         tabs = QTabWidget()
         tabs.addTab(self.create_editor_tab(), "Editor")
         tabs.addTab(self.create_syntax_tab(), "Syntax Colors")
+        tabs.addTab(self.create_build_tab(), "Build")
+        tabs.addTab(self.create_serial_tab(), "Serial Monitor")
         layout.addWidget(tabs)
         
         # Buttons
@@ -110,6 +117,146 @@ class SettingsDialog(QDialog):
         widget.setLayout(layout)
         return widget
         
+    def create_build_tab(self):
+        """Create build settings tab (shared compiler cache)."""
+        widget = QWidget()
+        layout = QVBoxLayout()
+
+        cache_group = QGroupBox("Compiler Cache")
+        cache_layout = QFormLayout()
+        self.cache_enabled_cb = QCheckBox("Reuse compiled objects across projects and cleans")
+        cache_layout.addRow("Enabled:", self.cache_enabled_cb)
+        self.cache_dir_edit = QLineEdit()
+        self.cache_dir_edit.setPlaceholderText(str(DEFAULT_CACHE_DIR))
+        cache_layout.addRow("Directory:", self.cache_dir_edit)
+        self.cache_max_mb = QSpinBox()
+        self.cache_max_mb.setRange(64, 65536)
+        self.cache_max_mb.setSingleStep(256)
+        self.cache_max_mb.setSuffix(" MB")
+        cache_layout.addRow("Size Limit:", self.cache_max_mb)
+
+        usage_row = QHBoxLayout()
+        self.cache_usage_label = QLabel()
+        usage_row.addWidget(self.cache_usage_label)
+        usage_row.addStretch()
+        clear_btn = QPushButton("Clear Cache")
+        clear_btn.clicked.connect(self.clear_cache)
+        usage_row.addWidget(clear_btn)
+        cache_layout.addRow("Usage:", usage_row)
+        cache_group.setLayout(cache_layout)
+        layout.addWidget(cache_group)
+
+        layout.addStretch()
+        widget.setLayout(layout)
+        return widget
+
+    def create_serial_tab(self):
+        """Create serial monitor settings tab."""
+        widget = QWidget()
+        layout = QVBoxLayout()
+
+        view_group = QGroupBox("Output")
+        view_layout = QFormLayout()
+        self.scrollback_lines = QSpinBox()
+        self.scrollback_lines.setRange(0, 1000000)
+        self.scrollback_lines.setSingleStep(1000)
+        self.scrollback_lines.setSpecialValueText("Unlimited")
+        self.scrollback_lines.setSuffix(" lines")
+        view_layout.addRow("Scrollback:", self.scrollback_lines)
+        view_group.setLayout(view_layout)
+        layout.addWidget(view_group)
+
+        capture_group = QGroupBox("Capture to Disk")
+        capture_layout = QFormLayout()
+        self.capture_dir_edit = QLineEdit()
+        self.capture_dir_edit.setPlaceholderText(str(DEFAULT_CAPTURE_DIR))
+        capture_layout.addRow("Directory:", self.capture_dir_edit)
+        self.capture_segment_mb = QSpinBox()
+        self.capture_segment_mb.setRange(1, 4096)
+        self.capture_segment_mb.setSuffix(" MB")
+        capture_layout.addRow("Segment Size:", self.capture_segment_mb)
+        self.capture_max_mb = QSpinBox()
+        self.capture_max_mb.setRange(16, 1048576)
+        self.capture_max_mb.setSingleStep(1024)
+        self.capture_max_mb.setSuffix(" MB")
+        capture_layout.addRow("Keep At Most:", self.capture_max_mb)
+        capture_group.setLayout(capture_layout)
+        layout.addWidget(capture_group)
+
+        rules_group = QGroupBox("Highlight Rules")
+        rules_layout = QVBoxLayout()
+        self.highlight_table = QTableWidget(0, 3)
+        self.highlight_table.setHorizontalHeaderLabels(["Pattern (regex)", "Color", "Ignore Case"])
+        self.highlight_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.highlight_table.verticalHeader().setVisible(False)
+        rules_layout.addWidget(self.highlight_table)
+        rules_buttons = QHBoxLayout()
+        add_rule_btn = QPushButton("Add")
+        add_rule_btn.clicked.connect(lambda: self.add_highlight_row("", "#D93025", False))
+        rules_buttons.addWidget(add_rule_btn)
+        remove_rule_btn = QPushButton("Remove")
+        remove_rule_btn.clicked.connect(
+            lambda: self.highlight_table.removeRow(self.highlight_table.currentRow()))
+        rules_buttons.addWidget(remove_rule_btn)
+        rules_buttons.addStretch()
+        rules_layout.addLayout(rules_buttons)
+        rules_group.setLayout(rules_layout)
+        layout.addWidget(rules_group)
+
+        layout.addStretch()
+        widget.setLayout(layout)
+        return widget
+
+    def add_highlight_row(self, pattern: str, color: str, ignore_case: bool):
+        row = self.highlight_table.rowCount()
+        self.highlight_table.insertRow(row)
+        self.highlight_table.setItem(row, 0, QTableWidgetItem(pattern))
+        color_btn = QPushButton()
+        color_btn.setProperty("color", color)
+        color_btn.setStyleSheet(f"background-color: {color};")
+        color_btn.clicked.connect(lambda: self._pick_rule_color(color_btn))
+        self.highlight_table.setCellWidget(row, 1, color_btn)
+        case_item = QTableWidgetItem()
+        case_item.setFlags(Qt.ItemFlag.ItemIsUserCheckable | Qt.ItemFlag.ItemIsEnabled)
+        case_item.setCheckState(Qt.CheckState.Checked if ignore_case else Qt.CheckState.Unchecked)
+        self.highlight_table.setItem(row, 2, case_item)
+        if not pattern:
+            self.highlight_table.editItem(self.highlight_table.item(row, 0))
+
+    def _pick_rule_color(self, button):
+        color = QColorDialog.getColor(QColor(button.property("color")), self)
+        if color.isValid():
+            button.setProperty("color", color.name())
+            button.setStyleSheet(f"background-color: {color.name()};")
+
+    def highlight_rules(self) -> list[dict]:
+        rules = []
+        for row in range(self.highlight_table.rowCount()):
+            pattern = self.highlight_table.item(row, 0).text().strip()
+            if pattern:
+                rules.append({
+                    "pattern": pattern,
+                    "color": self.highlight_table.cellWidget(row, 1).property("color"),
+                    "ignore_case": self.highlight_table.item(row, 2).checkState() == Qt.CheckState.Checked,
+                })
+        return rules
+
+    def _cache(self) -> BuildCache:
+        return BuildCache(self.cache_dir_edit.text().strip() or None, self.cache_max_mb.value())
+
+    def update_cache_usage(self):
+        cache = self._cache()
+        used, count = cache.usage()
+        stats = cache.load_stats()
+        text = f"{used / 1048576:.1f} MB in {count} objects"
+        if stats.total:
+            text += f", {stats.hit_rate:.0%} hit rate over {stats.total} objects"
+        self.cache_usage_label.setText(text)
+
+    def clear_cache(self):
+        self._cache().clear()
+        self.update_cache_usage()
+
     def create_syntax_tab(self):
         """Create syntax highlighting settings tab."""
         widget = QWidget()
@@ -235,6 +382,21 @@ class SettingsDialog(QDialog):
             self.settings.get("editor", "show_upload_failure_popup", True)
         )
             
+        # Build
+        self.cache_enabled_cb.setChecked(self.settings.get("build", "cache_enabled", True))
+        self.cache_dir_edit.setText(self.settings.get("build", "cache_dir", ""))
+        self.cache_max_mb.setValue(self.settings.get("build", "cache_max_mb", 1024))
+        self.update_cache_usage()
+
+        # Serial monitor
+        self.scrollback_lines.setValue(self.settings.get("serial", "scrollback_lines", 10000))
+        self.capture_dir_edit.setText(self.settings.get("serial", "capture_dir", ""))
+        self.capture_segment_mb.setValue(self.settings.get("serial", "capture_segment_mb", 64))
+        self.capture_max_mb.setValue(self.settings.get("serial", "capture_max_mb", 2048))
+        self.highlight_table.setRowCount(0)
+        for rule in self.settings.get("serial", "highlight_rules", []):
+            self.add_highlight_row(rule.get("pattern", ""), rule.get("color", "#D93025"), rule.get("ignore_case", False))
+
         # Syntax style checkboxes
         self.keyword_bold.setChecked(
             self.settings.get("syntax", "keyword_bold", True)
@@ -273,6 +435,18 @@ class SettingsDialog(QDialog):
         self.settings.set("editor", "show_compile_failure_popup", self.compile_failure_popup_cb.isChecked())
         self.settings.set("editor", "show_upload_failure_popup", self.upload_failure_popup_cb.isChecked())
             
+        # Build
+        self.settings.set("build", "cache_enabled", self.cache_enabled_cb.isChecked())
+        self.settings.set("build", "cache_dir", self.cache_dir_edit.text().strip())
+        self.settings.set("build", "cache_max_mb", self.cache_max_mb.value())
+
+        # Serial monitor
+        self.settings.set("serial", "scrollback_lines", self.scrollback_lines.value())
+        self.settings.set("serial", "capture_dir", self.capture_dir_edit.text().strip())
+        self.settings.set("serial", "capture_segment_mb", self.capture_segment_mb.value())
+        self.settings.set("serial", "capture_max_mb", self.capture_max_mb.value())
+        self.settings.set("serial", "highlight_rules", self.highlight_rules())
+
         # Syntax style checkboxes
         self.settings.set("syntax", "keyword_bold", self.keyword_bold.isChecked())
         self.settings.set("syntax", "function_bold", self.function_bold.isChecked())
@@ -297,5 +471,11 @@ class SettingsDialog(QDialog):
             
     def accept(self):
         """Save and close."""
+        for rule in self.highlight_rules():
+            try:
+                re.compile(rule["pattern"])
+            except re.error as e:
+                QMessageBox.warning(self, "Highlight Rules", f"Invalid pattern {rule['pattern']!r}: {e}")
+                return
         self.save_settings()
         super().accept()
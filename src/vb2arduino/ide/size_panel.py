@@ -0,0 +1,156 @@
+"""Firmware size panel: flash/RAM trend across builds and where the bytes went."""
+
+import pathlib
+
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QSplitter, QTableWidget, QTableWidgetItem, QHeaderView
+)
+from PyQt6.QtCore import Qt, QThread, QPointF, pyqtSignal
+from PyQt6.QtGui import QColor, QPainter, QPen
+
+from vb2arduino.size_report import SizeRecord, SizeToolError, analyze, append_history, growth, previous_record
+
+
+class SizeThread(QThread):
+    """Runs size_report.analyze off the GUI thread and appends the result to the history."""
+
+    analyzed = pyqtSignal(object, object)  # SizeRecord, list[SizeRecord] history
+    failed = pyqtSignal(str)
+
+    def __init__(self, elf: pathlib.Path, env: str, cpp: str, vb_source: str, history_path: pathlib.Path | None):
+        super().__init__()
+        self.elf = elf
+        self.env = env
+        self.cpp = cpp
+        self.vb_source = vb_source
+        self.history_path = history_path
+
+    def run(self):
+        try:
+            record = analyze(self.elf, self.env, self.cpp, self.vb_source)
+            history = append_history(self.history_path, record) if self.history_path else [record]
+        except (SizeToolError, OSError) as e:
+            self.failed.emit(str(e))
+            return
+        self.analyzed.emit(record, history)
+
+
+class TrendChart(QWidget):
+    """Small line chart of flash use over the recorded builds."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.values: list[int] = []
+        self.setMinimumHeight(60)
+
+    def set_values(self, values: list[int]):
+        self.values = values
+        self.setToolTip("Flash per build: " + ", ".join(str(v) for v in values[-10:]) if values else "")
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        rect = self.rect().adjusted(4, 4, -4, -16)
+        if len(self.values) < 2:
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "Build twice to see a trend")
+            return
+        low, high = min(self.values), max(self.values)
+        span = max(high - low, 1)
+        step = rect.width() / (len(self.values) - 1)
+        points = [
+            QPointF(rect.left() + i * step, rect.bottom() - (v - low) / span * rect.height())
+            for i, v in enumerate(self.values)
+        ]
+        painter.setPen(QPen(QColor("#1A73E8"), 2))
+        painter.drawPolyline(points)
+        painter.setPen(QColor("#5F6368"))
+        painter.drawText(self.rect().adjusted(4, 0, -4, 0), Qt.AlignmentFlag.AlignBottom | Qt.AlignmentFlag.AlignLeft,
+                         f"{len(self.values)} builds, {low}-{high} bytes")
+
+
+class SizePanel(QWidget):
+    """Size trend, top growth since the previous build, and per-procedure/per-line breakdown."""
+
+    line_activated = pyqtSignal(int)  # VB line
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        header = QHBoxLayout()
+        self.title_label = QLabel("Compile a sketch to see its firmware size.")
+        header.addWidget(self.title_label)
+        header.addStretch()
+        layout.addLayout(header)
+
+        self.chart = TrendChart()
+        layout.addWidget(self.chart)
+
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        self.growth_table = self._table(["Change", "Procedure", "Before", "After"])
+        self.proc_table = self._table(["Flash", "RAM", "Procedure"])
+        self.line_table = self._table(["Bytes", "VB line"])
+        self.line_table.cellDoubleClicked.connect(self._on_line_double_click)
+        for title, table in (("Top growth since last build", self.growth_table),
+                             ("By procedure", self.proc_table),
+                             ("By VB line (double-click to jump)", self.line_table)):
+            box = QWidget()
+            box_layout = QVBoxLayout(box)
+            box_layout.setContentsMargins(0, 0, 0, 0)
+            box_layout.addWidget(QLabel(title))
+            box_layout.addWidget(table)
+            splitter.addWidget(box)
+        layout.addWidget(splitter)
+
+    @staticmethod
+    def _table(columns: list[str]) -> QTableWidget:
+        table = QTableWidget(0, len(columns))
+        table.setHorizontalHeaderLabels(columns)
+        table.horizontalHeader().setSectionResizeMode(len(columns) - 1, QHeaderView.ResizeMode.Stretch)
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        return table
+
+    @staticmethod
+    def _fill(table: QTableWidget, rows: list[tuple]):
+        table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(str(value))
+                if isinstance(value, int):
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                    item.setData(Qt.ItemDataRole.UserRole, value)
+                table.setItem(row, col, item)
+
+    def show_record(self, record: SizeRecord, history: list[SizeRecord]):
+        previous = previous_record(history, record)
+
+        def delta(now: int, before: int | None) -> str:
+            return f" ({now - before:+d})" if before is not None and now != before else ""
+
+        self.title_label.setText(
+            f"{record.env}: flash {record.flash} bytes{delta(record.flash, previous and previous.flash)}, "
+            f"RAM {record.ram} bytes{delta(record.ram, previous and previous.ram)}"
+        )
+        self.chart.set_values([r.flash for r in history if r.env == record.env])
+        self._fill(self.growth_table, [
+            (f"{after - before:+d}", name, before, after) for name, before, after in growth(previous, record, top=50)
+        ])
+        self._fill(self.proc_table, [
+            (flash, ram, name)
+            for name, (flash, ram) in sorted(record.procedures.items(), key=lambda kv: kv[1][0], reverse=True)
+        ])
+        self._fill(self.line_table, sorted(
+            ((size, line) for line, size in record.line_bytes().items()), reverse=True
+        ))
+
+    def show_error(self, message: str):
+        self.title_label.setText(f"Size analysis unavailable: {message}")
+
+    def _on_line_double_click(self, row: int, _col: int):
+        item = self.line_table.item(row, 1)
+        if item is not None:
+            self.line_activated.emit(int(item.text()))
@@ -1,11 +1,14 @@
 """Utility functions for the IDE."""
 
+import importlib.util
 import serial.tools.list_ports
 import subprocess
 import json
 import threading
 from typing import Optional, Callable
 
+from vb2arduino.board_db import default_db
+
 
 def get_available_ports():
     """Get list of available serial ports.
@@ -17,29 +20,48 @@ def get_available_ports():
     return [port.device for port in ports]
 
 
-def get_platformio_boards():
-    """Get list of common PlatformIO boards.
-    
+def get_platformio_boards(query: str = "", limit: int = 50):
+    """Get the PlatformIO boards supporting the Arduino framework that best match a search.
+
+    Reads the local board database (see vb2arduino.board_db); until it has
+    been imported, a few common boards are returned. Only the `limit` best
+    matches are returned, so the list can go straight into a combo box.
+
     Returns:
         list: List of (display_name, board_id) tuples
     """
-    # Common boards - could be expanded by parsing `pio boards` output
-    boards = [
+    boards = [(b.name, b.board_id) for b in default_db().search(query, limit=limit)]
+    if boards:
+        return boards
+    return [
         ("ESP32-S3 DevKitM-1", "esp32-s3-devkitm-1"),
         ("ESP32 DevKit", "esp32dev"),
         ("Arduino Uno", "uno"),
         ("Arduino Mega 2560", "megaatmega2560"),
         ("Arduino Nano 33 IoT", "nano_33_iot"),
     ]
-    return boards
 
 
-def check_platformio_installed():
+_platformio_available = False
+
+
+def check_platformio_installed(refresh: bool = False):
     """Check if PlatformIO CLI is installed.
-    
+
+    A positive result is cached for the session; a negative one is re-checked
+    each call so installing PlatformIO while the IDE is open is picked up.
+
     Returns:
         bool: True if installed, False otherwise
     """
+    global _platformio_available
+    if _platformio_available and not refresh:
+        return True
+    # The IDE runs `python -m platformio`, so an importable module is enough
+    # and finding it costs no process start
+    if importlib.util.find_spec("platformio") is not None:
+        _platformio_available = True
+        return True
     try:
         result = subprocess.run(
             ["pio", "--version"],
@@ -47,9 +69,10 @@ def check_platformio_installed():
             text=True,
             timeout=5
         )
-        return result.returncode == 0
+        _platformio_available = result.returncode == 0
     except (subprocess.SubprocessError, FileNotFoundError):
-        return False
+        _platformio_available = False
+    return _platformio_available
 
 
 def get_pio_devices():
@@ -72,9 +95,54 @@ def get_pio_devices():
         return []
 
 
+# Known vendor VID mappings (hex strings without 0x)
+VIDS = {
+    "303a": "espressif",  # Espressif Systems
+    "2341": "arduino",    # Arduino LLC
+    "2e8a": "raspberrypi",  # Raspberry Pi (RP2040)
+    "10c4": "silabs",     # CP210x (used by many boards)
+    "1a86": "wch",        # CH340 (used by many boards)
+}
+
+# Default guesses per vendor
+DEFAULT_BOARD_BY_VENDOR = {
+    "espressif": "esp32-s3-devkitc-1",
+    "arduino": "uno",
+    "raspberrypi": "pico",
+}
+
+
+def parse_vid(hwid: str | None) -> str | None:
+    """Lower-case USB vendor id from a hwid such as 'USB VID:PID=303A:1001 ...'."""
+    if not hwid:
+        return None
+    try:
+        if "VID:PID=" in hwid:
+            vid_pid = hwid.split("VID:PID=", 1)[1].split()[0]
+            return vid_pid.split(":")[0].lower()
+    except Exception:
+        return None
+    return None
+
+
+def guess_board(port: str | None, hwid: str | None) -> str | None:
+    """Best-guess PlatformIO board id for a serial device."""
+    vid = parse_vid(hwid)
+    vendor_key = VIDS.get(vid) if vid else None
+    board = DEFAULT_BOARD_BY_VENDOR.get(vendor_key) if vendor_key else None
+    # If unknown vendor, pick ESP32 DevKit as safe default when ttyUSB/ACM present
+    if not board and port:
+        if str(port).lower().find("ttyusb") >= 0 or str(port).lower().find("ttyacm") >= 0:
+            board = "esp32dev"
+    return board
+
+
 def auto_detect_board_and_port():
     """Heuristically detect board and port from PlatformIO devices.
 
+    Runs `pio device list`, so it can take a second; the IDE uses
+    DeviceWatcher's cached table instead.
+
     Returns:
         tuple[str|None, str|None]: (board_id, port) best guesses, or (None, None).
     """
@@ -84,49 +152,11 @@ def auto_detect_board_and_port():
         ports = get_available_ports()
         return (None, ports[0] if ports else None)
 
-    # Known vendor VID mappings (hex strings without 0x)
-    VIDS = {
-        "303a": "espressif",  # Espressif Systems
-        "2341": "arduino",    # Arduino LLC
-        "2e8a": "raspberrypi",  # Raspberry Pi (RP2040)
-        "10c4": "silabs",     # CP210x (used by many boards)
-        "1a86": "wch",        # CH340 (used by many boards)
-    }
-
-    # Default guesses per vendor
-    DEFAULT_BOARD_BY_VENDOR = {
-        "espressif": "esp32-s3-devkitc-1",
-        "arduino": "uno",
-        "raspberrypi": "pico",
-    }
-
-    def parse_vid(hwid: str | None) -> str | None:
-        if not hwid:
-            return None
-        # hwid may contain 'USB VID:PID=303A:1001'
-        try:
-            if "VID:PID=" in hwid:
-                vid_pid = hwid.split("VID:PID=", 1)[1].split()[0]
-                vid = vid_pid.split(":")[0].lower()
-                return vid
-        except Exception:
-            return None
-        return None
-
     # Prefer USB serial devices
     for dev in devices:
         port = dev.get("port")
-        hwid = dev.get("hwid") or dev.get("hardware_id")
-        vid = parse_vid(hwid)
-        vendor_key = VIDS.get(vid) if vid else None
-        # Choose board based on vendor
-        board = DEFAULT_BOARD_BY_VENDOR.get(vendor_key) if vendor_key else None
-        # If unknown vendor, pick ESP32 DevKit as safe default when ttyUSB/ACM present
-        if not board and port:
-            if str(port).lower().find("ttyusb") >= 0 or str(port).lower().find("ttyacm") >= 0:
-                board = "esp32dev"
         if port:
-            return (board, port)
+            return (guess_board(port, dev.get("hwid") or dev.get("hardware_id")), port)
 
     # Fallback: first available port only
     ports = get_available_ports()
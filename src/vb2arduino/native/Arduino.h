@@ -0,0 +1,305 @@
+// Host-native stand-in for the Arduino core used by `vb2arduino --native`.
+//
+// Only the API surface the transpiler emits is provided. Hardware side effects
+// (GPIO, PWM, Serial output, display calls) are recorded into a trace instead
+// of touching hardware, and time is virtual: delay() advances the clock
+// immediately so a sketch runs as fast as the host CPU allows.
+#pragma once
+
+#include <algorithm>
+#include <cctype>
+#include <cmath>
+#include <cstdarg>
+#include <cstdint>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <string>
+
+typedef uint8_t byte;
+typedef bool boolean;
+typedef uint16_t word;
+
+#define HIGH 0x1
+#define LOW 0x0
+#define INPUT 0x0
+#define OUTPUT 0x1
+#define INPUT_PULLUP 0x2
+#define INPUT_PULLDOWN 0x9
+#define LED_BUILTIN 13
+#define A0 14
+#define A1 15
+#define A2 16
+#define A3 17
+#define A4 18
+#define A5 19
+
+#define CHANGE 1
+#define FALLING 2
+#define RISING 3
+
+#define DEC 10
+#define HEX 16
+#define OCT 8
+#define BIN 2
+
+#define LSBFIRST 0
+#define MSBFIRST 1
+
+#ifndef PI
+#define PI 3.1415926535897932384626433832795
+#endif
+#define HALF_PI 1.5707963267948966192313216916398
+#define TWO_PI 6.283185307179586476925286766559
+#define DEG_TO_RAD 0.017453292519943295769236907684886
+#define RAD_TO_DEG 57.295779513082320876798154814105
+
+#define PROGMEM
+#define F(s) (s)
+#define pgm_read_byte(addr) (*(const uint8_t*)(addr))
+#define pgm_read_word(addr) (*(const uint16_t*)(addr))
+#define pgm_read_dword(addr) (*(const uint32_t*)(addr))
+#define pgm_read_float(addr) (*(const float*)(addr))
+#define pgm_read_ptr(addr) (*(const void* const*)(addr))
+
+#define bitRead(value, bit) (((value) >> (bit)) & 0x01)
+#define bitSet(value, bit) ((value) |= (1UL << (bit)))
+#define bitClear(value, bit) ((value) &= ~(1UL << (bit)))
+#define bitWrite(value, bit, bitvalue) ((bitvalue) ? bitSet(value, bit) : bitClear(value, bit))
+#define bit(b) (1UL << (b))
+#define lowByte(w) ((uint8_t)((w) & 0xff))
+#define highByte(w) ((uint8_t)((w) >> 8))
+#define sq(x) ((x) * (x))
+#define radians(deg) ((deg) * DEG_TO_RAD)
+#define degrees(rad) ((rad) * RAD_TO_DEG)
+#define constrain(amt, low, high) ((amt) < (low) ? (low) : ((amt) > (high) ? (high) : (amt)))
+
+template <class A, class B>
+inline auto min(A a, B b) -> decltype(a < b ? a : b) { return a < b ? a : b; }
+template <class A, class B>
+inline auto max(A a, B b) -> decltype(a > b ? a : b) { return a > b ? a : b; }
+using std::abs;
+
+// ---------------------------------------------------------------------------
+// Trace
+// ---------------------------------------------------------------------------
+namespace vbnative {
+// Record one event ("name arg arg ...") with the current virtual time.
+void trace(const char* fmt, ...);
+uint64_t now_us();
+void advance_us(uint64_t us);
+}  // namespace vbnative
+
+// ---------------------------------------------------------------------------
+// String
+// ---------------------------------------------------------------------------
+class String {
+public:
+    String() {}
+    String(const char* s) : s_(s ? s : "") {}
+    String(const std::string& s) : s_(s) {}
+    String(char c) : s_(1, c) {}
+    String(unsigned char v, int base = DEC) : s_(format_int((unsigned long)v, base)) {}
+    String(int v, int base = DEC) : s_(format_signed((long)v, base)) {}
+    String(unsigned int v, int base = DEC) : s_(format_int((unsigned long)v, base)) {}
+    String(long v, int base = DEC) : s_(format_signed(v, base)) {}
+    String(unsigned long v, int base = DEC) : s_(format_int(v, base)) {}
+    String(long long v, int base = DEC) : s_(format_signed((long)v, base)) {}
+    String(unsigned long long v, int base = DEC) : s_(format_int((unsigned long)v, base)) {}
+    String(float v, unsigned int decimals = 2) : s_(format_float(v, decimals)) {}
+    String(double v, unsigned int decimals = 2) : s_(format_float(v, decimals)) {}
+    String(bool v) : s_(v ? "1" : "0") {}
+
+    unsigned int length() const { return (unsigned int)s_.size(); }
+    bool isEmpty() const { return s_.empty(); }
+    const char* c_str() const { return s_.c_str(); }
+    void reserve(unsigned int n) { s_.reserve(n); }
+
+    char charAt(unsigned int i) const { return i < s_.size() ? s_[i] : 0; }
+    void setCharAt(unsigned int i, char c) { if (i < s_.size()) s_[i] = c; }
+    char operator[](unsigned int i) const { return charAt(i); }
+    char& operator[](unsigned int i) { return s_[i]; }
+
+    String substring(unsigned int from) const { return from < s_.size() ? String(s_.substr(from)) : String(); }
+    String substring(unsigned int from, unsigned int to) const {
+        if (from > to) std::swap(from, to);
+        if (from >= s_.size()) return String();
+        return String(s_.substr(from, std::min<size_t>(to, s_.size()) - from));
+    }
+
+    int indexOf(char c, unsigned int from = 0) const { return pos(s_.find(c, from)); }
+    int indexOf(const String& s, unsigned int from = 0) const { return pos(s_.find(s.s_, from)); }
+    int lastIndexOf(char c) const { return pos(s_.rfind(c)); }
+    int lastIndexOf(const String& s) const { return pos(s_.rfind(s.s_)); }
+
+    bool startsWith(const String& p) const { return s_.compare(0, p.s_.size(), p.s_) == 0; }
+    bool endsWith(const String& p) const {
+        return p.s_.size() <= s_.size() && s_.compare(s_.size() - p.s_.size(), p.s_.size(), p.s_) == 0;
+    }
+    bool equals(const String& o) const { return s_ == o.s_; }
+    bool equalsIgnoreCase(const String& o) const {
+        if (s_.size() != o.s_.size()) return false;
+        for (size_t i = 0; i < s_.size(); ++i) {
+            if (std::tolower((unsigned char)s_[i]) != std::tolower((unsigned char)o.s_[i])) return false;
+        }
+        return true;
+    }
+    int compareTo(const String& o) const { return s_.compare(o.s_); }
+
+    long toInt() const { return std::strtol(s_.c_str(), nullptr, 10); }
+    float toFloat() const { return std::strtof(s_.c_str(), nullptr); }
+    double toDouble() const { return std::strtod(s_.c_str(), nullptr); }
+
+    void toUpperCase() { for (auto& c : s_) c = (char)std::toupper((unsigned char)c); }
+    void toLowerCase() { for (auto& c : s_) c = (char)std::tolower((unsigned char)c); }
+    void trim() {
+        size_t b = s_.find_first_not_of(" \t\r\n");
+        size_t e = s_.find_last_not_of(" \t\r\n");
+        s_ = b == std::string::npos ? std::string() : s_.substr(b, e - b + 1);
+    }
+    void replace(const String& from, const String& to) {
+        if (from.s_.empty()) return;
+        size_t p = 0;
+        while ((p = s_.find(from.s_, p)) != std::string::npos) {
+            s_.replace(p, from.s_.size(), to.s_);
+            p += to.s_.size();
+        }
+    }
+    void replace(char from, char to) { std::replace(s_.begin(), s_.end(), from, to); }
+    void remove(unsigned int index) { if (index < s_.size()) s_.erase(index); }
+    void remove(unsigned int index, unsigned int count) { if (index < s_.size()) s_.erase(index, count); }
+
+    bool concat(const String& o) { s_ += o.s_; return true; }
+    String& operator+=(const String& o) { s_ += o.s_; return *this; }
+    String& operator+=(const char* o) { s_ += o; return *this; }
+    String& operator+=(char c) { s_ += c; return *this; }
+    template <class T>
+    String& operator+=(T v) { s_ += String(v).s_; return *this; }
+
+    friend String operator+(const String& a, const String& b) { return String(a.s_ + b.s_); }
+    friend String operator+(const String& a, const char* b) { return String(a.s_ + b); }
+    friend String operator+(const char* a, const String& b) { return String(a + b.s_); }
+    template <class T>
+    friend String operator+(const String& a, T b) { return String(a.s_ + String(b).s_); }
+    template <class T>
+    friend String operator+(T a, const String& b) { return String(String(a).s_ + b.s_); }
+
+    bool operator==(const String& o) const { return s_ == o.s_; }
+    bool operator==(const char* o) const { return s_ == o; }
+    bool operator!=(const String& o) const { return s_ != o.s_; }
+    bool operator!=(const char* o) const { return s_ != o; }
+    bool operator<(const String& o) const { return s_ < o.s_; }
+    bool operator>(const String& o) const { return s_ > o.s_; }
+    bool operator<=(const String& o) const { return s_ <= o.s_; }
+    bool operator>=(const String& o) const { return s_ >= o.s_; }
+
+    const std::string& str() const { return s_; }
+
+private:
+    std::string s_;
+    static int pos(size_t p) { return p == std::string::npos ? -1 : (int)p; }
+    static std::string format_int(unsigned long v, int base) {
+        if (v == 0) return "0";
+        std::string out;
+        while (v) { int d = (int)(v % base); out.insert(out.begin(), (char)(d < 10 ? '0' + d : 'A' + d - 10)); v /= base; }
+        return out;
+    }
+    static std::string format_signed(long v, int base) {
+        if (base == DEC && v < 0) return "-" + format_int((unsigned long)(-v), base);
+        return format_int((unsigned long)v, base);
+    }
+    static std::string format_float(double v, unsigned int decimals) {
+        char buf[64];
+        std::snprintf(buf, sizeof(buf), "%.*f", (int)decimals, v);
+        return buf;
+    }
+};
+
+// ---------------------------------------------------------------------------
+// Serial
+// ---------------------------------------------------------------------------
+class HardwareSerial {
+public:
+    void begin(unsigned long baud, ...) { vbnative::trace("Serial.begin %lu", baud); }
+    void end() {}
+    void setTimeout(unsigned long ms) { timeout_ = ms; }
+    void setTxBufferSize(size_t) {}
+    void setRxBufferSize(size_t) {}
+    void flush() {}
+    explicit operator bool() const { return true; }
+
+    int available();
+    int read();
+    int peek();
+    String readString();
+    String readStringUntil(char terminator);
+
+    size_t write(uint8_t c) { emit(std::string(1, (char)c)); return 1; }
+    size_t write(const char* s) { emit(s); return std::strlen(s); }
+
+    size_t print(const String& s) { emit(s.str()); return s.length(); }
+    size_t print(const char* s) { emit(s); return std::strlen(s); }
+    size_t print(char c) { emit(std::string(1, c)); return 1; }
+    size_t print(bool v) { return print((int)v); }
+    size_t print(float v, int decimals = 2) { return print(String(v, (unsigned)decimals)); }
+    size_t print(double v, int decimals = 2) { return print(String(v, (unsigned)decimals)); }
+    template <class T>
+    size_t print(T v, int base = DEC) { return print(String(v, base)); }
+
+    size_t println() { emit("\r\n"); return 2; }
+    template <class... T>
+    size_t println(T... v) { size_t n = print(v...); emit("\r\n"); return n + 2; }
+
+    int printf(const char* fmt, ...) {
+        char buf[512];
+        va_list ap;
+        va_start(ap, fmt);
+        int n = std::vsnprintf(buf, sizeof(buf), fmt, ap);
+        va_end(ap);
+        emit(buf);
+        return n;
+    }
+
+private:
+    unsigned long timeout_ = 1000;
+    std::string line_;
+    void emit(const std::string& text);
+};
+
+extern HardwareSerial Serial;
+
+// ---------------------------------------------------------------------------
+// GPIO, timing, misc
+// ---------------------------------------------------------------------------
+void pinMode(uint8_t pin, uint8_t mode);
+void digitalWrite(uint8_t pin, uint8_t value);
+int digitalRead(uint8_t pin);
+int analogRead(uint8_t pin);
+void analogWrite(uint8_t pin, int value);
+void analogReadResolution(int bits);
+void tone(uint8_t pin, unsigned int frequency, unsigned long duration = 0);
+void noTone(uint8_t pin);
+unsigned long pulseIn(uint8_t pin, uint8_t state, unsigned long timeout = 1000000UL);
+void shiftOut(uint8_t dataPin, uint8_t clockPin, uint8_t bitOrder, uint8_t value);
+void attachInterrupt(uint8_t interrupt, void (*isr)(), int mode);
+void detachInterrupt(uint8_t interrupt);
+inline uint8_t digitalPinToInterrupt(uint8_t pin) { return pin; }
+inline void interrupts() {}
+inline void noInterrupts() {}
+inline void yield() {}
+
+unsigned long millis();
+unsigned long micros();
+void delay(unsigned long ms);
+void delayMicroseconds(unsigned int us);
+
+long random(long max);
+long random(long min, long max);
+void randomSeed(unsigned long seed);
+
+inline long map(long x, long in_min, long in_max, long out_min, long out_max) {
+    return (x - in_min) * (out_max - out_min) / (in_max - in_min) + out_min;
+}
+
+void setup();
+void loop();
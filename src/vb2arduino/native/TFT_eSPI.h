@@ -0,0 +1,137 @@
+// Host-native stand-in for TFT_eSPI used by `vb2arduino --native`.
+// Drawing calls are recorded into the trace; nothing is rendered.
+#pragma once
+
+#include "Arduino.h"
+
+#define TFT_BLACK 0x0000
+#define TFT_NAVY 0x000F
+#define TFT_DARKGREEN 0x03E0
+#define TFT_MAROON 0x7800
+#define TFT_PURPLE 0x780F
+#define TFT_OLIVE 0x7BE0
+#define TFT_LIGHTGREY 0xD69A
+#define TFT_DARKGREY 0x7BEF
+#define TFT_BLUE 0x001F
+#define TFT_GREEN 0x07E0
+#define TFT_CYAN 0x07FF
+#define TFT_RED 0xF800
+#define TFT_MAGENTA 0xF81F
+#define TFT_YELLOW 0xFFE0
+#define TFT_WHITE 0xFFFF
+#define TFT_ORANGE 0xFDA0
+
+#define TL_DATUM 0
+#define TC_DATUM 1
+#define TR_DATUM 2
+#define ML_DATUM 3
+#define MC_DATUM 4
+#define MR_DATUM 5
+#define BL_DATUM 6
+#define BC_DATUM 7
+#define BR_DATUM 8
+
+class TFT_eSPI {
+public:
+    TFT_eSPI(int16_t w = 240, int16_t h = 320) : width_(w), height_(h) {}
+
+    void init() { vbnative::trace("tft.init"); }
+    void begin() { vbnative::trace("tft.begin"); }
+    void setRotation(uint8_t r) {
+        if ((r & 1) != (rotation_ & 1)) std::swap(width_, height_);
+        rotation_ = r;
+        vbnative::trace("tft.setRotation %u", r);
+    }
+    int16_t width() const { return width_; }
+    int16_t height() const { return height_; }
+
+    void fillScreen(uint32_t c) { vbnative::trace("tft.fillScreen 0x%04X", (unsigned)c); }
+    void drawPixel(int32_t x, int32_t y, uint32_t c) { vbnative::trace("tft.drawPixel %d %d 0x%04X", x, y, (unsigned)c); }
+    void drawLine(int32_t x0, int32_t y0, int32_t x1, int32_t y1, uint32_t c) {
+        vbnative::trace("tft.drawLine %d %d %d %d 0x%04X", x0, y0, x1, y1, (unsigned)c);
+    }
+    void drawFastHLine(int32_t x, int32_t y, int32_t w, uint32_t c) {
+        vbnative::trace("tft.drawFastHLine %d %d %d 0x%04X", x, y, w, (unsigned)c);
+    }
+    void drawFastVLine(int32_t x, int32_t y, int32_t h, uint32_t c) {
+        vbnative::trace("tft.drawFastVLine %d %d %d 0x%04X", x, y, h, (unsigned)c);
+    }
+    void drawRect(int32_t x, int32_t y, int32_t w, int32_t h, uint32_t c) {
+        vbnative::trace("tft.drawRect %d %d %d %d 0x%04X", x, y, w, h, (unsigned)c);
+    }
+    void fillRect(int32_t x, int32_t y, int32_t w, int32_t h, uint32_t c) {
+        vbnative::trace("tft.fillRect %d %d %d %d 0x%04X", x, y, w, h, (unsigned)c);
+    }
+    void drawRoundRect(int32_t x, int32_t y, int32_t w, int32_t h, int32_t r, uint32_t c) {
+        vbnative::trace("tft.drawRoundRect %d %d %d %d %d 0x%04X", x, y, w, h, r, (unsigned)c);
+    }
+    void fillRoundRect(int32_t x, int32_t y, int32_t w, int32_t h, int32_t r, uint32_t c) {
+        vbnative::trace("tft.fillRoundRect %d %d %d %d %d 0x%04X", x, y, w, h, r, (unsigned)c);
+    }
+    void drawCircle(int32_t x, int32_t y, int32_t r, uint32_t c) {
+        vbnative::trace("tft.drawCircle %d %d %d 0x%04X", x, y, r, (unsigned)c);
+    }
+    void fillCircle(int32_t x, int32_t y, int32_t r, uint32_t c) {
+        vbnative::trace("tft.fillCircle %d %d %d 0x%04X", x, y, r, (unsigned)c);
+    }
+    void drawTriangle(int32_t x0, int32_t y0, int32_t x1, int32_t y1, int32_t x2, int32_t y2, uint32_t c) {
+        vbnative::trace("tft.drawTriangle %d %d %d %d %d %d 0x%04X", x0, y0, x1, y1, x2, y2, (unsigned)c);
+    }
+    void fillTriangle(int32_t x0, int32_t y0, int32_t x1, int32_t y1, int32_t x2, int32_t y2, uint32_t c) {
+        vbnative::trace("tft.fillTriangle %d %d %d %d %d %d 0x%04X", x0, y0, x1, y1, x2, y2, (unsigned)c);
+    }
+
+    void setCursor(int16_t x, int16_t y) { vbnative::trace("tft.setCursor %d %d", x, y); }
+    void setTextSize(uint8_t s) { vbnative::trace("tft.setTextSize %u", s); }
+    void setTextFont(uint8_t f) { vbnative::trace("tft.setTextFont %u", f); }
+    void setTextDatum(uint8_t d) { vbnative::trace("tft.setTextDatum %u", d); }
+    void setTextColor(uint16_t fg) { vbnative::trace("tft.setTextColor 0x%04X", fg); }
+    void setTextColor(uint16_t fg, uint16_t bg) { vbnative::trace("tft.setTextColor 0x%04X 0x%04X", fg, bg); }
+    void setTextWrap(bool w) { vbnative::trace("tft.setTextWrap %d", w); }
+    int16_t drawString(const String& s, int32_t x, int32_t y) {
+        vbnative::trace("tft.drawString %d %d %s", x, y, s.c_str());
+        return (int16_t)(s.length() * 6);
+    }
+    int16_t drawString(const String& s, int32_t x, int32_t y, uint8_t font) {
+        vbnative::trace("tft.drawString %d %d %s font=%u", x, y, s.c_str(), font);
+        return (int16_t)(s.length() * 6);
+    }
+    int16_t drawChar(uint16_t c, int32_t x, int32_t y) { vbnative::trace("tft.drawChar %d %d %u", x, y, c); return 6; }
+    int16_t drawChar(uint16_t c, int32_t x, int32_t y, uint8_t font) {
+        vbnative::trace("tft.drawChar %d %d %u font=%u", x, y, c, font);
+        return 6;
+    }
+    void drawChar(int32_t x, int32_t y, uint16_t c, uint32_t color, uint32_t bg, uint8_t size) {
+        vbnative::trace("tft.drawChar %d %d %u 0x%04X 0x%04X size=%u", x, y, c, (unsigned)color, (unsigned)bg, size);
+    }
+    int16_t textWidth(const String& s) const { return (int16_t)(s.length() * 6); }
+    template <class T>
+    void print(T v) { vbnative::trace("tft.print %s", String(v).c_str()); }
+    template <class T>
+    void println(T v) { vbnative::trace("tft.println %s", String(v).c_str()); }
+
+    void setWindow(int32_t x0, int32_t y0, int32_t x1, int32_t y1) {
+        vbnative::trace("tft.setWindow %d %d %d %d", x0, y0, x1, y1);
+    }
+    void setAddrWindow(int32_t x, int32_t y, int32_t w, int32_t h) {
+        vbnative::trace("tft.setAddrWindow %d %d %d %d", x, y, w, h);
+    }
+    void setViewport(int32_t x, int32_t y, int32_t w, int32_t h, bool = true) {
+        vbnative::trace("tft.setViewport %d %d %d %d", x, y, w, h);
+    }
+    void resetViewport() { vbnative::trace("tft.resetViewport"); }
+    void frameViewport(uint16_t c, int32_t w) { vbnative::trace("tft.frameViewport 0x%04X %d", c, w); }
+    void setOrigin(int32_t x, int32_t y) { vbnative::trace("tft.setOrigin %d %d", x, y); }
+    void pushColor(uint16_t c) { vbnative::trace("tft.pushColor 0x%04X", c); }
+    void pushBlock(uint16_t c, uint32_t len) { vbnative::trace("tft.pushBlock 0x%04X %u", c, len); }
+    void startWrite() {}
+    void endWrite() {}
+
+    uint16_t color565(uint8_t r, uint8_t g, uint8_t b) const {
+        return (uint16_t)(((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3));
+    }
+
+private:
+    int16_t width_, height_;
+    uint8_t rotation_ = 0;
+};
@@ -0,0 +1,71 @@
+"""Host-native backend: compile generated main.cpp against an Arduino API stub and run it."""
+
+import os
+import pathlib
+import re
+import shutil
+import subprocess
+from dataclasses import dataclass
+
+STUB_DIR = pathlib.Path(__file__).resolve().parent
+RUNTIME_SOURCE = STUB_DIR / "runtime.cpp"
+
+
+@dataclass
+class NativeRun:
+    """Result of one run of a native sketch executable."""
+
+    returncode: int
+    iterations: int = 0
+    elapsed: float = 0.0  # Wall-clock seconds spent in loop()
+    virtual_ms: int = 0  # Sketch time (millis()) at exit
+    trace_path: pathlib.Path | None = None
+    stderr: str = ""
+
+    @property
+    def iterations_per_sec(self) -> float:
+        return self.iterations / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def find_compiler() -> str | None:
+    """Return the host C++ compiler ($CXX, g++ or clang++), or None."""
+    for candidate in (os.environ.get("CXX"), "g++", "clang++"):
+        if candidate and shutil.which(candidate):
+            return candidate
+    return None
+
+
+def build_native(cpp_path: pathlib.Path, exe_path: pathlib.Path, compiler: str | None = None,
+                 optimize: str = "-O2") -> subprocess.CompletedProcess:
+    """Compile a generated sketch together with the stub runtime into a host executable."""
+    compiler = compiler or find_compiler() or "g++"
+    exe_path.parent.mkdir(parents=True, exist_ok=True)
+    cmd = [
+        compiler, "-std=c++17", optimize, "-w",
+        "-I", str(STUB_DIR),
+        str(cpp_path), str(RUNTIME_SOURCE),
+        "-o", str(exe_path),
+    ]
+    print("[cmd]", " ".join(cmd))
+    return subprocess.run(cmd, capture_output=True, text=True)
+
+
+def run_native(exe_path: pathlib.Path, iterations: int = 1000, inputs: pathlib.Path | None = None,
+               trace: pathlib.Path | None = None, timeout: float | None = None) -> NativeRun:
+    """Run setup() once and loop() `iterations` times; the trace goes to `trace` (stdout if None)."""
+    cmd = [str(exe_path), "-n", str(iterations)]
+    if inputs:
+        cmd.extend(["-i", str(inputs)])
+    if trace:
+        cmd.extend(["-t", str(trace)])
+    try:
+        result = subprocess.run(cmd, stderr=subprocess.PIPE, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return NativeRun(returncode=-1, trace_path=trace, stderr=f"Timed out after {timeout} s")
+    run = NativeRun(returncode=result.returncode, trace_path=trace, stderr=result.stderr or "")
+    m = re.search(r"iterations=(\d+) elapsed=([\d.eE+-]+) virtual_ms=(\d+)", run.stderr)
+    if m:
+        run.iterations = int(m.group(1))
+        run.elapsed = float(m.group(2))
+        run.virtual_ms = int(m.group(3))
+    return run
@@ -0,0 +1,265 @@
+// Runtime and entry point for `vb2arduino --native`.
+//
+// Usage: sketch [-n ITERATIONS] [-i INPUTS] [-t TRACE]
+//
+// Runs setup() once and loop() ITERATIONS times on the host. INPUTS is a
+// script of timed stimuli, one per line:
+//
+//     <iteration> digital <pin> <value>
+//     <iteration> analog <pin> <value>
+//     <iteration> serial <text>          (\n, \r and \t escapes are expanded)
+//
+// Iteration 0 is applied before setup(). Every recorded event is written to
+// TRACE (default: stdout) as "<iteration> <virtual-ms> <event>". A final
+// summary line on stderr reports iterations and wall-clock time.
+#include "Arduino.h"
+
+#include <chrono>
+#include <deque>
+#include <fstream>
+#include <map>
+#include <sstream>
+#include <vector>
+
+HardwareSerial Serial;
+
+namespace vbnative {
+namespace {
+
+struct Stimulus {
+    unsigned long iteration;
+    std::string kind;
+    int pin;
+    int value;
+    std::string text;
+};
+
+uint64_t g_clock_us = 0;
+unsigned long g_iteration = 0;
+FILE* g_trace = stdout;
+std::map<int, int> g_pin_mode;
+std::map<int, int> g_digital_in;
+std::map<int, int> g_digital_out;
+std::map<int, int> g_analog_in;
+std::deque<char> g_serial_rx;
+std::vector<Stimulus> g_stimuli;
+size_t g_next_stimulus = 0;
+unsigned long g_random_state = 1;
+
+std::string unescape(const std::string& s) {
+    std::string out;
+    for (size_t i = 0; i < s.size(); ++i) {
+        if (s[i] == '\\' && i + 1 < s.size()) {
+            char c = s[++i];
+            out += c == 'n' ? '\n' : c == 'r' ? '\r' : c == 't' ? '\t' : c;
+        } else {
+            out += s[i];
+        }
+    }
+    return out;
+}
+
+bool load_stimuli(const char* path) {
+    std::ifstream in(path);
+    if (!in) return false;
+    std::string line;
+    while (std::getline(in, line)) {
+        if (line.empty() || line[0] == '#') continue;
+        std::istringstream ls(line);
+        Stimulus s{0, "", 0, 0, ""};
+        if (!(ls >> s.iteration >> s.kind)) continue;
+        if (s.kind == "serial") {
+            std::getline(ls, s.text);
+            if (!s.text.empty() && s.text[0] == ' ') s.text.erase(0, 1);
+            s.text = unescape(s.text);
+        } else {
+            ls >> s.pin >> s.value;
+        }
+        g_stimuli.push_back(s);
+    }
+    std::stable_sort(g_stimuli.begin(), g_stimuli.end(),
+                     [](const Stimulus& a, const Stimulus& b) { return a.iteration < b.iteration; });
+    return true;
+}
+
+void apply_stimuli(unsigned long iteration) {
+    while (g_next_stimulus < g_stimuli.size() && g_stimuli[g_next_stimulus].iteration <= iteration) {
+        const Stimulus& s = g_stimuli[g_next_stimulus++];
+        if (s.kind == "digital") {
+            g_digital_in[s.pin] = s.value ? HIGH : LOW;
+        } else if (s.kind == "analog") {
+            g_analog_in[s.pin] = s.value;
+        } else if (s.kind == "serial") {
+            g_serial_rx.insert(g_serial_rx.end(), s.text.begin(), s.text.end());
+        }
+    }
+}
+
+}  // namespace
+
+void trace(const char* fmt, ...) {
+    if (!g_trace) return;
+    std::fprintf(g_trace, "%lu %llu.%03llu ", g_iteration, (unsigned long long)(g_clock_us / 1000),
+                 (unsigned long long)(g_clock_us % 1000));
+    va_list ap;
+    va_start(ap, fmt);
+    std::vfprintf(g_trace, fmt, ap);
+    va_end(ap);
+    std::fputc('\n', g_trace);
+}
+
+uint64_t now_us() { return g_clock_us; }
+void advance_us(uint64_t us) { g_clock_us += us; }
+
+}  // namespace vbnative
+
+using vbnative::trace;
+
+// ---------------------------------------------------------------------------
+// Serial
+// ---------------------------------------------------------------------------
+void HardwareSerial::emit(const std::string& text) {
+    for (char c : text) {
+        if (c == '\n') {
+            if (!line_.empty() && line_.back() == '\r') line_.pop_back();
+            trace("Serial %s", line_.c_str());
+            line_.clear();
+        } else {
+            line_ += c;
+        }
+    }
+}
+
+int HardwareSerial::available() { return (int)vbnative::g_serial_rx.size(); }
+
+int HardwareSerial::read() {
+    if (vbnative::g_serial_rx.empty()) return -1;
+    char c = vbnative::g_serial_rx.front();
+    vbnative::g_serial_rx.pop_front();
+    return (unsigned char)c;
+}
+
+int HardwareSerial::peek() {
+    return vbnative::g_serial_rx.empty() ? -1 : (unsigned char)vbnative::g_serial_rx.front();
+}
+
+String HardwareSerial::readString() {
+    std::string out(vbnative::g_serial_rx.begin(), vbnative::g_serial_rx.end());
+    vbnative::g_serial_rx.clear();
+    return String(out);
+}
+
+String HardwareSerial::readStringUntil(char terminator) {
+    std::string out;
+    while (!vbnative::g_serial_rx.empty()) {
+        char c = vbnative::g_serial_rx.front();
+        vbnative::g_serial_rx.pop_front();
+        if (c == terminator) break;
+        out += c;
+    }
+    return String(out);
+}
+
+// ---------------------------------------------------------------------------
+// GPIO
+// ---------------------------------------------------------------------------
+void pinMode(uint8_t pin, uint8_t mode) {
+    vbnative::g_pin_mode[pin] = mode;
+    trace("pinMode %u %u", pin, mode);
+}
+
+void digitalWrite(uint8_t pin, uint8_t value) {
+    int v = value ? HIGH : LOW;
+    auto it = vbnative::g_digital_out.find(pin);
+    if (it != vbnative::g_digital_out.end() && it->second == v) return;  // Only record edges
+    vbnative::g_digital_out[pin] = v;
+    trace("digitalWrite %u %d", pin, v);
+}
+
+int digitalRead(uint8_t pin) {
+    auto in = vbnative::g_digital_in.find(pin);
+    if (in != vbnative::g_digital_in.end()) return in->second;
+    auto out = vbnative::g_digital_out.find(pin);
+    if (out != vbnative::g_digital_out.end()) return out->second;
+    auto mode = vbnative::g_pin_mode.find(pin);
+    return mode != vbnative::g_pin_mode.end() && mode->second == INPUT_PULLUP ? HIGH : LOW;
+}
+
+int analogRead(uint8_t pin) {
+    auto it = vbnative::g_analog_in.find(pin);
+    return it != vbnative::g_analog_in.end() ? it->second : 0;
+}
+
+void analogWrite(uint8_t pin, int value) { trace("analogWrite %u %d", pin, value); }
+void analogReadResolution(int) {}
+void tone(uint8_t pin, unsigned int frequency, unsigned long duration) {
+    trace("tone %u %u %lu", pin, frequency, duration);
+}
+void noTone(uint8_t pin) { trace("noTone %u", pin); }
+unsigned long pulseIn(uint8_t, uint8_t, unsigned long) { return 0; }
+void shiftOut(uint8_t dataPin, uint8_t clockPin, uint8_t bitOrder, uint8_t value) {
+    trace("shiftOut %u %u %u %u", dataPin, clockPin, bitOrder, value);
+}
+void attachInterrupt(uint8_t interrupt, void (*)(), int mode) { trace("attachInterrupt %u %d", interrupt, mode); }
+void detachInterrupt(uint8_t interrupt) { trace("detachInterrupt %u", interrupt); }
+
+// ---------------------------------------------------------------------------
+// Virtual time
+// ---------------------------------------------------------------------------
+// Reading the clock costs one microsecond so busy-wait loops on millis() terminate.
+unsigned long millis() { vbnative::g_clock_us += 1; return (unsigned long)(vbnative::g_clock_us / 1000); }
+unsigned long micros() { vbnative::g_clock_us += 1; return (unsigned long)vbnative::g_clock_us; }
+void delay(unsigned long ms) { vbnative::g_clock_us += (uint64_t)ms * 1000; }
+void delayMicroseconds(unsigned int us) { vbnative::g_clock_us += us; }
+
+// ---------------------------------------------------------------------------
+// Random (deterministic unless randomSeed is called)
+// ---------------------------------------------------------------------------
+long random(long max) {
+    if (max <= 0) return 0;
+    vbnative::g_random_state = vbnative::g_random_state * 1103515245UL + 12345UL;
+    return (long)((vbnative::g_random_state >> 16) % (unsigned long)max);
+}
+long random(long min, long max) { return max <= min ? min : min + random(max - min); }
+void randomSeed(unsigned long seed) { vbnative::g_random_state = seed ? seed : 1; }
+
+// ---------------------------------------------------------------------------
+// Entry point
+// ---------------------------------------------------------------------------
+int main(int argc, char** argv) {
+    unsigned long iterations = 1000;
+    const char* inputs = nullptr;
+    const char* trace_path = nullptr;
+    for (int i = 1; i + 1 < argc; i += 2) {
+        std::string opt = argv[i];
+        if (opt == "-n") iterations = std::strtoul(argv[i + 1], nullptr, 10);
+        else if (opt == "-i") inputs = argv[i + 1];
+        else if (opt == "-t") trace_path = argv[i + 1];
+    }
+    if (inputs && !vbnative::load_stimuli(inputs)) {
+        std::fprintf(stderr, "cannot read inputs: %s\n", inputs);
+        return 2;
+    }
+    if (trace_path) {
+        vbnative::g_trace = std::fopen(trace_path, "w");
+        if (!vbnative::g_trace) {
+            std::fprintf(stderr, "cannot write trace: %s\n", trace_path);
+            return 2;
+        }
+    }
+
+    vbnative::apply_stimuli(0);
+    setup();
+    auto start = std::chrono::steady_clock::now();
+    for (unsigned long n = 1; n <= iterations; ++n) {
+        vbnative::g_iteration = n;
+        vbnative::apply_stimuli(n);
+        loop();
+    }
+    double elapsed = std::chrono::duration<double>(std::chrono::steady_clock::now() - start).count();
+
+    if (vbnative::g_trace && vbnative::g_trace != stdout) std::fclose(vbnative::g_trace);
+    std::fprintf(stderr, "iterations=%lu elapsed=%.9g virtual_ms=%llu\n", iterations, elapsed,
+                 (unsigned long long)(vbnative::g_clock_us / 1000));
+    return 0;
+}
@@ -0,0 +1,204 @@
+"""Long-lived PlatformIO worker.
+
+Started once per IDE session as ``python -m vb2arduino.pio_worker``. It imports
+PlatformIO and loads the installed platforms' board metadata up front, then
+runs jobs by forking: each child inherits the warm interpreter, runs the
+PlatformIO CLI in-process and exits, so a crash or leaked global state in one
+build cannot affect the next.
+
+Protocol (one JSON object per line):
+
+    -> {"id": 1, "args": ["run", "-e", "uno"], "cwd": "/path", "env": {"NAME": "value"}}
+    -> {"cancel": 1, "force": false}
+    <- {"ready": true, "version": "6.1.15"}
+    <- {"id": 1, "stream": "stdout", "line": "Processing uno ..."}
+    <- {"id": 1, "exit": 0}
+    <- {"id": 2, "exit": -15, "cancelled": true}    (cancelled before it started)
+
+Only POSIX is supported (jobs need fork); clients fall back to running
+``python -m platformio`` themselves elsewhere or when the worker goes away.
+"""
+
+import codecs
+import json
+import os
+import selectors
+import signal
+import sys
+from typing import Callable
+
+
+def supported() -> bool:
+    return hasattr(os, "fork") and hasattr(os, "setsid")
+
+
+def _load_platformio() -> tuple[Callable[[list[str]], int], str]:
+    """Import PlatformIO and warm its platform/board metadata."""
+    import platformio
+    from platformio.__main__ import main as pio_main
+
+    try:
+        from platformio.package.manager.platform import PlatformPackageManager
+        from platformio.platform.factory import PlatformFactory
+
+        for pkg in PlatformPackageManager().get_installed():
+            PlatformFactory.new(pkg).get_boards()
+    except Exception:
+        pass  # Warm-up is an optimisation only; jobs still work without it
+
+    return pio_main, getattr(platformio, "__version__", "")
+
+
+class _Job:
+    def __init__(self, job_id, pid: int, out_fd: int, err_fd: int):
+        self.id = job_id
+        self.pid = pid
+        self.fds = {out_fd: "stdout", err_fd: "stderr"}
+        self.decoders = {fd: codecs.getincrementaldecoder("utf-8")(errors="replace") for fd in self.fds}
+        self.partial = {fd: "" for fd in self.fds}
+        self.exit_code: int | None = None
+
+
+class Worker:
+    """Reads jobs from stdin and streams their output as JSON lines."""
+
+    def __init__(self, run_pio: Callable[[list[str]], int], proto):
+        self.run_pio = run_pio
+        self.proto = proto
+        self.sel = selectors.DefaultSelector()
+        self.control = b""
+        self.job: _Job | None = None
+        self.pending: list[dict] = []
+        self.closing = False
+
+    def send(self, msg: dict) -> None:
+        self.proto.write(json.dumps(msg) + "\n")
+        self.proto.flush()
+
+    def serve(self) -> None:
+        stdin_fd = sys.stdin.fileno()
+        self.sel.register(stdin_fd, selectors.EVENT_READ, "control")
+        while not (self.closing and not self.job):
+            for key, _ in self.sel.select(timeout=0.5):
+                if key.data == "control":
+                    self._read_control(key.fd)
+                else:
+                    self._read_job(key.fd)
+            self._reap()
+            if not self.job and self.pending and not self.closing:
+                self._start(self.pending.pop(0))
+
+    def _read_control(self, fd: int) -> None:
+        data = os.read(fd, 65536)
+        if not data:
+            # Client went away: stop the running build and exit
+            self.sel.unregister(fd)
+            self.closing = True
+            self.pending.clear()
+            self._signal(signal.SIGKILL)
+            return
+        self.control += data
+        while b"\n" in self.control:
+            raw, self.control = self.control.split(b"\n", 1)
+            try:
+                msg = json.loads(raw)
+            except ValueError:
+                continue
+            if "cancel" in msg:
+                if self.job and self.job.id == msg["cancel"]:
+                    self._signal(signal.SIGKILL if msg.get("force") else signal.SIGTERM)
+                for queued in [m for m in self.pending if m.get("id") == msg["cancel"]]:
+                    # Never started, but the client still waits for its exit
+                    self.pending.remove(queued)
+                    self.send({"id": queued.get("id"), "exit": -signal.SIGTERM, "cancelled": True})
+            elif "args" in msg:
+                self.pending.append(msg)
+
+    def _start(self, msg: dict) -> None:
+        out_r, out_w = os.pipe()
+        err_r, err_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # Child: become a PlatformIO process
+            try:
+                os.setsid()  # Own process group so cancel reaches SCons/toolchain children
+                os.dup2(out_w, 1)
+                os.dup2(err_w, 2)
+                for fd in (out_r, out_w, err_r, err_w):
+                    os.close(fd)
+                sys.stdout.reconfigure(line_buffering=True)
+                sys.stderr.reconfigure(line_buffering=True)
+                if msg.get("cwd"):
+                    os.chdir(msg["cwd"])
+                os.environ.update(msg.get("env") or {})
+                code = self.run_pio(["platformio", *msg["args"]])
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(code if isinstance(code, int) else 1)
+            except BaseException:
+                os._exit(1)
+        os.close(out_w)
+        os.close(err_w)
+        self.job = _Job(msg.get("id"), pid, out_r, err_r)
+        for fd in (out_r, err_r):
+            self.sel.register(fd, selectors.EVENT_READ, "job")
+
+    def _read_job(self, fd: int) -> None:
+        job = self.job
+        data = os.read(fd, 65536)
+        if not data:
+            tail = job.partial.pop(fd) + job.decoders[fd].decode(b"", final=True)
+            if tail:
+                self.send({"id": job.id, "stream": job.fds[fd], "line": tail})
+            self.sel.unregister(fd)
+            os.close(fd)
+            del job.fds[fd]
+            return
+        text = job.partial[fd] + job.decoders[fd].decode(data)
+        lines = text.split("\n")
+        job.partial[fd] = lines.pop()
+        for line in lines:
+            self.send({"id": job.id, "stream": job.fds[fd], "line": line.rstrip("\r")})
+
+    def _reap(self) -> None:
+        job = self.job
+        if not job:
+            return
+        if job.exit_code is None:
+            pid, status = os.waitpid(job.pid, os.WNOHANG)
+            if pid == 0:
+                return
+            job.exit_code = os.waitstatus_to_exitcode(status)
+        if job.fds:
+            return  # Drain output before reporting the exit
+        self.send({"id": job.id, "exit": job.exit_code})
+        self.job = None
+
+    def _signal(self, sig: int) -> None:
+        if self.job and self.job.exit_code is None:
+            try:
+                os.killpg(self.job.pid, sig)
+            except OSError:
+                pass
+
+
+def main() -> int:
+    if not supported():
+        print("pio_worker requires fork()", file=sys.stderr)
+        return 2
+    # Keep the protocol channel private: anything PlatformIO prints in this
+    # process goes to stderr instead of corrupting it.
+    proto = os.fdopen(os.dup(1), "w", buffering=1, encoding="utf-8")
+    os.dup2(2, 1)
+    try:
+        run_pio, version = _load_platformio()
+    except ImportError as e:
+        print(f"PlatformIO is not importable: {e}", file=sys.stderr)
+        return 2
+    worker = Worker(run_pio, proto)
+    worker.send({"ready": True, "version": version})
+    worker.serve()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,306 @@
+"""On-device profiling: the instrumentation runtime, its serial frames, and their statistics.
+
+With profiling on, the transpiler gives every Sub/Function (Setup and Loop
+included) and optionally every VB statement a slot in a static table on the
+device. A Sub's slot accumulates inclusive time and calls through a scope
+object; a line's slot accumulates the time from its statement to the next
+instrumented one (self time: time spent in called Subs goes to their lines)
+and how often it ran. loop() also tracks its own period for frequency and
+jitter.
+
+Every `interval_ms` the table is written over Serial as one binary frame
+and reset, so each frame holds the counts for one interval:
+
+    00 'V' 'P'                 sync
+    u8  version                FRAME_VERSION
+    u16 slots                  N
+    u32 elapsed_us             interval actually covered
+    u32 loops                  loop() periods measured
+    u32 loop_min_us, loop_max_us
+    N x (u32 us, u32 hits)
+    u16 checksum               sum of the bytes from version on
+
+All fields are little-endian. FrameParser pulls the frames out of the byte
+stream and passes every other byte through, so the sketch's own prints still
+reach the serial monitor. The slot table is written next to main.cpp as
+MAP_FILE for the IDE to name the slots.
+"""
+
+import json
+import pathlib
+import struct
+from dataclasses import asdict, dataclass, field
+
+PROFILE_OFF = "off"
+PROFILE_PROCS = "procs"  # Time each Sub/Function
+PROFILE_LINES = "lines"  # Sub/Functions and every VB statement
+PROFILE_MODES = (PROFILE_OFF, PROFILE_PROCS, PROFILE_LINES)
+DEFAULT_INTERVAL_MS = 1000
+MAP_FILE = "profile_map.json"
+
+FRAME_SYNC = b"\x00VP"
+FRAME_VERSION = 1
+MAX_SLOTS = 1024  # Larger counts in a header are taken as noise, not a frame
+_HEADER = struct.Struct("<BHIIII")  # version, slots, elapsed_us, loops, loop_min_us, loop_max_us
+_SLOT = struct.Struct("<II")
+
+
+class ProfileError(RuntimeError):
+    """The sketch needs more counters than a frame can carry."""
+
+
+@dataclass
+class ProfileSlot:
+    kind: str  # "proc" or "line"
+    name: str  # Sub/Function name (for a line, the one containing it)
+    vb_line: int  # The Sub/Function header or the statement's line
+
+
+@dataclass
+class ProfileFrame:
+    elapsed_us: int
+    loops: int
+    loop_min_us: int
+    loop_max_us: int
+    slots: list[tuple[int, int]]  # (us, hits) per slot
+
+
+def runtime_cpp(slot_count: int, interval_ms: int = DEFAULT_INTERVAL_MS) -> str:
+    """C++ for the slot table, the timing hooks and the frame writer."""
+    return f"""
+// Profiling runtime generated by transpiler
+#define __VB_PROF_SLOTS {slot_count}
+#define __VB_PROF_NONE 0xFFFF
+struct __VbProfSlot {{ uint32_t us; uint32_t hits; }};
+static __VbProfSlot __vb_prof[__VB_PROF_SLOTS];
+static uint16_t __vb_prof_cur = __VB_PROF_NONE;
+static uint32_t __vb_prof_mark = 0;
+static uint32_t __vb_prof_loops = 0;
+static uint32_t __vb_prof_loop_min = 0xFFFFFFFFUL;
+static uint32_t __vb_prof_loop_max = 0;
+static uint32_t __vb_prof_loop_start = 0;
+static uint32_t __vb_prof_dumped = 0;
+static bool __vb_prof_started = false;
+
+struct __VbProfScope {{
+    uint16_t slot;
+    uint32_t start;
+    explicit __VbProfScope(uint16_t s) : slot(s), start(micros()) {{}}
+    ~__VbProfScope() {{ __vb_prof[slot].us += micros() - start; __vb_prof[slot].hits++; }}
+}};
+
+static void __vb_prof_line(uint16_t slot) {{
+    uint32_t now = micros();
+    if (__vb_prof_cur != __VB_PROF_NONE) __vb_prof[__vb_prof_cur].us += now - __vb_prof_mark;
+    __vb_prof[slot].hits++;
+    __vb_prof_cur = slot;
+    __vb_prof_mark = micros();
+}}
+
+static void __vb_prof_put(uint32_t value, uint8_t bytes, uint16_t& sum) {{
+    for (uint8_t i = 0; i < bytes; ++i) {{
+        uint8_t b = (uint8_t)(value >> (8 * i));
+        Serial.write(b);
+        sum += b;
+    }}
+}}
+
+static void __vb_prof_dump(uint32_t elapsed) {{
+    uint16_t sum = 0;
+    Serial.write((uint8_t)0x00);
+    Serial.write((uint8_t)'V');
+    Serial.write((uint8_t)'P');
+    __vb_prof_put({FRAME_VERSION}, 1, sum);
+    __vb_prof_put(__VB_PROF_SLOTS, 2, sum);
+    __vb_prof_put(elapsed, 4, sum);
+    __vb_prof_put(__vb_prof_loops, 4, sum);
+    __vb_prof_put(__vb_prof_loops ? __vb_prof_loop_min : 0, 4, sum);
+    __vb_prof_put(__vb_prof_loop_max, 4, sum);
+    for (uint16_t i = 0; i < __VB_PROF_SLOTS; ++i) {{
+        __vb_prof_put(__vb_prof[i].us, 4, sum);
+        __vb_prof_put(__vb_prof[i].hits, 4, sum);
+        __vb_prof[i].us = 0;
+        __vb_prof[i].hits = 0;
+    }}
+    uint16_t check = sum;
+    __vb_prof_put(check, 2, sum);
+    __vb_prof_loops = 0;
+    __vb_prof_loop_min = 0xFFFFFFFFUL;
+    __vb_prof_loop_max = 0;
+}}
+
+// Called first thing in loop(): closes the last line, times the period and dumps when due
+static void __vb_prof_loop() {{
+    uint32_t now = micros();
+    if (__vb_prof_cur != __VB_PROF_NONE) {{
+        __vb_prof[__vb_prof_cur].us += now - __vb_prof_mark;
+        __vb_prof_cur = __VB_PROF_NONE;
+    }}
+    if (!__vb_prof_started) {{
+        __vb_prof_started = true;
+        __vb_prof_dumped = now;
+    }} else {{
+        uint32_t period = now - __vb_prof_loop_start;
+        __vb_prof_loops++;
+        if (period < __vb_prof_loop_min) __vb_prof_loop_min = period;
+        if (period > __vb_prof_loop_max) __vb_prof_loop_max = period;
+    }}
+    __vb_prof_loop_start = now;
+    if (now - __vb_prof_dumped >= {interval_ms}UL * 1000UL) {{
+        __vb_prof_dump(now - __vb_prof_dumped);
+        // Neither the next period nor the next interval includes the time spent writing the frame
+        __vb_prof_dumped = __vb_prof_loop_start = micros();
+    }}
+}}
+"""
+
+
+def ram_bytes(slot_count: int) -> int:
+    """Static RAM the runtime takes: 8 bytes per slot plus its loop and interval state."""
+    return 8 * slot_count + 27
+
+
+def save_map(path: pathlib.Path, slots: list[ProfileSlot], interval_ms: int = DEFAULT_INTERVAL_MS) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        "version": FRAME_VERSION,
+        "interval_ms": interval_ms,
+        "slots": [asdict(slot) for slot in slots],
+    }, indent=1), encoding="utf-8")
+
+
+def load_map(path: pathlib.Path) -> list[ProfileSlot]:
+    """The slot table written by save_map(); raises OSError or ValueError."""
+    data = json.loads(pathlib.Path(path).read_text(encoding="utf-8"))
+    if data.get("version") != FRAME_VERSION:
+        raise ValueError(f"Unsupported profile map version {data.get('version')!r}")
+    return [ProfileSlot(s["kind"], s["name"], int(s["vb_line"])) for s in data["slots"]]
+
+
+class FrameParser:
+    """Separates profile frames from the rest of a serial byte stream."""
+
+    def __init__(self):
+        self._buf = b""
+        self.frames = 0
+        self.bad_frames = 0  # Sync found but the frame was malformed; its bytes were passed through
+
+    def feed(self, data: bytes) -> tuple[bytes, list[ProfileFrame]]:
+        """Returns (bytes that are not part of a frame, completed frames)."""
+        buf = self._buf + data if self._buf else data
+        self._buf = b""
+        if 0 not in buf:
+            return buf, []  # The common case: plain text
+        out = bytearray()
+        frames = []
+        pos = 0
+        while True:
+            start = buf.find(FRAME_SYNC, pos)
+            if start < 0:
+                # Hold back a sync split across reads
+                tail = buf[pos:]
+                keep = next((k for k in (2, 1) if tail.endswith(FRAME_SYNC[:k])), 0)
+                out += tail[:len(tail) - keep]
+                self._buf = tail[len(tail) - keep:] if keep else b""
+                break
+            out += buf[pos:start]
+            body = start + len(FRAME_SYNC)
+            if len(buf) < body + _HEADER.size:
+                self._buf = buf[start:]
+                break
+            version, count, *_ = _HEADER.unpack_from(buf, body)
+            if version != FRAME_VERSION or count > MAX_SLOTS:
+                self.bad_frames += 1
+                out += buf[start:body]
+                pos = body
+                continue
+            end = body + _HEADER.size + count * _SLOT.size
+            if len(buf) < end + 2:
+                self._buf = buf[start:]
+                break
+            (check,) = struct.unpack_from("<H", buf, end)
+            if sum(buf[body:end]) & 0xFFFF != check:
+                self.bad_frames += 1
+                out += buf[start:body]
+                pos = body
+                continue
+            _, _, elapsed, loops, loop_min, loop_max = _HEADER.unpack_from(buf, body)
+            slots = list(_SLOT.iter_unpack(buf[body + _HEADER.size:end]))
+            frames.append(ProfileFrame(elapsed, loops, loop_min, loop_max, slots))
+            self.frames += 1
+            pos = end + 2
+        return bytes(out), frames
+
+
+@dataclass
+class SlotStats:
+    slot: ProfileSlot
+    us: int = 0  # Totals over every frame since the last reset
+    hits: int = 0
+    last_us: int = 0  # The latest frame
+    last_hits: int = 0
+
+
+@dataclass
+class ProfileStats:
+    """Running totals over decoded frames, for the hot-spot view."""
+
+    slots: list[ProfileSlot]
+    rows: list[SlotStats] = field(init=False)
+    elapsed_us: int = 0
+    frames: int = 0
+    loops: int = 0
+    loop_min_us: int = 0  # Over every frame
+    loop_max_us: int = 0
+    last: ProfileFrame | None = None
+
+    def __post_init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.rows = [SlotStats(slot) for slot in self.slots]
+        self.elapsed_us = self.frames = self.loops = 0
+        self.loop_min_us = self.loop_max_us = 0
+        self.last = None
+
+    def add(self, frame: ProfileFrame) -> bool:
+        """Accumulate a frame; False if it doesn't match the slot table (another build's firmware)."""
+        if len(frame.slots) != len(self.rows):
+            return False
+        for row, (us, hits) in zip(self.rows, frame.slots):
+            row.us += us
+            row.hits += hits
+            row.last_us, row.last_hits = us, hits
+        self.elapsed_us += frame.elapsed_us
+        self.frames += 1
+        if frame.loops:
+            self.loop_min_us = min(self.loop_min_us or frame.loop_min_us, frame.loop_min_us)
+            self.loop_max_us = max(self.loop_max_us, frame.loop_max_us)
+            self.loops += frame.loops
+        self.last = frame
+        return True
+
+    @property
+    def loop_hz(self) -> float:
+        """Loop frequency over the latest frame."""
+        frame = self.last
+        return frame.loops * 1e6 / frame.elapsed_us if frame and frame.elapsed_us else 0.0
+
+    @property
+    def loop_mean_us(self) -> float:
+        return self.elapsed_us / self.loops if self.loops else 0.0
+
+    @property
+    def jitter_us(self) -> int:
+        """Spread between the shortest and longest loop period in the latest frame."""
+        frame = self.last
+        return frame.loop_max_us - frame.loop_min_us if frame and frame.loops else 0
+
+    def share(self, row: SlotStats) -> float:
+        """Fraction of the profiled time spent in a slot."""
+        return row.us / self.elapsed_us if self.elapsed_us else 0.0
+
+    def hot(self, kind: str | None = None) -> list[SlotStats]:
+        """Rows by total time, hottest first (only `kind` slots if given)."""
+        rows = [row for row in self.rows if kind is None or row.slot.kind == kind]
+        return sorted(rows, key=lambda row: (-row.us, -row.hits, row.slot.vb_line))
@@ -0,0 +1,297 @@
+"""On-disk serial capture: raw bytes plus a line index, read back through mmap.
+
+A capture is a directory of segments. ``capture-NNNN.log`` holds the bytes
+exactly as received; ``capture-NNNN.idx`` holds one 16-byte record per line
+(byte offset of the line start in the log, receive time) and
+``capture-NNNN.chk`` one per read from the port (byte offset of the end of
+the read, receive time), which lets a capture be replayed with its original
+timing. Segments rotate at a size limit and the oldest are deleted when the
+capture exceeds its total limit, so a capture can run for days.
+
+CaptureReader maps the segments instead of reading them, so opening a
+multi-gigabyte capture costs a few system calls, any line or time is found
+by binary search over the index, and regular expressions run directly over
+the mapped bytes.
+"""
+
+import bisect
+import json
+import mmap
+import pathlib
+import re
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterator
+
+DEFAULT_CAPTURE_DIR = pathlib.Path.home() / ".asic" / "captures"
+DEFAULT_SEGMENT_MB = 64
+DEFAULT_MAX_MB = 2048
+META_NAME = "capture.json"
+INDEX_RECORD = struct.Struct("<Qd")  # line start offset, receive time
+CHUNK_RECORD = struct.Struct("<Qd")  # end offset of one read, receive time
+
+
+def capture_dir_for(port: str, base: pathlib.Path | None = None, started: float | None = None) -> pathlib.Path:
+    """A new capture directory name such as 20240101-120000-ttyUSB0."""
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(started or time.time()))
+    name = re.sub(r"[^\w.-]+", "_", pathlib.PurePath(port).name or "serial")
+    return (base or DEFAULT_CAPTURE_DIR) / f"{stamp}-{name}"
+
+
+class CaptureWriter:
+    """Appends received bytes to rotating segments and indexes each line start.
+
+    Not thread-safe: call write() from the thread that reads the port.
+    """
+
+    def __init__(self, directory: pathlib.Path, segment_mb: int = DEFAULT_SEGMENT_MB,
+                 max_mb: int = DEFAULT_MAX_MB, port: str = "", baudrate: int = 0):
+        self.directory = pathlib.Path(directory)
+        self.segment_bytes = segment_mb * 1024 * 1024
+        self.max_bytes = max(max_mb * 1024 * 1024, self.segment_bytes)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.bytes_written = 0
+        self.lines = 0
+        (self.directory / META_NAME).write_text(json.dumps(
+            {"port": port, "baudrate": baudrate, "started": time.time()}, indent=2) + "\n", encoding="utf-8")
+        self._segment = -1
+        self._log = self._idx = self._chk = None
+        self._size = 0  # Bytes in the current segment
+        self._at_line_start = True
+        self._open_segment()
+
+    def _open_segment(self):
+        self._close_files()
+        self._segment += 1
+        self._log = open(self.directory / f"capture-{self._segment:04d}.log", "wb")
+        self._idx = open(self.directory / f"capture-{self._segment:04d}.idx", "wb")
+        self._chk = open(self.directory / f"capture-{self._segment:04d}.chk", "wb")
+        self._size = 0
+        self._prune()
+
+    def _prune(self):
+        segments = sorted(self.directory.glob("capture-*.log"))
+        total = sum(p.stat().st_size for p in segments)
+        for log in segments[:-1]:
+            if total <= self.max_bytes:
+                break
+            total -= log.stat().st_size
+            log.unlink(missing_ok=True)
+            log.with_suffix(".idx").unlink(missing_ok=True)
+            log.with_suffix(".chk").unlink(missing_ok=True)
+
+    def write(self, data: bytes, timestamp: float | None = None) -> None:
+        if not data:
+            return
+        now = time.time() if timestamp is None else timestamp
+        # Rotate between lines, or mid-line if a line alone outgrows two segments
+        if self._size >= self.segment_bytes and (self._at_line_start or self._size >= 2 * self.segment_bytes):
+            self._open_segment()
+            self._at_line_start = True
+        records = []
+        start = 0
+        if self._at_line_start:
+            records.append(INDEX_RECORD.pack(self._size, now))
+        while True:
+            nl = data.find(b"\n", start)
+            if nl == -1 or nl == len(data) - 1:
+                break
+            records.append(INDEX_RECORD.pack(self._size + nl + 1, now))
+            start = nl + 1
+        self._log.write(data)
+        self._chk.write(CHUNK_RECORD.pack(self._size + len(data), now))
+        if records:
+            self._idx.write(b"".join(records))
+            self.lines += len(records)
+        self._size += len(data)
+        self.bytes_written += len(data)
+        self._at_line_start = data.endswith(b"\n")
+
+    def flush(self) -> None:
+        if self._log:
+            self._log.flush()
+            self._idx.flush()
+            self._chk.flush()
+
+    def _close_files(self):
+        for f in (self._log, self._idx, self._chk):
+            if f:
+                f.close()
+        self._log = self._idx = self._chk = None
+
+    def close(self) -> None:
+        self._close_files()
+
+
+@dataclass
+class _Segment:
+    log: mmap.mmap | None
+    idx: mmap.mmap | None
+    size: int
+    count: int  # Lines indexed
+    first_line: int  # Global number of this segment's first line
+    chk: mmap.mmap | None = None  # Read boundaries; absent in captures made before they were recorded
+
+    def offset(self, i: int) -> int:
+        return INDEX_RECORD.unpack_from(self.idx, i * INDEX_RECORD.size)[0]
+
+    def timestamp(self, i: int) -> float:
+        return INDEX_RECORD.unpack_from(self.idx, i * INDEX_RECORD.size)[1]
+
+    def span(self, i: int) -> tuple[int, int]:
+        end = self.offset(i + 1) if i + 1 < self.count else self.size
+        return self.offset(i), end
+
+
+class _Offsets:
+    """Sequence view of a segment's line offsets, for bisect."""
+
+    def __init__(self, segment: _Segment):
+        self.segment = segment
+
+    def __len__(self):
+        return self.segment.count
+
+    def __getitem__(self, i):
+        return self.segment.offset(i)
+
+
+class _Times(_Offsets):
+    def __getitem__(self, i):
+        return self.segment.timestamp(i)
+
+
+def _map(path: pathlib.Path) -> mmap.mmap | None:
+    with open(path, "rb") as f:
+        try:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty file
+            return None
+
+
+class CaptureReader:
+    """Random access to a capture's lines through memory-mapped segments."""
+
+    def __init__(self, directory: pathlib.Path, encoding: str = "utf-8"):
+        self.directory = pathlib.Path(directory)
+        self.encoding = encoding
+        self.segments: list[_Segment] = []
+        self._starts: list[int] = []
+        try:
+            self.meta = json.loads((self.directory / META_NAME).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.meta = {}
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Re-map the segments, picking up data written since the last call."""
+        self.close()
+        first = 0
+        for log_path in sorted(self.directory.glob("capture-*.log")):
+            idx_path = log_path.with_suffix(".idx")
+            if not idx_path.exists():
+                continue
+            chk_path = log_path.with_suffix(".chk")
+            log, idx = _map(log_path), _map(idx_path)
+            chk = _map(chk_path) if chk_path.exists() else None
+            size = len(log) if log else 0
+            # A record may be half-written while capturing; only whole records count
+            count = (len(idx) // INDEX_RECORD.size) if idx else 0
+            if not count or not size:
+                for m in (log, idx, chk):
+                    if m:
+                        m.close()
+                continue
+            self.segments.append(_Segment(log, idx, size, count, first, chk))
+            first += count
+        self._starts = [s.first_line for s in self.segments]
+
+    def close(self) -> None:
+        for seg in self.segments:
+            for m in (seg.log, seg.idx, seg.chk):
+                if m:
+                    m.close()
+        self.segments = []
+        self._starts = []
+
+    def __len__(self) -> int:
+        return self.segments[-1].first_line + self.segments[-1].count if self.segments else 0
+
+    @property
+    def size(self) -> int:
+        return sum(s.size for s in self.segments)
+
+    def _locate(self, line: int) -> tuple[_Segment, int]:
+        if not 0 <= line < len(self):
+            raise IndexError(line)
+        seg = self.segments[bisect.bisect_right(self._starts, line) - 1]
+        return seg, line - seg.first_line
+
+    def line(self, line: int) -> tuple[float, str]:
+        """(receive time, text without the line terminator) of a line."""
+        seg, i = self._locate(line)
+        start, end = seg.span(i)
+        raw = seg.log[start:end].rstrip(b"\r\n")
+        return seg.timestamp(i), raw.decode(self.encoding, errors="replace")
+
+    def timestamp(self, line: int) -> float:
+        seg, i = self._locate(line)
+        return seg.timestamp(i)
+
+    def line_at_time(self, when: float) -> int:
+        """First line received at or after `when` (len(self) if none)."""
+        for seg in self.segments:
+            if seg.timestamp(seg.count - 1) >= when:
+                return seg.first_line + bisect.bisect_left(_Times(seg), when)
+        return len(self)
+
+    def search(self, pattern: str, ignore_case: bool = False, start_line: int = 0,
+               cancel: threading.Event | None = None) -> Iterator[int]:
+        """Yield the numbers of lines matching a regular expression, in order.
+
+        The pattern runs over the mapped bytes (encoded as UTF-8), one match
+        per line at most.
+        """
+        flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+        regex = re.compile(pattern.encode(self.encoding), flags)
+        for seg in self.segments:
+            if seg.first_line + seg.count <= start_line:
+                continue
+            offsets = _Offsets(seg)
+            pos = seg.offset(max(0, start_line - seg.first_line))
+            while pos < seg.size:
+                if cancel is not None and cancel.is_set():
+                    return
+                m = regex.search(seg.log, pos)
+                if not m:
+                    break
+                i = bisect.bisect_right(offsets, m.start()) - 1
+                yield seg.first_line + i
+                # Continue after this line so each line is reported once
+                pos = seg.span(i)[1]
+                if pos <= m.start():
+                    pos = m.start() + 1
+
+    def chunks(self) -> Iterator[tuple[float, bytes]]:
+        """(receive time, bytes) for each read from the port, in order.
+
+        Captures without read boundaries are replayed a line at a time.
+        """
+        for seg in self.segments:
+            if seg.chk is not None:
+                start = 0
+                for i in range(len(seg.chk) // CHUNK_RECORD.size):
+                    end, ts = CHUNK_RECORD.unpack_from(seg.chk, i * CHUNK_RECORD.size)
+                    end = min(end, seg.size)
+                    if end > start:
+                        yield ts, seg.log[start:end]
+                        start = end
+                if start < seg.size:
+                    # Bytes logged after the last whole record (capture still running)
+                    yield seg.timestamp(seg.count - 1), seg.log[start:seg.size]
+            else:
+                for i in range(seg.count):
+                    start, end = seg.span(i)
+                    yield seg.timestamp(i), seg.log[start:end]
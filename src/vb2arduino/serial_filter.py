@@ -0,0 +1,157 @@
+"""Filter and highlight rules for serial output, with a tag index over the scrollback.
+
+Each rule is a regular expression compiled once. As a line arrives,
+RuleSet.tag() gives it a bitmask of the rules it matches: one combined
+search rejects the common case of a line matching nothing, and only lines
+that pass run the individual rules. LineIndex keeps (text, tags) for the
+lines in the scrollback, so changing which rules filter or highlight walks
+the stored bitmasks instead of running any regex again. Only a newly added
+rule has to scan the stored lines, once.
+"""
+
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Iterator
+
+MAX_RULES = 30
+MESSAGE = 1 << MAX_RULES  # Tag of monitor messages ("Connected to ..."); shown whatever the filter
+
+# Group references would point at the wrong group once patterns are joined into one
+_GROUP_REF = re.compile(r"\\[1-9]|\(\?P=|\\g<")
+
+
+@dataclass
+class Rule:
+    pattern: str
+    color: str | None = None  # Highlight color; None for a rule only used to filter
+    ignore_case: bool = False
+    regex: re.Pattern = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Raises re.error for an invalid pattern
+        self.regex = re.compile(self.pattern, re.IGNORECASE if self.ignore_case else 0)
+
+
+class RuleSet:
+    """Up to MAX_RULES rules, each owning one bit of a line's tags."""
+
+    def __init__(self):
+        self._rules: list[Rule | None] = []  # Index = tag bit; None marks a free slot
+        self._active: list[tuple[int, re.Pattern]] = []
+        self._any: re.Pattern | None = None
+
+    def __len__(self) -> int:
+        return len(self._active)
+
+    def __iter__(self) -> Iterator[tuple[int, Rule]]:
+        return ((bit, rule) for bit, rule in enumerate(self._rules) if rule)
+
+    def find(self, pattern: str, ignore_case: bool = False) -> int | None:
+        for bit, rule in self:
+            if rule.pattern == pattern and rule.ignore_case == ignore_case:
+                return bit
+        return None
+
+    def add(self, rule: Rule) -> tuple[int, bool]:
+        """Add a rule (or update the color of an identical one). Returns (bit, is_new)."""
+        bit = self.find(rule.pattern, rule.ignore_case)
+        if bit is not None:
+            if rule.color:
+                self._rules[bit].color = rule.color
+            return bit, False
+        try:
+            bit = self._rules.index(None)
+            self._rules[bit] = rule
+        except ValueError:
+            if len(self._rules) >= MAX_RULES:
+                raise ValueError(f"At most {MAX_RULES} filter/highlight rules") from None
+            bit = len(self._rules)
+            self._rules.append(rule)
+        self._rebuild()
+        return bit, True
+
+    def remove(self, bit: int) -> None:
+        if 0 <= bit < len(self._rules):
+            self._rules[bit] = None
+            self._rebuild()
+
+    def rule(self, bit: int) -> Rule | None:
+        return self._rules[bit] if 0 <= bit < len(self._rules) else None
+
+    def _rebuild(self):
+        self._active = [(bit, rule.regex) for bit, rule in self]
+        self._any = None
+        rules = [rule for _, rule in self]
+        if rules and not any(_GROUP_REF.search(r.pattern) for r in rules):
+            try:
+                self._any = re.compile("|".join(
+                    f"(?i:{r.pattern})" if r.ignore_case else f"(?:{r.pattern})" for r in rules))
+            except re.error:
+                self._any = None  # e.g. a pattern with global inline flags; check the rules one by one
+
+    def tag(self, text: str) -> int:
+        """Bitmask of the rules matching `text`."""
+        if not self._active:
+            return 0
+        if self._any is not None and not self._any.search(text):
+            return 0
+        tags = 0
+        for bit, regex in self._active:
+            if regex.search(text):
+                tags |= 1 << bit
+        return tags
+
+    def tag_one(self, bit: int, text: str) -> bool:
+        rule = self._rules[bit]
+        return bool(rule and rule.regex.search(text))
+
+    @property
+    def highlight_mask(self) -> int:
+        return sum(1 << bit for bit, rule in self if rule.color)
+
+    def color_for(self, tags: int) -> str | None:
+        """Color of the first highlight rule among `tags`."""
+        if tags:
+            for bit, rule in self:
+                if rule.color and tags & (1 << bit):
+                    return rule.color
+        return None
+
+
+class LineIndex:
+    """(text, tags) of the last `max_lines` lines, oldest first."""
+
+    def __init__(self, max_lines: int = 0):
+        self._lines: deque[list] = deque(maxlen=max_lines or None)
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def append(self, text: str, tags: int = 0) -> None:
+        self._lines.append([text, tags])
+
+    def set_max_lines(self, max_lines: int) -> None:
+        if (max_lines or None) != self._lines.maxlen:
+            self._lines = deque(self._lines, maxlen=max_lines or None)
+
+    def clear(self) -> None:
+        self._lines.clear()
+
+    def retag(self, rules: RuleSet, bit: int) -> None:
+        """Set or clear one rule's bit on every stored line (after the rule was added or removed)."""
+        flag = 1 << bit
+        for entry in self._lines:
+            if entry[1] & MESSAGE:
+                continue
+            if rules.tag_one(bit, entry[0]):
+                entry[1] |= flag
+            else:
+                entry[1] &= ~flag
+
+    def lines(self, mask: int = 0) -> Iterator[tuple[str, int]]:
+        """Stored lines with any of the `mask` tags (all lines for 0); messages always match."""
+        if not mask:
+            return ((text, tags) for text, tags in self._lines)
+        mask |= MESSAGE
+        return ((text, tags) for text, tags in self._lines if tags & mask)
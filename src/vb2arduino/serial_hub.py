@@ -0,0 +1,293 @@
+"""Several serial ports read by one thread.
+
+SerialHub opens any number of ports and services them all from a single
+selector loop: one thread, sleeping until any port has data, however many
+boards are attached. Where port handles can't be selected on (Windows) the
+same thread polls each port's input count instead.
+
+Every session decodes its own stream with a LineAssembler, keeps byte and
+line counters, and can write a capture. LineMerger interleaves the lines of
+all sessions by receive time for a combined view.
+"""
+
+import heapq
+import itertools
+import os
+import selectors
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+import serial
+
+from vb2arduino.serial_capture import CaptureWriter
+from vb2arduino.serial_stream import LineAssembler, SerialLine
+
+POLL_S = 0.01  # Fallback loop interval where ports can't be selected on
+CLOSE_TIMEOUT_S = 1.0  # How long close() waits for the loop to release a port
+
+
+@dataclass
+class PortStats:
+    """Counters since the session was opened."""
+
+    bytes_in: int = 0
+    bytes_out: int = 0
+    lines_in: int = 0
+
+
+class HubSession:
+    """One open port in a SerialHub. Reads happen on the hub thread; write() may be called from any thread."""
+
+    def __init__(self, session_id: int, port: str, baudrate: int, serial_port):
+        self.id = session_id
+        self.port = port
+        self.baudrate = baudrate
+        self.serial = serial_port
+        self.assembler = LineAssembler()
+        self.stats = PortStats()
+        self.error = ""  # Why the session ended, if it failed
+        self.closed = threading.Event()
+        self._closing = False
+        self._capture: CaptureWriter | None = None
+        self._capture_lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return not self._closing and not self.closed.is_set()
+
+    def write(self, data: bytes) -> int:
+        written = self.serial.write(data) or 0
+        self.stats.bytes_out += written
+        return written
+
+    def set_capture(self, writer: CaptureWriter | None) -> CaptureWriter | None:
+        """Start (or with None, stop) capturing this port. Returns the previous writer."""
+        with self._capture_lock:
+            old, self._capture = self._capture, writer
+        return old
+
+    def _record(self, data: bytes, now: float) -> None:
+        if self._capture:
+            with self._capture_lock:
+                if self._capture:
+                    self._capture.write(data, now)
+                    self._capture.flush()
+
+
+class SerialHub:
+    """Opens ports and reads them all on one background thread.
+
+    Callbacks run on the hub thread:
+      on_data(session, text, lines)  decoded text and the lines it completed
+      on_error(session, message)     the port failed; the session is then closed
+      on_closed(session)             after the port has been released
+    """
+
+    def __init__(self, on_data: Callable[[HubSession, str, list[SerialLine]], None] | None = None,
+                 on_error: Callable[[HubSession, str], None] | None = None,
+                 on_closed: Callable[[HubSession], None] | None = None):
+        self.on_data = on_data
+        self.on_error = on_error
+        self.on_closed = on_closed
+        self._sessions: dict[int, HubSession] = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._thread: threading.Thread | None = None
+        self._running = False
+        self._wake_event = threading.Event()
+        self._selector = None
+        self._wake_r = self._wake_w = None
+        if os.name == "posix":
+            self._selector = selectors.DefaultSelector()
+            self._wake_r, self._wake_w = os.pipe()
+            os.set_blocking(self._wake_r, False)
+            self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+
+    @property
+    def sessions(self) -> list[HubSession]:
+        with self._lock:
+            return list(self._sessions.values())
+
+    def session_for(self, port: str) -> HubSession | None:
+        return next((s for s in self.sessions if s.port == port and s.is_open), None)
+
+    def open(self, port: str, baudrate: int) -> HubSession:
+        """Open a port and start reading it. Raises serial.SerialException on failure."""
+        if self.session_for(port):
+            raise serial.SerialException(f"{port} is already open")
+        kwargs = {"exclusive": True} if os.name == "posix" else {}
+        # timeout=0: reads return what is buffered; the loop only reads once a port is ready
+        serial_port = serial.Serial(port=port, baudrate=baudrate, timeout=0, write_timeout=1, **kwargs)
+        session = HubSession(next(self._ids), port, baudrate, serial_port)
+        with self._lock:
+            self._sessions[session.id] = session
+        self._ensure_thread()
+        self._wake()
+        return session
+
+    def close(self, session: HubSession, wait: bool = True) -> None:
+        """Stop reading a session and close its port (on the hub thread)."""
+        if session.closed.is_set():
+            return
+        session._closing = True
+        if self._thread and self._thread.is_alive():
+            self._wake()
+            if wait:
+                session.closed.wait(CLOSE_TIMEOUT_S)
+        else:
+            self._release(session)
+
+    def shutdown(self) -> None:
+        """Close every session and stop the thread."""
+        for session in self.sessions:
+            session._closing = True
+        self._running = False
+        self._wake()
+        if self._thread:
+            self._thread.join(CLOSE_TIMEOUT_S * 2)
+            self._thread = None
+        for session in self.sessions:
+            self._release(session)
+        if self._selector:
+            self._selector.close()
+            self._selector = None
+        for fd in (self._wake_r, self._wake_w):
+            if fd is not None:
+                os.close(fd)
+        self._wake_r = self._wake_w = None
+
+    def _ensure_thread(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="SerialHub", daemon=True)
+        self._thread.start()
+
+    def _wake(self):
+        if self._wake_w is not None:
+            try:
+                os.write(self._wake_w, b"\0")
+            except OSError:
+                pass
+        self._wake_event.set()
+
+    def _run(self):
+        registered: set[int] = set()
+        while self._running:
+            for session in self.sessions:
+                if session._closing:
+                    registered.discard(session.id)
+                    self._release(session)
+                elif self._selector and session.id not in registered:
+                    try:
+                        self._selector.register(session.serial.fileno(), selectors.EVENT_READ, session)
+                        registered.add(session.id)
+                    except (ValueError, OSError) as e:
+                        self._fail(session, f"Cannot watch port: {e}")
+            if self._selector:
+                for key, _ in self._selector.select():
+                    if key.data is None:
+                        try:
+                            os.read(self._wake_r, 4096)
+                        except OSError:
+                            pass
+                    elif not key.data._closing:
+                        self._read(key.data)
+            else:
+                busy = False
+                for session in self.sessions:
+                    if not session._closing:
+                        busy = self._read(session) or busy
+                if not busy:
+                    self._wake_event.wait(POLL_S)
+                    self._wake_event.clear()
+
+    def _read(self, session: HubSession) -> bool:
+        try:
+            port = session.serial
+            waiting = port.in_waiting
+            if not waiting and not self._selector:
+                return False
+            # A ready port with nothing to read means the device went away; read() then raises
+            data = port.read(waiting or 1)
+        except Exception as e:
+            self._fail(session, f"Read error: {e}")
+            return False
+        if not data:
+            return False
+        now = time.time()
+        session._record(data, now)
+        text, lines = session.assembler.feed(data, now)
+        session.stats.bytes_in += len(data)
+        session.stats.lines_in += len(lines)
+        if self.on_data and (text or lines):
+            self.on_data(session, text, lines)
+        return True
+
+    def _fail(self, session: HubSession, message: str):
+        session.error = message
+        session._closing = True
+        if self.on_error:
+            self.on_error(session, message)
+        self._release(session)
+
+    def _release(self, session: HubSession):
+        """Unregister and close a session's port; runs once per session."""
+        with self._lock:
+            if self._sessions.pop(session.id, None) is None:
+                return
+        if self._selector:
+            try:
+                self._selector.unregister(session.serial.fileno())
+            except (KeyError, ValueError, OSError):
+                pass
+        try:
+            session.serial.close()
+        except Exception:
+            pass
+        tail = session.assembler.flush()
+        if tail and self.on_data:
+            self.on_data(session, "", [tail])
+        session.closed.set()
+        if self.on_closed:
+            self.on_closed(session)
+
+
+class LineMerger:
+    """Interleaves lines from several sources in receive-time order.
+
+    A line is stamped with the arrival of its first byte but only delivered
+    when its newline arrives, so a long line from one port can complete after
+    a later, shorter one from another. Lines are held for `hold` seconds and
+    released sorted by timestamp.
+    """
+
+    def __init__(self, hold: float = 0.1):
+        self.hold = hold
+        self._heap: list = []
+        self._seq = itertools.count()  # Keeps equal timestamps in arrival order
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, source, lines: list[SerialLine]) -> None:
+        for line in lines:
+            heapq.heappush(self._heap, (line.timestamp, next(self._seq), source, line))
+
+    def pop_ready(self, now: float | None = None) -> list[tuple[object, SerialLine]]:
+        """(source, line) for every line older than the hold time, oldest first."""
+        cutoff = (time.time() if now is None else now) - self.hold
+        ready = []
+        while self._heap and self._heap[0][0] <= cutoff:
+            _ts, _seq, source, line = heapq.heappop(self._heap)
+            ready.append((source, line))
+        return ready
+
+    def flush(self) -> list[tuple[object, SerialLine]]:
+        """Everything held, oldest first."""
+        return self.pop_ready(float("inf"))
+
+    def clear(self) -> None:
+        self._heap.clear()
@@ -0,0 +1,187 @@
+"""Numeric series parsed from serial lines, kept in fixed-size ring buffers for plotting.
+
+Lines like ``12.5,3,-1`` or ``temp:21.5 hum:40`` (the Arduino serial plotter
+formats) become one sample per field. Each channel is an ``array('d')`` ring,
+so memory stays fixed however long the stream runs. ``Envelope`` reduces a
+window to (min, max) per block of samples, with blocks aligned to absolute
+sample numbers so finished blocks are computed once and reused on every
+redraw: per-frame cost follows the new samples and the plot width, not the
+window size.
+"""
+
+import csv
+import re
+import time
+from array import array
+from typing import Iterable, TextIO
+
+from vb2arduino.serial_stream import SerialLine
+
+DEFAULT_CAPACITY = 100000  # Samples kept per channel
+MAX_CHANNELS = 16
+
+# "label:value" or a bare value, separated by commas, tabs or spaces
+FIELD_RE = re.compile(r"(?:([A-Za-z_][\w.]*)\s*[:=]\s*)?([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)(?![\w.])")
+
+
+def parse_fields(text: str) -> list[tuple[str | None, float]]:
+    """(label or None, value) for each numeric field of a line; [] if the line isn't numeric data."""
+    fields = FIELD_RE.findall(text)
+    if not fields:
+        return []
+    # Free text that merely contains a number ("Connecting to WiFi 2") isn't plot data
+    rest = FIELD_RE.sub("", text)
+    if re.search(r"[A-Za-z]{3,}", rest):
+        return []
+    return [(label or None, float(value)) for label, value in fields]
+
+
+class RingBuffer:
+    """Fixed-capacity float ring; the oldest values are overwritten."""
+
+    def __init__(self, capacity: int, fill: float = 0.0, count: int = 0):
+        self.capacity = capacity
+        self._data = array("d", [fill]) * capacity
+        self._head = count % capacity  # Next write position
+        self._count = min(count, capacity)
+        self.total = count  # Values appended since creation or clear; absolute index of the next one
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, value: float) -> None:
+        self._data[self._head] = value
+        self._head = (self._head + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+        self.total += 1
+
+    def tail(self, n: int | None = None) -> array:
+        """The last `n` values (all if None), oldest first."""
+        n = self._count if n is None else max(0, min(n, self._count))
+        start = (self._head - n) % self.capacity
+        if start + n <= self.capacity:
+            return self._data[start:start + n]
+        return self._data[start:] + self._data[:self._head]
+
+    def slice(self, start: int, stop: int) -> array:
+        """Values with absolute indexes start..stop-1, clipped to what is still buffered."""
+        start = max(start, self.total - self._count)
+        stop = min(stop, self.total)
+        if stop <= start:
+            return array("d")
+        a, b = start % self.capacity, stop % self.capacity
+        if a < b:
+            return self._data[a:b]
+        return self._data[a:] + self._data[:b]
+
+    def clear(self) -> None:
+        self._head = self._count = self.total = 0
+
+
+class Envelope:
+    """Incremental (min, max) decimation of a RingBuffer for drawing.
+
+    The block size is a power of two and blocks start at multiples of it in
+    absolute sample numbers, so a full block never changes and is kept until it
+    scrolls out of the window.
+    """
+
+    def __init__(self, ring: RingBuffer):
+        self.ring = ring
+        self._block = 0
+        self._first = 0  # Absolute block number of _cols[0]
+        self._cols: list[tuple[float, float]] = []
+
+    def columns(self, n: int, width: int) -> tuple[int, list[tuple[float, float]]]:
+        """(block size, (min, max) per block) for the last `n` values, at most `width` blocks.
+
+        With block size 1 each value is its own block.
+        """
+        ring = self.ring
+        n = min(n, len(ring))
+        if n <= 0 or width <= 1:
+            return 1, []
+        if n <= width:
+            return 1, [(v, v) for v in ring.tail(n)]
+        block = 2
+        while block * (width - 1) < n:
+            block *= 2
+        end = ring.total
+        first, full = (end - n) // block, end // block
+        if block != self._block or first < self._first:
+            self._block, self._first, self._cols = block, first, []
+        elif first > self._first:
+            del self._cols[:first - self._first]
+            self._first = first
+        cols = self._cols
+        for b in range(self._first + len(cols), full):
+            chunk = ring.slice(b * block, (b + 1) * block)
+            cols.append((min(chunk), max(chunk)) if chunk else (0.0, 0.0))
+        out = cols[:]
+        if end > full * block:
+            chunk = ring.slice(full * block, end)
+            out.append((min(chunk), max(chunk)))
+        return block, out
+
+
+class PlotData:
+    """Channels of samples with a shared receive-time axis."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.times = RingBuffer(capacity)
+        self.channels: dict[str, RingBuffer] = {}
+        self.envelopes: dict[str, Envelope] = {}
+        self.total_samples = 0  # Fields parsed since the last clear, for rate display
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def add_lines(self, lines: Iterable[SerialLine]) -> int:
+        """Parse lines and append one sample per numeric line. Returns samples added."""
+        added = 0
+        for line in lines:
+            fields = parse_fields(line.text)
+            if fields:
+                self.add_sample(fields, line.timestamp)
+                added += len(fields)
+        return added
+
+    def add_sample(self, fields: list[tuple[str | None, float]], timestamp: float | None = None) -> None:
+        self.times.append(time.time() if timestamp is None else timestamp)
+        seen = set()
+        for i, (label, value) in enumerate(fields):
+            name = label or str(i + 1)
+            ring = self.channels.get(name)
+            if ring is None:
+                if len(self.channels) >= MAX_CHANNELS:
+                    continue
+                # A channel that appears late is back-filled with its first value
+                ring = self.channels[name] = RingBuffer(self.capacity, value, self.times.total - 1)
+                self.envelopes[name] = Envelope(ring)
+            ring.append(value)
+            seen.add(name)
+            self.total_samples += 1
+        # Channels missing from this line hold their last value so all stay aligned
+        for name, ring in self.channels.items():
+            if name not in seen:
+                last = ring.tail(1)
+                ring.append(last[0] if last else 0.0)
+
+    def clear(self) -> None:
+        self.times.clear()
+        self.channels.clear()
+        self.envelopes.clear()
+        self.total_samples = 0
+
+    def write_csv(self, out: TextIO, last: int | None = None) -> int:
+        """Write the last `last` samples (all buffered if None) as CSV. Returns rows written."""
+        names = list(self.channels)
+        times = self.times.tail(last)
+        columns = [self.channels[name].tail(len(times)) for name in names]
+        writer = csv.writer(out)
+        writer.writerow(["timestamp", *names])
+        for row, ts in enumerate(times):
+            writer.writerow([f"{ts:.6f}", *(repr(col[row]) for col in columns)])
+        return len(times)
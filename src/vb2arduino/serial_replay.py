@@ -0,0 +1,199 @@
+"""Replay a serial capture through a virtual serial port.
+
+VirtualSerialPort opens a pseudo-terminal pair: the serial monitor (or any
+other program) opens `port` exactly as it would a USB device, while the
+Replayer writes the captured bytes into the other end, read by read, at the
+original pace, faster, or as fast as the reader keeps up (speed 0).
+
+The replay waits while nothing has the port open, so connecting late loses
+nothing and a reconnect resumes where it paused. Bytes the program sends to
+the "device" are read and counted so its writes never block.
+
+POSIX only: Windows has no pseudo-terminals to stand in for a COM port.
+"""
+
+import errno
+import os
+import select
+import threading
+import time
+import tty
+from typing import Callable, Iterable, Iterator
+
+from vb2arduino.serial_capture import CaptureReader
+
+SPEED_MAX = 0.0  # Replay as fast as the reader takes the data
+POLL_S = 0.05  # How often a paused replay checks for the port being reopened
+
+
+class VirtualSerialPort:
+    """A pseudo-terminal whose slave end stands in for a serial device."""
+
+    def __init__(self):
+        if os.name != "posix":
+            raise OSError("Virtual serial ports need POSIX pseudo-terminals")
+        self._master, slave = os.openpty()
+        tty.setraw(self._master)
+        tty.setraw(slave)
+        self.port = os.ttyname(slave)
+        # Without an open slave, reading the master fails with EIO: that is how
+        # is_open() tells whether a program currently has the port open
+        os.close(slave)
+        os.set_blocking(self._master, False)
+        self.bytes_from_host = 0
+        self.on_host_data: Callable[[bytes], None] | None = None
+
+    def fileno(self) -> int:
+        return self._master
+
+    def is_open(self) -> bool:
+        """True while some program has the port open. Drains anything it sent."""
+        try:
+            data = os.read(self._master, 65536)
+        except BlockingIOError:
+            return True
+        except OSError as e:
+            if e.errno == errno.EIO:
+                return False
+            raise
+        self._received(data)
+        return True
+
+    def _received(self, data: bytes):
+        if data:
+            self.bytes_from_host += len(data)
+            if self.on_host_data:
+                self.on_host_data(data)
+
+    def write(self, data: bytes, stop: threading.Event) -> int:
+        """Write `data`, waiting while the reader's buffer is full.
+
+        Returns the bytes written: fewer than len(data) if stopped or if the
+        program closed the port.
+        """
+        written = 0
+        while written < len(data) and not stop.is_set():
+            readable, writable, _ = select.select([self._master], [self._master], [], POLL_S)
+            if readable and not self.is_open():
+                break
+            if writable:
+                try:
+                    written += os.write(self._master, data[written:written + 65536])
+                except BlockingIOError:
+                    pass
+                except OSError as e:
+                    if e.errno == errno.EIO:
+                        break
+                    raise
+        return written
+
+    def close(self):
+        if self._master is not None:
+            os.close(self._master)
+            self._master = None
+
+
+def capture_chunks(directory) -> Callable[[], Iterator[tuple[float, bytes]]]:
+    """A chunk source over a capture directory; each call starts from the beginning."""
+    def chunks():
+        reader = CaptureReader(directory)
+        try:
+            for ts, data in reader.chunks():
+                yield ts, bytes(data)
+        finally:
+            reader.close()
+    return chunks
+
+
+class Replayer:
+    """Writes (timestamp, bytes) chunks into a VirtualSerialPort on a background thread.
+
+    speed 1.0 keeps the captured timing, 10.0 runs ten times faster and
+    SPEED_MAX sends as fast as the reader takes it. Time spent waiting for
+    the port to be (re)opened is not counted against the schedule.
+    """
+
+    def __init__(self, source: Callable[[], Iterable[tuple[float, bytes]]], port: VirtualSerialPort,
+                 speed: float = 1.0, loop: bool = False, name: str = ""):
+        self.source = source
+        self.name = name  # For display, e.g. the capture directory name
+        self.port = port
+        self.speed = speed
+        self.loop = loop
+        self.bytes_sent = 0
+        self.chunks_sent = 0
+        self.passes = 0
+        self.started_at = 0.0  # monotonic() when the first byte was written
+        self.finished_at = 0.0
+        self.error = ""
+        self.finished = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="SerialReplay", daemon=True)
+
+    @property
+    def elapsed(self) -> float:
+        if not self.started_at:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self.finished.wait(timeout)
+
+    def _wait_for_reader(self) -> float:
+        """Block until the port is open; returns how long that took."""
+        began = time.monotonic()
+        while not self._stop.is_set() and not self.port.is_open():
+            self._stop.wait(POLL_S)
+        return time.monotonic() - began
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                self._wait_for_reader()
+                self._replay_once()
+                self.passes += 1
+                if not self.loop:
+                    break
+        except Exception as e:  # OSError if the pty goes away
+            self.error = str(e)
+        finally:
+            self.finished_at = time.monotonic()
+            self.finished.set()
+
+    def _replay_once(self):
+        first_ts = None
+        base = time.monotonic()
+        for ts, data in self.source():
+            if self._stop.is_set():
+                return
+            if first_ts is None:
+                first_ts = ts
+            if self.speed > 0:
+                delay = base + (ts - first_ts) / self.speed - time.monotonic()
+                if delay > 0 and self._stop.wait(delay):
+                    return
+            if not self.started_at:
+                self.started_at = time.monotonic()
+            sent = 0
+            while True:
+                sent += self.port.write(data[sent:], self._stop)
+                if sent >= len(data) or self._stop.is_set():
+                    break
+                # The reader closed the port: pause the schedule until it is reopened
+                base += self._wait_for_reader()
+            self.bytes_sent += sent
+            if sent < len(data):
+                return
+            self.chunks_sent += 1
@@ -0,0 +1,214 @@
+"""Paced sending of text and files to a serial port from a writer thread.
+
+SendOptions describes how a payload goes out: in chunks of `chunk_size`
+bytes or a line at a time, with an optional pause after each piece, and with
+optional flow control. XON/XOFF is left to the OS driver (pyserial's
+`xonxoff`), which suspends output while the device has sent XOFF; ACK flow
+waits after each piece for a received line containing the `ack` token.
+
+SendQueue runs jobs in order on its own thread, so callers never block on
+the port; progress and completion are reported through callbacks.
+"""
+
+import itertools
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Iterator
+
+import serial
+
+from vb2arduino.serial_stream import SerialLine
+
+FLOW_NONE = "none"
+FLOW_XONXOFF = "xonxoff"
+FLOW_ACK = "ack"
+PROGRESS_INTERVAL_S = 0.1  # Progress callbacks at most this often per job
+
+
+@dataclass
+class SendOptions:
+    chunk_size: int = 256  # Bytes per write (ignored when sending by line)
+    by_line: bool = False  # One write per line, pacing and ACKs applying to each line
+    delay_ms: float = 0.0  # Pause after each chunk or line
+    flow: str = FLOW_NONE
+    ack: str = "OK"  # ACK flow: a received line containing this acknowledges the last piece
+    ack_timeout_s: float = 2.0
+    stall_timeout_s: float = 10.0  # Fail if the port accepts nothing for this long
+
+    def to_dict(self) -> dict:
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SendOptions":
+        return cls(**{k: v for k, v in (data or {}).items() if k in cls.__dataclass_fields__})
+
+
+@dataclass
+class SendJob:
+    id: int
+    name: str  # File name, or the text for a typed line
+    data: bytes
+    options: SendOptions
+    sent: int = 0
+    state: str = "queued"  # queued, sending, done, failed, cancelled
+    error: str = ""
+    started: float = 0.0
+    finished: float = 0.0
+    _cancel: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def total(self) -> int:
+        return len(self.data)
+
+    @property
+    def rate(self) -> float:
+        """Bytes per second so far."""
+        elapsed = (self.finished or time.monotonic()) - self.started if self.started else 0.0
+        return self.sent / elapsed if elapsed > 0 else 0.0
+
+
+def split_payload(data: bytes, options: SendOptions) -> Iterator[bytes]:
+    """The pieces a payload is written in."""
+    if options.by_line:
+        yield from data.splitlines(keepends=True)
+    else:
+        size = max(1, options.chunk_size)
+        for start in range(0, len(data), size):
+            yield data[start:start + size]
+
+
+class SendQueue:
+    """Writes queued jobs to an open port on a background thread.
+
+    on_progress(job) and on_finished(job) run on the writer thread. Feed the
+    received lines to ack_lines() (from the reader thread) for ACK flow.
+    """
+
+    def __init__(self, port, on_progress: Callable[[SendJob], None] | None = None,
+                 on_finished: Callable[[SendJob], None] | None = None):
+        self.port = port
+        self.on_progress = on_progress
+        self.on_finished = on_finished
+        self.current: SendJob | None = None
+        self._jobs: deque[SendJob] = deque()
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._ack = threading.Event()
+        self._ack_token = ""
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="SerialSend", daemon=True)
+        self._thread.start()
+
+    def submit(self, name: str, data: bytes, options: SendOptions | None = None) -> SendJob:
+        job = SendJob(next(self._ids), name, data, options or SendOptions())
+        with self._cond:
+            self._jobs.append(job)
+            self._cond.notify()
+        return job
+
+    def pending(self) -> list[SendJob]:
+        with self._cond:
+            return list(self._jobs)
+
+    def cancel(self, job: SendJob | None = None) -> None:
+        """Cancel one job, or with None the running job and everything queued."""
+        with self._cond:
+            jobs = [job] if job else [*self._jobs, *([self.current] if self.current else [])]
+            for j in jobs:
+                j._cancel.set()
+                if j in self._jobs:
+                    self._jobs.remove(j)
+                    self._finish(j, "cancelled")
+        running = self.current
+        if running and running._cancel.is_set():
+            self._ack.set()  # Stop waiting for an acknowledgement
+        if running and running._cancel.is_set() and hasattr(self.port, "cancel_write"):
+            try:
+                self.port.cancel_write()  # Interrupts a write blocked by flow control (POSIX)
+            except Exception:
+                pass
+
+    def ack_lines(self, lines: list[SerialLine]) -> None:
+        """Received lines, for ACK flow. Safe to call from any thread."""
+        token = self._ack_token
+        if token and any(token in line.text for line in lines):
+            self._ack.set()
+
+    def close(self, timeout: float = 2.0) -> None:
+        self.cancel()
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    def _finish(self, job: SendJob, state: str, error: str = ""):
+        job.state, job.error = state, error
+        job.finished = time.monotonic()
+        if self.on_finished:
+            self.on_finished(job)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and not self._jobs:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                job = self.current = self._jobs.popleft()
+            try:
+                self._send(job)
+            finally:
+                self.current = None
+
+    def _send(self, job: SendJob):
+        opts = job.options
+        port = self.port
+        job.state, job.started = "sending", time.monotonic()
+        saved = (port.write_timeout, port.xonxoff)
+        try:
+            port.write_timeout = opts.stall_timeout_s
+            if opts.flow == FLOW_XONXOFF:
+                port.xonxoff = True
+            self._ack_token = opts.ack if opts.flow == FLOW_ACK else ""
+            paced = opts.delay_ms > 0 or opts.flow == FLOW_ACK
+            last_progress = 0.0
+            for piece in split_payload(job.data, opts):
+                if job._cancel.is_set():
+                    break
+                self._ack.clear()
+                port.write(piece)
+                if paced:
+                    port.flush()  # Pace what reaches the device, not what reaches the OS buffer
+                job.sent += len(piece)
+                if opts.flow == FLOW_ACK and not self._ack.wait(opts.ack_timeout_s):
+                    if not job._cancel.is_set():
+                        self._finish(job, "failed", f"No {opts.ack!r} within {opts.ack_timeout_s:g} s "
+                                                    f"after byte {job.sent:,}")
+                        return
+                if opts.delay_ms > 0 and job._cancel.wait(opts.delay_ms / 1000):
+                    break
+                now = time.monotonic()
+                if self.on_progress and now - last_progress >= PROGRESS_INTERVAL_S:
+                    last_progress = now
+                    self.on_progress(job)
+            if not paced:
+                port.flush()
+        except serial.SerialTimeoutException:
+            if not job._cancel.is_set():
+                self._finish(job, "failed", f"The device stopped accepting data after byte {job.sent:,}")
+                return
+        except Exception as e:
+            if not job._cancel.is_set():
+                self._finish(job, "failed", f"Write error: {e}")
+                return
+        finally:
+            self._ack_token = ""
+            try:
+                port.write_timeout, port.xonxoff = saved
+            except Exception:
+                pass
+        if self.on_progress:
+            self.on_progress(job)
+        self._finish(job, "cancelled" if job._cancel.is_set() else "done")
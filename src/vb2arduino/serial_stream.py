@@ -0,0 +1,79 @@
+"""Streaming decode of serial data into timestamped lines.
+
+Reads from a serial port end at arbitrary byte boundaries: a UTF-8 character
+or a line can be split across two reads. LineAssembler keeps the decoder
+state and the unfinished line between reads, so consumers receive exact text
+and whole lines, each stamped with the time its first byte arrived.
+"""
+
+import codecs
+import time
+from typing import NamedTuple
+
+MAX_LINE = 16384  # Characters; longer runs without a newline (binary noise) are split
+
+
+class SerialLine(NamedTuple):
+    timestamp: float  # time.time() when the line's first byte was read
+    text: str  # Without the line terminator
+    complete: bool = True  # False for a partial line forced out by flush() or MAX_LINE
+
+
+class LineAssembler:
+    """Incremental UTF-8 decoder plus line splitter.
+
+    `feed` returns the decoded text (for display, partial lines included) and
+    the lines completed by this chunk. Lines end at "\\n"; a preceding "\\r" is
+    dropped.
+    """
+
+    def __init__(self, encoding: str = "utf-8", max_line: int = MAX_LINE):
+        self.encoding = encoding
+        self.max_line = max_line
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self._partial = ""
+        self._partial_ts = 0.0
+
+    @property
+    def partial(self) -> str:
+        """Text received since the last line break."""
+        return self._partial
+
+    def feed(self, data: bytes, timestamp: float | None = None) -> tuple[str, list[SerialLine]]:
+        now = time.time() if timestamp is None else timestamp
+        text = self._decoder.decode(data)
+        if not text:
+            return "", []
+        lines: list[SerialLine] = []
+        if not self._partial:
+            self._partial_ts = now
+        if "\n" not in text:
+            self._partial += text
+        else:
+            parts = text.split("\n")
+            first = self._partial + parts[0]
+            lines.append(SerialLine(self._partial_ts, first[:-1] if first.endswith("\r") else first))
+            for part in parts[1:-1]:
+                lines.append(SerialLine(now, part[:-1] if part.endswith("\r") else part))
+            self._partial = parts[-1]
+            self._partial_ts = now
+        while len(self._partial) > self.max_line:
+            lines.append(SerialLine(self._partial_ts, self._partial[:self.max_line], complete=False))
+            self._partial = self._partial[self.max_line:]
+        return text, lines
+
+    def flush(self, timestamp: float | None = None) -> SerialLine | None:
+        """Emit any unfinished line (e.g. when the port closes) and reset the decoder."""
+        tail = self._decoder.decode(b"", final=True)
+        self._decoder.reset()
+        text = self._partial + tail
+        self._partial = ""
+        if not text:
+            return None
+        return SerialLine(self._partial_ts or (time.time() if timestamp is None else timestamp),
+                          text.rstrip("\r"), complete=False)
+
+    def reset(self) -> None:
+        self._decoder.reset()
+        self._partial = ""
+        self._partial_ts = 0.0
@@ -0,0 +1,291 @@
+"""Firmware size analysis: section totals, symbol sizes attributed to VB code, and a size history.
+
+After a build, the toolchain's ``size``, ``nm`` and ``readelf`` are run on the
+ELF in ``.pio/build/<env>``. Symbols are attributed to VB Subs/Functions by
+name or by the source line their debug info points at (through the
+``__VB_LINE__`` markers), and machine code is attributed to individual VB
+lines through the DWARF line table. Each analysis can be appended to a
+per-sketch history so growth can be tracked between builds.
+"""
+
+import json
+import os
+import pathlib
+import re
+import shutil
+import subprocess
+import time
+from dataclasses import asdict, dataclass, field
+
+from vb2arduino.artifacts import file_hash, write_atomic
+from vb2arduino.source_map import procedure_at, vb_line_map, vb_procedures
+
+HISTORY_NAME = "size_history.json"
+HISTORY_LIMIT = 200
+
+# ELF e_machine -> cross tool prefixes, most likely first
+ELF_TOOL_PREFIXES = {
+    83: ["avr-"],
+    94: ["xtensa-esp32-elf-", "xtensa-esp32s3-elf-", "xtensa-esp32s2-elf-", "xtensa-esp-elf-", "xtensa-lx106-elf-"],
+    40: ["arm-none-eabi-"],
+    243: ["riscv32-esp-elf-", "riscv64-unknown-elf-"],
+}
+
+# nm symbol type -> kind; "data" occupies RAM and its initialiser occupies flash
+NM_KINDS = {"t": "code", "w": "code", "r": "rodata", "d": "data", "g": "data", "b": "bss", "s": "bss", "v": "data"}
+NM_LINE_RE = re.compile(r"^([0-9a-fA-F]+)\s+([0-9a-fA-F]+)\s+(\w)\s+(.+?)(?:\t(.+):(\d+))?$")
+BERKELEY_RE = re.compile(r"^\s*(\d+)\s+(\d+)\s+(\d+)\s+\d+\s+[0-9a-fA-F]+\s+\S", re.MULTILINE)
+DECODED_LINE_RE = re.compile(r"^(\S+)\s+(\d+|-)\s+(0x[0-9a-fA-F]+)")
+
+
+class SizeToolError(RuntimeError):
+    """The ELF or the toolchain's binutils could not be found or run."""
+
+
+@dataclass
+class SymbolSize:
+    name: str
+    size: int
+    kind: str  # code, rodata, data, bss
+    vb_line: int | None = None
+    procedure: str = ""
+
+    @property
+    def flash(self) -> int:
+        return self.size if self.kind in ("code", "rodata", "data") else 0
+
+    @property
+    def ram(self) -> int:
+        return self.size if self.kind in ("data", "bss") else 0
+
+
+@dataclass
+class SizeRecord:
+    """One build's size analysis, as stored in the history."""
+
+    env: str
+    built_at: float = 0.0
+    firmware_hash: str | None = None
+    text: int = 0
+    data: int = 0
+    bss: int = 0
+    procedures: dict[str, list[int]] = field(default_factory=dict)  # name -> [flash, ram]
+    symbols: dict[str, int] = field(default_factory=dict)  # name -> size, sketch symbols only
+    lines: dict[str, int] = field(default_factory=dict)  # VB line -> code bytes (JSON keys are strings)
+
+    @property
+    def flash(self) -> int:
+        return self.text + self.data
+
+    @property
+    def ram(self) -> int:
+        return self.data + self.bss
+
+    def line_bytes(self) -> dict[int, int]:
+        return {int(k): v for k, v in self.lines.items()}
+
+
+def find_elf(project_dir: pathlib.Path, env: str) -> pathlib.Path | None:
+    elf = project_dir / ".pio" / "build" / env / "firmware.elf"
+    return elf if elf.is_file() else None
+
+
+def elf_machine(elf: pathlib.Path) -> int | None:
+    try:
+        header = elf.read_bytes()[:20]
+    except OSError:
+        return None
+    if len(header) < 20 or header[:4] != b"\x7fELF":
+        return None
+    return int.from_bytes(header[18:20], "little" if header[5] == 1 else "big")
+
+
+def _platformio_packages() -> pathlib.Path:
+    core = os.environ.get("PLATFORMIO_CORE_DIR")
+    return (pathlib.Path(core) if core else pathlib.Path.home() / ".platformio") / "packages"
+
+
+def find_tool(elf: pathlib.Path, tool: str) -> str:
+    """Path of the binutils `tool` (size, nm, readelf) that understands this ELF."""
+    suffix = ".exe" if os.name == "nt" else ""
+    prefixes = ELF_TOOL_PREFIXES.get(elf_machine(elf), [])
+    for prefix in prefixes:
+        found = shutil.which(prefix + tool)
+        if found:
+            return found
+        for candidate in sorted(_platformio_packages().glob(f"toolchain-*/bin/{prefix}{tool}{suffix}")):
+            return str(candidate)
+    found = shutil.which(tool)
+    if found:
+        return found
+    raise SizeToolError(f"No '{tool}' found for {elf.name} (tried prefixes {prefixes or ['(host)']})")
+
+
+def _run(cmd: list[str]) -> str:
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, errors="replace", timeout=120)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        raise SizeToolError(f"{pathlib.Path(cmd[0]).name} failed: {e}") from e
+    if proc.returncode != 0:
+        raise SizeToolError(f"{pathlib.Path(cmd[0]).name} failed: {proc.stderr.strip()[:300]}")
+    return proc.stdout
+
+
+def parse_berkeley(output: str) -> tuple[int, int, int]:
+    """(text, data, bss) from `size` in its default Berkeley format."""
+    m = BERKELEY_RE.search(output)
+    if not m:
+        raise SizeToolError("Unrecognised output from size")
+    return int(m.group(1)), int(m.group(2)), int(m.group(3))
+
+
+def parse_nm(output: str) -> list[tuple[str, int, str, str | None, int | None]]:
+    """(name, size, kind, file, line) from `nm --print-size --size-sort --line-numbers -C`."""
+    symbols = []
+    for line in output.splitlines():
+        m = NM_LINE_RE.match(line)
+        if not m:
+            continue
+        kind = NM_KINDS.get(m.group(3).lower())
+        if not kind:
+            continue
+        line_no = int(m.group(6)) if m.group(6) else None
+        symbols.append((m.group(4), int(m.group(2), 16), kind, m.group(5), line_no))
+    return symbols
+
+
+def parse_line_table(output: str, cpp_name: str) -> dict[int, int]:
+    """C++ line -> bytes of code, from `readelf --debug-dump=decodedline`."""
+    sizes: dict[int, int] = {}
+    prev: tuple[int, int] | None = None  # (line, address) of the previous row in this sequence
+    for row in output.splitlines():
+        m = DECODED_LINE_RE.match(row)
+        if not m or not m.group(1).endswith(cpp_name):
+            prev = None
+            continue
+        address = int(m.group(3), 16)
+        if prev and address > prev[1]:
+            sizes[prev[0]] = sizes.get(prev[0], 0) + address - prev[1]
+        prev = None if m.group(2) == "-" else (int(m.group(2)), address)
+    return sizes
+
+
+def _base_name(symbol: str) -> str:
+    """'Foo(int, String)' -> 'Foo'; 'ns::bar()' -> 'bar'."""
+    return symbol.split("(", 1)[0].rsplit("::", 1)[-1].strip()
+
+
+def analyze(elf: pathlib.Path, env: str, cpp: str, vb_source: str, cpp_name: str = "main.cpp") -> SizeRecord:
+    """Measure `elf` and attribute its symbols and code to the VB program it was built from."""
+    text, data, bss = parse_berkeley(_run([find_tool(elf, "size"), str(elf)]))
+    nm_out = _run([find_tool(elf, "nm"), "--print-size", "--size-sort", "--line-numbers", "-C", str(elf)])
+    procs = vb_procedures(vb_source)
+    proc_names = {p.name.lower(): p.name for p in procs}
+    line_map = vb_line_map(cpp, procs)
+
+    record = SizeRecord(env=env, built_at=time.time(), firmware_hash=file_hash(elf), text=text, data=data, bss=bss)
+    for name, size, kind, src, line_no in parse_nm(nm_out):
+        sym = SymbolSize(name, size, kind)
+        in_sketch = bool(src and src.endswith(cpp_name))
+        if in_sketch and line_no is not None:
+            sym.vb_line = line_map.get(line_no)
+        base = _base_name(name).lower()
+        if base in proc_names:
+            sym.procedure = proc_names[base]
+        elif sym.vb_line is not None:
+            proc = procedure_at(procs, sym.vb_line)
+            sym.procedure = proc.name if proc else "(globals)"
+        elif in_sketch:
+            sym.procedure = "(runtime helpers)"
+        else:
+            sym.procedure = "(core and libraries)"
+        totals = record.procedures.setdefault(sym.procedure, [0, 0])
+        totals[0] += sym.flash
+        totals[1] += sym.ram
+        if in_sketch or sym.procedure in proc_names.values():
+            record.symbols[name] = record.symbols.get(name, 0) + size
+
+    try:
+        line_table = _run([find_tool(elf, "readelf"), "-W", "--debug-dump=decodedline", str(elf)])
+    except SizeToolError:
+        line_table = ""  # Per-line attribution needs debug info; totals and symbols still work
+    for cpp_line, size in parse_line_table(line_table, cpp_name).items():
+        vb_line = line_map.get(cpp_line)
+        if vb_line is not None:
+            record.lines[str(vb_line)] = record.lines.get(str(vb_line), 0) + size
+    return record
+
+
+def sketch_history_path(sketch: pathlib.Path) -> pathlib.Path:
+    """The size history kept next to a sketch: blink.vb -> blink.size_history.json."""
+    return sketch.with_name(f"{sketch.stem}.{HISTORY_NAME}")
+
+
+def load_history(path: pathlib.Path) -> list[SizeRecord]:
+    try:
+        entries = json.loads(path.read_text(encoding="utf-8"))
+        return [SizeRecord(**e) for e in entries]
+    except (OSError, ValueError, TypeError):
+        return []
+
+
+def append_history(path: pathlib.Path, record: SizeRecord, limit: int = HISTORY_LIMIT) -> list[SizeRecord]:
+    """Add `record` unless it measures the same firmware as the last entry for its env."""
+    history = load_history(path)
+    last = next((r for r in reversed(history) if r.env == record.env), None)
+    if last and record.firmware_hash and last.firmware_hash == record.firmware_hash:
+        return history
+    history = (history + [record])[-limit:]
+    write_atomic(path, json.dumps([asdict(r) for r in history], indent=1) + "\n")
+    return history
+
+
+def previous_record(history: list[SizeRecord], current: SizeRecord) -> SizeRecord | None:
+    """The latest recorded build of the same env with different firmware, to compare against."""
+    for r in reversed(history):
+        if r.env == current.env and not (current.firmware_hash and r.firmware_hash == current.firmware_hash):
+            return r
+    return None
+
+
+def growth(previous: SizeRecord | None, current: SizeRecord, top: int = 10) -> list[tuple[str, int, int]]:
+    """(procedure, flash before, flash after) for the procedures whose flash use grew most."""
+    if not previous:
+        return []
+    changes = []
+    for name in set(previous.procedures) | set(current.procedures):
+        before = previous.procedures.get(name, [0, 0])[0]
+        after = current.procedures.get(name, [0, 0])[0]
+        if after != before:
+            changes.append((name, before, after))
+    changes.sort(key=lambda c: c[2] - c[1], reverse=True)
+    return [c for c in changes if c[2] > c[1]][:top]
+
+
+def format_report(record: SizeRecord, previous: SizeRecord | None = None, top: int = 10) -> str:
+    """Plain-text size report with deltas against `previous`."""
+
+    def delta(now: int, before: int | None) -> str:
+        return f" ({now - before:+d})" if before is not None and now != before else ""
+
+    lines = [
+        f"[size] {record.env}: flash {record.flash} bytes{delta(record.flash, previous and previous.flash)}, "
+        f"RAM {record.ram} bytes{delta(record.ram, previous and previous.ram)}"
+        f"  (text {record.text}, data {record.data}, bss {record.bss})"
+    ]
+    procs = sorted(record.procedures.items(), key=lambda kv: kv[1][0], reverse=True)
+    if procs:
+        lines.append("[size] Flash by procedure:")
+        for name, (flash, ram) in procs[:top]:
+            lines.append(f"  {flash:>8}  {name}" + (f"  (RAM {ram})" if ram else ""))
+    vb_lines = sorted(record.line_bytes().items(), key=lambda kv: kv[1], reverse=True)
+    if vb_lines:
+        lines.append("[size] Largest VB lines (code bytes):")
+        for vb_line, size in vb_lines[:top]:
+            lines.append(f"  {size:>8}  line {vb_line}")
+    grown = growth(previous, record, top)
+    if grown:
+        lines.append("[size] Top growth since last build:")
+        for name, before, after in grown:
+            lines.append(f"  {after - before:>+8}  {name} ({before} -> {after})")
+    return "\n".join(lines)
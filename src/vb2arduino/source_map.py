@@ -0,0 +1,71 @@
+"""Map generated C++ lines back to the VB source they came from.
+
+The transpiler emits ``// __VB_LINE__:N`` before each generated statement;
+every following C++ line belongs to VB line N until the next marker.
+"""
+
+import re
+from dataclasses import dataclass
+
+VB_LINE_RE = re.compile(r"^\s*// __VB_LINE__:(\d+)")
+PROC_START_RE = re.compile(
+    r"^\s*(?:(?:Public|Private|Static)\s+)*(Sub|Function)\s+(\w+)", re.IGNORECASE
+)
+PROC_END_RE = re.compile(r"^\s*End\s+(Sub|Function)\b", re.IGNORECASE)
+# A C++ function definition header such as "void loop() {" or "int Add(int a, int b) {"
+CPP_FUNC_RE = re.compile(r"^[A-Za-z_][\w:<>,\s\*&]*?\b(\w+)\s*\([^;]*\)\s*\{")
+
+
+@dataclass
+class Procedure:
+    """A VB Sub/Function and the source lines it spans (1-based, inclusive)."""
+
+    name: str
+    start: int
+    end: int
+
+
+def vb_procedures(source: str) -> list[Procedure]:
+    """Find the Subs and Functions in VB source."""
+    procs: list[Procedure] = []
+    current: Procedure | None = None
+    for line_no, line in enumerate(source.splitlines(), start=1):
+        if current is None:
+            m = PROC_START_RE.match(line)
+            if m:
+                current = Procedure(m.group(2), line_no, line_no)
+        elif PROC_END_RE.match(line):
+            current.end = line_no
+            procs.append(current)
+            current = None
+    return procs
+
+
+def procedure_at(procs: list[Procedure], vb_line: int) -> Procedure | None:
+    for proc in procs:
+        if proc.start <= vb_line <= proc.end:
+            return proc
+    return None
+
+
+def vb_line_map(cpp: str, procs: list[Procedure] | None = None) -> dict[int, int]:
+    """Map C++ line -> VB line for every generated line that has a VB origin.
+
+    Lines before the first marker (includes, runtime helpers) are left out.
+    When `procs` is given, a function header is mapped to its Sub/Function
+    line instead of the last statement of the previous procedure.
+    """
+    by_name = {p.name.lower(): p.start for p in procs or []}
+    mapping: dict[int, int] = {}
+    current: int | None = None
+    for line_no, line in enumerate(cpp.splitlines(), start=1):
+        m = VB_LINE_RE.match(line)
+        if m:
+            current = int(m.group(1))
+        elif by_name:
+            header = CPP_FUNC_RE.match(line)
+            if header and header.group(1).lower() in by_name:
+                current = by_name[header.group(1).lower()]
+        if current is not None:
+            mapping[line_no] = current
+    return mapping
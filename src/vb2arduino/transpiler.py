@@ -1,17 +1,124 @@
+import ast
+import math
 import re
 from dataclasses import dataclass, field
 from typing import List
 
+from vb2arduino.profiler import (
+    DEFAULT_INTERVAL_MS, MAX_SLOTS, PROFILE_LINES, PROFILE_OFF, ProfileError, ProfileSlot, runtime_cpp,
+)
+
+
+# Default statement budget for Option Inline (procedures at or below this size are inlined)
+DEFAULT_INLINE_THRESHOLD = 3
+# Default trip-count limit for Option Unroll On
+DEFAULT_UNROLL_THRESHOLD = 8
+# Cap on C++ lines an unrolled loop may expand to
+MAX_UNROLLED_LINES = 256
+# Largest index domain turned into a lookup table
+MAX_LUT_ENTRIES = 256
+# Flash readers for lookup-table element types (PROGMEM on AVR, plain loads elsewhere)
+LUT_READERS = {
+    "uint8_t": "pgm_read_byte",
+    "int8_t": "(int8_t)pgm_read_byte",
+    "uint16_t": "pgm_read_word",
+    "int16_t": "(int16_t)pgm_read_word",
+    "int32_t": "(int32_t)pgm_read_dword",
+    "float": "pgm_read_float",
+    "__vb_trig_t": "__vb_read_trig",
+}
+# Sin/Cos tables keep the precision of the target's double (which is float on AVR)
+TRIG_LUT_TYPES = """#if defined(__AVR__)
+typedef float __vb_trig_t;
+#define __vb_read_trig(addr) pgm_read_float(addr)
+#else
+typedef double __vb_trig_t;
+#define __vb_read_trig(addr) (*(addr))
+#endif"""
+# VB types whose values are always whole numbers
+INTEGRAL_VB_TYPES = {"", "integer", "long", "byte", "boolean"}
+# Built-in numeric constants usable in constant expressions
+BUILTIN_CONST_VALUES = {
+    "PI": math.pi,
+    "TAU": 2.0 * math.pi,
+    "DEG2RAD": math.pi / 180.0,
+    "RAD2DEG": 180.0 / math.pi,
+}
+
+
+@dataclass
+class ProcedureInfo:
+    """Bookkeeping for a user Sub/Function, used for the call graph and inlining."""
+
+    name: str
+    signature_index: int
+    header_index: int
+    statements: int = 0
+    body: List[str] = field(default_factory=list)
+
+
+@dataclass
+class Declaration:
+    """A variable declared with Dim/Static, or a procedure parameter."""
+
+    name: str
+    c_type: str
+    scope: str  # "global", "setup", "loop" or the procedure name
+    dims: List[int | str] = field(default_factory=list)  # VB upper bounds for arrays
+    is_static: bool = False
+    is_parameter: bool = False
+
+
+@dataclass
+class ForLoop:
+    """An open For loop, kept until its Next so the body can be unrolled."""
+
+    var: str
+    c_type: str
+    start: int | None  # first value when the bounds are known at transpile time
+    step: int | None
+    trip_count: int | None
+    target: List[str]
+    position: int  # index of the loop's marker line in target
+    suffix: str  # line terminator used by target
+
 
 @dataclass
 class TranspileResult:
     cpp: str
+    inlined: List[tuple[str, int]] = field(default_factory=list)  # (procedure, statement count)
+    call_graph: dict[str, set[str]] = field(default_factory=dict)
+    profile: List[ProfileSlot] = field(default_factory=list)  # Slot table when profiling, by slot number
 
 
 class VBTranspiler:
     """Minimal VB6-like to Arduino C++ transpiler for a safe subset."""
 
-    def __init__(self) -> None:
+    def __init__(self, inline: bool = False, inline_threshold: int = DEFAULT_INLINE_THRESHOLD,
+                 profile: str = PROFILE_OFF, profile_interval_ms: int = DEFAULT_INTERVAL_MS) -> None:
+        # Inlining is opt-in (Option Inline On or inline=True), like Option Unroll
+        self.inline_budget = inline_threshold
+        self.default_inline_threshold = inline_threshold if inline else 0
+        self.inline_threshold: int = self.default_inline_threshold  # Option Inline Off|On|N
+        self.profile = profile  # PROFILE_OFF, PROFILE_PROCS or PROFILE_LINES
+        self.profile_interval_ms = profile_interval_ms
+        self.profile_slots: List[ProfileSlot] = []
+        self.procedures: dict[str, ProcedureInfo] = {}
+        self.unroll_threshold: int = 0  # Option Unroll Off|On|N (max trip count)
+        self.const_values: dict[str, int | float] = {}  # Numeric Const values known at transpile time
+        self.for_stack: List[ForLoop] = []
+        self.variable_types: dict[tuple[str, str], str] = {}  # (scope, variable name) -> lower-case VB type
+        self.enum_values: dict[str, dict[str, int]] = {}  # Lower-case enum name -> member values
+        self.current_enum: str | None = None
+        self.lut_lines: List[str] = []  # static const lookup tables
+        self.lut_names: dict[tuple, str] = {}
+        self.current_target: List[str] = []
+        self.current_suffix: str = ""
+        self.current_scope: str = "global"
+        self.declarations: List[Declaration] = []  # Every Dim/Static/parameter, for memory estimates
+        self.type_fields: dict[str, List[str]] = {}  # Type name -> field C types
+        self.current_type: str | None = None
+        self.entry_bodies: dict[str, List[str]] = {"setup": [], "loop": []}
         self.global_lines: List[str] = []
         self.setup_lines: List[str] = []
         self.loop_lines: List[str] = []
@@ -58,11 +165,30 @@ class VBTranspiler:
         self.pointer_vars.clear()
         self.array_dimensions.clear()
         self.option_base = 0
+        self.inline_threshold = self.default_inline_threshold
+        self.procedures.clear()
+        self.unroll_threshold = 0
+        self.const_values.clear()
+        self.for_stack.clear()
+        self.variable_types.clear()
+        self.enum_values.clear()
+        self.current_enum = None
+        self.lut_lines.clear()
+        self.lut_names.clear()
+        self.current_scope = "global"
+        self.declarations.clear()
+        self.type_fields.clear()
+        self.current_type = None
+        self.entry_bodies = {"setup": [], "loop": []}
         self.graphics_lib = None
         self.display_object = "tft"
         self.select_expr = ""
         self.in_case_block = False
         self.with_object = None
+        self.profile_slots = []
+        if self.profile != PROFILE_OFF:
+            # Slots 0 and 1 are always setup() and loop()
+            self.profile_slots = [ProfileSlot("proc", "Setup", 0), ProfileSlot("proc", "Loop", 0)]
 
         current = None  # None, "setup", "loop", "function"
         label_set = set()
@@ -88,6 +214,7 @@ class VBTranspiler:
             
             if not line:  # Line was only a comment
                 continue
+            self.current_scope = (self.current_function or "global") if current == "function" else (current or "global")
 
             # Label: support (must be at start of line, not indented)
             m_label = re.match(r"^(\w+):$", line)
@@ -106,6 +233,28 @@ class VBTranspiler:
                 except ValueError:
                     self.option_base = 0
                 continue
+
+            # Option Inline Off|On|N - statement budget for static inline procedures
+            if upper.startswith("OPTION INLINE"):
+                setting = upper[len("OPTION INLINE"):].strip()
+                if setting == "OFF":
+                    self.inline_threshold = 0
+                elif setting.isdigit():
+                    self.inline_threshold = int(setting)
+                else:
+                    self.inline_threshold = self.inline_budget or DEFAULT_INLINE_THRESHOLD
+                continue
+
+            # Option Unroll Off|On|N - fully unroll constant For loops up to N iterations
+            if upper.startswith("OPTION UNROLL"):
+                setting = upper[len("OPTION UNROLL"):].strip()
+                if setting == "OFF":
+                    self.unroll_threshold = 0
+                elif setting.isdigit():
+                    self.unroll_threshold = int(setting)
+                else:
+                    self.unroll_threshold = DEFAULT_UNROLL_THRESHOLD
+                continue
             
             # Include/Import statements
             if upper.startswith("#INCLUDE "):
@@ -125,22 +274,33 @@ class VBTranspiler:
                 statement = self._emit_dim(line)
                 # Add newlines to function statements for proper formatting
                 if statement:
+                    statement = self._profile_statement(statement, current, vb_line_no)
                     if current == "function":
+                        self._record_procedure_line(line)
                         target.append(f"// __VB_LINE__:{vb_line_no}\n")
                         target.append(statement + "\n")
                     else:
+                        if current in self.entry_bodies:
+                            self.entry_bodies[current].append(line)
                         target.append(f"// __VB_LINE__:{vb_line_no}")
                         target.append(statement)
                 continue
             if upper.startswith("SUB SETUP"):
                 current = "setup"
+                if self.profile_slots:
+                    self.profile_slots[0].vb_line = vb_line_no
                 continue
             if upper.startswith("SUB LOOP"):
                 current = "loop"
+                if self.profile_slots:
+                    self.profile_slots[1].vb_line = vb_line_no
                 continue
             if upper.startswith("SUB ") or upper.startswith("FUNCTION "):
                 current = "function"
                 self.current_function = self._emit_function_header(line)
+                if self.profile_slots and self.current_function in self.procedures:
+                    slot = self._profile_slot("proc", self.current_function, vb_line_no)
+                    self.function_lines.append(f"__VbProfScope __vb_prof_scope({slot});\n")
                 continue
             if upper == "END SUB" or upper == "END FUNCTION":
                 if current == "function":
@@ -150,18 +310,47 @@ class VBTranspiler:
                 continue
 
             target = self._target_lines(current)
+            self.current_target = target
+            self.current_suffix = "\n" if current == "function" else ""
             statement = self._emit_statement(line)
             # Add mapping marker and newlines to function statements for proper formatting
             if statement:
+                statement = self._profile_statement(statement, current, vb_line_no)
                 if current == "function":
+                    self._record_procedure_line(line)
                     target.append(f"// __VB_LINE__:{vb_line_no}\n")
                     target.append(statement + "\n")
                 else:
+                    if current in self.entry_bodies:
+                        self.entry_bodies[current].append(line)
                     target.append(f"// __VB_LINE__:{vb_line_no}")
                     target.append(statement)
 
+        call_graph = self.build_call_graph()
+        inlined = self._apply_inlining(call_graph)
         cpp = self._render_cpp()
-        return TranspileResult(cpp=cpp)
+        return TranspileResult(cpp=cpp, inlined=inlined, call_graph=call_graph,
+                               profile=list(self.profile_slots))
+
+    def _profile_slot(self, kind: str, name: str, vb_line: int) -> int:
+        if len(self.profile_slots) >= MAX_SLOTS:
+            hint = "profile Subs only" if self.profile == PROFILE_LINES else "split the sketch"
+            raise ProfileError(f"Profiling needs more than {MAX_SLOTS} counters (at VB line {vb_line}); {hint}")
+        self.profile_slots.append(ProfileSlot(kind, name, vb_line))
+        return len(self.profile_slots) - 1
+
+    def _profile_statement(self, statement: str, current: str | None, vb_line: int) -> str:
+        """With line profiling, give the statement a slot and call the line hook before it runs."""
+        if self.profile != PROFILE_LINES or current not in ("setup", "loop", "function"):
+            return statement
+        if statement.lstrip().startswith("}"):
+            return statement  # End If / Next / Else: a hook here would run inside the block being closed
+        name = self.current_function if current == "function" else current.capitalize()
+        hook = f"__vb_prof_line({self._profile_slot('line', name, vb_line)});"
+        # After a case label, so the hook runs when that case is taken
+        if statement.rstrip().endswith(":"):
+            return f"{statement} {hook}"
+        return f"{hook} {statement}"
 
     def _target_lines(self, current: str | None) -> List[str]:
         if current == "setup":
@@ -203,6 +392,9 @@ class VBTranspiler:
             return f"// TODO const: {line}"
         name, value = m.groups()
         value_expr = self._expr(value)
+        const_value = _eval_const_expr(value_expr, self.const_values)
+        if const_value is not None:
+            self.const_values[name] = const_value
         if re.match(r'^".*"$', value_expr):
             return f"const char* {name} = {value_expr};"
         return f"const auto {name} = {value_expr};"
@@ -235,6 +427,7 @@ class VBTranspiler:
                 pm = re.match(r"(optional\s+)?(byref|byval)?\s*(\w+)(?:\s+as\s+([\w\*]+))?(?:\s*=\s*(.+))?", param, re.IGNORECASE)
                 if pm:
                     is_optional, by_mode, pname, ptype, default_val = pm.groups()
+                    self.variable_types[(name, pname)] = (ptype or "").lower()
                     is_pointer = bool(ptype and ptype.endswith("*"))
                     base_type = ptype[:-1] if is_pointer else ptype
                     pc_type = self._map_type(base_type)
@@ -243,6 +436,7 @@ class VBTranspiler:
                         pc_type = f"{pc_type}*"
                     if by_mode and by_mode.lower() == "byref":
                         pc_type = f"{pc_type}&"
+                    self.declarations.append(Declaration(pname, pc_type, name, is_parameter=True))
                     param_decl = f"{pc_type} {pname}"
                     if is_optional or default_val:
                         if default_val:
@@ -262,8 +456,67 @@ class VBTranspiler:
         signature = f"{ret_c_type} {name}({params_str});"
         self.function_signatures.append(signature)
         self.function_lines.append(header)
+        self.procedures[name] = ProcedureInfo(
+            name=name,
+            signature_index=len(self.function_signatures) - 1,
+            header_index=len(self.function_lines) - 1,
+        )
         return name
 
+    def _record_procedure_line(self, line: str) -> None:
+        """Count a statement emitted into the current procedure body."""
+        proc = self.procedures.get(self.current_function or "")
+        if proc:
+            proc.statements += 1
+            proc.body.append(line)
+
+    def build_call_graph(self) -> dict[str, set[str]]:
+        """Map each procedure (and Setup/Loop) to the user procedures it references."""
+        bodies = {name: proc.body for name, proc in self.procedures.items()}
+        bodies.update(self.entry_bodies)
+        # VB names are case-insensitive: `foo` in a body calls `Foo`
+        by_lower = {name.lower(): name for name in self.procedures}
+        graph: dict[str, set[str]] = {}
+        for name, body in bodies.items():
+            callees: set[str] = set()
+            for line in body:
+                # Ignore identifiers inside string literals
+                code = re.sub(r'"[^"]*"', '""', line)
+                callees.update(by_lower[tok.lower()] for tok in re.findall(r"\b\w+\b", code)
+                               if tok.lower() in by_lower)
+            graph[name] = callees
+        return graph
+
+    def is_recursive(self, name: str, call_graph: dict[str, set[str]]) -> bool:
+        """True when the procedure can reach itself through the call graph."""
+        seen: set[str] = set()
+        stack = list(call_graph.get(name, ()))
+        while stack:
+            callee = stack.pop()
+            if callee == name:
+                return True
+            if callee not in seen:
+                seen.add(callee)
+                stack.extend(call_graph.get(callee, ()))
+        return False
+
+    def _apply_inlining(self, call_graph: dict[str, set[str]]) -> List[tuple[str, int]]:
+        """Mark small non-recursive procedures `static inline`.
+
+        avr-gcc's -Os rarely inlines out-of-line helpers that have a forward
+        declaration, so we make the decision here using a statement budget.
+        """
+        if self.inline_threshold <= 0:
+            return []
+        inlined: List[tuple[str, int]] = []
+        for name, proc in self.procedures.items():
+            if proc.statements > self.inline_threshold or self.is_recursive(name, call_graph):
+                continue
+            self.function_signatures[proc.signature_index] = "static inline " + self.function_signatures[proc.signature_index]
+            self.function_lines[proc.header_index] = "static inline " + self.function_lines[proc.header_index]
+            inlined.append((name, proc.statements))
+        return inlined
+
     def _emit_dim(self, line: str) -> str:
         # Dim x As Integer  | Dim x | Dim arr(10) As String | Dim arr(MAX_SIZE) As String
         # Multi-dimensional arrays: Dim arr(10, 20) As Integer | Dim arr(3, 4, 5) As Integer
@@ -291,6 +544,7 @@ class VBTranspiler:
                     dims.append(size)  # Store as string for later reference
             # Store dimensions for UBound/LBound
             self.array_dimensions[name] = dims
+            self.declarations.append(Declaration(name, c_type, self.current_scope, dims=list(dims)))
             # Build array declaration with brackets for each dimension
             array_decl = "".join([f"[{size}]" for size in c_sizes])
             return f"{c_type} {name}{array_decl};"
@@ -301,18 +555,23 @@ class VBTranspiler:
         name, type_token = m.groups()
         base_type, is_pointer = self._type_with_pointer(type_token)
         c_type = self._map_type(base_type)
+        self.variable_types[(self.current_scope, name)] = (base_type or "").lower()
         basic_types = {"integer", "long", "byte", "boolean", "single", "double", "string"}
         is_object = base_type and base_type[0].isupper() and base_type.lower() not in basic_types
 
         if is_pointer:
             self.pointer_vars.add(name)
+            self.declarations.append(Declaration(name, f"{c_type}*", self.current_scope))
             return f"{c_type}* {name} = nullptr;"
 
         if is_object:
             if base_type not in self.value_default_types and (base_type in self.pointer_default_types):
                 self.pointer_vars.add(name)
+                self.declarations.append(Declaration(name, f"{base_type}*", self.current_scope))
                 return f"{base_type}* {name} = nullptr;"
+            self.declarations.append(Declaration(name, base_type, self.current_scope))
             return f"{base_type} {name};"  # Object declaration by value
+        self.declarations.append(Declaration(name, c_type, self.current_scope))
         
         init_value = self._default_init(c_type)
         return f"{c_type} {name} = {init_value};"
@@ -400,8 +659,11 @@ class VBTranspiler:
         if m_static:
             name, type_token = m_static.groups()
             base_type, is_pointer = self._type_with_pointer(type_token)
+            self.variable_types[(self.current_scope, name)] = (base_type or "").lower()
             c_type = self._map_type(base_type)
             init_value = self._default_init(c_type)
+            self.declarations.append(Declaration(name, f"{c_type}*" if is_pointer else c_type,
+                                                 self.current_scope, is_static=True))
             if is_pointer:
                 return f"static {c_type}* {name} = nullptr;"
             return f"static {c_type} {name} = {init_value};"
@@ -443,11 +705,14 @@ class VBTranspiler:
             m = re.match(r"TYPE\s+(\w+)", line, re.IGNORECASE)
             if m:
                 self.block_stack.append("type")
+                self.current_type = m.group(1)
+                self.type_fields[self.current_type] = []
                 return f"struct {m.group(1)} {{"
             return "// TODO: Type not recognized"
         if upper == "END TYPE":
             if self.block_stack and self.block_stack[-1] == "type":
                 self.block_stack.pop()
+            self.current_type = None
             return "};"
 
         # Inside Type block: field declarations like "x As Integer"
@@ -456,6 +721,8 @@ class VBTranspiler:
             if m_field:
                 fname, ftype = m_field.groups()
                 f_c_type = self._map_type(ftype)
+                if self.current_type:
+                    self.type_fields[self.current_type].append(f_c_type)
                 return f"{f_c_type} {fname};"
             return f"// TODO: Type field: {line}"
         
@@ -464,16 +731,20 @@ class VBTranspiler:
             m = re.match(r"ENUM\s+(\w+)", line, re.IGNORECASE)
             if m:
                 self.block_stack.append("enum")
+                self.current_enum = m.group(1).lower()
+                self.enum_values[self.current_enum] = {}
                 return f"enum {m.group(1)} {{"
             return "// TODO: Enum not recognized"
         if upper == "END ENUM":
             if self.block_stack and self.block_stack[-1] == "enum":
                 self.block_stack.pop()
+            self.current_enum = None
             return "};"
         if self.block_stack and self.block_stack[-1] == "enum":
             m_enum = re.match(r"(\w+)\s*(=\s*.+)?", line, re.IGNORECASE)
             if m_enum:
                 name, val = m_enum.groups()
+                self._record_enum_member(name, val)
                 if val:
                     return f"{name} {val},"
                 return f"{name},"
@@ -510,14 +781,15 @@ class VBTranspiler:
                 start_c = self._expr(start)
                 end_c = self._expr(end)
                 step_c = self._expr(step) if step else "1"
-                return (
-                    f"for (int {var} = {start_c}; "
-                    f"(({step_c}) >= 0 ? {var} <= {end_c} : {var} >= {end_c}); "
-                    f"{var} += ({step_c})) {{"
-                )
+                return self._emit_for(var, start_c, end_c, step_c)
         if upper.startswith("NEXT"):
             if self.block_stack and self.block_stack[-1] == "for":
                 self.block_stack.pop()
+            loop = self.for_stack.pop() if self.for_stack else None
+            if loop:
+                self._widen_counter(loop)
+            if loop and self._unroll_loop(loop):
+                return ""
             return "}"
 
         if upper.startswith("WHILE "):
@@ -794,6 +1066,252 @@ class VBTranspiler:
 
         return f"// TODO: {line}"
 
+    def _emit_for(self, var: str, start_c: str, end_c: str, step_c: str) -> str:
+        """Emit a For loop, resolving direction and trip count at transpile time when possible."""
+        start_v = _eval_const_expr(start_c, self.const_values)
+        end_v = _eval_const_expr(end_c, self.const_values)
+        step_v = _eval_const_expr(step_c, self.const_values)
+        if not isinstance(step_v, int) or step_v == 0:
+            # Step unknown until runtime: keep the sign check
+            self.for_stack.append(ForLoop(var, "int", None, None, None, self.current_target,
+                                          len(self.current_target), self.current_suffix))
+            return (
+                f"for (int {var} = {start_c}; "
+                f"(({step_c}) >= 0 ? {var} <= {end_c} : {var} >= {end_c}); "
+                f"{var} += ({step_c})) {{"
+            )
+
+        c_type = "int"
+        trip_count = None
+        if isinstance(start_v, int) and isinstance(end_v, int):
+            trip_count = max(0, (end_v - start_v) // step_v + 1)
+            # The counter also takes the exit value (last + step) before the test fails
+            exit_v = start_v + trip_count * step_v
+            c_type = _induction_type(min(start_v, exit_v), max(start_v, exit_v))
+        self.for_stack.append(ForLoop(var, c_type, start_v if trip_count is not None else None, step_v,
+                                      trip_count, self.current_target, len(self.current_target),
+                                      self.current_suffix))
+
+        if step_v > 0:
+            cond = f"{var} <= {end_c}"
+            incr = f"{var}++" if step_v == 1 else f"{var} += {step_v}"
+        else:
+            cond = f"{var} >= {end_c}"
+            incr = f"{var}--" if step_v == -1 else f"{var} -= {-step_v}"
+        return f"for ({c_type} {var} = {start_c}; {cond}; {incr}) {{"
+
+    def _record_enum_member(self, name: str, val: str | None) -> None:
+        """Track enum member values so Enum-typed variables have a known domain."""
+        members = self.enum_values.get(self.current_enum or "")
+        if members is None:
+            return
+        if val:
+            value = _eval_const_expr(val.lstrip("= ").strip(), self.const_values)
+        else:
+            value = max(members.values()) + 1 if members else 0
+        if not isinstance(value, int):
+            # Value not known at transpile time: the enum has no usable domain
+            del self.enum_values[self.current_enum]
+            return
+        members[name] = value
+        self.const_values[name] = value
+
+    def _variable_type(self, name: str) -> str | None:
+        """The VB type of a variable as seen from the current scope (a local hides a global)."""
+        vb_type = self.variable_types.get((self.current_scope, name))
+        return vb_type if vb_type is not None else self.variable_types.get(("global", name))
+
+    def _is_integral(self, expr: str) -> bool:
+        """True unless the expression may hold a fraction (a Single/Double, float literal or `/`)."""
+        if "/" in expr or re.search(r"\d\.\d*|\.\d|\d[eE][-+]?\d", expr):
+            return False
+        for ident in re.findall(r"\b[A-Za-z_]\w*\b", expr):
+            if isinstance(self.const_values.get(ident), float):
+                return False
+            vb_type = self._variable_type(ident)
+            if vb_type is not None and vb_type not in INTEGRAL_VB_TYPES and vb_type not in self.enum_values:
+                return False
+        return True
+
+    def _index_domain(self, expr: str) -> tuple[int, int, bool] | None:
+        """Return (low, high, exact) for a bare identifier with a known value range.
+
+        exact is True when the C type itself guarantees the range (Byte); loop
+        counters and enums can be assigned out-of-range values, so callers guard them.
+        """
+        name = expr.strip().strip("()").strip()
+        if not re.fullmatch(r"\w+", name):
+            return None
+        for loop in reversed(self.for_stack):
+            if loop.var == name:
+                if not loop.trip_count:
+                    return None
+                last = loop.start + (loop.trip_count - 1) * loop.step
+                return (min(loop.start, last), max(loop.start, last), False)
+        vb_type = self._variable_type(name)
+        if vb_type == "byte":
+            return (0, 255, True)
+        members = self.enum_values.get(vb_type or "")
+        if members:
+            return (min(members.values()), max(members.values()), False)
+        return None
+
+    def _lut_table(self, kind: str, c_type: str, items: List[str]) -> str:
+        """Emit (or reuse) a static const lookup table and return its name."""
+        key = (c_type, tuple(items))
+        name = self.lut_names.get(key)
+        if name is None:
+            name = f"__vb_{kind}_lut{len(self.lut_names)}"
+            self.lut_names[key] = name
+            if c_type == "const char*":
+                self.lut_lines.append(f"static const char* const {name}[{len(items)}] = {{{', '.join(items)}}};")
+            else:
+                self.lut_lines.append(f"static const {c_type} {name}[{len(items)}] PROGMEM = {{{', '.join(items)}}};")
+        return name
+
+    def _lut_lookup(self, kind: str, c_type: str, items: List[str], index: str, low: int,
+                    domain: tuple[int, int, bool] | None, default: str) -> str:
+        """Index a lookup table covering values low..low+len(items)-1, guarding when needed."""
+        name = self._lut_table(kind, c_type, items)
+        if low:
+            offset = f"({index}) - {low}"
+        else:
+            offset = index if re.fullmatch(r"\w+", index) else f"({index})"
+        if c_type == "const char*":
+            read = f"{name}[{offset}]"
+        else:
+            read = f"{LUT_READERS[c_type]}({name} + ({offset}))"
+        high = low + len(items) - 1
+        if domain and domain[2] and low <= domain[0] and domain[1] <= high:
+            return read
+        return f"((unsigned)({offset}) < {len(items)}u ? {read} : {default})"
+
+    def _lut_items(self, values: List[str]) -> tuple[str, List[str]] | None:
+        """Classify constant table values; returns (element type, C literals) or None."""
+        if all(re.fullmatch(r'"[^"]*"', v) for v in values):
+            return "const char*", values
+        numbers = [_eval_const_expr(v, {**BUILTIN_CONST_VALUES, **self.const_values}) for v in values]
+        if any(n is None for n in numbers):
+            return None
+        if all(isinstance(n, int) for n in numbers):
+            return _lut_int_type(min(numbers), max(numbers)), [str(n) for n in numbers]
+        return "float", [_c_float(n) for n in numbers]
+
+    def _lut_choose(self, index: str, values: List[str]) -> str | None:
+        """Choose(index, v1..vn) with constant values -> table lookup."""
+        if not self._is_integral(index):
+            return None  # A fractional index would be truncated by the table's unsigned cast
+        items = self._lut_items(values)
+        if not items or len(values) > MAX_LUT_ENTRIES:
+            return None
+        c_type, literals = items
+        default = '""' if c_type == "const char*" else "0"
+        lookup = self._lut_lookup("choose", c_type, literals, index, 1, self._index_domain(index), default)
+        return f"String({lookup})" if c_type == "const char*" else lookup
+
+    def _lut_switch(self, params: List[str]) -> str | None:
+        """Switch(x = 1, v1, x = 2, v2, ..., True, vDefault) with constant values -> table lookup."""
+        var = None
+        cases: dict[int, str] = {}
+        default = None
+        for i in range(0, len(params), 2):
+            cond, val = params[i].strip(), self._expr(params[i + 1])
+            if i == len(params) - 2 and cond.upper() == "TRUE":
+                default = val
+                continue
+            m = re.fullmatch(r"(\w+)\s*=\s*(-?\d+)", cond)
+            if not m or (var is not None and m.group(1) != var):
+                return None
+            var = m.group(1)
+            cases.setdefault(int(m.group(2)), val)
+        if var is None or len(cases) < 2 or not self._is_integral(var):
+            return None
+        low, high = min(cases), max(cases)
+        if high - low + 1 > MAX_LUT_ENTRIES:
+            return None
+        is_string = cases[low].startswith('"')
+        fill = default if default is not None else ('""' if is_string else "0")
+        items = self._lut_items([cases.get(k, fill) for k in range(low, high + 1)] + [fill])
+        if not items:
+            return None
+        c_type, literals = items
+        lookup = self._lut_lookup("switch", c_type, literals[:-1], var, low, self._index_domain(var), literals[-1])
+        return f"String({lookup})" if c_type == "const char*" else lookup
+
+    def _lut_trig(self, func: str, arg: str) -> str:
+        """sin/cos of an expression in one small-domain integer variable -> float table."""
+        plain = f"{func}({arg})"
+        idents = set(re.findall(r"\b[A-Za-z_]\w*\b", arg))
+        names: dict[str, int | float] = dict(self.const_values)
+        for ident in idents:
+            if ident.upper() in BUILTIN_CONST_VALUES:
+                names[ident] = BUILTIN_CONST_VALUES[ident.upper()]
+        free = [ident for ident in idents if ident not in names]
+        if len(free) != 1:
+            return plain
+        domain = self._index_domain(free[0])
+        if not domain or domain[1] - domain[0] + 1 > MAX_LUT_ENTRIES:
+            return plain
+        low, high = domain[0], domain[1]
+        angles = [_eval_const_expr(arg, {**names, free[0]: v}) for v in range(low, high + 1)]
+        if any(a is None for a in angles):
+            return plain
+        table = [f"{getattr(math, func)(a):.17g}" for a in angles]
+        return self._lut_lookup(func, "__vb_trig_t", table, free[0], low, domain, plain)
+
+    def _widen_counter(self, loop: ForLoop) -> None:
+        """Give a narrowed counter its VB type again when its range isn't just the loop's.
+
+        The bounds only prove the range while the body leaves the counter alone:
+        a write can take it past the narrow type (and wrap instead of exiting),
+        and a bare argument may bind to a ByRef Integer/Long parameter
+        (int&/long&), which a narrower type can't.
+        """
+        if loop.c_type in ("int", "long"):
+            return
+        body_text = "\n".join(loop.target[loop.position + 2:])
+        var = re.escape(loop.var)
+        passed = re.search(rf"[(,]\s*{var}\s*[,)]", body_text)
+        if passed:
+            c_type = "int" if loop.c_type in ("int_fast8_t", "int_fast16_t") else "long"
+        elif _writes_counter(loop.var, body_text) or re.search(rf"&\s*{var}\b", body_text):
+            if loop.c_type not in ("int_fast8_t", "int_fast16_t"):
+                return  # Already at least 32 bits, like a VB Long
+            c_type = "int"
+        else:
+            return
+        header = loop.position + 1
+        loop.target[header] = loop.target[header].replace(f"for ({loop.c_type} ", f"for ({c_type} ", 1)
+        loop.c_type = c_type
+
+    def _unroll_loop(self, loop: ForLoop) -> bool:
+        """Replace a finished constant-trip-count loop with one block per iteration.
+
+        Returns True when the loop was unrolled (the caller then drops the closing brace).
+        """
+        if self.unroll_threshold <= 0 or not loop.trip_count or loop.trip_count > self.unroll_threshold:
+            return False
+        target = loop.target
+        body = target[loop.position + 2:]
+        body_text = "\n".join(body)
+        # Exits, jumps, statics and writes to the counter all depend on a real loop
+        if re.search(r"\b(break|continue|goto|static)\b", body_text) or re.search(r"^\w+:\s*$", body_text, re.MULTILINE):
+            return False
+        if _writes_counter(loop.var, body_text):
+            return False
+        if loop.trip_count * (len(body) + 2) > MAX_UNROLLED_LINES:
+            return False
+        unrolled: List[str] = []
+        for i in range(loop.trip_count):
+            value = loop.start + i * loop.step
+            unrolled.append(f"{{ {loop.c_type} {loop.var} = {value};{loop.suffix}")
+            unrolled.extend(body)
+            unrolled.append(f"}}{loop.suffix}")
+        # Keep the loop's VB line marker, replace header + body
+        del target[loop.position + 1:]
+        target.extend(unrolled)
+        return True
+
     def _expr(self, expr: str, is_condition: bool = False) -> str:
         expr = expr.strip()
         # --- UBound/LBound support ---
@@ -934,8 +1452,8 @@ class VBTranspiler:
         expr = re.sub(r"\bLOG\s*\(([^)]+)\)", r"log(\1)", expr, flags=re.IGNORECASE)
         expr = re.sub(r"\bEXP\s*\(([^)]+)\)", r"exp(\1)", expr, flags=re.IGNORECASE)
         expr = re.sub(r"\bATN\s*\(([^)]+)\)", r"atan(\1)", expr, flags=re.IGNORECASE)
-        expr = re.sub(r"\bSIN\s*\(([^)]+)\)", r"sin(\1)", expr, flags=re.IGNORECASE)
-        expr = re.sub(r"\bCOS\s*\(([^)]+)\)", r"cos(\1)", expr, flags=re.IGNORECASE)
+        expr = re.sub(r"\bSIN\s*\(([^)]+)\)", lambda m: self._lut_trig("sin", m.group(1)), expr, flags=re.IGNORECASE)
+        expr = re.sub(r"\bCOS\s*\(([^)]+)\)", lambda m: self._lut_trig("cos", m.group(1)), expr, flags=re.IGNORECASE)
         expr = re.sub(r"\bTAN\s*\(([^)]+)\)", r"tan(\1)", expr, flags=re.IGNORECASE)
         expr = re.sub(r"\bABS\s*\(([^)]+)\)", r"abs(\1)", expr, flags=re.IGNORECASE)
         expr = re.sub(r"\bRND\s*\(\)", r"random(0, 32767)", expr, flags=re.IGNORECASE)
@@ -953,6 +1471,9 @@ class VBTranspiler:
                 return f"/* ERROR: Choose needs at least 2 parameters */"
             index = self._expr(params[0])
             values = [self._expr(p) for p in params[1:]]
+            lookup = self._lut_choose(index, values)
+            if lookup:
+                return lookup
             # Generate ternary chain: index==1?val1:index==2?val2:...
             result = ""
             for i, val in enumerate(values, start=1):
@@ -971,6 +1492,9 @@ class VBTranspiler:
             params = self._split_params_balanced(content)
             if len(params) < 2 or len(params) % 2 != 0:
                 return f"/* ERROR: Switch needs even number of parameters */"
+            lookup = self._lut_switch(params)
+            if lookup:
+                return lookup
             # Generate ternary chain
             result = ""
             for i in range(0, len(params), 2):
@@ -1057,6 +1581,7 @@ class VBTranspiler:
                           # Arduino/C++ functions that should not be converted
                                                   "round", "trunc", "log", "exp", "atan", "randomSeed",
                           "atoi", "atol", "atof", "byte", "bool", "chr", "sqrt",
+                          "pgm_read_byte", "pgm_read_word", "pgm_read_dword", "pgm_read_float",
                           # Arduino types/classes (capital first letter)
                           "String"]  # Add user-defined functions that look like array calls
         def convert_array_access(match):
@@ -1336,17 +1861,27 @@ static std::vector<String> __vb_filter(const std::vector<String>& parts, const S
 }
 """
 
-        globals_section = helpers + "\n" + "\n".join(self.global_lines)
+        if self.profile_slots:
+            helpers += runtime_cpp(len(self.profile_slots), self.profile_interval_ms)
+
+        lut_section = "\n".join(self.lut_lines) + "\n" if self.lut_lines else ""
+        if any(c_type == "__vb_trig_t" for c_type, _ in self.lut_names):
+            lut_section = TRIG_LUT_TYPES + "\n" + lut_section
+        globals_section = helpers + "\n" + lut_section + "\n".join(self.global_lines)
         functions_section = "".join(self.function_lines) if self.function_lines else ""
         
         # Add initialization delay at the start of setup for USB/serial init
         setup_lines_list = self.setup_lines if self.setup_lines else []
+        loop_lines_list = self.loop_lines if self.loop_lines else []
+        if self.profile_slots:
+            setup_lines_list = ["__VbProfScope __vb_prof_scope(0);", *setup_lines_list]
+            loop_lines_list = ["__vb_prof_loop();", "__VbProfScope __vb_prof_scope(1);", *loop_lines_list]
         if setup_lines_list:
             setup_section = "delay(1000);\n    " + "\n    ".join(setup_lines_list)
         else:
             setup_section = "delay(1000);"
         
-        loop_section = "\n    ".join(self.loop_lines) if self.loop_lines else ""
+        loop_section = "\n    ".join(loop_lines_list)
 
         cpp_body = f"""#include <Arduino.h>
 {includes_section}{forward_declarations}{globals_section}
@@ -1374,6 +1909,106 @@ void loop() {{
         return "\n".join(numbered) + "\n"
 
 
-def transpile_string(source: str) -> str:
+def _eval_const_expr(expr: str, names: dict[str, int | float]) -> int | float | None:
+    """Evaluate a C arithmetic expression of literals and known constants.
+
+    Integer division and modulo follow C (truncate toward zero). Returns None
+    when the expression references anything not known at transpile time.
+    """
+    try:
+        tree = ast.parse(expr.strip(), mode="eval")
+    except (SyntaxError, ValueError):
+        return None
+
+    def ev(node):
+        if isinstance(node, ast.Expression):
+            return ev(node.body)
+        if isinstance(node, ast.Constant):
+            value = node.value
+            return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+        if isinstance(node, ast.Name):
+            return names.get(node.id)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            value = ev(node.operand)
+            if value is None:
+                return None
+            return -value if isinstance(node.op, ast.USub) else value
+        if isinstance(node, ast.BinOp):
+            left, right = ev(node.left), ev(node.right)
+            if left is None or right is None:
+                return None
+            op = node.op
+            both_int = isinstance(left, int) and isinstance(right, int)
+            if isinstance(op, ast.Add):
+                return left + right
+            if isinstance(op, ast.Sub):
+                return left - right
+            if isinstance(op, ast.Mult):
+                return left * right
+            if isinstance(op, ast.Div):
+                if right == 0:
+                    return None
+                if both_int:
+                    quotient = abs(left) // abs(right)
+                    return quotient if (left >= 0) == (right >= 0) else -quotient
+                return left / right
+            if both_int and isinstance(op, ast.Mod) and right != 0:
+                return left - right * int(left / right)
+            if both_int and isinstance(op, ast.LShift):
+                return left << right
+            if both_int and isinstance(op, ast.RShift):
+                return left >> right
+            if both_int and isinstance(op, ast.BitAnd):
+                return left & right
+            if both_int and isinstance(op, ast.BitOr):
+                return left | right
+        return None
+
+    return ev(tree)
+
+
+def _lut_int_type(low: int, high: int) -> str:
+    """Smallest fixed-width type for integer lookup-table entries."""
+    for c_type, type_min, type_max in (
+        ("uint8_t", 0, 0xFF),
+        ("int8_t", -0x80, 0x7F),
+        ("uint16_t", 0, 0xFFFF),
+        ("int16_t", -0x8000, 0x7FFF),
+    ):
+        if type_min <= low and high <= type_max:
+            return c_type
+    return "int32_t"
+
+
+def _c_float(value: float) -> str:
+    """Format a float as a C literal with single-precision accuracy."""
+    text = f"{float(value):.9g}"
+    if "e" not in text and "." not in text and "inf" not in text and "nan" not in text:
+        text += ".0"
+    return text + "f"
+
+
+def _writes_counter(var: str, body_text: str) -> bool:
+    """True if emitted C++ assigns to, increments or decrements `var`."""
+    var = re.escape(var)
+    return bool(re.search(rf"\b{var}\s*(=[^=]|\+=|-=|\*=|/=|\+\+|--)|(\+\+|--)\s*{var}\b", body_text))
+
+
+def _induction_type(low: int, high: int) -> str:
+    """Narrowest fast signed integer type holding every value a loop counter takes.
+
+    Signed so that arithmetic on the counter (`i - 150`) stays signed after promotion.
+    """
+    for c_type, type_min, type_max in (
+        ("int_fast8_t", -0x80, 0x7F),
+        ("int_fast16_t", -0x8000, 0x7FFF),
+        ("int32_t", -0x80000000, 0x7FFFFFFF),
+    ):
+        if type_min <= low and high <= type_max:
+            return c_type
+    return "int64_t"
+
+
+def transpile_string(source: str, **options) -> str:
     """Convenience function to transpile VB source to Arduino C++."""
-    return VBTranspiler().transpile(source).cpp
+    return VBTranspiler(**options).transpile(source).cpp
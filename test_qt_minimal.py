@@ -1,6 +1,8 @@
 from PyQt6.QtWidgets import QApplication
-app = QApplication([])
 from vb2arduino.ide.main_window import MainWindow
-window = MainWindow()
-window.show()
-app.exec()
+
+if __name__ == "__main__":
+    app = QApplication([])
+    window = MainWindow()
+    window.show()
+    app.exec()
@@ -0,0 +1,73 @@
+import os
+import sys
+
+import pytest
+
+from vb2arduino import VBTranspiler
+from vb2arduino.native import build_native, find_compiler, run_native
+
+
+@pytest.fixture
+def run_sketch(tmp_path):
+    """Transpile a VB sketch, build it against the native stub and return its trace."""
+    if not find_compiler():
+        pytest.skip("no host C++ compiler")
+
+    def run(source: str, iterations: int = 1, **options) -> str:
+        cpp = tmp_path / "main.cpp"
+        cpp.write_text(VBTranspiler(**options).transpile(source).cpp, encoding="utf-8")
+        build = build_native(cpp, tmp_path / "sketch")
+        assert build.returncode == 0, build.stderr
+        trace = tmp_path / "trace.txt"
+        result = run_native(tmp_path / "sketch", iterations, trace=trace, timeout=30)
+        assert result.returncode == 0, result.stderr
+        return trace.read_text(encoding="utf-8")
+
+    return run
+
+
+@pytest.fixture
+def qapp(tmp_path, monkeypatch):
+    """A QApplication on an offscreen display, with the IDE settings under tmp_path."""
+    pytest.importorskip("PyQt6")
+    monkeypatch.setenv("QT_QPA_PLATFORM", "offscreen")
+    monkeypatch.setenv("HOME", str(tmp_path))
+    from PyQt6.QtWidgets import QApplication
+
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def main_window(qapp, tmp_path, monkeypatch):
+    """The IDE window with no popups, building into tmp_path."""
+    from PyQt6.QtWidgets import QMessageBox
+    from vb2arduino.ide.main_window import MainWindow
+
+    for name in ("information", "warning", "critical"):
+        monkeypatch.setattr(QMessageBox, name, staticmethod(lambda *args, **kwargs: None))
+    window = MainWindow()
+    window.build_output_dir = tmp_path / "build"
+    yield window
+    window.is_modified = False
+    window.close()
+    qapp.processEvents()
+
+
+@pytest.fixture
+def pty_port():
+    """Open pseudo-terminals: returns (master fd, slave path); the test plays the device on the master."""
+    if sys.platform == "win32":
+        pytest.skip("needs a pseudo-terminal")
+    fds = []
+
+    def open_():
+        master, slave = os.openpty()
+        fds.extend([master, slave])
+        return master, os.ttyname(slave)
+
+    yield open_
+    for fd in fds:
+        try:
+            os.close(fd)
+        except OSError:
+            pass
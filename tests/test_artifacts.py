@@ -0,0 +1,66 @@
+from vb2arduino.artifacts import (
+    build_inputs, input_hashes, is_flashed, is_up_to_date, load_manifest, record_flash, save_manifest,
+)
+
+
+def make_project(root):
+    (root / "src").mkdir(parents=True)
+    (root / "platformio.ini").write_text("[env:uno]\n")
+    (root / "src" / "main.cpp").write_text('#include <Arduino.h>\n#include "pins.h"\n#include "../../shared/util.h"\n')
+    (root / "src" / "pins.h").write_text("#define LED 13\n")
+    (root / "src" / "extra.c").write_text("int extra;\n")
+    (root / "include").mkdir()
+    (root / "include" / "config.h").write_text("#define RATE 9600\n")
+    (root.parent / "shared").mkdir(exist_ok=True)
+    (root.parent / "shared" / "util.h").write_text('#include "more.h"\n')
+    (root.parent / "shared" / "more.h").write_text("#define MORE 1\n")
+    (root / ".pio" / "build" / "uno").mkdir(parents=True)
+    (root / ".pio" / "build" / "uno" / "firmware.hex").write_text(":00000001FF\n")
+    (root / ".pio" / "libdeps" / "uno").mkdir(parents=True)
+    (root / ".pio" / "libdeps" / "uno" / "Servo.h").write_text("class Servo;\n")
+
+
+def test_build_inputs_cover_sources_and_local_includes(tmp_path):
+    project = tmp_path / "sketch" / "build"
+    make_project(project)
+    assert build_inputs(project) == [
+        "platformio.ini",
+        "../shared/more.h",
+        "../shared/util.h",
+        "include/config.h",
+        "src/extra.c",
+        "src/main.cpp",
+        "src/pins.h",
+    ]
+    # build_src_dir = . (the CLI's layout) skips PlatformIO's own .pio directory
+    assert "platformio.ini" in build_inputs(project, ".") and not any(
+        ".pio" in path for path in build_inputs(project, "."))
+
+
+def test_changed_header_makes_build_stale(tmp_path):
+    project = tmp_path / "sketch" / "build"
+    make_project(project)
+    save_manifest(project, "uno", input_hashes(project, build_inputs(project)))
+    assert is_up_to_date(project, "uno", input_hashes(project, build_inputs(project)))
+
+    (tmp_path / "sketch" / "shared" / "more.h").write_text("#define MORE 2\n")
+    assert not is_up_to_date(project, "uno", input_hashes(project, build_inputs(project)))
+
+
+def test_same_firmware_on_the_same_port_is_not_flashed_again(tmp_path):
+    project = tmp_path / "build"
+    make_project(project)
+    firmware_hash = save_manifest(project, "uno", {}).firmware_hash
+    records = tmp_path / "flashed.json"
+    assert firmware_hash == load_manifest(project).firmware_hash
+    assert not is_flashed("/dev/ttyUSB0", "uno", firmware_hash, records)
+
+    record_flash("/dev/ttyUSB0", "uno", firmware_hash, records)
+
+    assert is_flashed("/dev/ttyUSB0", "uno", firmware_hash, records)
+    assert not is_flashed("/dev/ttyUSB1", "uno", firmware_hash, records)  # Another board
+    assert not is_flashed("/dev/ttyUSB0", "nano", firmware_hash, records)  # Same port, other target
+    assert not is_flashed("/dev/ttyUSB0", "uno", "0" * 64, records)  # Rebuilt firmware
+    assert not is_flashed("/dev/ttyUSB0", "uno", None, records)  # No firmware found
+    records.write_text("not json")
+    assert not is_flashed("/dev/ttyUSB0", "uno", firmware_hash, records)
@@ -0,0 +1,46 @@
+import threading
+
+from vb2arduino import board_db
+from vb2arduino.board_db import BoardDB, BoardInfo
+from vb2arduino.ide.utils import get_platformio_boards
+
+BOARDS = [
+    BoardInfo("uno", "Arduino Uno", "atmelavr", "atmega328p", "Arduino", frameworks=("arduino",)),
+    BoardInfo("esp32-s3-devkitc-1", "Espressif ESP32-S3-DevKitC-1", "espressif32", "esp32s3", "Espressif",
+              frameworks=("arduino", "espidf")),
+    BoardInfo("nucleo_f401re", "ST Nucleo F401RE", "ststm32", "stm32f401ret6", "ST", frameworks=("mbed",)),
+] + [BoardInfo(f"generic{i}", f"Generic Board {i}", "atmelavr", "atmega328p", frameworks=("arduino",))
+     for i in range(100)]
+
+
+def test_refresh_thread_and_reader_use_their_own_connections(tmp_path):
+    db = BoardDB(tmp_path / "boards.sqlite")
+    errors = []
+
+    def refresh():
+        try:
+            db.replace_all(BOARDS)
+        except Exception as e:  # Surface sqlite3.ProgrammingError from a shared connection
+            errors.append(e)
+        finally:
+            db.close()
+
+    thread = threading.Thread(target=refresh)
+    thread.start()
+    thread.join()
+    assert not errors
+    assert db.search("s3dk")[0].board_id == "esp32-s3-devkitc-1"
+    assert [b.board_id for b in db.by_vendor("arduino")] == ["uno"]
+    assert db.imported_at() is not None
+    db.close()
+    assert db.get("uno").name == "Arduino Uno"
+
+
+def test_board_list_holds_only_search_results(tmp_path, monkeypatch):
+    db = BoardDB(tmp_path / "boards.sqlite")
+    db.replace_all(BOARDS)
+    monkeypatch.setattr(board_db, "_default_db", db)
+    assert len(get_platformio_boards()) == 50
+    assert get_platformio_boards("uno")[0] == ("Arduino Uno", "uno")
+    assert ("ST Nucleo F401RE", "nucleo_f401re") not in get_platformio_boards("nucleo")
+    db.close()
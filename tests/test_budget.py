@@ -0,0 +1,64 @@
+from vb2arduino import VBTranspiler
+from vb2arduino.boards import get_board_profile
+from vb2arduino.budget import estimate_budget
+
+BIG_BUFFER = """
+Dim samples(1999) As Long
+
+Sub Loop()
+    samples(0) = 1
+End Sub
+"""
+
+CALLS = """
+Function Leaf(x As Integer) As Integer
+    Dim scratch(49) As Long
+    Return x + 1
+End Function
+
+Function Middle(x As Integer) As Integer
+    Return Leaf(x) * 2
+End Function
+
+Function Forever(n As Integer) As Integer
+    Return Forever(n - 1)
+End Function
+
+Sub Loop()
+    SerialPrintLine Middle(1)
+End Sub
+"""
+
+
+def budget(source: str, board: str):
+    transpiler = VBTranspiler()
+    result = transpiler.transpile(source)
+    return estimate_budget(transpiler, get_board_profile(board), result.call_graph)
+
+
+def test_array_over_ram_fails_on_a_small_board_only():
+    uno = budget(BIG_BUFFER, "uno")
+    assert not uno.ok
+    assert uno.static_ram == 190 + 2000 * 4
+    assert uno.errors == [f"Static RAM {uno.static_ram} B exceeds 2048 B"]
+    assert uno.ranked(1)[0].name == "samples"
+    assert "[error] Static RAM" in uno.format()
+
+    assert budget(BIG_BUFFER, "esp32dev").ok
+
+
+def test_stack_follows_the_deepest_call_chain():
+    report = budget(CALLS, "uno")
+    assert report.ok
+    assert report.stack_path == ["loop", "Middle", "Leaf"]
+    assert report.stack_depth >= 50 * 4 + 3 * 4  # Leaf's locals plus three call frames
+    assert report.recursive == ["Forever"]
+    assert any("Recursion" in warning for warning in report.warnings)
+
+
+def test_deep_stack_warns_without_failing():
+    source = CALLS.replace("scratch(49)", "scratch(2999)")
+    report = budget(source, "esp32dev")
+    assert report.ok
+    assert report.stack_depth > report.stack_available
+    assert any("Estimated stack" in warning for warning in report.warnings)
@@ -0,0 +1,48 @@
+import os
+
+from vb2arduino.build_cache import STATS_NAME, BuildCache, CacheStats, count_hits
+
+OUTPUT = """\
+Retrieved `.pio/build/uno/FrameworkArduino/main.cpp.o' from cache
+Retrieved `.pio/build/uno/FrameworkArduino/wiring.c.o' from cache
+Compiling .pio/build/uno/src/main.cpp.o
+Linking .pio/build/uno/firmware.elf
+Compiling .pio/build/uno/src/extra.cpp.o
+"""
+
+
+def add_object(cache: BuildCache, name: str, size: int, used_at: float):
+    path = cache.directory / name[:2] / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"\0" * size)
+    os.utime(path, (used_at, used_at))
+    return path
+
+
+def test_count_hits_and_misses():
+    stats = count_hits(OUTPUT.splitlines())
+    assert (stats.hits, stats.misses) == (2, 2)
+    assert stats.hit_rate == 0.5
+
+
+def test_record_accumulates_across_builds(tmp_path):
+    cache = BuildCache(tmp_path)
+    cache.record(CacheStats(hits=3, misses=1))
+    totals = cache.record(CacheStats(hits=1, misses=3))
+    assert (totals.hits, totals.misses) == (4, 4)
+    assert cache.record(CacheStats()) == totals  # An empty build leaves the totals alone
+    assert "4 hits, 4 compiled (50% hit rate)" in cache.summary(totals)
+
+
+def test_evict_drops_least_recently_used_objects(tmp_path):
+    cache = BuildCache(tmp_path, max_mb=1)
+    paths = [add_object(cache, f"{i:02d}signature", 300 * 1024, used_at=1_000_000 + i) for i in range(5)]
+    cache.record(CacheStats(hits=1))
+
+    removed, freed = cache.evict()
+
+    assert (removed, freed) == (2, 2 * 300 * 1024)
+    assert [p.exists() for p in paths] == [False, False, True, True, True]
+    assert cache.usage() == (3 * 300 * 1024, 3)
+    assert (tmp_path / STATS_NAME).exists()
+    assert cache.evict() == (0, 0)
@@ -0,0 +1,55 @@
+import sys
+
+from vb2arduino.build_matrix import board_build_dir, env_section, format_matrix, parse_size_report, run_matrix
+
+# Mimics PlatformIO's auto-clean: when platformio.ini changed since the last
+# build, the whole build directory is removed and recreated (without exist_ok)
+FAKE_PIO = r"""
+import hashlib, os, pathlib, shutil, sys, time
+args = sys.argv[1:]
+project = pathlib.Path(args[args.index("--project-dir") + 1])
+board = args[args.index("--environment") + 1]
+build_dir = pathlib.Path(os.environ.get("PLATFORMIO_BUILD_DIR") or project / ".pio" / "build")
+checksum = hashlib.sha1((project / "platformio.ini").read_bytes()).hexdigest()
+stamp = build_dir / "project.checksum"
+if not stamp.exists() or stamp.read_text() != checksum:
+    if build_dir.exists():
+        shutil.rmtree(build_dir)
+    time.sleep(0.05)
+    os.makedirs(build_dir)
+    stamp.write_text(checksum)
+obj = build_dir / board / "main.o"
+obj.parent.mkdir(parents=True, exist_ok=True)
+obj.write_text("object")
+time.sleep(0.2)
+if not obj.exists():
+    sys.exit("object file deleted by another build")
+print("RAM:   [=   ]  9.2% (used 188 bytes from 2048 bytes)")
+print("Flash: [=   ]  1.4% (used 444 bytes from 32256 bytes)")
+"""
+
+
+def test_parallel_boards_survive_a_changed_ini(tmp_path):
+    pio = tmp_path / "fake_pio.py"
+    pio.write_text(FAKE_PIO)
+    project = tmp_path / "project"
+    project.mkdir()
+    boards = ["uno", "nano", "mega", "leonardo"]
+    ini = "".join(env_section(board, "atmelavr") for board in boards[:2])
+    (project / "platformio.ini").write_text(ini)
+    assert all(r.ok for r in run_matrix(project, boards[:2], [sys.executable, str(pio)], parallel=2))
+
+    # Adding boards changes platformio.ini under every environment's feet
+    (project / "platformio.ini").write_text(ini + "".join(env_section(board, "atmelavr") for board in boards[2:]))
+    results = run_matrix(project, boards, [sys.executable, str(pio)], parallel=4)
+    assert [r.board for r in results] == boards
+    assert all(r.ok for r in results), [r.output for r in results if not r.ok]
+    assert all((board_build_dir(project, board) / board / "main.o").exists() for board in boards)
+    assert (results[0].ram_used, results[0].flash_total) == (188, 32256)
+    assert "uno" in format_matrix(results)
+
+
+def test_size_report_parsing():
+    sizes = parse_size_report("RAM:   [==  ]  20.1% (used 412 bytes from 2048 bytes)\n"
+                              "Flash: [=   ]   5.0% (used 1612 bytes from 32256 bytes)\n")
+    assert sizes == {"RAM": (412, 2048), "Flash": (1612, 32256)}
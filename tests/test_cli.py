@@ -0,0 +1,36 @@
+from vb2arduino import VBTranspiler
+from vb2arduino.artifacts import load_manifest, save_manifest
+from vb2arduino.cli import flash_used, without_inlining
+
+SKETCH = """
+Function Twice(x As Integer) As Integer
+    Return x * 2
+End Function
+
+Sub Setup()
+    Serial.Begin 9600
+End Sub
+
+Sub Loop()
+    Serial.Println Twice(21)
+End Sub
+"""
+
+
+def test_without_inlining_matches_a_build_with_inlining_off():
+    result = VBTranspiler(inline=True).transpile(SKETCH)
+    assert result.inlined and result.inlined[0][0] == "Twice"
+    baseline = VBTranspiler().transpile(SKETCH).cpp
+    assert without_inlining(result.cpp, result.inlined) == baseline
+
+
+def test_flash_used_reads_platformio_summary():
+    output = "RAM:   [=         ]   6.5% (used 21340 bytes from 327680 bytes)\n" \
+             "Flash: [===       ]  25.1% (used 328741 bytes from 1310720 bytes)\n"
+    assert flash_used(output) == 328741
+    assert flash_used("error: build failed") is None
+
+
+def test_manifest_keeps_flash_size(tmp_path):
+    save_manifest(tmp_path, "uno", {"main.cpp": "abc"}, flash=1234)
+    assert load_manifest(tmp_path).flash == 1234
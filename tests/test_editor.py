@@ -0,0 +1,43 @@
+import pytest
+
+from vb2arduino.ide.build_runner import parse_diagnostic
+
+
+@pytest.fixture
+def editor(qapp):
+    from vb2arduino.ide.editor import CodeEditor
+
+    widget = CodeEditor()
+    widget.setPlainText("Sub Loop()\n    x = 1\n    y = 2\nEnd Sub\n")
+    yield widget
+    widget.close()
+
+
+def test_parse_diagnostic_keeps_only_the_sketch():
+    line = "src/main.cpp:12:5: error: 'foo' was not declared in this scope"
+    assert parse_diagnostic(line, "main.cpp") == (12, "error", "'foo' was not declared in this scope")
+    assert parse_diagnostic("lib/Servo.cpp:3:1: warning: unused", "main.cpp") is None
+    assert parse_diagnostic("Compiling .pio/build/uno/src/main.cpp.o", "main.cpp") is None
+
+
+def test_diagnostics_follow_edits_and_drop_when_their_line_changes(editor):
+    from PyQt6.QtGui import QTextCursor
+
+    editor.add_diagnostic(2, "error", "'x' was not declared")
+    editor.add_diagnostic(3, "warning", "unused 'y'")
+    editor.add_diagnostic(99, "error", "beyond the end")  # Ignored
+    assert editor.diagnostics_at(2) == [("error", "'x' was not declared")]
+
+    cursor = QTextCursor(editor.document())
+    cursor.insertText("' header\n")  # A new first line moves both markers down
+    assert editor.diagnostics_at(2) == []
+    assert editor.diagnostics_at(3) == [("error", "'x' was not declared")]
+    assert editor.diagnostics_at(4) == [("warning", "unused 'y'")]
+
+    cursor = QTextCursor(editor.document().findBlockByNumber(2))
+    cursor.insertText("Dim x As Integer: ")  # Editing the marked line drops its marker
+    assert editor.diagnostics_at(3) == []
+    assert editor.diagnostics_at(4) == [("warning", "unused 'y'")]
+
+    editor.clear_diagnostics()
+    assert editor.diagnostics_at(4) == []
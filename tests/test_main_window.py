@@ -0,0 +1,88 @@
+import sys
+
+from vb2arduino.artifacts import MANIFEST_NAME, save_manifest
+from vb2arduino.ide import main_window as main_window_module
+from vb2arduino.ide.build_runner import BuildJob
+from vb2arduino.ide.device_watcher import DeviceInfo
+
+
+def select_board(window, board: str) -> None:
+    window.board_combo.addItem(board, board)
+    window.board_combo.setCurrentIndex(window.board_combo.count() - 1)
+
+
+def test_clean_targets_the_build_project_and_drops_its_manifest(main_window, monkeypatch):
+    jobs = []
+    monkeypatch.setattr(main_window.build_runner, "enqueue", jobs.append)
+    select_board(main_window, "uno")
+    project = main_window.build_output_dir
+    save_manifest(project, "uno", {"main.cpp": "abc"})
+
+    main_window.clean_build()
+
+    [job] = jobs
+    assert job.cmd[job.cmd.index("--project-dir") + 1] == str(project)
+    assert job.prepare(job)
+    assert not (project / MANIFEST_NAME).exists()
+
+
+def test_clean_without_a_build_is_dropped(main_window, monkeypatch):
+    jobs = []
+    monkeypatch.setattr(main_window.build_runner, "enqueue", jobs.append)
+    select_board(main_window, "uno")
+
+    main_window.clean_build()
+
+    assert not jobs[0].prepare(jobs[0])
+
+
+def test_manifest_and_size_failures_reach_the_build_output(main_window, monkeypatch):
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(main_window_module, "save_manifest", fail)
+    monkeypatch.setattr(main_window, "_analyze_size", fail)
+    job = BuildJob(title="Compile", cmd=[sys.executable, "-m", "platformio", "run", "--environment", "uno"],
+                   log_name="compile", cwd=main_window.build_output_dir, inputs={"main.cpp": "abc"})
+    main_window.build_output_dir.mkdir()
+
+    main_window._on_build_finished(job, 0)
+
+    output = main_window.build_output.output.toPlainText()
+    assert "Could not save the build manifest: disk full" in output
+    assert "Size report failed: disk full" in output
+
+
+def test_auto_select_keeps_a_chosen_port(main_window):
+    main_window._fill_ports([DeviceInfo("/dev/ttyS0"), DeviceInfo("/dev/ttyUSB0", board="uno")])
+    main_window.port_combo.setCurrentIndex(main_window.port_combo.findData("/dev/ttyS0"))
+
+    main_window.auto_select_defaults()
+
+    assert main_window._selected_port() == "/dev/ttyS0"
+
+
+def test_hotplug_fills_an_empty_port_selection(main_window):
+    main_window.port_combo.clear()
+
+    main_window._on_devices_changed([DeviceInfo("/dev/ttyUSB0", board="uno")])
+
+    assert main_window._selected_port() == "/dev/ttyUSB0"
+
+
+def test_upload_is_skipped_only_for_the_firmware_the_port_already_runs(main_window, monkeypatch):
+    monkeypatch.setattr(main_window_module, "is_flashed", lambda port, board, firmware: port == "/dev/ttyUSB0")
+    compile_job = BuildJob(title="Compile", cmd=[], log_name="compile")
+
+    def prepare(port, force=False):
+        job = BuildJob(title="Upload", cmd=[], log_name="upload")
+        return main_window._prepare_upload(job, compile_job, "uno", port, force), job
+
+    compile_job.exit_code = 1
+    assert prepare("/dev/ttyUSB0")[0] is False  # Nothing to flash after a failed compile
+
+    compile_job.exit_code = 0
+    ready, job = prepare("/dev/ttyUSB0")
+    assert ready and job.skipped and "already runs this firmware" in job.skip_message
+    assert not prepare("/dev/ttyUSB0", force=True)[1].skipped
+    assert not prepare("/dev/ttyUSB1")[1].skipped
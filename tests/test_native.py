@@ -0,0 +1,18 @@
+import pytest
+
+from vb2arduino import VBTranspiler
+from vb2arduino.native import build_native, find_compiler, run_native
+
+
+def test_a_fast_run_reports_a_nonzero_elapsed_time(tmp_path):
+    if not find_compiler():
+        pytest.skip("no host C++ compiler")
+    cpp = tmp_path / "main.cpp"
+    cpp.write_text(VBTranspiler().transpile("Sub Loop()\nEnd Sub\n").cpp, encoding="utf-8")
+    assert build_native(cpp, tmp_path / "sketch").returncode == 0
+
+    run = run_native(tmp_path / "sketch", 1, trace=tmp_path / "trace.txt", timeout=30)
+
+    assert run.iterations == 1
+    assert 0 < run.elapsed < 1e-3
+    assert run.iterations_per_sec > 0
@@ -0,0 +1,29 @@
+import io
+import json
+import os
+
+from vb2arduino import pio_worker
+
+
+def control(worker, *messages):
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, b"".join(json.dumps(m).encode() + b"\n" for m in messages))
+    os.close(write_fd)
+    try:
+        worker._read_control(read_fd)
+    finally:
+        os.close(read_fd)
+
+
+def sent(proto):
+    return [json.loads(line) for line in proto.getvalue().splitlines()]
+
+
+def test_job_cancelled_before_it_starts_still_reports_exit():
+    proto = io.StringIO()
+    worker = pio_worker.Worker(lambda args: 0, proto)
+    control(worker, {"id": 1, "args": ["run"], "cwd": None}, {"id": 2, "args": ["run"], "cwd": None},
+            {"cancel": 1, "force": False})
+    assert [m["id"] for m in worker.pending] == [2]
+    assert sent(proto) == [{"id": 1, "exit": -15, "cancelled": True}]
+
@@ -0,0 +1,107 @@
+import struct
+import subprocess
+
+import pytest
+
+from vb2arduino import VBTranspiler
+from vb2arduino.native import find_compiler
+from vb2arduino.profiler import (
+    FRAME_SYNC, FRAME_VERSION, MAX_SLOTS, PROFILE_LINES, FrameParser, ProfileError, ProfileSlot, ProfileStats,
+    runtime_cpp,
+)
+
+# Just enough Arduino for the profiling runtime: a clock and a Serial that writes raw bytes to stdout
+HARNESS = r"""
+#include <cstdint>
+#include <cstdio>
+static uint32_t g_us = 0;
+static uint32_t micros() { return g_us += 1; }
+struct { void write(uint8_t b) { std::fputc(b, stdout); } void print(const char* s) { std::fputs(s, stdout); } } Serial;
+%s
+int main() {
+    for (int i = 0; i < 5000; ++i) {
+        __vb_prof_loop();
+        if (i %% 1000 == 0) Serial.print("tick\n");
+        { __VbProfScope scope(0); __vb_prof_line(1); g_us += 10; __vb_prof_line(2); g_us += 30; }
+    }
+}
+"""
+
+
+def encode_frame(slots, elapsed=1000, loops=10, loop_min=90, loop_max=110, version=FRAME_VERSION):
+    body = struct.pack("<BHIIII", version, len(slots), elapsed, loops, loop_min, loop_max)
+    body += b"".join(struct.pack("<II", us, hits) for us, hits in slots)
+    return FRAME_SYNC + body + struct.pack("<H", sum(body) & 0xFFFF)
+
+
+def feed_in_chunks(parser, data, size):
+    text, frames = b"", []
+    for start in range(0, len(data), size):
+        out, got = parser.feed(data[start:start + size])
+        text += out
+        frames += got
+    return text, frames
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 4096])
+def test_frames_are_split_from_text_at_any_chunk_size(size):
+    frame = encode_frame([(500, 5), (0, 0), (0x12345678, 1)])
+    stream = b"hello\r\n" + frame + b"world\r\n" + frame + frame + b"\x00 not a frame\r\n"
+    text, frames = feed_in_chunks(FrameParser(), stream, size)
+    assert text == b"hello\r\nworld\r\n\x00 not a frame\r\n"
+    assert len(frames) == 3
+    assert frames[0].slots == [(500, 5), (0, 0), (0x12345678, 1)]
+    assert (frames[0].elapsed_us, frames[0].loops, frames[0].loop_min_us, frames[0].loop_max_us) == (1000, 10, 90, 110)
+
+
+def test_corrupt_frame_is_passed_through():
+    frame = bytearray(encode_frame([(1, 1)]))
+    frame[-3] ^= 0xFF
+    parser = FrameParser()
+    text, frames = parser.feed(bytes(frame))
+    assert frames == [] and parser.bad_frames == 1
+    assert text == bytes(frame)
+
+
+def test_stats_rank_hot_slots_and_reject_other_builds():
+    slots = [ProfileSlot("proc", "Loop", 1), ProfileSlot("line", "Loop", 2), ProfileSlot("line", "Loop", 3)]
+    stats = ProfileStats(slots)
+    parser = FrameParser()
+    _, frames = parser.feed(encode_frame([(900, 10), (100, 10), (800, 10)], elapsed=1000, loops=10))
+    assert stats.add(frames[0])
+    assert not stats.add(parser.feed(encode_frame([(1, 1)]))[1][0])
+    assert [row.slot.vb_line for row in stats.hot("line")] == [3, 2]
+    assert stats.loop_hz == pytest.approx(10000)
+    assert stats.jitter_us == 20
+
+
+@pytest.mark.skipif(not find_compiler(), reason="no host C++ compiler")
+def test_runtime_frames_round_trip(tmp_path):
+    source = tmp_path / "harness.cpp"
+    source.write_text(HARNESS % runtime_cpp(3, interval_ms=2), encoding="utf-8")
+    exe = tmp_path / "harness"
+    build = subprocess.run([find_compiler(), "-std=c++17", "-w", str(source), "-o", str(exe)],
+                           capture_output=True, text=True)
+    assert build.returncode == 0, build.stderr
+    output = subprocess.run([str(exe)], capture_output=True, check=True).stdout
+
+    text, frames = feed_in_chunks(FrameParser(), output, 5)
+    assert text == b"tick\n" * 5
+    assert frames
+    stats = ProfileStats([ProfileSlot("proc", "Work", 1), ProfileSlot("line", "Work", 2),
+                          ProfileSlot("line", "Work", 3)])
+    assert all(stats.add(frame) for frame in frames)
+    proc, first, second = stats.rows
+    assert proc.hits == first.hits == second.hits
+    assert frames[-1].slots[0][1] == frames[-1].loops  # One Sub call per loop() period
+    assert second.us > first.us > 0
+    assert stats.hot("line")[0] is second
+
+
+def test_slot_count_is_capped():
+    body = "\n".join("    n = n + 1" for _ in range(MAX_SLOTS))
+    source = f"Sub Setup()\n    Dim n As Integer\n{body}\nEnd Sub\n"
+    with pytest.raises(ProfileError, match=str(MAX_SLOTS)):
+        VBTranspiler(profile=PROFILE_LINES).transpile(source)
+    assert len(VBTranspiler(profile=PROFILE_LINES).transpile(source.replace(
+        "    n = n + 1\n", "", 10)).profile) <= MAX_SLOTS
@@ -0,0 +1,36 @@
+from vb2arduino.serial_capture import CaptureReader, CaptureWriter
+
+
+def write_capture(directory, reads, **options):
+    writer = CaptureWriter(directory, **options)
+    for ts, data in reads:
+        writer.write(data, timestamp=ts)
+    writer.close()
+    return writer
+
+
+def test_lines_times_and_search(tmp_path):
+    reads = [(1.0, b"boot\r\nte"), (2.0, b"mp=21\r\n"), (3.0, b"temp=22\r\nerr"), (4.0, b"or: x\r\n")]
+    writer = write_capture(tmp_path, reads)
+    assert writer.lines == 4 and writer.bytes_written == sum(len(d) for _, d in reads)
+
+    reader = CaptureReader(tmp_path)
+    assert len(reader) == 4
+    assert [reader.line(i) for i in range(4)] == [
+        (1.0, "boot"), (1.0, "temp=21"), (3.0, "temp=22"), (3.0, "error: x")]
+    assert reader.line_at_time(2.5) == 2
+    assert list(reader.search(r"TEMP=\d+", ignore_case=True)) == [1, 2]
+    assert list(reader.search("temp", start_line=2)) == [2]
+    assert list(reader.chunks()) == reads
+    reader.close()
+
+
+def test_segments_rotate_and_oldest_are_pruned(tmp_path):
+    line = b"x" * 1023 + b"\n"
+    write_capture(tmp_path, [(float(i), line * 256) for i in range(20)], segment_mb=1, max_mb=2)
+    logs = sorted(tmp_path.glob("capture-*.log"))
+    assert len(logs) <= 3 and logs[0].name != "capture-0000.log"
+    reader = CaptureReader(tmp_path)
+    assert len(reader) == sum(p.stat().st_size for p in logs) // 1024
+    assert reader.line(len(reader) - 1) == (19.0, "x" * 1023)
+    reader.close()
@@ -0,0 +1,50 @@
+import pytest
+
+from vb2arduino.serial_filter import MAX_RULES, MESSAGE, LineIndex, Rule, RuleSet
+
+
+def test_tags_and_colors():
+    rules = RuleSet()
+    err, _ = rules.add(Rule("ERR", "#FF0000"))
+    temp, _ = rules.add(Rule(r"temp=(\d+)", ignore_case=True))
+    assert rules.tag("boot ok") == 0
+    assert rules.tag("TEMP=21 ERR") == (1 << err) | (1 << temp)
+    assert rules.color_for(rules.tag("ERR: overheat")) == "#FF0000"
+    assert rules.color_for(rules.tag("temp=3")) is None
+    assert rules.add(Rule("ERR", "#00FF00")) == (err, False)  # Same pattern: only the color changes
+    assert rules.rule(err).color == "#00FF00"
+
+
+def test_back_references_fall_back_to_rule_by_rule_matching():
+    rules = RuleSet()
+    bit, _ = rules.add(Rule(r"(\w)\1"))
+    rules.add(Rule("x"))
+    assert rules.tag("aa") == 1 << bit
+    assert rules.tag("ab") == 0
+
+
+def test_rule_limit_and_reused_slots():
+    rules = RuleSet()
+    for i in range(MAX_RULES):
+        rules.add(Rule(f"r{i}"))
+    with pytest.raises(ValueError):
+        rules.add(Rule("one too many"))
+    rules.remove(3)
+    assert rules.add(Rule("again")) == (3, True)
+
+
+def test_index_filters_by_stored_tags_and_retags_new_rules():
+    rules = RuleSet()
+    index = LineIndex(max_lines=3)
+    for text in ("boot", "temp=20", "[Connected]", "temp=21"):
+        index.append(text, MESSAGE if text.startswith("[") else rules.tag(text))
+    assert [text for text, _ in index.lines()] == ["temp=20", "[Connected]", "temp=21"]  # Oldest dropped
+
+    bit, new = rules.add(Rule("temp=21"))
+    assert new
+    index.retag(rules, bit)
+    assert [text for text, _ in index.lines(1 << bit)] == ["[Connected]", "temp=21"]  # Messages always shown
+
+    rules.remove(bit)
+    index.retag(rules, bit)
+    assert [text for text, _ in index.lines(1 << bit)] == ["[Connected]"]
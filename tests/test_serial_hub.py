@@ -0,0 +1,112 @@
+import os
+import threading
+import time
+
+import pytest
+import serial
+
+from vb2arduino.serial_hub import LineMerger, SerialHub
+from vb2arduino.serial_stream import SerialLine
+
+
+class Events:
+    """Hub callbacks collected per port, with a way to wait for them."""
+
+    def __init__(self):
+        self.lines: dict[str, list[str]] = {}
+        self.errors: dict[str, str] = {}
+        self.closed: list[str] = []
+        self._changed = threading.Condition()
+
+    def on_data(self, session, text, lines):
+        with self._changed:
+            self.lines.setdefault(session.port, []).extend(line.text for line in lines)
+            self._changed.notify_all()
+
+    def on_error(self, session, message):
+        with self._changed:
+            self.errors[session.port] = message
+            self._changed.notify_all()
+
+    def on_closed(self, session):
+        with self._changed:
+            self.closed.append(session.port)
+            self._changed.notify_all()
+
+    def wait(self, predicate, timeout: float = 5.0):
+        with self._changed:
+            assert self._changed.wait_for(predicate, timeout)
+
+
+@pytest.fixture
+def hub():
+    events = Events()
+    hub = SerialHub(on_data=events.on_data, on_error=events.on_error, on_closed=events.on_closed)
+    hub.events = events
+    yield hub
+    hub.shutdown()
+
+
+def test_one_thread_reads_every_port(hub, pty_port):
+    (dev_a, port_a), (dev_b, port_b) = pty_port(), pty_port()
+    a, b = hub.open(port_a, 115200), hub.open(port_b, 9600)
+
+    os.write(dev_a, b"a1\na2\n")
+    os.write(dev_b, b"b1\n")
+    hub.events.wait(lambda: len(hub.events.lines.get(port_a, [])) == 2 and port_b in hub.events.lines)
+
+    assert hub.events.lines == {port_a: ["a1", "a2"], port_b: ["b1"]}
+    assert (a.stats.bytes_in, a.stats.lines_in) == (6, 2)
+    assert sum(t.name == "SerialHub" for t in threading.enumerate()) == 1
+
+    b.write(b"ping\n")
+    assert os.read(dev_b, 5) == b"ping\n"
+    assert b.stats.bytes_out == 5
+
+
+def test_close_releases_only_that_port(hub, pty_port):
+    (dev_a, port_a), (dev_b, port_b) = pty_port(), pty_port()
+    a, b = hub.open(port_a, 115200), hub.open(port_b, 115200)
+
+    os.write(dev_a, b"partial")
+    hub.events.wait(lambda: a.stats.bytes_in == 7)
+    hub.close(a)
+
+    assert a.closed.is_set() and not a.is_open
+    assert hub.events.lines[port_a] == ["partial"]  # The unterminated tail is flushed on close
+    assert hub.events.closed == [port_a]
+    assert hub.session_for(port_a) is None
+    os.write(dev_b, b"still here\n")
+    hub.events.wait(lambda: hub.events.lines.get(port_b) == ["still here"])
+    assert b.is_open
+
+
+def test_open_failures(hub, pty_port):
+    _, port = pty_port()
+    hub.open(port, 115200)
+    with pytest.raises(serial.SerialException, match="already open"):
+        hub.open(port, 115200)
+    with pytest.raises(serial.SerialException):
+        hub.open("/dev/does-not-exist", 115200)
+
+
+def test_a_vanished_device_fails_its_session(hub, pty_port):
+    dev, port = pty_port()
+    session = hub.open(port, 115200)
+    time.sleep(0.05)  # Let the hub thread start watching the port
+
+    os.close(dev)  # The device goes away: the port reports ready but reading fails
+
+    hub.events.wait(lambda: port in hub.events.closed)
+    assert session.error.startswith("Read error")
+    assert hub.events.errors[port] == session.error
+    assert not session.is_open
+
+
+def test_line_merger_orders_by_first_byte_time():
+    merger = LineMerger(hold=0.1)
+    merger.push("a", [SerialLine(2.0, "late-start")])
+    merger.push("b", [SerialLine(1.0, "early"), SerialLine(2.0, "same-time")])
+    assert merger.pop_ready(now=1.5) == [("b", SerialLine(1.0, "early"))]
+    assert merger.flush() == [("a", SerialLine(2.0, "late-start")), ("b", SerialLine(2.0, "same-time"))]
+    assert len(merger) == 0
@@ -0,0 +1,112 @@
+import os
+import time
+
+import pytest
+
+
+class FakeSettings:
+    def __init__(self, **serial):
+        self.serial = serial
+
+    def get(self, section, key, default=None):
+        return self.serial.get(key, default) if section == "serial" else default
+
+
+@pytest.fixture
+def monitor(qapp):
+    from vb2arduino.ide.serial_monitor import SerialMonitor
+
+    widget = SerialMonitor()
+    yield widget
+    widget.close()
+
+
+def test_reapplying_the_same_highlight_rules_keeps_the_view(monitor, monkeypatch):
+    rules = [{"pattern": "ERROR", "color": "#FF0000"}]
+    monitor.apply_settings(FakeSettings(highlight_rules=rules))
+    redraws = []
+    monkeypatch.setattr(monitor, "refresh_view", lambda: redraws.append(1))
+
+    monitor.apply_settings(FakeSettings(highlight_rules=[dict(rule) for rule in rules], scrollback_lines=500))
+    assert redraws == []
+
+    monitor.apply_settings(FakeSettings(highlight_rules=[{"pattern": "WARN", "color": "#FFA500"}]))
+    assert redraws == [1]
+    assert monitor.rules.find("ERROR") is None
+
+
+@pytest.fixture
+def reader(qapp, pty_port):
+    """A SerialReader on a pseudo-terminal; returns (reader, device fd, received signals)."""
+    import serial
+    from PyQt6.QtCore import Qt
+    from vb2arduino.ide.serial_monitor import SerialReader
+
+    device, path = pty_port()
+    port = serial.Serial(path, timeout=0)
+    thread = SerialReader(port)
+    got = {"text": [], "lines": [], "errors": []}
+    direct = Qt.ConnectionType.DirectConnection  # Record on the reader thread; no event loop needed
+    thread.data_received.connect(got["text"].append, direct)
+    thread.lines_received.connect(lambda lines: got["lines"].extend(line.text for line in lines), direct)
+    thread.error_occurred.connect(got["errors"].append, direct)
+    yield thread, device, got
+    thread.stop()
+    port.close()
+
+
+def wait_until(predicate, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_reader_assembles_lines_split_across_reads(reader, tmp_path):
+    from vb2arduino.serial_capture import CaptureReader, CaptureWriter
+
+    thread, device, got = reader
+    acked = []
+    thread.line_listener = acked.extend
+    thread.set_capture(CaptureWriter(tmp_path))
+    thread.start()
+
+    for piece in (b"temp: 21.5\xc2", b"\xb0C\r\nok", b"\r\n"):
+        os.write(device, piece)
+        time.sleep(0.02)
+    assert wait_until(lambda: len(got["lines"]) == 2)
+
+    assert got["lines"] == ["temp: 21.5°C", "ok"]
+    assert "".join(got["text"]) == "temp: 21.5°C\r\nok\r\n"
+    assert [line.text for line in acked] == got["lines"]
+    thread.set_capture(None).close()
+    capture = CaptureReader(tmp_path)
+    assert [capture.line(i)[1] for i in range(len(capture))] == ["temp: 21.5°C", "ok"]
+    capture.close()
+
+
+def test_reader_stop_wakes_an_idle_thread(reader):
+    thread, _, got = reader
+    thread.start()
+    time.sleep(0.05)  # Blocked in select() with nothing to read
+
+    began = time.monotonic()
+    thread.stop()
+
+    assert not thread.isRunning()
+    assert time.monotonic() - began < 0.5
+    assert got["errors"] == []
+
+
+def test_reader_reports_a_vanished_device_and_flushes_the_partial_line(reader):
+    thread, device, got = reader
+    thread.start()
+    os.write(device, b"no newline")
+    assert wait_until(lambda: got["text"])
+
+    os.close(device)
+
+    assert wait_until(lambda: got["errors"])
+    assert got["errors"][0].startswith("Read error")
+    assert wait_until(lambda: not thread.isRunning())
+    assert got["lines"] == ["no newline"]
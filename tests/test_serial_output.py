@@ -0,0 +1,48 @@
+import pytest
+
+
+@pytest.fixture
+def view(qapp):
+    from vb2arduino.ide.serial_output import SerialOutputView
+
+    widget = SerialOutputView()
+    yield widget
+    widget.close()
+
+
+def test_text_is_queued_until_the_frame_flush(view):
+    for i in range(100):
+        view.append_text(f"line {i}\n")
+    assert view.toPlainText() == ""
+    assert view._flush_timer.isActive()
+
+    view.flush()
+
+    assert view.toPlainText().splitlines() == [f"line {i}" for i in range(100)]
+
+
+def test_messages_start_on_a_line_of_their_own(view):
+    view.append_text("partial")
+    view.message("[Disconnected]")
+    view.append_text("next\n")
+    view.flush()
+    assert view.toPlainText() == "partial\n[Disconnected]\nnext\n"
+
+
+def test_scrollback_keeps_the_newest_lines(view):
+    view.set_scrollback(50)
+    view.append_text("".join(f"line {i}\n" for i in range(500)))
+    view.flush()
+    lines = view.toPlainText().splitlines()
+    assert len(lines) <= 50
+    assert lines[-1] == "line 499"
+
+
+def test_backlog_over_the_limit_drops_the_oldest_chunks(view, monkeypatch):
+    monkeypatch.setattr(type(view), "PENDING_LIMIT", 100)
+    for i in range(10):
+        view.append_text(f"{i}" * 19 + "\n")  # 20 characters per chunk
+    view.flush()
+    text = view.toPlainText()
+    assert text.startswith("[... 100 characters dropped ...]\n")
+    assert text.splitlines()[1:] == [f"{i}" * 19 for i in range(5, 10)]
@@ -0,0 +1,53 @@
+import io
+import random
+
+from vb2arduino.serial_plot import Envelope, PlotData, RingBuffer, parse_fields
+from vb2arduino.serial_stream import SerialLine
+
+
+def test_parse_plotter_formats():
+    assert parse_fields("12.5,3,-1") == [(None, 12.5), (None, 3.0), (None, -1.0)]
+    assert parse_fields("temp:21.5 hum=40\t1e3") == [("temp", 21.5), ("hum", 40.0), (None, 1000.0)]
+    assert parse_fields("Connecting to WiFi 2") == []
+    assert parse_fields("ready") == []
+
+
+def test_ring_buffer_keeps_the_newest_values():
+    ring = RingBuffer(4)
+    for value in range(10):
+        ring.append(float(value))
+    assert len(ring) == 4 and ring.total == 10
+    assert list(ring.tail()) == [6.0, 7.0, 8.0, 9.0]
+    assert list(ring.tail(2)) == [8.0, 9.0]
+    assert list(ring.slice(0, 8)) == [6.0, 7.0]  # Older values are gone
+
+
+def test_envelope_matches_brute_force_as_samples_arrive():
+    rng = random.Random(7)
+    ring = RingBuffer(5000)
+    envelope = Envelope(ring)
+    values = []
+    for _ in range(6):
+        for _ in range(rng.randint(100, 900)):
+            values.append(rng.uniform(-1, 1))
+            ring.append(values[-1])
+        n, width = 2000, 300
+        block, cols = envelope.columns(n, width)
+        assert len(cols) <= width
+        # Blocks are aligned to absolute sample numbers, so the first may start before the window
+        first = (len(values) - min(n, len(values))) // block
+        blocks = [values[b * block:(b + 1) * block] for b in range(first, -(-len(values) // block))]
+        assert cols == [(min(chunk), max(chunk)) for chunk in blocks]
+
+
+def test_samples_stay_aligned_across_channels(tmp_path):
+    data = PlotData(capacity=10)
+    added = data.add_lines([SerialLine(1.0, "a:1"), SerialLine(2.0, "boot done"),
+                            SerialLine(3.0, "a:2 b:5"), SerialLine(4.0, "b:6")])
+    assert added == 4 and len(data) == 3
+    assert list(data.channels["a"].tail()) == [1.0, 2.0, 2.0]  # Holds its last value
+    assert list(data.channels["b"].tail()) == [5.0, 5.0, 6.0]  # Back-filled with its first value
+
+    out = io.StringIO()
+    assert data.write_csv(out, last=2) == 2
+    assert out.getvalue().splitlines() == ["timestamp,a,b", "3.000000,2.0,5.0", "4.000000,2.0,6.0"]
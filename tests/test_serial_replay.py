@@ -0,0 +1,84 @@
+import os
+import time
+
+import pytest
+import serial
+
+from vb2arduino.serial_capture import CaptureWriter
+from vb2arduino.serial_replay import SPEED_MAX, Replayer, VirtualSerialPort, capture_chunks
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="needs a pseudo-terminal")
+
+CHUNKS = [(10.0, b"boot\r\n"), (10.5, b"temp=21\r\n"), (11.0, b"temp=22\r\n")]
+
+
+@pytest.fixture
+def vport():
+    port = VirtualSerialPort()
+    yield port
+    port.close()
+
+
+def replay(port, source, **options):
+    replayer = Replayer(source, port, **options)
+    replayer.start()
+    return replayer
+
+
+def read_exactly(conn: serial.Serial, size: int) -> bytes:
+    data = b""
+    deadline = time.monotonic() + 5
+    while len(data) < size and time.monotonic() < deadline:
+        data += conn.read(size - len(data))
+    return data
+
+
+def test_capture_replays_byte_for_byte(tmp_path, vport):
+    writer = CaptureWriter(tmp_path)
+    for ts, data in CHUNKS:
+        writer.write(data, timestamp=ts)
+    writer.close()
+    expected = b"".join(data for _, data in CHUNKS)
+
+    with serial.Serial(vport.port, timeout=0.1) as conn:
+        replayer = replay(vport, capture_chunks(tmp_path), speed=SPEED_MAX)
+        assert read_exactly(conn, len(expected)) == expected
+        assert replayer.wait(5)
+    assert (replayer.bytes_sent, replayer.chunks_sent, replayer.passes) == (len(expected), 3, 1)
+    assert replayer.error == ""
+
+
+def test_replay_waits_for_the_port_to_be_opened(vport):
+    replayer = replay(vport, lambda: CHUNKS, speed=SPEED_MAX)
+    time.sleep(0.2)
+    assert replayer.bytes_sent == 0 and replayer.running
+
+    with serial.Serial(vport.port, timeout=0.1) as conn:
+        assert read_exactly(conn, 6) == b"boot\r\n"
+        assert replayer.wait(5)
+
+
+def test_speed_scales_the_captured_timing(vport):
+    with serial.Serial(vport.port, timeout=0.1) as conn:
+        replayer = replay(vport, lambda: CHUNKS, speed=10.0)
+        assert replayer.wait(5)
+        read_exactly(conn, replayer.bytes_sent)
+    assert 0.09 <= replayer.elapsed < 1.0  # One captured second at 10x
+
+
+def test_host_writes_are_drained_and_stop_ends_a_slow_replay(vport):
+    received = []
+    vport.on_host_data = received.append
+    with serial.Serial(vport.port, timeout=0.1) as conn:
+        replayer = replay(vport, lambda: CHUNKS, speed=0.001)
+        assert read_exactly(conn, 6) == b"boot\r\n"
+        conn.write(b"reset\n")
+        conn.flush()
+        deadline = time.monotonic() + 5
+        while not received and time.monotonic() < deadline:
+            vport.is_open()
+            time.sleep(0.01)
+        replayer.stop()
+    assert b"".join(received) == b"reset\n"
+    assert vport.bytes_from_host == 6
+    assert replayer.finished.is_set() and replayer.chunks_sent == 1
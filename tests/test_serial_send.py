@@ -0,0 +1,129 @@
+import threading
+
+import pytest
+import serial
+
+from vb2arduino.serial_send import FLOW_ACK, SendOptions, SendQueue, split_payload
+from vb2arduino.serial_stream import SerialLine
+
+
+class FakePort:
+    """Records writes; `on_write` can answer or block like a device would."""
+
+    def __init__(self, on_write=None):
+        self.write_timeout = None
+        self.xonxoff = False
+        self.writes: list[bytes] = []
+        self.on_write = on_write
+        self.unblocked = threading.Event()
+
+    def write(self, data: bytes) -> int:
+        self.writes.append(bytes(data))
+        if self.on_write:
+            self.on_write(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def cancel_write(self):
+        self.unblocked.set()
+
+
+class Finished:
+    """on_finished callback that lets the test wait for jobs."""
+
+    def __init__(self):
+        self.jobs = []
+        self._done = threading.Semaphore(0)
+
+    def __call__(self, job):
+        self.jobs.append(job)
+        self._done.release()
+
+    def wait(self, count: int = 1):
+        for _ in range(count):
+            assert self._done.acquire(timeout=5)
+
+
+@pytest.fixture
+def open_queue():
+    queues = []
+
+    def open_(port):
+        finished = Finished()
+        queues.append(SendQueue(port, on_finished=finished))
+        return queues[-1], finished
+
+    yield open_
+    for queue in queues:
+        queue.close()
+
+
+def test_split_by_chunk_and_by_line():
+    assert list(split_payload(b"0123456789", SendOptions(chunk_size=4))) == [b"0123", b"4567", b"89"]
+    assert list(split_payload(b"a\nbb\r\nc", SendOptions(by_line=True))) == [b"a\n", b"bb\r\n", b"c"]
+
+
+def test_jobs_are_written_in_order_in_chunks(open_queue):
+    port = FakePort()
+    queue, finished = open_queue(port)
+    first = queue.submit("first", b"0123456789", SendOptions(chunk_size=4, stall_timeout_s=3))
+    second = queue.submit("second", b"abc")
+    finished.wait(2)
+    assert port.writes == [b"0123", b"4567", b"89", b"abc"]
+    assert (first.state, first.sent, second.state) == ("done", 10, "done")
+    assert port.write_timeout is None  # Restored after each job
+
+
+def test_ack_flow_waits_for_each_line(open_queue):
+    port = FakePort()
+    queue, finished = open_queue(port)
+    port.on_write = lambda data: queue.ack_lines([SerialLine(0.0, "ok"), SerialLine(0.0, "OK " + data.decode())])
+    job = queue.submit("gcode", b"G1 X1\nG1 X2\n", SendOptions(by_line=True, flow=FLOW_ACK))
+    finished.wait()
+    assert job.state == "done"
+    assert port.writes == [b"G1 X1\n", b"G1 X2\n"]
+
+
+def test_missing_ack_fails_the_job(open_queue):
+    port = FakePort()
+    queue, finished = open_queue(port)
+    job = queue.submit("lines", b"one\ntwo\n", SendOptions(by_line=True, flow=FLOW_ACK, ack_timeout_s=0.05))
+    finished.wait()
+    assert job.state == "failed"
+    assert job.error == "No 'OK' within 0.05 s after byte 4"
+    assert port.writes == [b"one\n"]
+
+
+def test_stalled_port_fails_the_job(open_queue):
+    def stall(data):
+        raise serial.SerialTimeoutException("Write timeout")
+
+    queue, finished = open_queue(FakePort(stall))
+    job = queue.submit("data", b"data")
+    finished.wait()
+    assert job.state == "failed"
+    assert job.error == "The device stopped accepting data after byte 0"
+
+
+def test_cancel_interrupts_a_blocked_write_and_drops_queued_jobs(open_queue):
+    port = FakePort()
+    writing = threading.Event()
+
+    def block(data):
+        writing.set()
+        port.unblocked.wait(5)  # Held by flow control until cancel_write()
+
+    port.on_write = block
+    queue, finished = open_queue(port)
+    running = queue.submit("running", b"x" * 10, SendOptions(chunk_size=2))
+    queued = queue.submit("queued", b"y")
+    assert writing.wait(5)
+
+    queue.cancel()
+    finished.wait(2)
+
+    assert {job.name: job.state for job in finished.jobs} == {"running": "cancelled", "queued": "cancelled"}
+    assert (running.sent, queued.sent) == (2, 0)
+    assert port.writes == [b"xx"]
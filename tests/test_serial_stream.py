@@ -0,0 +1,30 @@
+from vb2arduino.serial_stream import LineAssembler, SerialLine
+
+
+def test_lines_and_utf8_split_across_reads():
+    asm = LineAssembler()
+    data = "temp: 21.5°C\r\nok\r\nstill go".encode("utf-8")
+    lines, text = [], ""
+    for i, byte in enumerate(data):
+        out, got = asm.feed(bytes([byte]), timestamp=float(i))
+        text += out
+        lines += got
+    assert text == data.decode("utf-8")
+    assert [line.text for line in lines] == ["temp: 21.5°C", "ok"]
+    assert lines[0].timestamp == 0.0  # When the line's first byte arrived
+    assert asm.partial == "still go"
+    assert asm.flush() == SerialLine(19.0, "still go", complete=False)
+    assert asm.partial == ""
+
+
+def test_several_lines_in_one_read_and_invalid_bytes():
+    asm = LineAssembler()
+    _, lines = asm.feed(b"a\nb\xff\nc\n", timestamp=5.0)
+    assert lines == [SerialLine(5.0, "a"), SerialLine(5.0, "b�"), SerialLine(5.0, "c")]
+
+
+def test_overlong_line_is_split():
+    asm = LineAssembler(max_line=4)
+    _, lines = asm.feed(b"0123456789", timestamp=1.0)
+    assert [(line.text, line.complete) for line in lines] == [("0123", False), ("4567", False)]
+    assert asm.partial == "89"
@@ -0,0 +1,13 @@
+from vb2arduino.size_report import SizeRecord, append_history, load_history, sketch_history_path
+
+
+def test_each_sketch_keeps_its_own_history(tmp_path):
+    blink = sketch_history_path(tmp_path / "blink.vb")
+    servo = sketch_history_path(tmp_path / "servo" / "servo.vb")
+    assert blink == tmp_path / "blink.size_history.json"
+    assert servo == tmp_path / "servo" / "servo.size_history.json"
+
+    append_history(blink, SizeRecord(env="uno", firmware_hash="a", text=1000))
+    append_history(blink, SizeRecord(env="uno", firmware_hash="b", text=1200))
+    assert [r.flash for r in load_history(blink)] == [1000, 1200]
+    assert load_history(servo) == []
@@ -0,0 +1,158 @@
+import re
+
+from vb2arduino import VBTranspiler
+
+
+def transpile(source: str, **options) -> str:
+    return VBTranspiler(**options).transpile(source).cpp
+
+
+def test_for_counter_is_signed():
+    cpp = transpile("""
+Sub Setup()
+    For i = 0 To 300 Step 100
+        SerialPrintLine i - 150
+    Next
+End Sub
+""")
+    header = re.search(r"for \((\w+) i = 0;", cpp)
+    assert header and not header.group(1).startswith("u")
+
+
+def test_for_counter_arithmetic_goes_negative(run_sketch):
+    trace = run_sketch("""
+Sub Setup()
+    For i = 0 To 300 Step 100
+        SerialPrintLine i - 150
+    Next
+    For j = 0 To 7
+        SerialPrintLine j - 2
+    Next
+End Sub
+
+Sub Loop()
+End Sub
+""")
+    assert "-150" in trace and "150" in trace and "-2" in trace
+    assert "18446744073709551466" not in trace
+
+
+def test_for_counter_passed_byref_keeps_int(run_sketch):
+    source = """
+Sub Show(ByRef n As Integer)
+    SerialPrintLine n
+End Sub
+
+Sub Setup()
+    For j = 0 To 7
+        Show j
+    Next
+End Sub
+
+Sub Loop()
+End Sub
+"""
+    assert "for (int j = 0;" in transpile(source)
+    assert "7" in run_sketch(source)
+
+
+def test_local_byte_does_not_narrow_global_of_same_name():
+    cpp = transpile("""
+Dim x As Integer
+
+Sub Helper()
+    Dim x As Byte
+    x = 3
+End Sub
+
+Sub Setup()
+    x = 1000
+    SerialPrintLine Sin(x)
+End Sub
+""")
+    assert "sin(x)" in cpp and "__vb_sin_lut" not in cpp
+
+
+def test_byte_trig_table_is_read_unguarded_in_target_precision(run_sketch):
+    source = """
+Sub Setup()
+    Dim b As Byte
+    b = 200
+    SerialPrintLine Sin(b) * 1000000
+End Sub
+
+Sub Loop()
+End Sub
+"""
+    cpp = transpile(source)
+    assert "typedef double __vb_trig_t;" in cpp
+    assert "__vb_read_trig(__vb_sin_lut0 + (b))" in cpp
+    assert "-873297.30" in run_sketch(source)  # sin(200) to double precision; a float table gives -873297.27
+
+
+def test_fractional_selectors_skip_lookup_tables():
+    cpp = transpile("""
+Dim f As Single
+
+Sub Setup()
+    SerialPrintLine Switch(f = 1, 10, f = 2, 20, True, 0)
+    SerialPrintLine Choose(f, 10, 20, 30)
+    SerialPrintLine Choose(2.5, 10, 20, 30)
+End Sub
+""")
+    assert "_lut" not in cpp and "(unsigned)" not in cpp
+
+
+def test_integer_choose_uses_guarded_table():
+    cpp = transpile("""
+Dim n As Integer
+
+Sub Setup()
+    SerialPrintLine Choose(n, 10, 20, 30)
+End Sub
+""")
+    assert "(unsigned)((n) - 1) < 3u ? pgm_read_byte(__vb_choose_lut0 + ((n) - 1)) : 0" in cpp
+
+
+def test_for_counter_written_in_body_keeps_int():
+    cpp = transpile("""
+Sub Setup()
+    For i = 0 To 100
+        If i = 5 Then
+            i = i + 200
+        End If
+        SerialPrintLine i * 2
+    Next
+End Sub
+""")
+    assert "for (int i = 0;" in cpp and "i = i + 200;" in cpp
+
+
+INLINE_SKETCH = """
+Function Twice(x As Integer) As Integer
+    Return x * 2
+End Function
+
+Function Countdown(n As Integer) As Integer
+    If n > 0 Then
+        Return countdown(n - 1)
+    End If
+    Return 0
+End Function
+
+Sub Loop()
+    SerialPrintLine Twice(Countdown(3))
+End Sub
+"""
+
+
+def test_inlining_is_opt_in():
+    assert "static inline" not in transpile(INLINE_SKETCH)
+    cpp = transpile("Option Inline On\n" + INLINE_SKETCH)
+    assert "static inline int Twice(" in cpp
+
+
+def test_call_graph_ignores_case():
+    result = VBTranspiler(inline=True, inline_threshold=10).transpile(INLINE_SKETCH)
+    assert result.call_graph["Countdown"] == {"Countdown"}
+    assert [name for name, _ in result.inlined] == ["Twice"]